@@ -15,11 +15,12 @@ import sys
 import py_compile
 import struct
 import imp
+import itertools
 
-__all__ = ["compile_dir","compile_file","compile_path"]
+__all__ = ["compile_dir","compile_file","compile_path","write_report"]
 
 def compile_dir(dir, maxlevels=10, ddir=None,
-                force=0, rx=None, quiet=0):
+                force=0, rx=None, quiet=0, workers=1, report=None):
     """Byte-compile all modules in the given directory tree.
 
     Arguments (only dir is required):
@@ -30,7 +31,16 @@ def compile_dir(dir, maxlevels=10, ddir=None,
                file as it is compiled into each byte-code file.
     force:     if 1, force compilation, even if timestamps are up-to-date
     quiet:     if 1, be quiet during compilation
+    workers:   number of worker processes compiling in parallel, 0 for one
+               per CPU (PyPy extension)
+    report:    if a list, a (filename, status, error message) tuple is
+               appended to it for every source file, see write_report()
+               (PyPy extension)
     """
+    files = _walk_dir(dir, maxlevels, ddir, quiet)
+    return _compile_files(files, force, rx, quiet, workers, report)
+
+def _walk_dir(dir, maxlevels, ddir, quiet):
     if not quiet:
         print 'Listing', dir, '...'
     try:
@@ -39,7 +49,6 @@ def compile_dir(dir, maxlevels=10, ddir=None,
         print "Can't list", dir
         names = []
     names.sort()
-    success = 1
     for name in names:
         fullname = os.path.join(dir, name)
         if ddir is not None:
@@ -47,15 +56,50 @@ def compile_dir(dir, maxlevels=10, ddir=None,
         else:
             dfile = None
         if not os.path.isdir(fullname):
-            if not compile_file(fullname, ddir, force, rx, quiet):
-                success = 0
+            yield fullname, ddir
         elif maxlevels > 0 and \
              name != os.curdir and name != os.pardir and \
              os.path.isdir(fullname) and \
              not os.path.islink(fullname):
-            if not compile_dir(fullname, maxlevels - 1, dfile, force, rx,
-                               quiet):
-                success = 0
+            for item in _walk_dir(fullname, maxlevels - 1, dfile, quiet):
+                yield item
+
+def _compile_files(files, force, rx, quiet, workers, report):
+    """Compile the (fullname, ddir) pairs of 'files', in 'workers'
+    processes if it is not 1."""
+    if workers != 1:
+        try:
+            import multiprocessing
+        except ImportError:
+            workers = 1
+    tasks = ((fullname, ddir, force, rx, quiet) for fullname, ddir in files)
+    if workers == 1:
+        results = itertools.imap(_compile_task, tasks)
+        return _collect_results(results, report)
+    pool = multiprocessing.Pool(workers or None)
+    try:
+        results = pool.imap(_compile_task, tasks, 8)
+        success = _collect_results(results, report)
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    return success
+
+def _compile_task(args):
+    fullname, ddir, force, rx, quiet = args
+    status, msg = _compile_file(fullname, ddir, force, rx, quiet)
+    return fullname, status, msg
+
+def _collect_results(results, report):
+    success = 1
+    for fullname, status, msg in results:
+        if status == 'failed':
+            success = 0
+        if status is not None and report is not None:
+            report.append((fullname, status, msg))
     return success
 
 def compile_file(fullname, ddir=None, force=0, rx=None, quiet=0):
@@ -69,7 +113,14 @@ def compile_file(fullname, ddir=None, force=0, rx=None, quiet=0):
     force:     if 1, force compilation, even if timestamps are up-to-date
     quiet:     if 1, be quiet during compilation
     """
-    success = 1
+    status, msg = _compile_file(fullname, ddir, force, rx, quiet)
+    return int(status != 'failed')
+
+def _compile_file(fullname, ddir, force, rx, quiet):
+    """Byte-compile one file.  Returns the status, one of 'compiled',
+    'skipped' (up-to-date), 'excluded' (by rx), 'failed' or None if
+    fullname is not a source file, and the error message of a failure.
+    """
     name = os.path.basename(fullname)
     if ddir is not None:
         dfile = os.path.join(ddir, name)
@@ -78,37 +129,73 @@ def compile_file(fullname, ddir=None, force=0, rx=None, quiet=0):
     if rx is not None:
         mo = rx.search(fullname)
         if mo:
-            return success
-    if os.path.isfile(fullname):
-        head, tail = name[:-3], name[-3:]
-        if tail == '.py':
-            if not force:
-                try:
-                    mtime = int(os.stat(fullname).st_mtime)
-                    expect = struct.pack('<4sl', imp.get_magic(), mtime)
-                    cfile = fullname + (__debug__ and 'c' or 'o')
-                    with open(cfile, 'rb') as chandle:
-                        actual = chandle.read(8)
-                    if expect == actual:
-                        return success
-                except IOError:
-                    pass
-            if not quiet:
-                print 'Compiling', fullname, '...'
-            try:
-                ok = py_compile.compile(fullname, None, dfile, True)
-            except py_compile.PyCompileError,err:
-                if quiet:
-                    print 'Compiling', fullname, '...'
-                print err.msg
-                success = 0
-            except IOError, e:
-                print "Sorry", e
-                success = 0
-            else:
-                if ok == 0:
-                    success = 0
-    return success
+            return 'excluded', None
+    if not os.path.isfile(fullname):
+        return None, None
+    head, tail = name[:-3], name[-3:]
+    if tail != '.py':
+        return None, None
+    # PyPy: with sys.pycache_prefix the neighbouring .pyc files are not
+    # used, and the cache entries are named after the hash of the source
+    prefix = getattr(sys, 'pycache_prefix', None)
+    if not force and not prefix:
+        try:
+            mtime = int(os.stat(fullname).st_mtime)
+            expect = struct.pack('<4sl', imp.get_magic(), mtime)
+            cfile = fullname + (__debug__ and 'c' or 'o')
+            with open(cfile, 'rb') as chandle:
+                actual = chandle.read(8)
+            if expect == actual:
+                return 'skipped', None
+        except IOError:
+            pass
+    if not quiet:
+        print 'Compiling', fullname, '...'
+    try:
+        if prefix:
+            if not _precompile(fullname, dfile):
+                return 'skipped', None
+        else:
+            ok = py_compile.compile(fullname, None, dfile, True)
+            if ok == 0:
+                return 'failed', None
+    except py_compile.PyCompileError,err:
+        if quiet:
+            print 'Compiling', fullname, '...'
+        print err.msg
+        return 'failed', err.msg
+    except IOError, e:
+        print "Sorry", e
+        return 'failed', str(e)
+    return 'compiled', None
+
+def _precompile(fullname, dfile):
+    # PyPy: compile into sys.pycache_prefix, returns False if the entry
+    # for this source was already there
+    try:
+        cfile, written = imp._precompile_source(fullname)
+    except IOError:
+        raise
+    except Exception, err:
+        raise py_compile.PyCompileError(err.__class__, err, dfile or fullname)
+    return written
+
+def write_report(report, filename):
+    """Write the entries collected by compile_dir(report=...) as JSON to
+    'filename', or to stdout if it is '-' (PyPy extension)."""
+    import json
+    data = {'compiled': 0, 'skipped': 0, 'excluded': 0, 'failed': 0,
+            'files': []}
+    for fullname, status, msg in report:
+        data[status] += 1
+        data['files'].append({'file': fullname, 'status': status,
+                              'error': msg})
+    if filename == '-':
+        json.dump(data, sys.stdout, indent=1, sort_keys=True)
+        sys.stdout.write('\n')
+    else:
+        with open(filename, 'w') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
 
 def compile_path(skip_curdir=1, maxlevels=0, force=0, quiet=0):
     """Byte-compile all module on sys.path.
@@ -152,11 +239,12 @@ def main():
     """Script main program."""
     import getopt
     try:
-        opts, args = getopt.getopt(sys.argv[1:], 'lfqd:x:i:')
+        opts, args = getopt.getopt(sys.argv[1:], 'lfqd:x:i:j:', ['report='])
     except getopt.error, msg:
         print msg
         print "usage: python compileall.py [-l] [-f] [-q] [-d destdir] " \
-              "[-x regexp] [-i list] [directory|file ...]"
+              "[-x regexp] [-i list] [-j workers] [--report file] " \
+              "[directory|file ...]"
         print
         print "arguments: zero or more file and directory names to compile; " \
               "if no arguments given, "
@@ -177,6 +265,10 @@ def main():
         print "-i file: add all the files and directories listed in file to " \
               "the list considered for"
         print '         compilation; if "-", names are read from stdin'
+        print "-j workers: compile in that many processes, 0 for one per CPU"
+        print "--report file: write the status of every source file as " \
+              "JSON to file,"
+        print '               or to stdout if "-"'
 
         sys.exit(2)
     maxlevels = 10
@@ -185,6 +277,8 @@ def main():
     quiet = 0
     rx = None
     flist = None
+    workers = 1
+    report_file = None
     for o, a in opts:
         if o == '-l': maxlevels = 0
         if o == '-d': ddir = a
@@ -194,11 +288,14 @@ def main():
             import re
             rx = re.compile(a)
         if o == '-i': flist = a
+        if o == '-j': workers = int(a)
+        if o == '--report': report_file = a
     if ddir:
         if len(args) != 1 and not os.path.isdir(args[0]):
             print "-d destdir require exactly one directory argument"
             sys.exit(2)
     success = 1
+    report = [] if report_file else None
     try:
         if args or flist:
             try:
@@ -210,16 +307,19 @@ def main():
                 for arg in args:
                     if os.path.isdir(arg):
                         if not compile_dir(arg, maxlevels, ddir,
-                                           force, rx, quiet):
+                                           force, rx, quiet, workers, report):
                             success = 0
                     else:
-                        if not compile_file(arg, ddir, force, rx, quiet):
+                        if not _compile_files([(arg, ddir)], force, rx,
+                                              quiet, 1, report):
                             success = 0
         else:
             success = compile_path()
     except KeyboardInterrupt:
         print "\n[interrupted]"
         success = 0
+    if report is not None:
+        write_report(report, report_file)
     return success
 
 if __name__ == '__main__':
@@ -194,5 +194,15 @@ hasname.append(201)
 def_op('CALL_METHOD', 202)            # #args not including 'self'
 def_op('BUILD_LIST_FROM_ARG', 203)
 jrel_op('JUMP_IF_NOT_DEBUG', 204)     # jump over assert statements
+def_op('MATCH_TABLE', 205)            # Index in const list
+hasconst.append(205)
+def_op('MATCH_CLASS', 49)
+
+# pypy modification, superinstructions: the opcode of the first instruction
+# of a common pair is replaced, the second instruction is left unchanged
+def_op('LOAD_FAST_LOAD_ATTR', 206)          # Local variable number
+haslocal.append(206)
+def_op('COMPARE_OP_POP_JUMP_IF_FALSE', 208) # Comparison operator
+hascompare.append(208)
 
 del def_op, name_op, jrel_op, jabs_op
@@ -103,6 +103,20 @@ def compile(file, cfile=None, dfile=None, doraise=False):
     directories).
 
     """
+    if cfile is None and getattr(sys, 'pycache_prefix', None):
+        # PyPy: write into the central cache directory that the import
+        # machinery uses when sys.pycache_prefix is set
+        try:
+            imp._precompile_source(file)
+        except IOError:
+            raise
+        except Exception, err:
+            py_exc = PyCompileError(err.__class__, err, dfile or file)
+            if doraise:
+                raise py_exc
+            else:
+                sys.stderr.write(py_exc.msg + '\n')
+        return
     with open(file, 'U') as f:
         try:
             timestamp = long(os.fstat(f.fileno()).st_mtime)
@@ -120,13 +134,34 @@ def compile(file, cfile=None, dfile=None, doraise=False):
             return
     if cfile is None:
         cfile = file + (__debug__ and 'c' or 'o')
-    with open(cfile, 'wb') as fc:
-        fc.write('\0\0\0\0')
-        wr_long(fc, timestamp)
-        marshal.dump(codeobject, fc)
-        fc.flush()
-        fc.seek(0, 0)
-        fc.write(MAGIC)
+    # PyPy: write to a temporary file and rename it, so that concurrent
+    # compilers and importers never see a partially written file
+    tmpfile = '%s.%d.tmp' % (cfile, os.getpid())
+    try:
+        with open(tmpfile, 'wb') as fc:
+            fc.write('\0\0\0\0')
+            wr_long(fc, timestamp)
+            marshal.dump(codeobject, fc)
+            fc.flush()
+            fc.seek(0, 0)
+            fc.write(MAGIC)
+        _replace(tmpfile, cfile)
+    except:
+        try:
+            os.unlink(tmpfile)
+        except OSError:
+            pass
+        raise
+
+def _replace(src, dst):
+    try:
+        os.rename(src, dst)
+    except OSError:
+        if os.name != 'nt' or not os.path.exists(dst):
+            raise
+        # on Windows, rename() does not replace an existing file
+        os.unlink(dst)
+        os.rename(src, dst)
 
 def main(args=None):
     """Compile several source files.
@@ -1,5 +1,6 @@
 import compileall
 import imp
+import json
 import os
 import py_compile
 import shutil
@@ -71,6 +72,51 @@ class CompileallTests(unittest.TestCase):
         os.unlink(self.bc_path)
         os.unlink(self.bc_path2)
 
+    def test_report(self):
+        # PyPy extension: the status of every source file
+        bad_path = os.path.join(self.directory, '_bad.py')
+        with open(bad_path, 'w') as file:
+            file.write('x = (\n')
+        with open(os.path.join(self.directory, 'README'), 'w') as file:
+            file.write('not a source\n')
+        compileall.compile_file(self.source_path2, force=False, quiet=True)
+        report = []
+        success = compileall.compile_dir(self.directory, quiet=True,
+                                         report=report)
+        self.assertFalse(success)
+        statuses = dict((os.path.basename(name), status)
+                        for name, status, msg in report)
+        self.assertEqual(statuses, {'_test.py': 'compiled',
+                                    '_test2.py': 'skipped',
+                                    '_bad.py': 'failed'})
+        self.assertEqual(os.listdir(self.directory).count('_bad.pyc'), 0)
+        report_path = os.path.join(self.directory, 'report.json')
+        compileall.write_report(report, report_path)
+        with open(report_path) as file:
+            data = json.load(file)
+        self.assertEqual((data['compiled'], data['skipped'], data['failed']),
+                         (1, 1, 1))
+        self.assertEqual(len(data['files']), 3)
+
+    def test_workers(self):
+        # PyPy extension: compile in parallel processes
+        subdir = os.path.join(self.directory, 'sub')
+        os.mkdir(subdir)
+        for i in range(10):
+            shutil.copyfile(self.source_path,
+                            os.path.join(subdir, '_test%d.py' % i))
+        report = []
+        self.assertTrue(compileall.compile_dir(self.directory, quiet=True,
+                                               workers=2, report=report))
+        self.assertEqual(len(report), 12)
+        self.assertTrue(all(status == 'compiled'
+                            for name, status, msg in report))
+        for name, status, msg in report:
+            self.assertTrue(os.path.isfile(name + ('c' if __debug__ else 'o')))
+        self.assertFalse([name for name in os.listdir(subdir)
+                          if name.endswith('.tmp')])
+
+
 def test_main():
     test_support.run_unittest(CompileallTests)
 
@@ -177,6 +177,13 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
     BoolOption("lonepycfiles", "Import pyc files with no matching py file",
                default=False),
 
+    StrOption("frozen_modules",
+              "Comma-separated list of application-level modules from "
+              "lib_pypy and lib-python whose code is compiled into the "
+              "executable",
+              cmdline="--frozen-modules",
+              default=""),
+
     StrOption("soabi",
               "Tag to differentiate extension modules built for different Python interpreters",
               cmdline="--soabi",
@@ -186,6 +193,11 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
                "Honor the __builtins__ key of a module dictionary",
                default=False),
 
+    BoolOption("framefreelist",
+               "Reuse the frames of calls that returned without their frame "
+               "escaping, from a small free list per code object",
+               default=False),
+
     BoolOption("disable_call_speedhacks",
                "make sure that all calls go through space.call_args",
                default=False),
@@ -219,7 +231,8 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
         BoolOption("withsmalllong", "use a version of 'long' in a C long long",
                    default=False),
 
-        BoolOption("withstrbuf", "use strings optimized for addition (ver 2)",
+        BoolOption("withstrbuf",
+                   "use str and unicode objects optimized for addition",
                    default=False),
 
         BoolOption("withspecialisedtuple",
@@ -231,6 +244,32 @@ pypy_optiondescription = OptionDescription("objspace", "Object Space Options", [
                    default=False,
                    requires=[("objspace.honor__builtins__", False)]),
 
+        BoolOption("withunboxedvaluedict",
+                   "use dict strategies that store int and float values "
+                   "unboxed, for dicts like {int: float} or {str: int}",
+                   default=False),
+
+        BoolOption("withunboxedattributes",
+                   "store int and float instance attributes unboxed",
+                   default=False),
+
+        BoolOption("withtuplekeystrategies",
+                   "use dict and set strategies for keys that are tuples "
+                   "(int, int) or (str, int)",
+                   default=False),
+
+        BoolOption("withtuplelists",
+                   "store lists of (int, int), (float, float) and similar "
+                   "small tuples column-wise",
+                   default=False,
+                   requires=[("objspace.std.withliststrategies", True)]),
+
+        BoolOption("withsliceviews",
+                   "make large slices of lists, str and unicode share the "
+                   "items of the sliced object instead of copying them",
+                   default=False,
+                   requires=[("objspace.std.withliststrategies", True)]),
+
         BoolOption("withliststrategies",
                    "enable optimized ways to store lists of primitives ",
                    default=True),
@@ -272,6 +311,8 @@ def set_pypy_opt_level(config, level):
         config.objspace.std.suggest(optimized_list_getitem=True)
         #config.objspace.std.suggest(newshortcut=True)
         config.objspace.std.suggest(withspecialisedtuple=True)
+        config.objspace.std.suggest(withtuplekeystrategies=True)
+        config.objspace.std.suggest(withstrbuf=True)
         #if not IS_64_BITS:
         #    config.objspace.std.suggest(withsmalllong=True)
 
@@ -285,6 +326,9 @@ def set_pypy_opt_level(config, level):
     if level == 'mem':
         config.objspace.std.suggest(withprebuiltint=True)
         config.objspace.std.suggest(withliststrategies=True)
+        config.objspace.std.suggest(withunboxedvaluedict=True)
+        config.objspace.std.suggest(withtuplelists=True)
+        config.objspace.std.suggest(withunboxedattributes=True)
         if not IS_64_BITS:
             config.objspace.std.suggest(withsmalllong=True)
 
@@ -42,9 +42,14 @@ def test_set_pypy_opt_level():
     conf = get_pypy_config()
     set_pypy_opt_level(conf, '2')
     assert conf.objspace.std.intshortcut
+    assert conf.objspace.std.withstrbuf
     conf = get_pypy_config()
     set_pypy_opt_level(conf, '0')
     assert not conf.objspace.std.intshortcut
+    assert not conf.objspace.std.withstrbuf
+    conf = get_pypy_config()
+    set_pypy_opt_level(conf, 'mem')
+    assert conf.objspace.std.withunboxedattributes
 
 def test_check_documentation():
     def check_file_exists(fn):
@@ -34,6 +34,9 @@ PyPy options and arguments:
 -X track-resources : track the creation of files and sockets and display
                      a warning if they are not closed explicitly
 -X faulthandler    : attempt to display tracebacks when PyPy crashes
+-X pycache_prefix=PATH : read and write the compiled .pyc files in the
+                     directory PATH instead of next to the sources; also
+                     PYTHONPYCACHEPREFIX=PATH
 """
 # Missing vs CPython: PYTHONHOME, PYTHONCASEOK
 USAGE2 = """
@@ -45,6 +48,8 @@ PYTHONIOENCODING: Encoding[:errors] used for stdin/stdout/stderr.
 PYPY_IRC_TOPIC: if set to a non-empty value, print a random #pypy IRC
                topic at startup of interactive mode.
 PYPYLOG: If set to a non-empty value, enable logging.
+PYPYJITPROFILE: file where the JIT records which loops it compiled, loaded
+               at startup to compile them again sooner.
 """
 
 try:
@@ -247,9 +252,12 @@ def set_runtime_options(options, Xparam, *args):
         sys.pypy_set_track_resources(True)
     elif Xparam == 'faulthandler':
         run_faulthandler()
+    elif Xparam.startswith('pycache_prefix='):
+        sys.pycache_prefix = Xparam[len('pycache_prefix='):] or None
     else:
         print >> sys.stderr, 'usage: %s -X [options]' % (get_sys_executable(),)
-        print >> sys.stderr, '[options] can be: track-resources, faulthandler'
+        print >> sys.stderr, ('[options] can be: track-resources, '
+                              'faulthandler, pycache_prefix=PATH')
         raise SystemExit
 
 class CommandLineError(Exception):
@@ -518,6 +526,9 @@ def parse_command_line(argv):
             options["unbuffered"] = 1
         parse_env('PYTHONVERBOSE', "verbose", options)
         parse_env('PYTHONOPTIMIZE', "optimize", options)
+        if (os.getenv('PYTHONPYCACHEPREFIX') and
+                getattr(sys, 'pycache_prefix', None) is None):
+            sys.pycache_prefix = os.getenv('PYTHONPYCACHEPREFIX')
     if (options["interactive"] or
         (not options["ignore_environment"] and os.getenv('PYTHONINSPECT'))):
         options["inspect"] = 1
@@ -582,6 +593,13 @@ def run_command_line(interactive,
     mainmodule = type(sys)('__main__')
     sys.modules['__main__'] = mainmodule
 
+    # enabled before site.py runs, so that the profile is loaded before
+    # most code objects are created
+    jitprofile = not ignore_environment and os.getenv('PYPYJITPROFILE')
+    if jitprofile and 'pypyjit' in sys.builtin_module_names:
+        import pypyjit
+        pypyjit.enable_warmup_profile(jitprofile)
+
     if not no_site:
         try:
             import site
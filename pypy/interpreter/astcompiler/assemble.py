@@ -22,6 +22,8 @@ class Instruction(object):
         self.arg = arg
         self.lineno = 0
         self.has_jump = False
+        self.match_keys_w = None
+        self.match_targets = None
 
     def size(self):
         """Return the size of bytes of this instruction when it is
@@ -219,6 +221,7 @@ class PythonCodeMaker(ast.ASTVisitor):
             self.lineno_set = True
         if not self.is_dead_code():
             self.instrs.append(instr)
+        return instr
 
     def emit_op_name(self, op, container, name):
         """Emit an opcode referencing a name."""
@@ -228,6 +231,23 @@ class PythonCodeMaker(ast.ASTVisitor):
         """Emit a jump opcode to another block."""
         self.emit_op(op).jump_to(block_to, absolute)
 
+    def emit_match_table(self, keys_w, targets):
+        """Emit a MATCH_TABLE jumping to the block of 'targets' whose key in
+        'keys_w' is the first one equal to the subject.  Its constant, the
+        tuple (keys, offsets), is only built by assemble(), once the offsets
+        of the blocks are known."""
+        space = self.space
+        # reserve the constant under a key that cannot clash with the keys
+        # made by _make_key(), which all have at least two items
+        w_len = space.len(self.w_consts)
+        space.setitem(self.w_consts, space.newtuple([w_len]), w_len)
+        index = space.int_w(w_len)
+        if index == 0:
+            self.scope.doc_removable = False
+        instr = self.emit_op_arg(ops.MATCH_TABLE, index)
+        instr.match_keys_w = keys_w
+        instr.match_targets = targets
+
     def add_name(self, container, name):
         """Get the index of a name in container."""
         name = self.scope.mangle(name)
@@ -380,6 +400,40 @@ class PythonCodeMaker(ast.ASTVisitor):
             consts_w[space.int_w(w_index)] = w_constant
         return consts_w
 
+    def _build_match_tables(self, blocks, consts_w):
+        space = self.space
+        for block in blocks:
+            for instr in block.instructions:
+                if instr.match_targets is not None:
+                    offsets_w = [space.newint(target.offset)
+                                 for target in instr.match_targets]
+                    consts_w[instr.arg] = space.newtuple([
+                        space.newtuple(instr.match_keys_w[:]),
+                        space.newtuple(offsets_w)])
+
+    def _fuse_superinstructions(self, blocks):
+        """Replace the first instruction of some common pairs with a
+        superinstruction that also runs the second one.
+
+        The second instruction is left in place, so this must not change
+        any offset.  Pairs are only fused inside a block, so that the
+        second half is never a jump target, and when the second half does
+        not start a new line, so that tracing sees the same line events.
+        """
+        for block in blocks:
+            instrs = block.instructions
+            i = 0
+            while i < len(instrs) - 1:
+                first = instrs[i]
+                second = instrs[i + 1]
+                fused = _superinstructions.get((first.opcode, second.opcode),
+                                               -1)
+                if fused != -1 and not second.lineno and second.size() == 3:
+                    first.opcode = fused
+                    i += 2
+                else:
+                    i += 1
+
     def _get_code_flags(self):
         """Get an extra flags that should be attached to the code object."""
         raise NotImplementedError
@@ -434,6 +488,9 @@ class PythonCodeMaker(ast.ASTVisitor):
                 if jump_op == ops.JUMP_ABSOLUTE or jump_op == ops.JUMP_FORWARD:
                     # Nothing more can occur.
                     break
+            elif instr.match_targets is not None:
+                for target in instr.match_targets:
+                    self._next_stack_depth_walk(target, depth)
             elif jump_op == ops.RETURN_VALUE or jump_op == ops.RAISE_VARARGS:
                 # Nothing more can occur.
                 break
@@ -504,7 +561,9 @@ class PythonCodeMaker(ast.ASTVisitor):
         self._resolve_block_targets(blocks)
         lnotab = self._build_lnotab(blocks)
         stack_depth = self._stacksize(blocks)
+        self._fuse_superinstructions(blocks)
         consts_w = self._build_consts_array()
+        self._build_match_tables(blocks, consts_w)
         names = _list_from_dict(self.names)
         var_names = _list_from_dict(self.var_names)
         cell_names = _list_from_dict(self.cell_vars)
@@ -668,6 +727,21 @@ _static_opcode_stack_effects = {
     ops.JUMP_IF_NOT_DEBUG: 0,
 
     ops.BUILD_LIST_FROM_ARG: 1,
+
+    ops.MATCH_TABLE: 0,
+    ops.MATCH_CLASS: 0,
+
+    # superinstructions: only the effect of the first half, the second
+    # half is still a separate instruction
+    ops.LOAD_FAST_LOAD_ATTR: 1,
+    ops.COMPARE_OP_POP_JUMP_IF_FALSE: -1,
+}
+
+
+# (first opcode, second opcode) -> superinstruction replacing the first one
+_superinstructions = {
+    (ops.LOAD_FAST, ops.LOAD_ATTR): ops.LOAD_FAST_LOAD_ATTR,
+    (ops.COMPARE_OP, ops.POP_JUMP_IF_FALSE): ops.COMPARE_OP_POP_JUMP_IF_FALSE,
 }
 
 
@@ -338,6 +338,8 @@ class stmt(AST):
             return If.from_object(space, w_node)
         if space.isinstance_w(w_node, get(space).w_With):
             return With.from_object(space, w_node)
+        if space.isinstance_w(w_node, get(space).w_Matching):
+            return Matching.from_object(space, w_node)
         if space.isinstance_w(w_node, get(space).w_Raise):
             return Raise.from_object(space, w_node)
         if space.isinstance_w(w_node, get(space).w_TryExcept):
@@ -1012,6 +1014,57 @@ class With(stmt):
 State.ast_type('With', 'stmt', ['context_expr', 'optional_vars', 'body'])
 
 
+class Matching(stmt):
+
+    def __init__(self, subject, cases, lineno, col_offset):
+        self.subject = subject
+        self.cases = cases
+        stmt.__init__(self, lineno, col_offset)
+
+    def walkabout(self, visitor):
+        visitor.visit_Matching(self)
+
+    def mutate_over(self, visitor):
+        self.subject = self.subject.mutate_over(visitor)
+        if self.cases:
+            for i in range(len(self.cases)):
+                self.cases[i] = self.cases[i].mutate_over(visitor)
+        return visitor.visit_Matching(self)
+
+    def to_object(self, space):
+        w_node = space.call_function(get(space).w_Matching)
+        w_subject = self.subject.to_object(space)  # expr
+        space.setattr(w_node, space.newtext('subject'), w_subject)
+        if self.cases is None:
+            cases_w = []
+        else:
+            cases_w = [node.to_object(space) for node in self.cases] # match_case
+        w_cases = space.newlist(cases_w)
+        space.setattr(w_node, space.newtext('cases'), w_cases)
+        w_lineno = space.newint(self.lineno)  # int
+        space.setattr(w_node, space.newtext('lineno'), w_lineno)
+        w_col_offset = space.newint(self.col_offset)  # int
+        space.setattr(w_node, space.newtext('col_offset'), w_col_offset)
+        return w_node
+
+    @staticmethod
+    def from_object(space, w_node):
+        w_subject = get_field(space, w_node, 'subject', False)
+        w_cases = get_field(space, w_node, 'cases', False)
+        w_lineno = get_field(space, w_node, 'lineno', False)
+        w_col_offset = get_field(space, w_node, 'col_offset', False)
+        _subject = expr.from_object(space, w_subject)
+        if _subject is None:
+            raise_required_value(space, w_node, 'subject')
+        cases_w = space.unpackiterable(w_cases)
+        _cases = [match_case.from_object(space, w_item) for w_item in cases_w]
+        _lineno = space.int_w(w_lineno)
+        _col_offset = space.int_w(w_col_offset)
+        return Matching(_subject, _cases, _lineno, _col_offset)
+
+State.ast_type('Matching', 'stmt', ['subject', 'cases'])
+
+
 class Raise(stmt):
 
     def __init__(self, type, inst, tback, lineno, col_offset):
@@ -3294,6 +3347,66 @@ class comprehension(AST):
 
 State.ast_type('comprehension', 'AST', ['target', 'iter', 'ifs'])
 
+class match_case(AST):
+
+    def __init__(self, patterns, name, guard, body):
+        self.patterns = patterns
+        self.name = name
+        self.guard = guard
+        self.body = body
+
+    def mutate_over(self, visitor):
+        if self.patterns:
+            for i in range(len(self.patterns)):
+                self.patterns[i] = self.patterns[i].mutate_over(visitor)
+        if self.name:
+            self.name = self.name.mutate_over(visitor)
+        if self.guard:
+            self.guard = self.guard.mutate_over(visitor)
+        if self.body:
+            for i in range(len(self.body)):
+                self.body[i] = self.body[i].mutate_over(visitor)
+        return visitor.visit_match_case(self)
+
+    def walkabout(self, visitor):
+        visitor.visit_match_case(self)
+
+    def to_object(self, space):
+        w_node = space.call_function(get(space).w_match_case)
+        if self.patterns is None:
+            patterns_w = []
+        else:
+            patterns_w = [node.to_object(space) for node in self.patterns] # expr
+        w_patterns = space.newlist(patterns_w)
+        space.setattr(w_node, space.newtext('patterns'), w_patterns)
+        w_name = self.name.to_object(space) if self.name is not None else space.w_None  # expr
+        space.setattr(w_node, space.newtext('name'), w_name)
+        w_guard = self.guard.to_object(space) if self.guard is not None else space.w_None  # expr
+        space.setattr(w_node, space.newtext('guard'), w_guard)
+        if self.body is None:
+            body_w = []
+        else:
+            body_w = [node.to_object(space) for node in self.body] # stmt
+        w_body = space.newlist(body_w)
+        space.setattr(w_node, space.newtext('body'), w_body)
+        return w_node
+
+    @staticmethod
+    def from_object(space, w_node):
+        w_patterns = get_field(space, w_node, 'patterns', False)
+        w_name = get_field(space, w_node, 'name', True)
+        w_guard = get_field(space, w_node, 'guard', True)
+        w_body = get_field(space, w_node, 'body', False)
+        patterns_w = space.unpackiterable(w_patterns)
+        _patterns = [expr.from_object(space, w_item) for w_item in patterns_w]
+        _name = expr.from_object(space, w_name)
+        _guard = expr.from_object(space, w_guard)
+        body_w = space.unpackiterable(w_body)
+        _body = [stmt.from_object(space, w_item) for w_item in body_w]
+        return match_case(_patterns, _name, _guard, _body)
+
+State.ast_type('match_case', 'AST', ['patterns', 'name', 'guard', 'body'])
+
 class excepthandler(AST):
 
     def __init__(self, lineno, col_offset):
@@ -3530,6 +3643,8 @@ class ASTVisitor(object):
         return self.default_visitor(node)
     def visit_With(self, node):
         return self.default_visitor(node)
+    def visit_Matching(self, node):
+        return self.default_visitor(node)
     def visit_Raise(self, node):
         return self.default_visitor(node)
     def visit_TryExcept(self, node):
@@ -3610,6 +3725,8 @@ class ASTVisitor(object):
         return self.default_visitor(node)
     def visit_comprehension(self, node):
         return self.default_visitor(node)
+    def visit_match_case(self, node):
+        return self.default_visitor(node)
     def visit_ExceptHandler(self, node):
         return self.default_visitor(node)
     def visit_arguments(self, node):
@@ -3685,6 +3802,10 @@ class GenericASTVisitor(ASTVisitor):
             node.optional_vars.walkabout(self)
         self.visit_sequence(node.body)
 
+    def visit_Matching(self, node):
+        node.subject.walkabout(self)
+        self.visit_sequence(node.cases)
+
     def visit_Raise(self, node):
         if node.type:
             node.type.walkabout(self)
@@ -3845,6 +3966,14 @@ class GenericASTVisitor(ASTVisitor):
         node.iter.walkabout(self)
         self.visit_sequence(node.ifs)
 
+    def visit_match_case(self, node):
+        self.visit_sequence(node.patterns)
+        if node.name:
+            node.name.walkabout(self)
+        if node.guard:
+            node.guard.walkabout(self)
+        self.visit_sequence(node.body)
+
     def visit_ExceptHandler(self, node):
         if node.type:
             node.type.walkabout(self)
@@ -461,6 +461,79 @@ class ASTBuilder(object):
             body = [wi]
         return wi
 
+    def handle_matching_stmt(self, match_node):
+        subject = self.handle_expr(match_node.get_child(1))
+        last = match_node.num_children() - 2
+        cases = []
+        for i in range(5, last + 1):
+            cases.append(self.handle_case_clause(match_node.get_child(i),
+                                                 i == last))
+        return ast.Matching(subject, cases, match_node.get_lineno(),
+                            match_node.get_column())
+
+    def handle_case_clause(self, case_node, is_last):
+        patterns = []
+        self.flatten_alternatives(self.handle_expr(case_node.get_child(1)),
+                                  patterns)
+        name = None
+        guard = None
+        i = 2
+        while case_node.get_child(i).type == tokens.NAME:
+            if case_node.get_child(i).get_value() == "as":
+                name_node = case_node.get_child(i + 1)
+                name_str = name_node.get_value()
+                self.check_forbidden_name(name_str, name_node)
+                name = ast.Name(name_str, ast.Store, name_node.get_lineno(),
+                                name_node.get_column())
+            else:
+                guard = self.handle_expr(case_node.get_child(i + 1))
+            i += 2
+        body = self.handle_suite(case_node.get_child(-1))
+        for pattern in patterns:
+            self.check_pattern(pattern, len(patterns) == 1)
+        if guard is None and not is_last:
+            # an unguarded capture or wildcard matches anything
+            for pattern in patterns:
+                if isinstance(pattern, ast.Name) and pattern.ctx == ast.Store:
+                    self.error_ast("name capture '%s' makes remaining "
+                                   "patterns unreachable" % (pattern.id,),
+                                   pattern)
+                if isinstance(pattern, ast.Name) and pattern.id == "_":
+                    self.error_ast("wildcard makes remaining patterns "
+                                   "unreachable", pattern)
+        return ast.match_case(patterns, name, guard, body)
+
+    def flatten_alternatives(self, pattern, patterns):
+        if isinstance(pattern, ast.BinOp) and pattern.op == ast.BitOr:
+            self.flatten_alternatives(pattern.left, patterns)
+            self.flatten_alternatives(pattern.right, patterns)
+        else:
+            patterns.append(pattern)
+
+    def check_pattern(self, pattern, alone):
+        """Check that 'pattern' is a literal, None, True or False, the
+        wildcard '_', a capture name, a dotted value or a class pattern
+        'cls()'.  Captures are turned into assignment targets."""
+        if isinstance(pattern, ast.Num) or isinstance(pattern, ast.Str):
+            return
+        if isinstance(pattern, ast.Name):
+            if pattern.id in ("_", "None", "True", "False"):
+                return
+            if not alone:
+                self.error_ast("alternative patterns cannot bind names",
+                               pattern)
+            self.set_context(pattern, ast.Store)
+            return
+        if isinstance(pattern, ast.Attribute):
+            return
+        if isinstance(pattern, ast.Call):
+            if (not pattern.args and not pattern.keywords and
+                    pattern.starargs is None and pattern.kwargs is None and
+                    (isinstance(pattern.func, ast.Name) or
+                     isinstance(pattern.func, ast.Attribute))):
+                return
+        self.error_ast("invalid pattern", pattern)
+
     def handle_classdef(self, classdef_node, decorators=None):
         name_node = classdef_node.get_child(1)
         name = name_node.get_value()
@@ -669,6 +742,8 @@ class ASTBuilder(object):
                 return self.handle_classdef(stmt)
             elif stmt_type == syms.decorated:
                 return self.handle_decorated(stmt)
+            elif stmt_type == syms.matching_stmt:
+                return self.handle_matching_stmt(stmt)
             else:
                 raise AssertionError("unhandled compound statement")
         else:
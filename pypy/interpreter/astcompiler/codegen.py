@@ -92,6 +92,10 @@ compare_operations = misc.dict_to_switch({
     ast.IsNot: 9
 })
 
+# the minimum number of keys for which the literal patterns of consecutive
+# cases of a match statement are dispatched with MATCH_TABLE
+MIN_MATCH_TABLE_SIZE = 4
+
 subscr_operations = misc.dict_to_switch({
     ast.AugLoad: ops.BINARY_SUBSCR,
     ast.Load: ops.BINARY_SUBSCR,
@@ -753,6 +757,131 @@ class PythonCodeGenerator(assemble.PythonCodeMaker):
         self.emit_op(ops.END_FINALLY)
         self.pop_frame_block(F_BLOCK_FINALLY_END, cleanup)
 
+    def visit_Matching(self, match):
+        self.update_position(match.lineno, True)
+        end = self.new_block()
+        # the subject stays on the stack until a case matches
+        match.subject.walkabout(self)
+        cases = match.cases
+        i = 0
+        while i < len(cases):
+            # a run of cases with only literal patterns is dispatched with
+            # a single MATCH_TABLE if it is large enough
+            j = i
+            keys_count = 0
+            while j < len(cases) and self._is_literal_case(cases[j]):
+                keys_count += self._count_patterns(cases[j])
+                j += 1
+            if keys_count >= MIN_MATCH_TABLE_SIZE:
+                self._match_table(cases, i, j, end)
+                i = j
+            else:
+                self._match_case(cases[i], end)
+                i += 1
+        self.emit_op(ops.POP_TOP)
+        self.use_next_block(end)
+
+    def _literal_key(self, pattern):
+        if isinstance(pattern, ast.Num):
+            return pattern.n
+        if isinstance(pattern, ast.Str):
+            return pattern.s
+        return None
+
+    def _is_literal_case(self, case):
+        assert isinstance(case, ast.match_case)
+        if case.guard is not None:
+            return False
+        for pattern in case.patterns:
+            if self._literal_key(pattern) is None:
+                return False
+        return True
+
+    def _count_patterns(self, case):
+        assert isinstance(case, ast.match_case)
+        return len(case.patterns)
+
+    def _match_table(self, cases, start, stop, end):
+        keys_w = []
+        targets = []
+        arms = []
+        for i in range(start, stop):
+            arm = self.new_block()
+            arms.append(arm)
+            case = cases[i]
+            assert isinstance(case, ast.match_case)
+            for pattern in case.patterns:
+                keys_w.append(self._literal_key(pattern))
+                targets.append(arm)
+        otherwise = self.new_block()
+        self.emit_match_table(keys_w, targets)
+        self.emit_jump(ops.JUMP_FORWARD, otherwise)
+        for i in range(start, stop):
+            self.use_next_block(arms[i - start])
+            self._match_case_body(cases[i], otherwise, end)
+        self.use_next_block(otherwise)
+
+    def _match_case(self, case, end):
+        assert isinstance(case, ast.match_case)
+        self.update_position(case.patterns[0].lineno, True)
+        next_case = self.new_block()
+        patterns = case.patterns
+        irrefutable = False
+        for pattern in patterns:
+            if isinstance(pattern, ast.Name) and (pattern.id == "_" or
+                                                  pattern.ctx == ast.Store):
+                irrefutable = True
+        if not irrefutable:
+            arm = self.new_block()
+            for i in range(len(patterns)):
+                self._match_pattern(patterns[i])
+                if i == len(patterns) - 1:
+                    self.emit_jump(ops.POP_JUMP_IF_FALSE, next_case, True)
+                else:
+                    self.emit_jump(ops.POP_JUMP_IF_TRUE, arm, True)
+            self.use_next_block(arm)
+        self._match_case_body(case, next_case, end)
+        self.use_next_block(next_case)
+
+    def _match_pattern(self, pattern):
+        """Push whether the subject on the top of the stack matches
+        'pattern', leaving the subject there."""
+        if isinstance(pattern, ast.Call):
+            pattern.func.walkabout(self)
+            self.emit_op(ops.MATCH_CLASS)
+            return
+        self.emit_op(ops.DUP_TOP)
+        if isinstance(pattern, ast.Name):
+            # None, True or False
+            if pattern.id == "None":
+                self.load_const(self.space.w_None)
+            else:
+                self.load_const(self.space.newbool(pattern.id == "True"))
+            op = ast.Is
+        elif isinstance(pattern, ast.Const):
+            # None
+            self.load_const(pattern.value)
+            op = ast.Is
+        else:
+            pattern.walkabout(self)
+            op = ast.Eq
+        self.emit_op_arg(ops.COMPARE_OP, compare_operations(op))
+
+    def _match_case_body(self, case, next_case, end):
+        assert isinstance(case, ast.match_case)
+        pattern = case.patterns[0]
+        if isinstance(pattern, ast.Name) and pattern.ctx == ast.Store:
+            self.emit_op(ops.DUP_TOP)
+            pattern.walkabout(self)
+        if case.name:
+            self.emit_op(ops.DUP_TOP)
+            case.name.walkabout(self)
+        if case.guard:
+            case.guard.accept_jump_if(self, False, next_case)
+        self.emit_op(ops.POP_TOP)
+        self.visit_sequence(case.body)
+        self.emit_jump(ops.JUMP_FORWARD, end)
+
     def visit_Raise(self, rais):
         self.update_position(rais.lineno, True)
         arg = 0
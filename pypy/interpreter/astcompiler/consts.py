@@ -18,6 +18,7 @@ CO_FUTURE_UNICODE_LITERALS = 0x20000
 #pypy specific:
 CO_KILL_DOCSTRING = 0x100000
 CO_YIELD_INSIDE_TRY = 0x200000
+CO_FUTURE_MATCH_STATEMENT = 0x400000
 
 PyCF_SOURCE_IS_UTF8 = 0x0100
 PyCF_DONT_IMPLY_DEDENT = 0x0200
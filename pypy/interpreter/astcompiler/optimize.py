@@ -10,7 +10,78 @@ from rpython.rlib.objectmodel import specialize
 
 
 def optimize_ast(space, tree, compile_info):
-    return tree.mutate_over(OptimizingVisitor(space, compile_info))
+    optimizer = OptimizingVisitor(space, compile_info)
+    if compile_info.optimize >= 1:
+        collector = BindingCollector()
+        tree.walkabout(collector)
+        optimizer.bindings = collector.bindings
+        optimizer.unknown_bindings = collector.unknown_bindings
+        if isinstance(tree, ast.Module):
+            return optimizer.optimize_module(tree)
+    return tree.mutate_over(optimizer)
+
+
+def _is_final_name(name):
+    """UPPER_CASE names are taken as Final constants."""
+    has_upper = False
+    for c in name:
+        if 'a' <= c <= 'z':
+            return False
+        if 'A' <= c <= 'Z':
+            has_upper = True
+    return has_upper
+
+
+class BindingCollector(ast.GenericASTVisitor):
+    """Counts how many times each name is bound in a module, in any
+    scope."""
+
+    def __init__(self):
+        self.bindings = {}
+        # set if 'exec' or 'import *' can bind any name
+        self.unknown_bindings = False
+
+    def bind(self, name):
+        self.bindings[name] = self.bindings.get(name, 0) + 1
+
+    def visit_Name(self, name):
+        if name.ctx != ast.Load:
+            self.bind(name.id)
+
+    def visit_FunctionDef(self, func):
+        self.bind(func.name)
+        ast.GenericASTVisitor.visit_FunctionDef(self, func)
+
+    def visit_ClassDef(self, cls):
+        self.bind(cls.name)
+        ast.GenericASTVisitor.visit_ClassDef(self, cls)
+
+    def visit_arguments(self, arguments):
+        if arguments.vararg:
+            self.bind(arguments.vararg)
+        if arguments.kwarg:
+            self.bind(arguments.kwarg)
+        ast.GenericASTVisitor.visit_arguments(self, arguments)
+
+    def visit_alias(self, alias):
+        if alias.name == "*":
+            self.unknown_bindings = True
+        elif alias.asname:
+            self.bind(alias.asname)
+        else:
+            dot = alias.name.find(".")
+            if dot < 0:
+                self.bind(alias.name)
+            else:
+                self.bind(alias.name[:dot])
+
+    def visit_Global(self, glob):
+        for name in glob.names:
+            self.bind(name)
+
+    def visit_Exec(self, exc):
+        self.unknown_bindings = True
+        ast.GenericASTVisitor.visit_Exec(self, exc)
 
 
 CONST_NOT_CONST = -1
@@ -160,11 +231,51 @@ opposite_compare_operations = misc.dict_to_switch({
 
 
 class OptimizingVisitor(ast.ASTVisitor):
-    """Constant folds AST."""
+    """Constant folds AST.
+
+    With an optimization level of 1 or more, this also propagates the
+    module-level Final constants: UPPER_CASE names that are assigned a
+    constant once at the top level of the module and are never bound
+    anywhere else in it.  It folds len() of constant strings and tuples and
+    the builtin True and False, when the module does not bind these names.
+    It turns the literal sets of constants that are the right operand of
+    'in' into frozensets, and the literal lists into tuples.  As other
+    modules could still change these names, or the builtins, this is
+    opt-in."""
 
     def __init__(self, space, compile_info):
         self.space = space
         self.compile_info = compile_info
+        # name -> number of bindings in the module, with optimize >= 1
+        self.bindings = None
+        self.unknown_bindings = False
+        self.constants_w = {}
+
+    def optimize_module(self, mod):
+        """Optimize the body of 'mod', statement by statement: a Final
+        constant is only propagated after its assignment."""
+        body = mod.body
+        if body:
+            for i in range(len(body)):
+                stmt = body[i].mutate_over(self)
+                body[i] = stmt
+                self._note_final_constant(stmt)
+        return mod
+
+    def _note_final_constant(self, stmt):
+        if (self.unknown_bindings or not isinstance(stmt, ast.Assign) or
+                len(stmt.targets) != 1):
+            return
+        target = stmt.targets[0]
+        if (isinstance(target, ast.Name) and _is_final_name(target.id) and
+                self.bindings.get(target.id, 0) == 1):
+            w_const = stmt.value.as_constant()
+            if w_const is not None:
+                self.constants_w[target.id] = w_const
+
+    def _is_unbound(self, name):
+        return (self.bindings is not None and not self.unknown_bindings and
+                name not in self.bindings)
 
     @specialize.argtype(1)
     def default_visitor(self, node):
@@ -272,8 +383,71 @@ class OptimizingVisitor(ast.ASTVisitor):
             if name.ctx == ast.Load:
                 return ast.Const(self.space.w_None, name.lineno,
                                  name.col_offset)
+        elif name.ctx == ast.Load and self.bindings is not None:
+            w_const = self.constants_w.get(name.id, None)
+            if w_const is None and self._is_unbound(name.id):
+                if name.id == "True":
+                    w_const = self.space.w_True
+                elif name.id == "False":
+                    w_const = self.space.w_False
+            if w_const is not None:
+                return ast.Const(w_const, name.lineno, name.col_offset)
         return name
 
+    def visit_Call(self, call):
+        func = call.func
+        if (isinstance(func, ast.Name) and func.id == "len" and
+                self._is_unbound("len") and call.args and
+                len(call.args) == 1 and not call.keywords and
+                call.starargs is None and call.kwargs is None):
+            space = self.space
+            w_arg = call.args[0].as_constant()
+            if w_arg is not None and (
+                    space.isinstance_w(w_arg, space.w_basestring) or
+                    space.isinstance_w(w_arg, space.w_tuple)):
+                return ast.Const(space.len(w_arg), call.lineno,
+                                 call.col_offset)
+        return call
+
+    def visit_Compare(self, compare):
+        if self.bindings is not None:
+            for i in range(len(compare.ops)):
+                op = compare.ops[i]
+                if op == ast.In or op == ast.NotIn:
+                    comparator = compare.comparators[i]
+                    w_const = self._as_constant_container(comparator)
+                    if w_const is not None:
+                        compare.comparators[i] = ast.Const(
+                            w_const, comparator.lineno, comparator.col_offset)
+        return compare
+
+    def _as_constant_container(self, node):
+        """Set literals of constants become a frozenset, as building the set
+        already requires hashable items.  List literals become a tuple: a
+        frozenset would make 'x in [...]' fail for an unhashable x."""
+        if isinstance(node, ast.List):
+            is_set = False
+        elif isinstance(node, ast.Set):
+            is_set = True
+        else:
+            return None
+        elts = node.elts
+        count = len(elts) if elts is not None else 0
+        items_w = [None] * count
+        for i in range(count):
+            w_const = elts[i].as_constant()
+            if w_const is None:
+                return None
+            items_w[i] = w_const
+        if not is_set:
+            return self.space.newtuple(items_w)
+        try:
+            for w_item in items_w:
+                self.space.hash(w_item)
+        except OperationError:
+            return None
+        return self.space.newfrozenset(items_w)
+
     def visit_Tuple(self, tup):
         """Try to turn tuple building into a constant."""
         if tup.elts:
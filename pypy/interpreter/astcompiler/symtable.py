@@ -482,6 +482,17 @@ class SymtableBuilder(ast.GenericASTVisitor):
         self.visit_sequence(wih.body)
         self.scope.note_try_end(wih)
 
+    def visit_match_case(self, case):
+        for pattern in case.patterns:
+            # the wildcard '_' is neither bound nor looked up
+            if not (isinstance(pattern, ast.Name) and pattern.id == "_"):
+                pattern.walkabout(self)
+        if case.name:
+            case.name.walkabout(self)
+        if case.guard:
+            case.guard.walkabout(self)
+        self.visit_sequence(case.body)
+
     def visit_arguments(self, arguments):
         scope = self.scope
         assert isinstance(scope, FunctionScope) # Annotator hint.
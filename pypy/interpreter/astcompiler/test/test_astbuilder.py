@@ -460,6 +460,42 @@ class TestAstBuilder:
         assert len(wi.body) == 1
         assert isinstance(wi.body[0], ast.Pass)
 
+    def test_matching(self):
+        def get_match(source):
+            info = pyparse.CompileInfo("<test>", "exec",
+                                       consts.CO_FUTURE_MATCH_STATEMENT)
+            tree = self.parser.parse_source(source, info)
+            mod = ast_from_node(self.space, tree, info)
+            assert len(mod.body) == 1
+            return mod.body[0]
+        m = get_match("match x:\n case 1 | -2 | 'a' as y: pass\n"
+                      " case C() | m.C() if y: pass\n case z: pass")
+        assert isinstance(m, ast.Matching)
+        assert isinstance(m.subject, ast.Name)
+        assert len(m.cases) == 3
+        case = m.cases[0]
+        assert isinstance(case, ast.match_case)
+        assert len(case.patterns) == 3
+        assert self.space.int_w(case.patterns[1].n) == -2
+        assert isinstance(case.patterns[2], ast.Str)
+        assert case.name.id == "y"
+        assert case.name.ctx == ast.Store
+        assert case.guard is None
+        assert isinstance(case.body[0], ast.Pass)
+        case = m.cases[1]
+        assert isinstance(case.patterns[0], ast.Call)
+        assert isinstance(case.patterns[1].func, ast.Attribute)
+        assert isinstance(case.guard, ast.Name)
+        case = m.cases[2]
+        assert case.patterns[0].ctx == ast.Store
+        for source in ["match x:\n case a | b: pass",
+                       "match x:\n case _: pass\n case 1: pass",
+                       "match x:\n case 1 + 2: pass",
+                       "match x:\n case C(a): pass"]:
+            py.test.raises(SyntaxError, get_match, source)
+        m = get_match("match x:\n case _ if x: pass\n case _: pass")
+        assert m.cases[0].patterns[0].ctx == ast.Load
+
     def test_class(self):
         for input in ("class X: pass", "class X(): pass"):
             cls = self.get_first_stmt(input)
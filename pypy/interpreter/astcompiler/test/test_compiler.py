@@ -1,5 +1,6 @@
 import py, sys
-from pypy.interpreter.astcompiler import codegen, astbuilder, symtable, optimize
+from pypy.interpreter.astcompiler import (
+    codegen, astbuilder, symtable, optimize, consts)
 from pypy.interpreter.pyparser import pyparse
 from pypy.interpreter.pyparser.test import expressions
 from pypy.interpreter.pycode import PyCode
@@ -13,9 +14,9 @@ def compile_with_astcompiler(expr, mode, space):
     ast = astbuilder.ast_from_node(space, cst, info)
     return codegen.compile_ast(space, ast, info)
 
-def generate_function_code(expr, space):
+def generate_function_code(expr, space, flags=0):
     p = pyparse.PythonParser(space)
-    info = pyparse.CompileInfo("<test>", 'exec')
+    info = pyparse.CompileInfo("<test>", 'exec', flags)
     cst = p.parse_source(expr, info)
     ast = astbuilder.ast_from_node(space, cst, info)
     function_ast = optimize.optimize_ast(space, ast.body[0], info)
@@ -948,6 +949,109 @@ class TestCompiler:
         finally:
             space.call_function(w_set_debug, space.w_True)
 
+    def test_match_statement(self):
+        decl = """
+        from __future__ import match_statement
+        import sys
+        class A(object): pass
+        class B(A): pass
+        def f(x):
+            match x:
+                case 1 | 2:
+                    return 'small'
+                case 3 | 4 | 5 as y:
+                    return 'medium %r' % (y,)
+                case 6.5 | 7L:
+                    return 'float or long'
+                case 'x' | u'y':
+                    return 'text'
+                case None:
+                    return 'none'
+                case True:
+                    return 'true'
+                case sys.maxint:
+                    return 'maxint'
+                case B():
+                    return 'B'
+                case A() as a if a.flag:
+                    return 'flagged A'
+                case y if isinstance(y, int) and y < 0:
+                    return 'negative %d' % (y,)
+                case _:
+                    pass
+            return 'other'
+        """
+        for expr, result in [("f(1)", 'small'), ("f(2L)", 'small'),
+                             ("f(2.0)", 'small'), ("f(4)", 'medium 4'),
+                             ("f(6.5)", 'float or long'),
+                             ("f(7)", 'float or long'),
+                             ("f('x')", 'text'), ("f('y')", 'text'),
+                             ("f(u'x')", 'text'), ("f(None)", 'none'),
+                             ("f(True)", 'small'), ("f(False)", 'other'),
+                             ("f(sys.maxint)", 'maxint'), ("f(B())", 'B'),
+                             ("f(-5)", 'negative -5'), ("f(0)", 'other'),
+                             ("f(A())", 'other')]:
+            yield self.st, decl + "\nA.flag = False\n", expr, result
+        yield (self.st, decl + "a = A(); a.flag = True; r = f(a)", "r",
+               'flagged A')
+
+    def test_match_statement_table(self):
+        decl = """
+        from __future__ import match_statement
+        def f(x):
+            match x:
+                case 0:
+                    r = 'zero'
+                case 1 | 2 | 3:
+                    r = 'few'
+                case 'a' | 'b':
+                    r = 'letter'
+                case _:
+                    r = 'many'
+            return r
+        """
+        for expr, result in [("f(0)", 'zero'), ("f(3)", 'few'),
+                             ("f(3.0)", 'few'), ("f('b')", 'letter'),
+                             ("f(u'a')", 'letter'), ("f(4)", 'many'),
+                             ("f([])", 'many')]:
+            yield self.st, decl, expr, result
+        # the first equal key wins, and the subject is evaluated once
+        yield (self.st, """
+        from __future__ import match_statement
+        l = [1, 1.0]
+        def f():
+            match l.pop():
+                case 1.0 | 2 | 3:
+                    return 'first'
+                case 1 | 4 | 5:
+                    return 'second'
+        r = f(), len(l)
+        """, "r", ('first', 1))
+
+    def test_match_statement_loop(self):
+        yield (self.st, """
+        from __future__ import match_statement
+        r = []
+        for x in range(6):
+            match x % 3:
+                case 0:
+                    continue
+                case 1:
+                    r.append(x)
+                case _:
+                    break
+        """, "r", [1])
+
+    def test_match_statement_errors(self):
+        for source in ["match x:\n case 1 | y: pass",
+                       "match x:\n case y: pass\n case 1: pass",
+                       "match x:\n case _: pass\n case 1: pass",
+                       "match x:\n case [1]: pass",
+                       "match x:\n case f(1): pass",
+                       "match x:\n case None as None: pass"]:
+            source = "from __future__ import match_statement\n" + source
+            yield self.error_test, source, SyntaxError
+
     def test_dont_fold_equal_code_objects(self):
         yield self.st, "f=lambda:1;g=lambda:1.0;x=g()", 'type(x)', float
         yield (self.st, "x=(lambda: (-0.0, 0.0), lambda: (0.0, -0.0))[1]()",
@@ -1004,6 +1108,50 @@ class AppTestCompiler:
         assert hint_called[0]
         assert l == list(range(5))
 
+    def test_match_statement(self):
+        import sys
+        match = 5
+        case = match
+        assert case == 5
+        d = {}
+        exec ("from __future__ import match_statement\n"
+              "def f(x):\n"
+              "    match x:\n"
+              "        case int() | long():\n"
+              "            return 'number'\n"
+              "        case sys.maxint():\n"
+              "            pass\n") in {'sys': sys}, d
+        assert d['f'](5) == 'number'
+        raises(TypeError, d['f'], 'x')
+        raises(SyntaxError, compile, "match x:\n case 1: pass", "", "exec")
+        co = compile("match x:\n case 1: y = 2", "", "exec",
+                     __import__('__future__').match_statement.compiler_flag)
+        d = {'x': 1}
+        exec co in d
+        assert d['y'] == 2
+
+    def test_superinstructions(self):
+        import sys, opcode
+        def f(x, y):
+            if x < y:
+                return x.real
+            return x.missing
+        assert f(1, 2) == 1
+        try:
+            f(2, 1)
+        except AttributeError:
+            tb = sys.exc_info()[2].tb_next
+        else:
+            raise AssertionError("should have raised")
+        # the error is reported at the second half of the superinstruction
+        assert tb.tb_lineno == f.func_code.co_firstlineno + 3
+        co_code = f.func_code.co_code
+        assert ord(co_code[tb.tb_lasti]) == opcode.opmap['LOAD_ATTR']
+        def g(x):
+            return x, y
+            y = 1
+        raises(UnboundLocalError, g, 1)
+
     def test_unicode_in_source(self):
         import sys
         d = {}
@@ -1016,8 +1164,8 @@ class AppTestCompiler:
 
 
 class TestOptimizations:
-    def count_instructions(self, source):
-        code, blocks = generate_function_code(source, self.space)
+    def count_instructions(self, source, flags=0):
+        code, blocks = generate_function_code(source, self.space, flags)
         instrs = []
         for block in blocks:
             instrs.extend(block.instructions)
@@ -1110,6 +1258,30 @@ class TestOptimizations:
                           ops.POP_JUMP_IF_FALSE: 1,
                           ops.RETURN_VALUE: 2}
 
+    def test_match_table(self):
+        source = """def f(x):
+            match x:
+                case 1: return 'a'
+                case 2 | 3: return 'b'
+                case 'c': return 'c'
+                case y if y: return 'd'
+        """
+        counts = self.count_instructions(source,
+                                         consts.CO_FUTURE_MATCH_STATEMENT)
+        assert counts[ops.MATCH_TABLE] == 1
+        assert ops.COMPARE_OP not in counts
+        source = """def f(x):
+            match x:
+                case 1: return 'a'
+                case 2: return 'b'
+                case int(): return 'c'
+        """
+        counts = self.count_instructions(source,
+                                         consts.CO_FUTURE_MATCH_STATEMENT)
+        assert ops.MATCH_TABLE not in counts
+        assert counts[ops.COMPARE_OP] == 2
+        assert counts[ops.MATCH_CLASS] == 1
+
     def test_remove_dead_yield(self):
         source = """def f(x):
             return
@@ -1170,6 +1342,126 @@ class TestOptimizations:
             assert ops.BUILD_SET not in counts
             assert ops.LOAD_CONST in counts
 
+    def compile_optimized(self, source):
+        space = self.space
+        source = str(py.code.Source(source))
+        p = pyparse.PythonParser(space)
+        info = pyparse.CompileInfo("<test>", 'exec', optimize=1)
+        cst = p.parse_source(source, info)
+        mod = astbuilder.ast_from_node(space, cst, info)
+        mod = optimize.optimize_ast(space, mod, info)
+        code = codegen.compile_ast(space, mod, info)
+        for w_const in code.co_consts_w:
+            if isinstance(w_const, PyCode):
+                return code, w_const
+        return code, None
+
+    def test_propagate_final_constants(self):
+        source = """
+        DEBUG = False
+        SIZE = 2 * 2
+        NAME = 'abc'
+        def f(x):
+            if DEBUG:
+                log(x)
+            return x * SIZE, NAME, DEBUG or True
+        """
+        code, f = self.compile_optimized(source)
+        assert f.co_names == []
+        space = self.space
+        w_d = space.newdict()
+        code.exec_code(space, w_d, w_d)
+        w_res = space.call_function(space.getitem(w_d, space.wrap('f')),
+                                    space.wrap(3))
+        assert space.unwrap(w_res) == (12, 'abc', True)
+
+    def test_dont_propagate_constants(self):
+        for source in ["Size = 4\ndef f(): return Size",
+                       "SIZE = 4\nSIZE = 5\ndef f(): return SIZE",
+                       "SIZE = 4\ndef f():\n global SIZE\n return SIZE",
+                       "def f(): return SIZE\nSIZE = 4",
+                       "SIZE = []\ndef f(): return SIZE",
+                       "SIZE = 4\ndef f(SIZE=1): return SIZE",
+                       "SIZE = 4\ndef f(): return SIZE\nexec ''",
+                       "SIZE = 4\ndef f(): return SIZE\nfrom m import *",
+                       "SIZE = 4\ndef f(): return SIZE\nfrom m import SIZE"]:
+            code, f = self.compile_optimized(source)
+            assert f.co_names + f.co_varnames in (['SIZE'], ['Size'])
+        code, f = self.compile_optimized("def f(): return True, False\n"
+                                         "False = 0")
+        assert f.co_names == ['False']
+
+    def test_fold_len(self):
+        code, f = self.compile_optimized("""
+        T = (1, 2, 3)
+        def f():
+            return len('abcd') + len(T) + len(u'x')
+        """)
+        assert f.co_names == []
+        assert self.space.int_w(f.co_consts_w[1]) == 8
+        code, f = self.compile_optimized("""
+        def f():
+            return len('abcd')
+        def len(x):
+            return 5
+        """)
+        assert f.co_names == ['len']
+
+    def test_in_constant_containers(self):
+        space = self.space
+        code, f = self.compile_optimized("""
+        def f(x):
+            return x in {1, 2, 3}, x not in {'a', 'b'} == True, x in [1, 2]
+        """)
+        consts_w = [w_const for w_const in f.co_consts_w
+                    if space.is_w(space.type(w_const), space.w_frozenset)]
+        assert len(consts_w) == 2
+        consts_w = [w_const for w_const in f.co_consts_w
+                    if space.is_w(space.type(w_const), space.w_tuple)]
+        assert len(consts_w) == 1
+        assert space.unwrap(consts_w[0]) == (1, 2)
+        code, f = self.compile_optimized("""
+        def f(x):
+            return x in [1, [2]], x in (1, 2)
+        """)
+        for w_const in f.co_consts_w:
+            assert not space.is_w(space.type(w_const), space.w_frozenset)
+
+    def test_in_list_unhashable(self):
+        space = self.space
+        code, f = self.compile_optimized("""
+        def f(x):
+            return x in [1, 2], x not in [1, 2], x in (1, 2)
+        """)
+        w_globals = space.newdict()
+        code.exec_code(space, w_globals, w_globals)
+        w_f = space.getitem(w_globals, space.newtext('f'))
+        w_res = space.call_function(w_f, space.newlist([]))
+        assert space.unwrap(w_res) == (False, True, False)
+
+    def get_opcodes(self, code):
+        result = []
+        co_code = code.co_code
+        i = 0
+        while i < len(co_code):
+            op = ord(co_code[i])
+            result.append(op)
+            i += 3 if op >= ops.HAVE_ARGUMENT else 1
+        return result
+
+    def test_superinstructions(self):
+        code, f = self.compile_optimized("""
+        def f(x, y):
+            if x < y:
+                return x.real
+            return g()
+        """)
+        assert self.get_opcodes(f) == [
+            ops.LOAD_FAST, ops.LOAD_FAST,
+            ops.COMPARE_OP_POP_JUMP_IF_FALSE, ops.POP_JUMP_IF_FALSE,
+            ops.LOAD_FAST_LOAD_ATTR, ops.LOAD_ATTR, ops.RETURN_VALUE,
+            ops.LOAD_GLOBAL, ops.CALL_FUNCTION, ops.RETURN_VALUE]
+
     def test_dont_fold_huge_powers(self):
         for source in (
             "2 ** 3000",         # not constant-folded: too big
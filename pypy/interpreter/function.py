@@ -104,12 +104,11 @@ class Function(W_Root):
         elif (nargs | PyCode.FLATPYCALL) == fast_natural_arity:
             assert isinstance(code, PyCode)
             if nargs < 5:
-                new_frame = self.space.createframe(code, self.w_func_globals,
-                                                   self)
+                new_frame = code.create_call_frame(self)
                 for i in funccallunrolling:
                     if i < nargs:
                         new_frame.locals_cells_stack_w[i] = args_w[i]
-                return new_frame.run()
+                return code.run_call_frame(new_frame)
         elif nargs >= 1 and fast_natural_arity == Code.PASSTHROUGHARGS1:
             assert isinstance(code, gateway.BuiltinCodePassThroughArguments1)
             return code.funcrun_obj(self, args_w[0],
@@ -171,19 +170,17 @@ class Function(W_Root):
     @jit.unroll_safe
     def _flat_pycall(self, code, nargs, frame):
         # code is a PyCode
-        new_frame = self.space.createframe(code, self.w_func_globals,
-                                                   self)
+        new_frame = code.create_call_frame(self)
         for i in xrange(nargs):
             w_arg = frame.peekvalue(nargs-1-i)
             new_frame.locals_cells_stack_w[i] = w_arg
 
-        return new_frame.run()
+        return code.run_call_frame(new_frame)
 
     @jit.unroll_safe
     def _flat_pycall_defaults(self, code, nargs, frame, defs_to_load):
         # code is a PyCode
-        new_frame = self.space.createframe(code, self.w_func_globals,
-                                                   self)
+        new_frame = code.create_call_frame(self)
         for i in xrange(nargs):
             w_arg = frame.peekvalue(nargs-1-i)
             new_frame.locals_cells_stack_w[i] = w_arg
@@ -194,7 +191,7 @@ class Function(W_Root):
         for j in xrange(start, ndefs):
             new_frame.locals_cells_stack_w[i] = self.defs_w[j]
             i += 1
-        return new_frame.run()
+        return code.run_call_frame(new_frame)
 
     def getdict(self, space):
         if self.w_func_dict is None:
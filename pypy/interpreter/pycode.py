@@ -32,7 +32,7 @@ def unpack_text_tuple(space, w_str_tuple):
 # Magic numbers for the bytecode version in code objects.
 # See comments in pypy/module/imp/importing.
 cpython_magic, = struct.unpack("<i", imp.get_magic())   # host magic number
-default_magic = (0xf303 + 7) | 0x0a0d0000               # this PyPy's magic
+default_magic = (0xf303 + 5) | 0x0a0d0000               # this PyPy's magic
                                                         # (from CPython 2.7.0)
 
 # cpython_code_signature helper
@@ -54,6 +54,66 @@ class CodeHookCache(object):
     def __init__(self, space):
         self._code_hook = None
 
+class MatchTable(object):
+    """The decoded (keys, offsets) constant of a MATCH_TABLE instruction.
+    The target is the offset of the first key that is equal to the subject.
+    Subjects that are exactly ints or strs are looked up in a dict, as long
+    as no key of another type can compare equal to them."""
+    _immutable_fields_ = ["keys_w[*]", "offsets[*]", "int_targets",
+                          "str_targets"]
+
+    def __init__(self, space, w_table):
+        w_keys, w_offsets = space.fixedview(w_table, 2)
+        self.keys_w = space.fixedview(w_keys)
+        self.offsets = [space.int_w(w_offset)
+                        for w_offset in space.fixedview(w_offsets)]
+        if len(self.offsets) != len(self.keys_w):
+            raise oefmt(space.w_SystemError, "corrupted match table")
+        int_targets = {}
+        str_targets = {}
+        for i in range(len(self.keys_w)):
+            w_key = self.keys_w[i]
+            w_type = space.type(w_key)
+            if space.is_w(w_type, space.w_int):
+                key = space.int_w(w_key)
+                if int_targets is not None and key not in int_targets:
+                    int_targets[key] = self.offsets[i]
+            elif space.is_w(w_type, space.w_bytes):
+                key = space.bytes_w(w_key)
+                if str_targets is not None and key not in str_targets:
+                    str_targets[key] = self.offsets[i]
+            elif space.is_w(w_type, space.w_unicode):
+                str_targets = None    # u'a' == 'a'
+            else:
+                int_targets = None    # 1.0 == 1, 1L == 1, ...
+        self.int_targets = int_targets
+        self.str_targets = str_targets
+
+    def lookup(self, space, w_subject):
+        """Return the offset to jump to, or -1 if no key is equal to the
+        subject."""
+        w_type = space.type(w_subject)
+        if self.int_targets is not None and space.is_w(w_type, space.w_int):
+            return self._lookup_int(space.int_w(w_subject))
+        if self.str_targets is not None and space.is_w(w_type, space.w_bytes):
+            return self._lookup_str(space.bytes_w(w_subject))
+        for i in range(len(self.keys_w)):
+            if space.is_true(space.eq(w_subject, self.keys_w[i])):
+                return self.offsets[i]
+        return -1
+
+    @jit.elidable
+    def _lookup_int(self, key):
+        return self.int_targets.get(key, -1)
+
+    @jit.elidable
+    def _lookup_str(self, key):
+        return self.str_targets.get(key, -1)
+
+# maximum number of frames kept for reuse by a code object, see
+# PyCode.create_call_frame()
+FRAME_FREELIST_SIZE = 4
+
 class PyCode(eval.Code):
     "CPython-style code objects."
     _immutable_fields_ = ["_signature", "co_argcount", "co_cellvars[*]",
@@ -97,6 +157,45 @@ class PyCode(eval.Code):
         self._init_ready()
         self.new_code_hook()
 
+    # frames of finished calls that can be reused by the next calls,
+    # only with objspace.framefreelist
+    _free_frames = None
+
+    def create_call_frame(self, func):
+        """Return a frame to call 'func', whose code is self.  Use
+        run_call_frame() to run it."""
+        space = self.space
+        if space.config.objspace.framefreelist and not jit.we_are_jitted():
+            frames = self._free_frames
+            if frames:
+                frame = frames.pop()
+                frame.reinit_for_call(func.w_func_globals, func)
+                return frame
+        return space.createframe(self, func.w_func_globals, func)
+
+    def run_call_frame(self, frame):
+        w_result = frame.run()
+        if (self.space.config.objspace.framefreelist and
+                not jit.we_are_jitted()):
+            self._release_frame(frame)
+        return w_result
+
+    def _release_frame(self, frame):
+        # Only reached if the call returned normally, i.e. no traceback can
+        # reference the frame.  A frame is not reused if it escaped, e.g.
+        # with sys._getframe() or by an accessed traceback, if it was seen
+        # by a trace or profile function, which creates its debugdata, or if
+        # it belongs to a generator.
+        if (frame.escaped or frame.debugdata is not None or
+                self.co_flags & CO_GENERATOR):
+            return
+        frames = self._free_frames
+        if frames is None:
+            frames = self._free_frames = []
+        if len(frames) < FRAME_FREELIST_SIZE:
+            frame.clear_for_freelist()
+            frames.append(frame)
+
     def frame_stores_global(self, w_globals):
         if self.w_globals is None:
             self.w_globals = w_globals
@@ -106,6 +205,9 @@ class PyCode(eval.Code):
         return True
 
     def new_code_hook(self):
+        if self.space.config.objspace.usemodules.pypyjit:
+            from pypy.module.pypyjit.interp_warmup import code_created
+            code_created(self.space, self)
         code_hook = self.space.fromcache(CodeHookCache)._code_hook
         if code_hook is not None:
             try:
@@ -151,10 +253,27 @@ class PyCode(eval.Code):
         self._compute_flatcall()
 
         init_mapdict_cache(self)
+        if self.space.config.objspace.std.withcelldict:
+            from pypy.objspace.std.celldict import init_global_cache
+            init_global_cache(self)
 
     def _init_ready(self):
         "This is a hook for the vmprof module, which overrides this method."
 
+    _match_tables = None
+
+    @jit.elidable
+    def get_match_table(self, constindex):
+        """Return the MatchTable of a MATCH_TABLE instruction."""
+        if self._match_tables is None:
+            self._match_tables = {}
+        try:
+            return self._match_tables[constindex]
+        except KeyError:
+            table = MatchTable(self.space, self.co_consts_w[constindex])
+            self._match_tables[constindex] = table
+            return table
+
     def _cleanup_(self):
         if (self.magic == cpython_magic and
             '__pypy__' not in sys.builtin_module_names):
@@ -225,8 +344,7 @@ class PyCode(eval.Code):
         self.fast_natural_arity = eval.Code.FLATPYCALL | self.co_argcount
 
     def funcrun(self, func, args):
-        frame = self.space.createframe(self, func.w_func_globals,
-                                  func)
+        frame = self.create_call_frame(func)
         sig = self._signature
         # speed hack
         fresh_frame = jit.hint(frame, access_directly=True,
@@ -234,11 +352,10 @@ class PyCode(eval.Code):
         args.parse_into_scope(None, fresh_frame.locals_cells_stack_w, func.name,
                               sig, func.defs_w)
         fresh_frame.init_cells()
-        return frame.run()
+        return self.run_call_frame(frame)
 
     def funcrun_obj(self, func, w_obj, args):
-        frame = self.space.createframe(self, func.w_func_globals,
-                                  func)
+        frame = self.create_call_frame(func)
         sig = self._signature
         # speed hack
         fresh_frame = jit.hint(frame, access_directly=True,
@@ -246,7 +363,7 @@ class PyCode(eval.Code):
         args.parse_into_scope(w_obj, fresh_frame.locals_cells_stack_w, func.name,
                               sig, func.defs_w)
         fresh_frame.init_cells()
-        return frame.run()
+        return self.run_call_frame(frame)
 
     def getvarnames(self):
         return self.co_varnames
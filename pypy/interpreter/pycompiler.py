@@ -122,7 +122,8 @@ class PythonAstCompiler(PyCodeCompiler):
         f_flags, f_lineno, f_col = fut
         future_pos = f_lineno, f_col
         flags |= f_flags
-        info = pyparse.CompileInfo(filename, mode, flags, future_pos)
+        info = pyparse.CompileInfo(filename, mode, flags, future_pos,
+                                   optimize=self.space.sys.compiler_optimize)
         return self._compile_ast(node, info)
 
     def _compile_ast(self, node, info):
@@ -151,6 +152,7 @@ class PythonAstCompiler(PyCodeCompiler):
 
     def compile(self, source, filename, mode, flags, hidden_applevel=False):
         info = pyparse.CompileInfo(filename, mode, flags,
-                                   hidden_applevel=hidden_applevel)
+                                   hidden_applevel=hidden_applevel,
+                                   optimize=self.space.sys.compiler_optimize)
         mod = self._compile_to_ast(source, info)
         return self._compile_ast(mod, info)
@@ -112,6 +112,31 @@ class PyFrame(W_Root):
         # class bodies only have CO_NEWLOCALS.
         self.initialize_frame_scopes(outer_func, code)
 
+    def reinit_for_call(self, w_globals, outer_func):
+        """Prepare a frame taken from the free list of its code object for a
+        new call, see PyCode.create_call_frame().  It was cleared by
+        clear_for_freelist() when it was put there."""
+        code = self.pycode
+        if code.frame_stores_global(w_globals):
+            self.getorcreatedebug().w_globals = w_globals
+        if self.space.config.objspace.honor__builtins__:
+            self.builtin = self.space.builtin.pick_builtin(w_globals)
+        self.initialize_frame_scopes(outer_func, code)
+
+    def clear_for_freelist(self):
+        """Forget the finished call, so that the frame does not keep any
+        object alive while it waits on the free list of its code object."""
+        code = self.pycode
+        for i in range(len(self.locals_cells_stack_w)):
+            self.locals_cells_stack_w[i] = None
+        self.valuestackdepth = (code.co_nlocals + len(code.co_cellvars) +
+                                len(code.co_freevars))
+        self.last_instr = -1
+        self.last_exception = None
+        self.lastblock = None
+        self.f_backref = jit.vref_None
+        self.frame_finished_execution = False
+
     def getdebug(self):
         return self.debugdata
 
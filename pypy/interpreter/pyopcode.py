@@ -217,6 +217,13 @@ class __extend__(pyframe.PyFrame):
                 next_instr = self.POP_JUMP_IF_FALSE(oparg, next_instr)
             elif opcode == opcodedesc.POP_JUMP_IF_TRUE.index:
                 next_instr = self.POP_JUMP_IF_TRUE(oparg, next_instr)
+            elif opcode == opcodedesc.MATCH_TABLE.index:
+                next_instr = self.MATCH_TABLE(oparg, next_instr)
+            elif opcode == opcodedesc.LOAD_FAST_LOAD_ATTR.index:
+                next_instr = self.LOAD_FAST_LOAD_ATTR(oparg, next_instr)
+            elif opcode == opcodedesc.COMPARE_OP_POP_JUMP_IF_FALSE.index:
+                next_instr = self.COMPARE_OP_POP_JUMP_IF_FALSE(oparg,
+                                                               next_instr)
             elif opcode == opcodedesc.BINARY_ADD.index:
                 self.BINARY_ADD(oparg, next_instr)
             elif opcode == opcodedesc.BINARY_AND.index:
@@ -355,6 +362,8 @@ class __extend__(pyframe.PyFrame):
                 self.MAKE_FUNCTION(oparg, next_instr)
             elif opcode == opcodedesc.MAP_ADD.index:
                 self.MAP_ADD(oparg, next_instr)
+            elif opcode == opcodedesc.MATCH_CLASS.index:
+                self.MATCH_CLASS(oparg, next_instr)
             elif opcode == opcodedesc.NOP.index:
                 self.NOP(oparg, next_instr)
             elif opcode == opcodedesc.POP_BLOCK.index:
@@ -858,10 +867,14 @@ class __extend__(pyframe.PyFrame):
 
     def STORE_ATTR(self, nameindex, next_instr):
         "obj.attributename = newvalue"
-        w_attributename = self.getname_w(nameindex)
         w_obj = self.popvalue()
         w_newvalue = self.popvalue()
-        self.space.setattr(w_obj, w_attributename, w_newvalue)
+        if not jit.we_are_jitted():
+            from pypy.objspace.std.mapdict import STORE_ATTR_caching
+            STORE_ATTR_caching(self.getcode(), w_obj, nameindex, w_newvalue)
+        else:
+            w_attributename = self.getname_w(nameindex)
+            self.space.setattr(w_obj, w_attributename, w_newvalue)
 
     def DELETE_ATTR(self, nameindex, next_instr):
         "del obj.attributename"
@@ -905,7 +918,16 @@ class __extend__(pyframe.PyFrame):
 
     @always_inline
     def LOAD_GLOBAL(self, nameindex, next_instr):
-        self.pushvalue(self._load_global(self.getname_u(nameindex)))
+        if (self.space.config.objspace.std.withcelldict and
+                not jit.we_are_jitted()):
+            from pypy.objspace.std.celldict import LOAD_GLOBAL_caching
+            w_value = LOAD_GLOBAL_caching(self.getcode(), self.get_w_globals(),
+                                          self.get_builtin(), nameindex)
+            if w_value is None:
+                self._load_global_failed(self.getname_u(nameindex))
+        else:
+            w_value = self._load_global(self.getname_u(nameindex))
+        self.pushvalue(w_value)
 
     def DELETE_FAST(self, varindex, next_instr):
         if self.locals_cells_stack_w[varindex] is None:
@@ -1087,6 +1109,54 @@ class __extend__(pyframe.PyFrame):
             next_instr += jumpby
         return next_instr
 
+    def MATCH_TABLE(self, constindex, next_instr):
+        # the subject of the match statement stays on the stack
+        w_subject = self.peekvalue()
+        table = self.getcode().get_match_table(constindex)
+        target = table.lookup(self.space, w_subject)
+        if target < 0:
+            return next_instr
+        return target
+
+    def MATCH_CLASS(self, oparg, next_instr):
+        space = self.space
+        w_cls = self.popvalue()
+        w_subject = self.peekvalue()
+        if not space.abstract_isclass_w(w_cls):
+            raise oefmt(space.w_TypeError,
+                        "called match pattern must be a class")
+        w_result = space.newbool(
+            space.abstract_isinstance_w(w_subject, w_cls, allow_override=True))
+        self.pushvalue(w_result)
+
+    ### superinstructions ###
+    # The assembler replaces the opcode of the first instruction of some
+    # common pairs with a superinstruction, leaving the second instruction
+    # in place: offsets and line numbers are unchanged.  The handlers below
+    # run both halves without going through the dispatch loop in between,
+    # and return the offset following the second half.
+
+    def _fused_oparg(self, next_instr):
+        # the argument of the second half, which starts at 'next_instr'
+        co_code = self.pycode.co_code
+        self.last_instr = intmask(next_instr)
+        lo = ord(co_code[next_instr + 1])
+        hi = ord(co_code[next_instr + 2])
+        return (hi * 256) | lo
+
+    def LOAD_FAST_LOAD_ATTR(self, varindex, next_instr):
+        self.LOAD_FAST(varindex, next_instr)
+        nameindex = self._fused_oparg(next_instr)
+        next_instr += 3
+        self.LOAD_ATTR(nameindex, next_instr)
+        return next_instr
+
+    def COMPARE_OP_POP_JUMP_IF_FALSE(self, testnum, next_instr):
+        self.COMPARE_OP(testnum, next_instr)
+        target = self._fused_oparg(next_instr)
+        next_instr += 3
+        return self.POP_JUMP_IF_FALSE(target, next_instr)
+
     def GET_ITER(self, oparg, next_instr):
         w_iterable = self.popvalue()
         w_iterator = self.space.iter(w_iterable)
@@ -66,11 +66,15 @@ class DFA:
         else:
             return self.states[crntState * self.max_char + ord(item)]
 
-    def recognize(self, inVec, pos = 0):
+    def recognize(self, inVec, pos = 0, end = -1):
+        """Match inVec[pos:end], without copying it.  An end of -1 means the
+        end of inVec."""
+        if end < 0:
+            end = len(inVec)
         crntState = self.start
         lastAccept = False
         i = pos
-        for i in range(pos, len(inVec)):
+        for i in range(pos, end):
             item = inVec[i]
             accept = self.accepts[crntState]
             crntState = self._next_state(item, crntState)
@@ -98,10 +102,12 @@ class DFA:
 
 class NonGreedyDFA (DFA):
 
-    def recognize(self, inVec, pos = 0):
+    def recognize(self, inVec, pos = 0, end = -1):
+        if end < 0:
+            end = len(inVec)
         crntState = self.start
         i = pos
-        for i in range(pos, len(inVec)):
+        for i in range(pos, end):
             item = inVec[i]
             accept = self.accepts[crntState]
             if accept:
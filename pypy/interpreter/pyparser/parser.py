@@ -20,6 +20,51 @@ class Grammar(object):
         self.labels = [0]
         self.token_ids = {}
         self.start = -1
+        # Compact tables, filled by _build_tables() from the dfas above.
+        # States of all the DFAs are numbered globally; the arcs of state s
+        # are arc_labels[a], arc_targets[a] for a in
+        # range(state_arcs[s], state_arcs[s + 1]).
+        self.dfa_start_state = []
+        self.state_arcs = [0]
+        self.state_accepting = []
+        self.arc_labels = []
+        self.arc_targets = []
+        # first_sets[dfa_index * num_labels + label] != '\x00' if the label
+        # can start the corresponding DFA.
+        self.first_sets = ""
+        self.num_labels = 0
+
+    def _build_tables(self):
+        """NOT_RPYTHON: Flatten the dfas into integer arrays."""
+        dfa_start_state = []
+        state_arcs = [0]
+        state_accepting = []
+        arc_labels = []
+        arc_targets = []
+        for states, first in self.dfas:
+            dfa_start_state.append(len(state_accepting))
+            for arcs, is_accepting in states:
+                state_accepting.append(is_accepting)
+                state_arcs.append(state_arcs[-1] + len(arcs))
+        for i in range(len(self.dfas)):
+            states, first = self.dfas[i]
+            base = dfa_start_state[i]
+            for arcs, is_accepting in states:
+                for label, next_state in arcs:
+                    arc_labels.append(label)
+                    arc_targets.append(base + next_state)
+        num_labels = len(self.labels)
+        first_sets = []
+        for states, first in self.dfas:
+            for label in range(num_labels):
+                first_sets.append('\x01' if label in first else '\x00')
+        self.dfa_start_state = dfa_start_state
+        self.state_arcs = state_arcs
+        self.state_accepting = state_accepting
+        self.arc_labels = arc_labels
+        self.arc_targets = arc_targets
+        self.first_sets = "".join(first_sets)
+        self.num_labels = num_labels
 
     def shared_copy(self):
         new = self.__class__()
@@ -29,14 +74,23 @@ class Grammar(object):
         new.dfas = self.dfas
         new.labels = self.labels
         new.token_ids = self.token_ids
+        new.dfa_start_state = self.dfa_start_state
+        new.state_arcs = self.state_arcs
+        new.state_accepting = self.state_accepting
+        new.arc_labels = self.arc_labels
+        new.arc_targets = self.arc_targets
+        new.first_sets = self.first_sets
+        new.num_labels = self.num_labels
         return new
 
     def _freeze_(self):
-        # Remove some attributes not used in parsing.
+        # Remove some attributes not used in parsing.  The parser only reads
+        # the compact tables, so the nested dfas are dropped as well.
         try:
             del self.symbol_to_label
             del self.symbol_names
             del self.symbol_ids
+            del self.dfas
         except AttributeError:
             pass
         return True
@@ -198,42 +252,43 @@ class Parser(object):
         self.root = None
         current_node = Nonterminal(start, [])
         self.stack = []
-        self.stack.append((self.grammar.dfas[start - 256], 0, current_node))
+        self.stack.append((self.grammar.dfa_start_state[start - 256],
+                           current_node))
 
     def add_token(self, token_type, value, lineno, column, line):
         label_index = self.classify(token_type, value, lineno, column, line)
+        grammar = self.grammar
         sym_id = 0 # for the annotator
         while True:
-            dfa, state_index, node = self.stack[-1]
-            states, first = dfa
-            arcs, is_accepting = states[state_index]
-            for i, next_state in arcs:
-                sym_id = self.grammar.labels[i]
+            state, node = self.stack[-1]
+            arcs_start = grammar.state_arcs[state]
+            arcs_end = grammar.state_arcs[state + 1]
+            for arc in range(arcs_start, arcs_end):
+                i = grammar.arc_labels[arc]
+                next_state = grammar.arc_targets[arc]
+                sym_id = grammar.labels[i]
                 if label_index == i:
                     # We matched a non-terminal.
                     self.shift(next_state, token_type, value, lineno, column)
-                    state = states[next_state]
                     # While the only possible action is to accept, pop nodes off
                     # the stack.
-                    while state[1] and not state[0]:
+                    while self._accept_only(next_state):
                         self.pop()
                         if not self.stack:
                             # Parsing is done.
                             return True
-                        dfa, state_index, node = self.stack[-1]
-                        state = dfa[0][state_index]
+                        next_state, node = self.stack[-1]
                     return False
                 elif sym_id >= 256:
-                    sub_node_dfa = self.grammar.dfas[sym_id - 256]
                     # Check if this token can start a child node.
-                    if label_index in sub_node_dfa[1]:
-                        self.push(sub_node_dfa, next_state, sym_id, lineno,
-                                  column)
+                    first_index = (sym_id - 256) * grammar.num_labels
+                    if grammar.first_sets[first_index + label_index] != '\x00':
+                        self.push(next_state, sym_id, lineno, column)
                         break
             else:
                 # We failed to find any arcs to another state, so unless this
                 # state is accepting, it's invalid input.
-                if is_accepting:
+                if grammar.state_accepting[state]:
                     self.pop()
                     if not self.stack:
                         raise ParseError("too much input", token_type, value,
@@ -241,13 +296,18 @@ class Parser(object):
                 else:
                     # If only one possible input would satisfy, attach it to the
                     # error.
-                    if len(arcs) == 1:
+                    if arcs_end - arcs_start == 1:
                         expected = sym_id
                     else:
                         expected = -1
                     raise ParseError("bad input", token_type, value, lineno,
                                      column, line, expected)
 
+    def _accept_only(self, state):
+        grammar = self.grammar
+        return (grammar.state_accepting[state] and
+                grammar.state_arcs[state] == grammar.state_arcs[state + 1])
+
     def classify(self, token_type, value, lineno, column, line):
         """Find the label for a token."""
         if token_type == self.grammar.KEYWORD_TOKEN:
@@ -262,26 +322,27 @@ class Parser(object):
 
     def shift(self, next_state, token_type, value, lineno, column):
         """Shift a non-terminal and prepare for the next state."""
-        dfa, state, node = self.stack[-1]
+        state, node = self.stack[-1]
         new_node = Terminal(token_type, value, lineno, column)
         node.append_child(new_node)
-        self.stack[-1] = (dfa, next_state, node)
+        self.stack[-1] = (next_state, node)
 
-    def push(self, next_dfa, next_state, node_type, lineno, column):
+    def push(self, next_state, node_type, lineno, column):
         """Push a terminal and adjust the current state."""
-        dfa, state, node = self.stack[-1]
+        state, node = self.stack[-1]
         new_node = Nonterminal(node_type, [])
-        self.stack[-1] = (dfa, next_state, node)
-        self.stack.append((next_dfa, 0, new_node))
+        self.stack[-1] = (next_state, node)
+        self.stack.append((self.grammar.dfa_start_state[node_type - 256],
+                           new_node))
 
     def pop(self):
         """Pop an entry off the stack and make its node a child of the last."""
-        dfa, state, node = self.stack.pop()
+        state, node = self.stack.pop()
         if self.stack:
             # we are now done with node, so we can store it more efficiently if
             # it has just one child
             if node.num_children() == 1:
                 node = Nonterminal1(node.type, node.get_child(0))
-            self.stack[-1][2].append_child(node)
+            self.stack[-1][1].append_child(node)
         else:
             self.root = node
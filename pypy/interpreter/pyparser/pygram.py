@@ -18,10 +18,20 @@ def _get_python_grammar():
     return pgen.build_grammar(PythonGrammar)
 
 
-python_grammar = _get_python_grammar()
-python_grammar_no_print = python_grammar.shared_copy()
-python_grammar_no_print.keyword_ids = python_grammar_no_print.keyword_ids.copy()
-del python_grammar_no_print.keyword_ids["print"]
+def _without_keywords(grammar, *keywords):
+    result = grammar.shared_copy()
+    result.keyword_ids = result.keyword_ids.copy()
+    for keyword in keywords:
+        del result.keyword_ids[keyword]
+    return result
+
+# 'match' and 'case' are only keywords with the match_statement future
+_full_grammar = _get_python_grammar()
+python_grammar = _without_keywords(_full_grammar, "match", "case")
+python_grammar_no_print = _without_keywords(_full_grammar,
+                                            "print", "match", "case")
+python_grammar_match = _without_keywords(_full_grammar)
+python_grammar_no_print_match = _without_keywords(_full_grammar, "print")
 
 class _Tokens(object):
     pass
@@ -38,4 +48,4 @@ for sym_name, idx in python_grammar.symbol_ids.iteritems():
 syms = _Symbols()
 syms._rev_lookup = rev_lookup # for debugging
 
-del _get_python_grammar, _Tokens, tok_name, sym_name, idx
+del _get_python_grammar, _without_keywords, _full_grammar, _Tokens, tok_name, sym_name, idx
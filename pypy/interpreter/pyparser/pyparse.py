@@ -66,16 +66,19 @@ class CompileInfo(object):
       import.
     * hidden_applevel: Will this code unit and sub units be hidden at the
       applevel?
+    * optimize: The optimization level of the AST optimizer (see
+      __pypy__.set_compiler_optimize()).
     """
 
     def __init__(self, filename, mode="exec", flags=0, future_pos=(0, 0),
-                 hidden_applevel=False):
+                 hidden_applevel=False, optimize=0):
         self.filename = filename
         self.mode = mode
         self.encoding = None
         self.flags = flags
         self.last_future_import = future_pos
         self.hidden_applevel = hidden_applevel
+        self.optimize = optimize
 
 
 _targets = {
@@ -84,6 +87,16 @@ _targets = {
 'exec' : pygram.syms.file_input,
 }
 
+def _select_grammar(flags):
+    if flags & consts.CO_FUTURE_MATCH_STATEMENT:
+        if flags & consts.CO_FUTURE_PRINT_FUNCTION:
+            return pygram.python_grammar_no_print_match
+        return pygram.python_grammar_match
+    if flags & consts.CO_FUTURE_PRINT_FUNCTION:
+        return pygram.python_grammar_no_print
+    return pygram.python_grammar
+
+
 class PythonParser(parser.Parser):
 
     def __init__(self, space, future_flags=future.futureFlags_2_7,
@@ -135,10 +148,6 @@ class PythonParser(parser.Parser):
 
         flags = compile_info.flags
 
-        # The tokenizer is very picky about how it wants its input.
-        source_lines = textsrc.splitlines(True)
-        if source_lines and not source_lines[-1].endswith("\n"):
-            source_lines[-1] += '\n'
         if textsrc and textsrc[-1] == "\n":
             flags &= ~consts.PyCF_DONT_IMPLY_DEDENT
 
@@ -149,17 +158,14 @@ class PythonParser(parser.Parser):
                 # Note: we no longer pass the CO_FUTURE_* to the tokenizer,
                 # which is expected to work independently of them.  It's
                 # certainly the case for all futures in Python <= 2.7.
-                tokens = pytokenizer.generate_tokens(source_lines, flags)
+                tokens = pytokenizer.generate_tokens(textsrc, flags)
 
                 newflags, last_future_import = (
                     future.add_future_flags(self.future_flags, tokens))
                 compile_info.last_future_import = last_future_import
                 compile_info.flags |= newflags
 
-                if compile_info.flags & consts.CO_FUTURE_PRINT_FUNCTION:
-                    self.grammar = pygram.python_grammar_no_print
-                else:
-                    self.grammar = pygram.python_grammar
+                self.grammar = _select_grammar(compile_info.flags)
 
                 for tp, value, lineno, column, line in tokens:
                     if self.add_token(tp, value, lineno, column, line):
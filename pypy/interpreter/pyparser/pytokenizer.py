@@ -5,6 +5,7 @@ from pypy.interpreter.pyparser.error import TokenError, TokenIndentationError
 from pypy.interpreter.pyparser.pytokenize import tabsize, whiteSpaceDFA, \
     triple_quoted, endDFAs, single_quoted, pseudoDFA
 from pypy.interpreter.astcompiler import consts
+from rpython.rlib import rstring
 
 NAMECHARS = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_'
 NUMCHARS = '0123456789'
@@ -46,7 +47,7 @@ def match_encoding_declaration(comment):
 
 DUMMY_DFA = automata.DFA([], [])
 
-def generate_tokens(lines, flags):
+def generate_tokens(source, flags):
     """
     This is a rewrite of pypy.module.parser.pytokenize.generate_tokens since
     the original function is not RPYTHON (uses yield)
@@ -58,6 +59,11 @@ def generate_tokens(lines, flags):
     * the line number (the real one, counting continuation lines)
     * the position on the line of the end of the token.
 
+    Unlike the original, it scans the whole source buffer in place instead of
+    reading it line by line: the automata are run on the buffer with explicit
+    bounds, and the string of a line is only built when a token or an error
+    on that line needs it.
+
     Original docstring ::
 
         The generate_tokens() generator requires one argment, readline, which
@@ -72,12 +78,12 @@ def generate_tokens(lines, flags):
         and the line on which the token was found. The line passed is the
         logical line; continuation lines are included.
     """
+    source = normalize_newlines(source)
     token_list = []
     lnum = parenlev = continued = 0
     namechars = NAMECHARS
     numchars = NUMCHARS
-    contstr, needcont = '', 0
-    contline = None
+    contstart, needcont = -1, 0
     indents = [0]
     last_comment = ''
     parenlevstart = (0, 0, "")
@@ -87,101 +93,116 @@ def generate_tokens(lines, flags):
     # make the annotator happy
     line = ''
     pos = 0
-    lines.append("")
     strstart = (0, 0, "")
-    for line in lines:
+    source_len = len(source)
+    line_start = 0
+    while True:
         lnum = lnum + 1
-        line = universal_newline(line)
-        pos, max = 0, len(line)
+        if line_start < source_len:
+            # 'source' always ends with a newline, see normalize_newlines()
+            line_end = source.find('\n', line_start) + 1
+            assert line_end > line_start
+        else:
+            line_end = line_start                   # EOF
+        pos, max = line_start, line_end
+        line = None
 
-        if contstr:
-            if not line:
+        if contstart >= 0:
+            if line_start == line_end:
                 raise TokenError(
                     "EOF while scanning triple-quoted string literal",
                     strstart[2], strstart[0], strstart[1]+1,
                     token_list, lnum-1)
-            endmatch = endDFA.recognize(line)
+            endmatch = endDFA.recognize(source, line_start, line_end)
             if endmatch >= 0:
                 pos = end = endmatch
-                tok = (tokens.STRING, contstr + line[:end], strstart[0],
+                line = source[line_start:line_end]
+                tok = (tokens.STRING, source[contstart:end], strstart[0],
                        strstart[1], line)
                 token_list.append(tok)
                 last_comment = ''
-                contstr, needcont = '', 0
-                contline = None
-            elif (needcont and not line.endswith('\\\n') and
-                               not line.endswith('\\\r\n')):
-                tok = (tokens.ERRORTOKEN, contstr + line, strstart[0],
-                       strstart[1], line)
+                contstart, needcont = -1, 0
+            elif (needcont and not (line_end - line_start >= 2 and
+                                    source[line_end - 2] == '\\')):
+                line = source[line_start:line_end]
+                tok = (tokens.ERRORTOKEN, source[contstart:line_end],
+                       strstart[0], strstart[1], line)
                 token_list.append(tok)
                 last_comment = ''
-                contstr = ''
-                contline = None
+                contstart = -1
+                line_start = line_end
                 continue
             else:
-                contstr = contstr + line
-                contline = contline + line
+                line_start = line_end
                 continue
 
         elif parenlev == 0 and not continued:  # new statement
-            if not line: break
+            if line_start == line_end: break
             column = 0
             while pos < max:                   # measure leading whitespace
-                if line[pos] == ' ': column = column + 1
-                elif line[pos] == '\t': column = (column/tabsize + 1)*tabsize
-                elif line[pos] == '\f': column = 0
+                if source[pos] == ' ': column = column + 1
+                elif source[pos] == '\t': column = (column/tabsize + 1)*tabsize
+                elif source[pos] == '\f': column = 0
                 else: break
                 pos = pos + 1
             if pos == max: break
 
-            if line[pos] in '#\r\n':
+            if source[pos] in '#\r\n':
                 # skip comments or blank lines
+                line_start = line_end
                 continue
 
+            line = source[line_start:line_end]
             if column > indents[-1]:           # count indents or dedents
                 indents.append(column)
-                token_list.append((tokens.INDENT, line[:pos], lnum, 0, line))
+                token_list.append((tokens.INDENT, source[line_start:pos],
+                                   lnum, 0, line))
                 last_comment = ''
             while column < indents[-1]:
                 indents = indents[:-1]
-                token_list.append((tokens.DEDENT, '', lnum, pos, line))
+                token_list.append((tokens.DEDENT, '', lnum, pos - line_start,
+                                   line))
                 last_comment = ''
             if column != indents[-1]:
                 err = "unindent does not match any outer indentation level"
                 raise TokenIndentationError(err, line, lnum, 0, token_list)
 
         else:                                  # continued statement
-            if not line:
+            if line_start == line_end:
                 if parenlev > 0:
                     lnum1, start1, line1 = parenlevstart
                     raise TokenError("parenthesis is never closed", line1,
                                      lnum1, start1 + 1, token_list, lnum)
-                raise TokenError("EOF in multi-line statement", line,
+                raise TokenError("EOF in multi-line statement", '',
                                  lnum, 0, token_list)
             continued = 0
 
+        if line is None:
+            line = source[line_start:line_end]
         while pos < max:
-            pseudomatch = pseudoDFA.recognize(line, pos)
+            pseudomatch = pseudoDFA.recognize(source, pos, max)
             if pseudomatch >= 0:                            # scan for tokens
                 # JDR: Modified
-                start = whiteSpaceDFA.recognize(line, pos)
+                start = whiteSpaceDFA.recognize(source, pos, max)
                 if start < 0:
                     start = pos
                 end = pseudomatch
+                column = start - line_start
 
                 if start == end:
                     raise TokenError("Unknown character", line,
-                                     lnum, start + 1, token_list)
+                                     lnum, column + 1, token_list)
 
                 pos = end
-                token, initial = line[start:end], line[start]
+                token, initial = source[start:end], source[start]
                 if initial in numchars or \
                    (initial == '.' and token != '.'):      # ordinary number
-                    token_list.append((tokens.NUMBER, token, lnum, start, line))
+                    token_list.append((tokens.NUMBER, token, lnum, column,
+                                       line))
                     last_comment = ''
                 elif initial in '\r\n':
                     if parenlev <= 0:
-                        tok = (tokens.NEWLINE, last_comment, lnum, start, line)
+                        tok = (tokens.NEWLINE, last_comment, lnum, column, line)
                         token_list.append(tok)
                     last_comment = ''
                 elif initial == '#':
@@ -189,85 +210,88 @@ def generate_tokens(lines, flags):
                     last_comment = token
                 elif token in triple_quoted:
                     endDFA = endDFAs[token]
-                    endmatch = endDFA.recognize(line, pos)
+                    endmatch = endDFA.recognize(source, pos, max)
                     if endmatch >= 0:                     # all on one line
                         pos = endmatch
-                        token = line[start:pos]
-                        tok = (tokens.STRING, token, lnum, start, line)
+                        token = source[start:pos]
+                        tok = (tokens.STRING, token, lnum, column, line)
                         token_list.append(tok)
                         last_comment = ''
                     else:
-                        strstart = (lnum, start, line)
-                        contstr = line[start:]
-                        contline = line
+                        strstart = (lnum, column, line)
+                        contstart = start
                         break
                 elif initial in single_quoted or \
                     token[:2] in single_quoted or \
                     token[:3] in single_quoted:
                     if token[-1] == '\n':                  # continued string
-                        strstart = (lnum, start, line)
+                        strstart = (lnum, column, line)
                         endDFA = (endDFAs[initial] or endDFAs[token[1]] or
                                    endDFAs[token[2]])
-                        contstr, needcont = line[start:], 1
-                        contline = line
+                        contstart, needcont = start, 1
                         break
                     else:                                  # ordinary string
-                        tok = (tokens.STRING, token, lnum, start, line)
+                        tok = (tokens.STRING, token, lnum, column, line)
                         token_list.append(tok)
                         last_comment = ''
                 elif initial in namechars:                 # ordinary name
-                    token_list.append((tokens.NAME, token, lnum, start, line))
+                    token_list.append((tokens.NAME, token, lnum, column, line))
                     last_comment = ''
                 elif initial == '\\':                      # continued stmt
                     continued = 1
                 else:
                     if initial in '([{':
                         if parenlev == 0:
-                            parenlevstart = (lnum, start, line)
+                            parenlevstart = (lnum, column, line)
                         parenlev = parenlev + 1
                     elif initial in ')]}':
                         parenlev = parenlev - 1
                         if parenlev < 0:
                             raise TokenError("unmatched '%s'" % initial, line,
-                                             lnum, start + 1, token_list)
+                                             lnum, column + 1, token_list)
                     if token in python_opmap:
                         punct = python_opmap[token]
                     else:
                         punct = tokens.OP
-                    token_list.append((punct, token, lnum, start, line))
+                    token_list.append((punct, token, lnum, column, line))
                     last_comment = ''
             else:
-                start = whiteSpaceDFA.recognize(line, pos)
+                start = whiteSpaceDFA.recognize(source, pos, max)
                 if start < 0:
                     start = pos
-                if start<max and line[start] in single_quoted:
+                if start<max and source[start] in single_quoted:
                     raise TokenError("EOL while scanning string literal",
-                             line, lnum, start+1, token_list)
-                tok = (tokens.ERRORTOKEN, line[pos], lnum, pos, line)
+                             line, lnum, start - line_start + 1, token_list)
+                tok = (tokens.ERRORTOKEN, source[pos], lnum, pos - line_start,
+                       line)
                 token_list.append(tok)
                 last_comment = ''
                 pos = pos + 1
+        line_start = line_end
 
     lnum -= 1
+    if line is None:
+        line = ''
+    column = pos - line_start
     if not (flags & consts.PyCF_DONT_IMPLY_DEDENT):
         if token_list and token_list[-1][0] != tokens.NEWLINE:
             tok = (tokens.NEWLINE, '', lnum, 0, '\n')
             token_list.append(tok)
         for indent in indents[1:]:                # pop remaining indent levels
-            token_list.append((tokens.DEDENT, '', lnum, pos, line))
+            token_list.append((tokens.DEDENT, '', lnum, column, line))
     tok = (tokens.NEWLINE, '', lnum, 0, '\n')
     token_list.append(tok)
 
-    token_list.append((tokens.ENDMARKER, '', lnum, pos, line))
+    token_list.append((tokens.ENDMARKER, '', lnum, column, line))
     return token_list
 
 
-def universal_newline(line):
-    # show annotator that indexes below are non-negative
-    line_len_m2 = len(line) - 2
-    if line_len_m2 >= 0 and line[-2] == '\r' and line[-1] == '\n':
-        return line[:line_len_m2] + '\n'
-    line_len_m1 = len(line) - 1
-    if line_len_m1 >= 0 and line[-1] == '\r':
-        return line[:line_len_m1] + '\n'
-    return line
+def normalize_newlines(source):
+    """Turn all line endings into plain newlines and make sure the source
+    ends with one, as the tokenizer expects."""
+    if '\r' in source:
+        source = rstring.replace(source, '\r\n', '\n')
+        source = source.replace('\r', '\n')
+    if source and source[-1] != '\n':
+        source += '\n'
+    return source
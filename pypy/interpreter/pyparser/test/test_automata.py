@@ -10,3 +10,11 @@ def test_states():
     assert d.states == "\x01\x00"
     assert d.defaults == "\xff\x00"
     assert d.max_char == 1
+
+def test_recognize_bounded():
+    d = DFA([{"a": 1}, {"a": 1}], [False, True])
+    assert d.recognize("aaab") == 3
+    assert d.recognize("aaab", 1) == 3
+    assert d.recognize("aaab", 0, 2) == 2
+    assert d.recognize("baaa", 1, 3) == 3
+    assert d.recognize("baaa", 0, 3) == -1
@@ -3,8 +3,7 @@ from pypy.interpreter.pyparser import future, pytokenizer
 from pypy.tool import stdlib___future__ as fut
 
 def run(s, expected_last_future=(0, 0)):
-    source_lines = s.splitlines(True)
-    tokens = pytokenizer.generate_tokens(source_lines, 0)
+    tokens = pytokenizer.generate_tokens(s, 0)
     #
     flags, last_future_import = future.add_future_flags(
         future.futureFlags_2_7, tokens)
@@ -38,6 +38,24 @@ class TestParserGenerator:
         assert states == [([(1, 1)], False), ([], True)]
         assert g.labels[0] == 0
 
+    def test_compact_tables(self):
+        g = self.gram_for("foo: bar NAME*\nbar: STRING | NUMBER")
+        for dfa_index, (states, first) in enumerate(g.dfas):
+            base = g.dfa_start_state[dfa_index]
+            for i, (arcs, is_accepting) in enumerate(states):
+                state = base + i
+                assert g.state_accepting[state] == is_accepting
+                start, end = g.state_arcs[state], g.state_arcs[state + 1]
+                assert zip(g.arc_labels[start:end],
+                           g.arc_targets[start:end]) == [
+                    (label, base + next_state) for label, next_state in arcs]
+            for label in range(len(g.labels)):
+                assert ((g.first_sets[dfa_index * g.num_labels + label] ==
+                         '\x01') == (label in first))
+        copy = g.shared_copy()
+        assert copy.arc_labels is g.arc_labels
+        assert copy.first_sets == g.first_sets
+
     def test_load_python_grammars(self):
         gram_pat = os.path.join(os.path.dirname(__file__), "..", "data",
                                 "Grammar*")
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 import py
-from pypy.interpreter.pyparser import pyparse
+from pypy.interpreter.pyparser import pyparse, pytokenizer
 from pypy.interpreter.pyparser.pygram import syms, tokens
 from pypy.interpreter.pyparser.error import SyntaxError, IndentationError
 from pypy.interpreter.astcompiler import consts
@@ -136,6 +136,16 @@ pass"""
         self.parse("''' \n '''")
         self.parse("r''' \n '''")
 
+    def test_multiline_string_tokens(self):
+        source = 'x = """a\r\nb\r\n"""; y = \'c\\\r\nd\'\r\nz = 1'
+        toks = pytokenizer.generate_tokens(source, 0)
+        strings = [(tok[1], tok[2], tok[3]) for tok in toks
+                   if tok[0] == tokens.STRING]
+        assert strings == [('"""a\nb\n"""', 1, 4), ("'c\\\nd'", 3, 9)]
+        names = [(tok[1], tok[2], tok[3], tok[4]) for tok in toks
+                 if tok[0] == tokens.NAME]
+        assert names[-1] == ('z', 5, 0, 'z = 1\n')
+
     def test_bytes_literal(self):
         self.parse('b" "')
         self.parse('br" "')
@@ -159,6 +169,20 @@ pass"""
     def test_print_function(self):
         self.parse("from __future__ import print_function\nx = print\n")
 
+    def test_match_statement(self):
+        # 'match' and 'case' are keywords only with the future import
+        self.parse("match = case = 1\nmatch(case)\n")
+        py.test.raises(SyntaxError, self.parse,
+                       "match x:\n    case 1: pass\n")
+        source = "match x:\n    case 1 | 2 as y if y: pass\n"
+        self.parse("from __future__ import match_statement\n" + source)
+        info = pyparse.CompileInfo("<test>", "exec",
+                                   consts.CO_FUTURE_MATCH_STATEMENT |
+                                   consts.CO_FUTURE_PRINT_FUNCTION)
+        tree = self.parse(source + "x = print\n", info=info)
+        assert tree.type == syms.file_input
+        py.test.raises(SyntaxError, self.parse, "match = 1\n", info=info)
+
     def test_universal_newlines(self):
         fmt = 'stuff = """hello%sworld"""'
         expected_tree = self.parse(fmt % '\n')
@@ -1,3 +1,4 @@
+import py
 from rpython.tool import udir
 from pypy.conftest import option
 from pypy.interpreter.gateway import interp2app
@@ -629,3 +630,126 @@ class AppTestPyFrame:
         function()
         sys.settrace(None)
         assert seen == ["line", "line", "line", "return"]
+
+
+def free_frames(space, w_func):
+    return space.newint(len(w_func.code._free_frames or []))
+
+class AppTestFrameFreeList:
+    spaceconfig = {"objspace.framefreelist": True}
+
+    def setup_class(cls):
+        if option.runappdirect:
+            py.test.skip("inspects the free list at interp-level")
+        cls.w_free_frames = cls.space.wrap(interp2app(free_frames))
+
+    def test_reuse(self):
+        def f(x, y=5):
+            z = x + y
+            return z
+        assert self.free_frames(f) == 0
+        assert f(1) == 6
+        assert self.free_frames(f) == 1
+        assert f(2, 3) == 5
+        assert f(y=1, x=2) == 3
+        assert self.free_frames(f) == 1
+
+    def test_recursion(self):
+        def fib(n):
+            if n < 2:
+                return n
+            return fib(n - 1) + fib(n - 2)
+        assert fib(15) == 610
+        assert 0 < self.free_frames(fib) <= 4
+        assert fib(10) == 55
+
+    def test_getframe_escapes(self):
+        import sys
+        def f(x):
+            y = x * 2
+            return sys._getframe()
+        def g(x):
+            return sys._getframe(1)
+        def h(x):
+            return g(x)
+        f1 = f(1)
+        f2 = f(2)
+        assert f1 is not f2
+        assert (f1.f_locals['x'], f1.f_locals['y']) == (1, 2)
+        assert (f2.f_locals['x'], f2.f_locals['y']) == (2, 4)
+        assert self.free_frames(f) == 0
+        h1 = h(1)
+        h2 = h(2)
+        assert h1 is not h2
+        assert h1.f_locals['x'] == 1
+        assert self.free_frames(h) == 0
+        assert self.free_frames(g) == 1
+
+    def test_traceback(self):
+        import sys
+        def f(x):
+            try:
+                1 / 0
+            except ZeroDivisionError:
+                return sys.exc_info()[2]
+        def g(x):
+            if x:
+                raise ValueError
+        def h(x):
+            try:
+                g(x)
+            except ValueError:
+                return x
+        tb = f(5)
+        f(6)
+        assert tb.tb_frame.f_locals['x'] == 5
+        assert self.free_frames(f) == 0
+        try:
+            g(7)
+        except ValueError:
+            tb = sys.exc_info()[2]
+        g(0)
+        assert tb.tb_next.tb_frame.f_locals['x'] == 7
+        assert h(8) == 8
+        assert self.free_frames(h) == 0
+
+    def test_generator(self):
+        def gen(x):
+            yield x
+            yield x + 1
+        def make(x):
+            return gen(x)
+        g1 = make(1)
+        g2 = make(10)
+        assert g1.gi_frame is not g2.gi_frame
+        assert list(g1) == [1, 2]
+        assert list(g2) == [10, 11]
+        assert self.free_frames(gen) == 0
+        assert self.free_frames(make) == 1
+
+    def test_closure(self):
+        def make(n):
+            def inner():
+                return n
+            return inner
+        a = make(1)
+        b = make(2)
+        assert (a(), b()) == (1, 2)
+        assert self.free_frames(make) == 1
+
+    def test_trace(self):
+        import sys
+        def f(x):
+            return x
+        frames = []
+        def trace(frame, event, arg):
+            frames.append(frame)
+        sys.settrace(trace)
+        try:
+            f(1)
+            f(2)
+        finally:
+            sys.settrace(None)
+        assert frames[0] is not frames[1]
+        assert frames[0].f_locals['x'] == 1
+        assert self.free_frames(f) == 0
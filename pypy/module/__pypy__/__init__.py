@@ -91,6 +91,8 @@ class Module(MixedModule):
         'strategy'                  : 'interp_magic.strategy',  # dict,set,list
         'specialized_zip_2_lists'   : 'interp_magic.specialized_zip_2_lists',
         'set_debug'                 : 'interp_magic.set_debug',
+        'set_compiler_optimize'     : 'interp_magic.set_compiler_optimize',
+        'set_lazy_imports'          : 'interp_magic.set_lazy_imports',
         'locals_to_fast'            : 'interp_magic.locals_to_fast',
         'set_code_callback'         : 'interp_magic.set_code_callback',
         'save_module_content_for_future_reload':
@@ -119,6 +121,10 @@ class Module(MixedModule):
                                  'interp_magic.reset_method_cache_counter')
             self.extra_interpdef('mapdict_cache_counter',
                                  'interp_magic.mapdict_cache_counter')
+            self.extra_interpdef('global_cache_counter',
+                                 'interp_magic.global_cache_counter')
+            self.extra_interpdef('store_attr_cache_counter',
+                                 'interp_magic.store_attr_cache_counter')
         PYC_MAGIC = get_pyc_magic(self.space)
         self.extra_interpdef('PYC_MAGIC', 'space.wrap(%d)' % PYC_MAGIC)
         try:
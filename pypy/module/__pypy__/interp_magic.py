@@ -8,7 +8,8 @@ from pypy.objspace.std.dictmultiobject import W_DictMultiObject
 from pypy.objspace.std.listobject import W_ListObject
 from pypy.objspace.std.setobject import W_BaseSetObject
 from pypy.objspace.std.typeobject import MethodCache
-from pypy.objspace.std.mapdict import MapAttrCache
+from pypy.objspace.std.mapdict import MapAttrCache, StoreAttrCacheCounter
+from pypy.objspace.std.celldict import GlobalCacheCounter
 from rpython.rlib import rposix, rgc, rstack
 
 
@@ -40,6 +41,12 @@ def reset_method_cache_counter(space):
     cache = space.fromcache(MapAttrCache)
     cache.misses = {}
     cache.hits = {}
+    cache = space.fromcache(GlobalCacheCounter)
+    cache.misses = {}
+    cache.hits = {}
+    cache = space.fromcache(StoreAttrCacheCounter)
+    cache.misses = {}
+    cache.hits = {}
 
 @unwrap_spec(name='text')
 def mapdict_cache_counter(space, name):
@@ -50,6 +57,24 @@ def mapdict_cache_counter(space, name):
     return space.newtuple([space.newint(cache.hits.get(name, 0)),
                            space.newint(cache.misses.get(name, 0))])
 
+@unwrap_spec(name='text')
+def global_cache_counter(space, name):
+    """Return a tuple (cache_hits, cache_misses) for the LOAD_GLOBAL inline
+    caches of the given name."""
+    assert space.config.objspace.std.withmethodcachecounter
+    cache = space.fromcache(GlobalCacheCounter)
+    return space.newtuple([space.newint(cache.hits.get(name, 0)),
+                           space.newint(cache.misses.get(name, 0))])
+
+@unwrap_spec(name='text')
+def store_attr_cache_counter(space, name):
+    """Return a tuple (cache_hits, cache_misses) for the STORE_ATTR inline
+    caches of the given attribute name."""
+    assert space.config.objspace.std.withmethodcachecounter
+    cache = space.fromcache(StoreAttrCacheCounter)
+    return space.newtuple([space.newint(cache.hits.get(name, 0)),
+                           space.newint(cache.misses.get(name, 0))])
+
 def builtinify(space, w_func):
     """To implement at app-level modules that are, in CPython,
     implemented in C: this decorator protects a function from being ever
@@ -141,6 +166,43 @@ def set_debug(space, debug):
                   space.newtext('__debug__'),
                   space.newbool(debug))
 
+@unwrap_spec(level=int)
+def set_compiler_optimize(space, level):
+    """Set the optimization level of the bytecode compiler.  With a level
+    of 1, module-level UPPER_CASE names that are only assigned a constant
+    once are replaced by their value, as are True, False and len() of
+    constants when the module does not rebind them.  This is only correct
+    if no other module changes these names.  The .pyc files are then
+    written with a different magic number."""
+    if not 0 <= level <= 1:
+        raise oefmt(space.w_ValueError, "optimization level must be 0 or 1")
+    space.sys.compiler_optimize = level
+
+@unwrap_spec(enabled=bool)
+def set_lazy_imports(space, enabled, w_allowlist=None, w_denylist=None):
+    """Enable or disable lazy imports.  When enabled, 'import x' of a
+    module that is not a package returns a module whose code only runs
+    when one of its attributes is first used.  If 'allowlist' is given,
+    only these modules are imported lazily; modules in 'denylist' never
+    are (by default, site and __main__ and similar modules).  A name also
+    applies to all the modules inside a package of that name."""
+    from pypy.module.imp.importing import (LazyImportState,
+                                           LAZY_IMPORTS_DENYLIST)
+    state = space.fromcache(LazyImportState)
+    if space.is_none(w_allowlist):
+        allowlist = []
+    else:
+        allowlist = [space.text_w(w_name)
+                     for w_name in space.unpackiterable(w_allowlist)]
+    if space.is_none(w_denylist):
+        denylist = LAZY_IMPORTS_DENYLIST
+    else:
+        denylist = [space.text_w(w_name)
+                    for w_name in space.unpackiterable(w_denylist)]
+    state.enabled = enabled
+    state.allowlist = allowlist
+    state.denylist = denylist
+
 @unwrap_spec(estimate=int)
 def add_memory_pressure(estimate):
     """ Add memory pressure of estimate bytes. Useful when calling a C function
@@ -32,6 +32,23 @@ def f():
             __pypy__.set_code_callback(None)
         assert d['f'].__code__ in l
 
+    def test_set_compiler_optimize(self):
+        import __pypy__
+        source = "DEBUG = False\ndef f():\n    return DEBUG\n"
+        def get_f(source):
+            d = {}
+            exec compile(source, "<test>", "exec") in d
+            return d['f']
+        __pypy__.set_compiler_optimize(1)
+        try:
+            f = get_f(source)
+        finally:
+            __pypy__.set_compiler_optimize(0)
+        assert f.__code__.co_names == ()
+        assert f() is False
+        assert get_f(source).__code__.co_names == ('DEBUG',)
+        raises(ValueError, __pypy__.set_compiler_optimize, 2)
+
     def test_decode_long(self):
         from __pypy__ import decode_long
         assert decode_long('') == 0
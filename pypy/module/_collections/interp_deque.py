@@ -1,5 +1,6 @@
 import sys
-from rpython.rlib.objectmodel import specialize
+from rpython.rlib import rerased
+from rpython.rlib.objectmodel import import_from_mixin, specialize
 from pypy.interpreter import gateway
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.typedef import TypeDef, make_weakref_descr
@@ -7,6 +8,8 @@ from pypy.interpreter.typedef import GetSetProperty
 from pypy.interpreter.gateway import interp2app, unwrap_spec
 from pypy.interpreter.error import OperationError, oefmt
 from rpython.rlib.debug import check_nonneg
+from pypy.objspace.std.floatobject import W_FloatObject
+from pypy.objspace.std.intobject import W_IntObject
 
 
 # A `dequeobject` is composed of a doubly-linked list of `block` nodes.
@@ -42,10 +45,133 @@ CENTER   = ((BLOCKLEN - 1) / 2)
 
 class Block(object):
     __slots__ = ('leftlink', 'rightlink', 'data')
-    def __init__(self, leftlink, rightlink):
+    def __init__(self, leftlink, rightlink, data):
         self.leftlink = leftlink
         self.rightlink = rightlink
-        self.data = [None] * BLOCKLEN
+        self.data = data     # erased by the strategy of the deque
+
+# ------------------------------------------------------------
+# The items of all the blocks of a deque are stored in the same way,
+# described by the strategy of the deque, like for lists (see
+# pypy/objspace/std/listobject.py).  An empty deque picks the strategy
+# that fits the first item added to it; adding an item of another type
+# to a non-empty deque switches it to the ObjectDequeStrategy, converting
+# the blocks in place.
+
+class DequeStrategy(object):
+    def __init__(self, space):
+        self.space = space
+
+    def is_correct_type(self, w_obj):
+        raise NotImplementedError
+
+    def new_data(self):
+        raise NotImplementedError
+
+    def getitem(self, block, index):
+        raise NotImplementedError
+
+    def setitem(self, block, index, w_obj):
+        raise NotImplementedError
+
+    def clearitem(self, block, index):
+        raise NotImplementedError
+
+    def swapitems(self, block1, index1, block2, index2):
+        raise NotImplementedError
+
+    def getitems_object(self, block):
+        raise NotImplementedError
+
+
+class AbstractUnwrappedDequeStrategy(object):
+
+    def new_data(self):
+        return self.erase([self._none_value] * BLOCKLEN)
+
+    def getitem(self, block, index):
+        return self.wrap(self.unerase(block.data)[index])
+
+    def setitem(self, block, index, w_obj):
+        self.unerase(block.data)[index] = self.unwrap(w_obj)
+
+    def clearitem(self, block, index):
+        self.unerase(block.data)[index] = self._none_value
+
+    def swapitems(self, block1, index1, block2, index2):
+        data1 = self.unerase(block1.data)
+        data2 = self.unerase(block2.data)
+        data1[index1], data2[index2] = data2[index2], data1[index1]
+
+    def getitems_object(self, block):
+        data = self.unerase(block.data)
+        return [self.wrap(item) for item in data]
+
+
+class ObjectDequeStrategy(DequeStrategy):
+    import_from_mixin(AbstractUnwrappedDequeStrategy)
+
+    _none_value = None
+
+    def wrap(self, item):
+        return item
+
+    def unwrap(self, w_obj):
+        return w_obj
+
+    erase, unerase = rerased.new_erasing_pair("deque_object")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def is_correct_type(self, w_obj):
+        return True
+
+
+class IntegerDequeStrategy(DequeStrategy):
+    import_from_mixin(AbstractUnwrappedDequeStrategy)
+
+    _none_value = 0
+
+    def wrap(self, intval):
+        return self.space.newint(intval)
+
+    def unwrap(self, w_int):
+        return self.space.int_w(w_int)
+
+    erase, unerase = rerased.new_erasing_pair("deque_integer")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def is_correct_type(self, w_obj):
+        return type(w_obj) is W_IntObject
+
+
+class FloatDequeStrategy(DequeStrategy):
+    import_from_mixin(AbstractUnwrappedDequeStrategy)
+
+    _none_value = 0.0
+
+    def wrap(self, floatval):
+        return self.space.newfloat(floatval)
+
+    def unwrap(self, w_float):
+        return self.space.float_w(w_float)
+
+    erase, unerase = rerased.new_erasing_pair("deque_float")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def is_correct_type(self, w_obj):
+        return type(w_obj) is W_FloatObject
+
+
+def get_strategy_from_item(space, w_obj):
+    if space.config.objspace.std.withliststrategies:
+        if type(w_obj) is W_IntObject:
+            return space.fromcache(IntegerDequeStrategy)
+        if type(w_obj) is W_FloatObject:
+            return space.fromcache(FloatDequeStrategy)
+    return space.fromcache(ObjectDequeStrategy)
 
 class Lock(object):
     pass
@@ -56,6 +182,7 @@ class W_Deque(W_Root):
     def __init__(self, space):
         self.space = space
         self.maxlen = sys.maxint
+        self.strategy = space.fromcache(ObjectDequeStrategy)
         self.clear()
         check_nonneg(self.leftindex)
         check_nonneg(self.rightindex)
@@ -92,6 +219,31 @@ class W_Deque(W_Root):
         if w_iterable is not None:
             self.extend(w_iterable)
 
+    def switch_to_object_strategy(self):
+        strategy = self.space.fromcache(ObjectDequeStrategy)
+        block = self.leftblock
+        while block is not None:
+            items_w = self.strategy.getitems_object(block)
+            block.data = strategy.erase(items_w)
+            block = block.rightlink
+        self.strategy = strategy
+        # the items outside of the deque must not be kept alive
+        for i in range(self.leftindex):
+            strategy.clearitem(self.leftblock, i)
+        for i in range(self.rightindex + 1, BLOCKLEN):
+            strategy.clearitem(self.rightblock, i)
+
+    def prepare_for_item(self, w_x):
+        # make sure that the strategy of the deque can store 'w_x'
+        if self.len == 0:
+            strategy = get_strategy_from_item(self.space, w_x)
+            if strategy is not self.strategy:
+                # there is only one block, with no item in it
+                self.strategy = strategy
+                self.leftblock.data = strategy.new_data()
+        elif not self.strategy.is_correct_type(w_x):
+            self.switch_to_object_strategy()
+
     def trimleft(self):
         if self.len > self.maxlen:
             self.popleft()
@@ -104,35 +256,37 @@ class W_Deque(W_Root):
 
     def append(self, w_x):
         "Add an element to the right side of the deque."
+        self.prepare_for_item(w_x)
         ri = self.rightindex + 1
         if ri >= BLOCKLEN:
-            b = Block(self.rightblock, None)
+            b = Block(self.rightblock, None, self.strategy.new_data())
             self.rightblock.rightlink = b
             self.rightblock = b
             ri = 0
         self.rightindex = ri
-        self.rightblock.data[ri] = w_x
+        self.strategy.setitem(self.rightblock, ri, w_x)
         self.len += 1
         self.trimleft()
         self.modified()
 
     def appendleft(self, w_x):
         "Add an element to the left side of the deque."
+        self.prepare_for_item(w_x)
         li = self.leftindex - 1
         if li < 0:
-            b = Block(None, self.leftblock)
+            b = Block(None, self.leftblock, self.strategy.new_data())
             self.leftblock.leftlink = b
             self.leftblock = b
             li = BLOCKLEN - 1
         self.leftindex = li
-        self.leftblock.data[li] = w_x
+        self.strategy.setitem(self.leftblock, li, w_x)
         self.len += 1
         self.trimright()
         self.modified()
 
     def clear(self):
         "Remove all elements from the deque."
-        self.leftblock = Block(None, None)
+        self.leftblock = Block(None, None, self.strategy.new_data())
         self.rightblock = self.leftblock
         self.leftindex = CENTER + 1
         self.rightindex = CENTER
@@ -147,7 +301,7 @@ class W_Deque(W_Root):
         index = self.leftindex
         lock = self.getlock()
         for i in range(self.len):
-            w_item = block.data[index]
+            w_item = self.strategy.getitem(block, index)
             if space.eq_w(w_item, w_x):
                 result += 1
             self.checklock(lock)
@@ -203,8 +357,8 @@ class W_Deque(W_Root):
             raise oefmt(self.space.w_IndexError, "pop from an empty deque")
         self.len -= 1
         ri = self.rightindex
-        w_obj = self.rightblock.data[ri]
-        self.rightblock.data[ri] = None
+        w_obj = self.strategy.getitem(self.rightblock, ri)
+        self.strategy.clearitem(self.rightblock, ri)
         ri -= 1
         if ri < 0:
             if self.len == 0:
@@ -226,8 +380,8 @@ class W_Deque(W_Root):
             raise oefmt(self.space.w_IndexError, "pop from an empty deque")
         self.len -= 1
         li = self.leftindex
-        w_obj = self.leftblock.data[li]
-        self.leftblock.data[li] = None
+        w_obj = self.strategy.getitem(self.leftblock, li)
+        self.strategy.clearitem(self.leftblock, li)
         li += 1
         if li >= BLOCKLEN:
             if self.len == 0:
@@ -250,7 +404,7 @@ class W_Deque(W_Root):
         index = self.leftindex
         lock = self.getlock()
         for i in range(self.len):
-            w_item = block.data[index]
+            w_item = self.strategy.getitem(block, index)
             equal = space.eq_w(w_item, w_x)
             self.checklock(lock)
             if equal:
@@ -270,7 +424,7 @@ class W_Deque(W_Root):
         ri = self.rightindex
         rb = self.rightblock
         for i in range(self.len >> 1):
-            lb.data[li], rb.data[ri] = rb.data[ri], lb.data[li]
+            self.strategy.swapitems(lb, li, rb, ri)
             li += 1
             if li >= BLOCKLEN:
                 lb = lb.rightlink
@@ -366,7 +520,7 @@ class W_Deque(W_Root):
         start, stop, step = space.decode_index(w_index, self.len)
         if step == 0:  # index only
             b, i = self.locate(start)
-            return b.data[i]
+            return self.strategy.getitem(b, i)
         else:
             raise oefmt(space.w_TypeError, "deque[:] is not supported")
 
@@ -375,7 +529,8 @@ class W_Deque(W_Root):
         start, stop, step = space.decode_index(w_index, self.len)
         if step == 0:  # index only
             b, i = self.locate(start)
-            b.data[i] = w_newobj
+            self.prepare_for_item(w_newobj)
+            self.strategy.setitem(b, i, w_newobj)
         else:
             raise oefmt(space.w_TypeError, "deque[:] is not supported")
 
@@ -520,7 +675,7 @@ class W_DequeIter(W_Root):
             raise OperationError(space.w_StopIteration, space.w_None)
         self.counter -= 1
         ri = self.index
-        w_x = self.block.data[ri]
+        w_x = self.deque.strategy.getitem(self.block, ri)
         ri += 1
         if ri == BLOCKLEN:
             self.block = self.block.rightlink
@@ -562,7 +717,7 @@ class W_DequeRevIter(W_Root):
             raise OperationError(space.w_StopIteration, space.w_None)
         self.counter -= 1
         ri = self.index
-        w_x = self.block.data[ri]
+        w_x = self.deque.strategy.getitem(self.block, ri)
         ri -= 1
         if ri < 0:
             self.block = self.block.leftlink
@@ -302,3 +302,67 @@ class AppTestBasic:
         d.pop()
         gc.collect(); gc.collect(); gc.collect()
         assert X.freed
+
+    def test_mixed_types(self):
+        from _collections import deque
+        d = deque(xrange(100))
+        d.appendleft(-1.5)
+        d.append("x")
+        assert list(d) == [-1.5] + range(100) + ["x"]
+        d = deque([1.5] * 100, maxlen=70)
+        d[3] = 4
+        assert d[3] == 4 and d[4] == 1.5 and len(d) == 70
+        d.rotate(20)
+        d.reverse()
+        assert d.count(1.5) == 69
+        d.remove(4)
+        assert list(d) == [1.5] * 69
+        d.clear()
+        d.append(5)
+        d.append(5.5)
+        assert list(d) == [5, 5.5]
+        assert type(d[0]) is int
+        it = iter(d)
+        next(it)
+        d[1] = "y"
+        assert next(it) == "y"
+
+
+class TestDequeStrategies:
+    spaceconfig = dict(usemodules=['_collections'])
+
+    def newdeque(self, items_w):
+        from pypy.module._collections.interp_deque import W_Deque
+        w_deque = W_Deque(self.space)
+        for w_item in items_w:
+            w_deque.append(w_item)
+        return w_deque
+
+    def test_first_item(self):
+        from pypy.module._collections.interp_deque import (
+            ObjectDequeStrategy, IntegerDequeStrategy, FloatDequeStrategy)
+        space = self.space
+        w_deque = self.newdeque([])
+        assert isinstance(w_deque.strategy, ObjectDequeStrategy)
+        w_deque.append(space.wrap(1))
+        assert isinstance(w_deque.strategy, IntegerDequeStrategy)
+        w_deque.pop()
+        w_deque.appendleft(space.wrap(1.5))
+        assert isinstance(w_deque.strategy, FloatDequeStrategy)
+        w_deque.popleft()
+        w_deque.append(space.wrap("a"))
+        assert isinstance(w_deque.strategy, ObjectDequeStrategy)
+
+    def test_switch_to_object(self):
+        from pypy.module._collections.interp_deque import (
+            ObjectDequeStrategy, IntegerDequeStrategy)
+        space = self.space
+        w_deque = self.newdeque([space.wrap(i) for i in range(200)])
+        assert isinstance(w_deque.strategy, IntegerDequeStrategy)
+        w_deque.append(space.wrap(2 ** 100))
+        assert isinstance(w_deque.strategy, ObjectDequeStrategy)
+        assert space.unwrap(space.call_function(space.w_list, w_deque)) == (
+            range(200) + [2 ** 100])
+        data = ObjectDequeStrategy.unerase(w_deque.rightblock.data)
+        assert data[w_deque.rightindex + 1:] == [None] * (
+            len(data) - w_deque.rightindex - 1)
@@ -23,6 +23,7 @@ class Module(MixedModule):
         'load_compiled':   'interp_imp.load_compiled',
         'load_dynamic':    'interp_imp.load_dynamic',
         '_run_compiled_module': 'interp_imp._run_compiled_module',   # pypy
+        '_precompile_source': 'interp_imp._precompile_source',       # pypy
         '_getimporter':    'importing._getimporter',                 # pypy
         #'run_module':      'interp_imp.run_module',
         'new_module':      'interp_imp.new_module',
@@ -50,3 +51,8 @@ class Module(MixedModule):
         add_fork_hook('parent', interp_imp.release_lock)
         add_fork_hook('child', interp_imp.reinit_lock)
 
+    def setup_after_space_initialization(self):
+        "NOT_RPYTHON"
+        from pypy.module.imp import importing
+        importing.freeze_modules(self.space)
+
@@ -11,7 +11,7 @@ from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.baseobjspace import W_Root, CannotHaveLock
 from pypy.interpreter.eval import Code
 from pypy.interpreter.pycode import PyCode
-from rpython.rlib import streamio, jit
+from rpython.rlib import streamio, jit, rsha
 from rpython.rlib.streamio import StreamErrors
 from rpython.rlib.objectmodel import we_are_translated, specialize
 from pypy.module.sys.version import PYPY_VERSION
@@ -410,7 +410,10 @@ def _absolute_import(space, modulename, baselevel, w_fromlist, tentative):
             first = w_mod
             tentative = 0
         prefix.append(part)
-        w_path = try_getattr(space, w_mod, space.newtext('__path__'))
+        if isinstance(w_mod, LazyModule) and w_mod.is_pending():
+            w_path = None     # not a package, and don't load it yet
+        else:
+            w_path = try_getattr(space, w_mod, space.newtext('__path__'))
         level += 1
 
     if w_fromlist is not None:
@@ -538,8 +541,11 @@ def find_module(space, modulename, w_modulename, partname, w_path,
         if w_loader:
             return FindInfo.fromLoader(w_loader)
 
-    # XXX Check for frozen modules?
-    #     when w_path is a string
+    # modules frozen into the executable come before sys.path, unless
+    # an explicit path is given for a top-level module
+    if ((w_path is None or modulename != partname) and
+            find_frozen_module(space, modulename) is not None):
+        return FindInfo(PY_FROZEN, modulename, None)
 
     delayed_builtin = None
     w_lib_extensions = None
@@ -637,6 +643,12 @@ def load_module(space, w_modulename, find_info, reuse=False):
         return space.getbuiltinmodule(find_info.filename, force_init=True,
                                       reuse=reuse)
 
+    if find_info.modtype == PY_FROZEN:
+        frozen = find_frozen_module(space, find_info.filename)
+        if frozen is not None:
+            return load_frozen_module(space, w_modulename, frozen,
+                                      reuse=reuse)
+
     if find_info.modtype in (PY_SOURCE, PY_COMPILED, C_EXTENSION, PKG_DIRECTORY):
         w_mod = None
         if reuse:
@@ -702,7 +714,14 @@ def load_part(space, w_path, prefix, partname, w_parent, tentative):
 
         try:
             if find_info:
-                w_mod = load_module(space, w_modulename, find_info)
+                if (find_info.modtype in (PY_SOURCE, PY_COMPILED) and
+                        is_lazy_import(space, modulename)):
+                    w_mod = LazyModule(space, w_modulename, find_info.filename,
+                                       find_info.modtype)
+                    space.setitem(space.sys.get('modules'), w_modulename,
+                                  w_mod)
+                else:
+                    w_mod = load_module(space, w_modulename, find_info)
                 if w_parent is not None:
                     space.setattr(w_parent, space.newtext(partname), w_mod)
                 return w_mod
@@ -868,11 +887,16 @@ def getimportlock(space):
 # CPython leaves a gap of 10 when it increases its own magic number.
 # To avoid assigning exactly the same numbers as CPython, we can pick
 # any number between CPython + 2 and CPython + 9.  Right now,
-# default_magic = CPython + 7.
+# default_magic = CPython + 5.
 #
 #     CPython + 0                  -- used by CPython without the -U option
 #     CPython + 1                  -- used by CPython with the -U option
-#     CPython + 7 = default_magic  -- used by PyPy (incompatible!)
+#     CPython + 5 = default_magic  -- used by PyPy (incompatible!)
+#     CPython + 6                  -- used by PyPy after
+#                                     __pypy__.set_compiler_optimize(1)
+#     CPython + 7                  -- used by PyPy before superinstructions
+#     CPython + 8, 9               -- used by development versions with
+#                                     four superinstructions; don't reuse
 #
 from pypy.interpreter.pycode import default_magic
 MARSHAL_VERSION_FOR_PYC = 2
@@ -885,7 +909,7 @@ def get_pyc_magic(space):
             magic = __import__('imp').get_magic()
             return struct.unpack('<i', magic)[0]
 
-    return default_magic
+    return default_magic + space.sys.compiler_optimize
 
 
 def parse_source_module(space, pathname, source):
@@ -926,9 +950,16 @@ def load_source_module(space, w_modulename, w_mod, pathname, source, fd,
                   (space.text_w(w_modulename), pathname))
 
     src_stat = os.fstat(fd)
-    cpathname = pathname + 'c'
-    mtime = int(src_stat[stat.ST_MTIME])
     mode = src_stat[stat.ST_MODE]
+    prefix = get_pycache_prefix(space)
+    if prefix is not None:
+        # central cache directory: the entry is found from the source
+        # text itself, so it never needs an mtime check
+        cpathname = make_cache_filename(space, prefix, source)
+        mtime = 0
+    else:
+        cpathname = pathname + 'c'
+        mtime = int(src_stat[stat.ST_MTIME])
     stream = check_compiled_module(space, cpathname, mtime)
 
     if stream:
@@ -940,13 +971,19 @@ def load_source_module(space, w_modulename, w_mod, pathname, source, fd,
                 stream.close()
             except StreamErrors:
                 pass
-        space.setattr(w_mod, space.newtext('__file__'), space.newtext(cpathname))
+        if prefix is None:
+            space.setattr(w_mod, space.newtext('__file__'),
+                          space.newtext(cpathname))
     else:
         code_w = parse_source_module(space, pathname, source)
 
         if write_pyc:
             if not space.is_true(space.sys.get('dont_write_bytecode')):
-                write_compiled_module(space, code_w, cpathname, mode, mtime)
+                if prefix is not None:
+                    write_cached_module(space, code_w, prefix, cpathname)
+                else:
+                    write_compiled_module(space, code_w, cpathname, mode,
+                                          mtime)
 
     try:
         optimize = space.sys.get_flag('optimize')
@@ -1075,21 +1112,28 @@ def open_exclusive(space, cpathname, mode):
     fd = os.open(cpathname, flags, mode)
     return streamio.fdopen_as_stream(fd, "wb")
 
-def write_compiled_module(space, co, cpathname, src_mode, src_mtime):
-    """
-    Write a compiled module to a file, placing the time of last
-    modification of its source into the header.
-    Errors are ignored, if a write error occurs an attempt is made to
-    remove the file.
-    """
+def _marshal_code(space, co):
+    """Return the marshalled form of 'co', or None if it cannot be
+    marshalled."""
     w_marshal = space.getbuiltinmodule('marshal')
     try:
         w_str = space.call_method(w_marshal, 'dumps', co,
                                   space.newint(MARSHAL_VERSION_FOR_PYC))
-        strbuf = space.text_w(w_str)
+        return space.text_w(w_str)
     except OperationError as e:
         if e.async(space):
             raise
+        return None
+
+def write_compiled_module(space, co, cpathname, src_mode, src_mtime):
+    """
+    Write a compiled module to a file, placing the time of last
+    modification of its source into the header.
+    Errors are ignored, if a write error occurs an attempt is made to
+    remove the file.
+    """
+    strbuf = _marshal_code(space, co)
+    if strbuf is None:
         #print "Problem while marshalling %s, skipping" % cpathname
         return
     #
@@ -1125,3 +1169,301 @@ def write_compiled_module(space, co, cpathname, src_mode, src_mtime):
             os.unlink(cpathname)
         except OSError:
             pass
+
+# __________________________________________________________________
+#
+# Central bytecode cache
+#
+# If sys.pycache_prefix is set to a directory (PYTHONPYCACHEPREFIX or
+# "-X pycache_prefix=DIR"), the .pyc files are not read from or written
+# next to the sources.  Instead, the compiled form of a source is stored in
+# that directory under a name made from the SHA-1 of the source text and
+# the current pyc magic.  Several installations, containers or read-only
+# source trees can share one cache, and an entry is never stale: a
+# changed source simply maps to another file.  The files have the usual
+# .pyc format, with a zero mtime.
+
+def get_pycache_prefix(space):
+    w_prefix = space.sys.get('pycache_prefix')
+    if space.is_none(w_prefix):
+        return None
+    prefix = space.fsencode_w(w_prefix)
+    if not prefix:
+        return None
+    return prefix
+
+def make_cache_filename(space, prefix, source):
+    digest = rsha.new(source).hexdigest()
+    return os.path.join(prefix, "%s-%d.pyc" % (digest, get_pyc_magic(space)))
+
+def write_cached_module(space, co, prefix, cpathname):
+    """
+    Write a compiled module into the central cache directory.  The file
+    is first written under a temporary name and then renamed, so that
+    concurrent readers never see a partial file and concurrent writers
+    of the same entry don't conflict.  Errors are ignored.
+    """
+    strbuf = _marshal_code(space, co)
+    if strbuf is None:
+        return
+    try:
+        os.mkdir(prefix, 0777)
+    except OSError:
+        pass
+    tmpname = "%s.%d.tmp" % (cpathname, os.getpid())
+    try:
+        stream = open_exclusive(space, tmpname, 0644)
+    except (OSError, StreamErrors):
+        return
+    try:
+        try:
+            _w_long(stream, get_pyc_magic(space))
+            _w_long(stream, 0)   # mtime, unused
+            stream.write(strbuf)
+        finally:
+            stream.close()
+        os.rename(tmpname, cpathname)
+    except (OSError, StreamErrors):
+        try:
+            os.unlink(tmpname)
+        except OSError:
+            pass
+
+def precompile_source(space, pathname):
+    """
+    Compile the source file 'pathname' into the central cache directory,
+    unless it is already there.  Returns the name of the cache file and
+    whether it was written.
+    """
+    prefix = get_pycache_prefix(space)
+    if prefix is None:
+        raise oefmt(space.w_ValueError, "sys.pycache_prefix is not set")
+    try:
+        stream = streamio.open_file_as_stream(pathname, "U")
+        try:
+            source = stream.readall()
+        finally:
+            stream.close()
+    except StreamErrors as e:
+        from pypy.interpreter.streamutil import wrap_streamerror
+        raise wrap_streamerror(space, e)
+    cpathname = make_cache_filename(space, prefix, source)
+    stream = check_compiled_module(space, cpathname, 0)
+    if stream:
+        try:
+            stream.close()
+        except StreamErrors:
+            pass
+        return cpathname, False
+    code_w = parse_source_module(space, pathname, source)
+    write_cached_module(space, code_w, prefix, cpathname)
+    return cpathname, True
+
+# __________________________________________________________________
+#
+# Frozen modules
+#
+# The application-level modules listed in the translation option
+# objspace.frozen_modules are compiled at translation time, and their code
+# objects become part of the executable.  Importing them does not touch
+# the file system.
+
+class FrozenModule(object):
+    _immutable_fields_ = ['name', 'relpath', 'pkgdir', 'code_w']
+
+    def __init__(self, name, relpath, pkgdir, code_w):
+        self.name = name
+        self.relpath = relpath      # relative to sys.prefix
+        self.pkgdir = pkgdir        # the same, None if not a package
+        self.code_w = code_w
+
+class FrozenModules(object):
+    def __init__(self, space):
+        self.modules = {}
+
+def freeze_modules(space):
+    """NOT_RPYTHON: compile the modules listed in objspace.frozen_modules.
+    Called when the imp module is set up, before translation."""
+    from pypy import pypydir
+    from pypy.module.sys.version import CPYTHON_VERSION
+    rootdir = os.path.dirname(pypydir)
+    libdirs = [os.path.join('lib_pypy'),
+               os.path.join('lib-python', '%d.%d' % CPYTHON_VERSION[:2])]
+    frozen = space.fromcache(FrozenModules)
+    for name in space.config.objspace.frozen_modules.split(','):
+        name = name.strip()
+        if not name or name in frozen.modules:
+            continue
+        parts = name.split('.')
+        for libdir in libdirs:
+            base = os.path.join(libdir, *parts)
+            if os.path.isfile(os.path.join(rootdir, base, '__init__.py')):
+                relpath = os.path.join(base, '__init__.py')
+                pkgdir = base
+                break
+            if os.path.isfile(os.path.join(rootdir, base + '.py')):
+                relpath = base + '.py'
+                pkgdir = None
+                break
+        else:
+            raise ValueError("cannot freeze %r: no source in lib_pypy or "
+                             "lib-python" % (name,))
+        with open(os.path.join(rootdir, relpath), 'rU') as f:
+            source = f.read()
+        code_w = space.createcompiler().compile(source, relpath, 'exec', 0)
+        frozen.modules[name] = FrozenModule(name, relpath, pkgdir, code_w)
+
+def find_frozen_module(space, modulename):
+    return space.fromcache(FrozenModules).modules.get(modulename, None)
+
+@jit.dont_look_inside
+def load_frozen_module(space, w_modulename, frozen, reuse=False):
+    """
+    Execute the code of a frozen module.  Returns the result of
+    sys.modules[modulename], which must exist.
+    """
+    log_pyverbose(space, 1, "import %s # frozen\n" % (frozen.name,))
+    # sys.prefix is only set if the stdlib was found at startup
+    w_prefix = space.sys.getdictvalue(space, 'prefix')
+    if w_prefix is not None and space.isinstance_w(w_prefix, space.w_text):
+        prefix = space.fsencode_w(w_prefix)
+    else:
+        prefix = ''
+    pathname = os.path.join(prefix, frozen.relpath)
+    pkgdir = frozen.pkgdir
+    if pkgdir is not None:
+        pkgdir = os.path.join(prefix, pkgdir)
+    w_mod = None
+    if reuse:
+        w_mod = space.finditem(space.sys.get('modules'), w_modulename)
+    if w_mod is None:
+        w_mod = Module(space, w_modulename)
+    _prepare_module(space, w_mod, pathname, pkgdir)
+
+    code_w = frozen.code_w
+    try:
+        optimize = space.sys.get_flag('optimize')
+    except RuntimeError:
+        # during bootstrapping
+        optimize = 0
+    if optimize >= 2:
+        code_w.remove_docstrings(space)
+    update_code_filenames(space, code_w, pathname)
+    try:
+        return exec_code_module(space, w_mod, code_w, w_modulename)
+    except OperationError:
+        w_mods = space.sys.get('modules')
+        space.call_method(w_mods, 'pop', w_modulename, space.w_None)
+        raise
+
+# __________________________________________________________________
+#
+# Lazy imports
+#
+# When enabled with __pypy__.set_lazy_imports(), 'import x' of a plain
+# source or compiled module (not a package) only finds the file and puts a
+# LazyModule in sys.modules.  The code of the module runs the first time
+# its dict is needed, e.g. on the first attribute read or write.  The
+# LazyModule is then an ordinary module, whose dict already is the
+# module dict of the code, so later accesses cost nothing more.
+
+LAZY_IMPORTS_DENYLIST = ['site', 'sitecustomize', 'usercustomize', '__main__']
+
+class LazyImportState(object):
+    def __init__(self, space):
+        self.enabled = False
+        self.allowlist = []    # if not empty, only these are lazy
+        self.denylist = LAZY_IMPORTS_DENYLIST
+
+def _name_matches(modulename, names):
+    # 'names' contains module names; a package name also matches all the
+    # modules inside it
+    for name in names:
+        if modulename == name or modulename.startswith(name + '.'):
+            return True
+    return False
+
+def is_lazy_import(space, modulename):
+    state = space.fromcache(LazyImportState)
+    if not state.enabled:
+        return False
+    if state.allowlist and not _name_matches(modulename, state.allowlist):
+        return False
+    return not _name_matches(modulename, state.denylist)
+
+class LazyModule(Module):
+    """A module whose code has not been executed yet."""
+
+    _immutable_fields_ = ['pending_filename?']
+
+    def __init__(self, space, w_name, filename, modtype):
+        Module.__init__(self, space, w_name)
+        # like _prepare_module(), but without going through getdict()
+        space.setitem(self.w_dict, space.newtext('__file__'),
+                      space.newtext(filename))
+        space.setitem(self.w_dict, space.newtext('__doc__'), space.w_None)
+        self.pending_filename = filename
+        self.pending_modtype = modtype
+        self.loading = False
+
+    def is_pending(self):
+        return self.pending_filename is not None
+
+    def getdict(self, space):
+        if self.pending_filename is not None:
+            self._load(space)
+        return self.w_dict
+
+    def _load(self, space):
+        lock = getimportlock(space)
+        lock.acquire_lock()
+        try:
+            # another thread may have loaded it while we were waiting,
+            # and the loading code itself may access the module
+            if self.pending_filename is None or self.loading:
+                return
+            self.loading = True
+            try:
+                load_lazy_module(space, self, self.pending_filename,
+                                 self.pending_modtype)
+            finally:
+                self.loading = False
+                self.pending_filename = None
+        finally:
+            lock.release_lock(silent_after_fork=True)
+
+@jit.dont_look_inside
+def load_lazy_module(space, w_mod, filename, modtype):
+    w_modulename = w_mod.w_name
+    if modtype == PY_SOURCE:
+        filemode = "U"
+    else:
+        filemode = "rb"
+    try:
+        stream = streamio.open_file_as_stream(filename, filemode)
+    except StreamErrors:
+        raise oefmt(space.w_ImportError, "cannot open %s", filename)
+    try:
+        try:
+            if modtype == PY_SOURCE:
+                load_source_module(space, w_modulename, w_mod, filename,
+                                   stream.readall(),
+                                   stream.try_to_find_file_descriptor(),
+                                   check_afterwards=False)
+            else:
+                magic = _r_long(stream)
+                timestamp = _r_long(stream)
+                load_compiled_module(space, w_modulename, w_mod, filename,
+                                     magic, timestamp, stream.readall(),
+                                     check_afterwards=False)
+        except OperationError:
+            # like load_module(), but only if it is still this module
+            w_mods = space.sys.get('modules')
+            if space.finditem(w_mods, w_modulename) is w_mod:
+                space.delitem(w_mods, w_modulename)
+            raise
+    finally:
+        try:
+            stream.close()
+        except StreamErrors:
+            pass
@@ -125,6 +125,14 @@ def _run_compiled_module(space, w_modulename, filename, w_file, w_module,
         stream.close()
     return w_mod
 
+@unwrap_spec(filename='fsencode')
+def _precompile_source(space, filename):
+    # the function 'imp._precompile_source' is a pypy-only extension:
+    # compile the given source file into the directory sys.pycache_prefix
+    # and return (name of the cache file, True if it was written now)
+    cpathname, written = importing.precompile_source(space, filename)
+    return space.newtuple([space.newtext(cpathname), space.newbool(written)])
+
 @unwrap_spec(filename='fsencode')
 def load_compiled(space, w_modulename, filename, w_file=None):
     w_mod = Module(space, w_modulename)
@@ -152,7 +160,11 @@ def init_builtin(space, w_name):
     return space.getbuiltinmodule(name)
 
 def init_frozen(space, w_name):
-    return None
+    name = space.text0_w(w_name)
+    frozen = importing.find_frozen_module(space, name)
+    if frozen is None:
+        return None
+    return importing.load_frozen_module(space, w_name, frozen, reuse=True)
 
 def is_builtin(space, w_name):
     name = space.text0_w(w_name)
@@ -163,7 +175,8 @@ def is_builtin(space, w_name):
     return space.newint(1)
 
 def is_frozen(space, w_name):
-    return space.w_False
+    name = space.text0_w(w_name)
+    return space.newbool(importing.find_frozen_module(space, name) is not None)
 
 #__________________________________________________________________
 
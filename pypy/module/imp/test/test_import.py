@@ -1493,6 +1493,82 @@ class AppTestWriteBytecode(object):
         assert not os.path.exists(c.__file__ + 'c')
 
 
+class AppTestPycachePrefix(object):
+    spaceconfig = dict(usemodules=['imp'])
+
+    def setup_class(cls):
+        src = udir.join('pycache_prefix_src')
+        src.ensure(dir=1)
+        src.join('pcp_one.py').write('x = 42\n')
+        src.join('pcp_two.py').write('x = 42\n')
+        src.join('pcp_three.py').write('x = 43\n')
+        cls.w_srcdir = cls.space.wrap(str(src))
+        cls.w_cachedir = cls.space.wrap(str(udir.join('pycache_prefix')))
+
+    def setup_method(self, meth):
+        self.space.appexec([self.w_srcdir], """(srcdir):
+            import sys
+            sys.path.insert(0, srcdir)
+        """)
+
+    def teardown_method(self, meth):
+        self.space.appexec([self.w_srcdir], """(srcdir):
+            import sys
+            sys.path.remove(srcdir)
+            sys.pycache_prefix = None
+            for name in ['pcp_one', 'pcp_two', 'pcp_three']:
+                sys.modules.pop(name, None)
+        """)
+
+    def test_default(self):
+        import sys
+        assert sys.pycache_prefix is None
+
+    def test_import(self):
+        import sys, os, imp
+        sys.pycache_prefix = self.cachedir
+        import pcp_one
+        assert pcp_one.x == 42
+        assert pcp_one.__file__.endswith('pcp_one.py')
+        assert not os.path.exists(pcp_one.__file__ + 'c')
+        entries = os.listdir(self.cachedir)
+        assert len(entries) == 1
+        magic = imp.get_magic()
+        with open(os.path.join(self.cachedir, entries[0]), 'rb') as f:
+            assert f.read(8) == magic + '\x00' * 4
+        # same source, same cache entry
+        import pcp_two
+        assert pcp_two.x == 42
+        assert pcp_two.__file__.endswith('pcp_two.py')
+        assert os.listdir(self.cachedir) == entries
+        # the entry is reused on the next import
+        del sys.modules['pcp_one']
+        import pcp_one
+        assert pcp_one.x == 42
+        assert pcp_one.__file__.endswith('pcp_one.py')
+        # a different source gets a new entry
+        import pcp_three
+        assert pcp_three.x == 43
+        assert len(os.listdir(self.cachedir)) == 2
+
+    def test_precompile_source(self):
+        import sys, os, imp
+        raises(ValueError, imp._precompile_source,
+               os.path.join(self.srcdir, 'pcp_three.py'))
+        sys.pycache_prefix = self.cachedir
+        cfile, written = imp._precompile_source(
+            os.path.join(self.srcdir, 'pcp_three.py'))
+        assert os.path.dirname(cfile) == self.cachedir
+        assert cfile.endswith('.pyc')
+        assert os.path.exists(cfile)
+        assert imp._precompile_source(
+            os.path.join(self.srcdir, 'pcp_three.py')) == (cfile, False)
+        assert not [name for name in os.listdir(self.cachedir)
+                    if name.endswith('.tmp')]
+        raises(IOError, imp._precompile_source,
+               os.path.join(self.srcdir, 'does_not_exist.py'))
+
+
 class AppTestWriteBytecodeSandbox(AppTestWriteBytecode):
     spaceconfig = {
         "translation.sandbox": True
@@ -1530,6 +1606,143 @@ class AppTestLonePycFile(_AppTestLonePycFileBase):
     }
 
 
+class AppTestFrozenModules(object):
+    spaceconfig = {
+        "objspace.frozen_modules": "stat, xml,xml.dom",
+    }
+
+    def setup_class(cls):
+        if conftest.option.runappdirect:
+            py.test.skip("translation option")
+
+    def test_is_frozen(self):
+        import imp
+        assert imp.is_frozen('stat')
+        assert imp.is_frozen('xml.dom')
+        assert not imp.is_frozen('os')
+        assert imp.find_module('stat')[1:] == ('stat', ('', '', imp.PY_FROZEN))
+
+    def test_import_without_path(self):
+        import sys
+        saved_path = sys.path[:]
+        saved_modules = sys.modules.copy()
+        sys.path[:] = []
+        for name in ['stat', 'xml', 'xml.dom']:
+            sys.modules.pop(name, None)
+        try:
+            import stat
+            assert stat.S_ISDIR(stat.S_IFDIR)
+            assert stat.__file__.endswith('stat.py')
+            assert stat.__name__ == 'stat'
+            assert stat.S_ISDIR.__code__.co_filename == stat.__file__
+            import xml.dom
+            assert xml.__file__.endswith('__init__.py')
+            assert xml.__path__[0].endswith('xml')
+            assert xml.dom.Node.ELEMENT_NODE == 1
+            assert sys.modules['xml.dom'] is xml.dom
+        finally:
+            sys.path[:] = saved_path
+            sys.modules.clear()
+            sys.modules.update(saved_modules)
+
+    def test_init_frozen(self):
+        import imp
+        mod = imp.init_frozen('stat')
+        assert mod.S_IFDIR
+        assert imp.init_frozen('os') is None
+
+
+class AppTestLazyImports(object):
+    spaceconfig = dict(usemodules=['__pypy__'])
+
+    def setup_class(cls):
+        root = udir.join('lazy_imports')
+        root.ensure(dir=1)
+        root.join('lazy_a.py').write(
+            'import sys\nsys.lazy_executed.append(__name__)\nx = 42\n')
+        root.join('lazy_b.py').write(
+            'import sys\nsys.lazy_executed.append(__name__)\n'
+            'raise ValueError("boom")\n')
+        pkg = root.join('lazy_pkg')
+        pkg.ensure(dir=1)
+        pkg.join('__init__.py').write(
+            'import sys\nsys.lazy_executed.append(__name__)\n')
+        pkg.join('sub.py').write(
+            'import sys\nsys.lazy_executed.append(__name__)\ny = 43\n')
+        cls.w_root = cls.space.wrap(str(root))
+
+    def setup_method(self, meth):
+        self.space.appexec([self.w_root], """(root):
+            import sys
+            sys.path.insert(0, root)
+            sys.lazy_executed = []
+        """)
+
+    def teardown_method(self, meth):
+        self.space.appexec([self.w_root], """(root):
+            import sys, __pypy__
+            __pypy__.set_lazy_imports(False)
+            sys.path.remove(root)
+            del sys.lazy_executed
+            for name in ['lazy_a', 'lazy_b', 'lazy_pkg', 'lazy_pkg.sub']:
+                sys.modules.pop(name, None)
+        """)
+
+    def test_lazy_import(self):
+        import sys, __pypy__
+        __pypy__.set_lazy_imports(True)
+        import lazy_a
+        assert sys.lazy_executed == []
+        assert type(lazy_a) is type(sys)
+        assert sys.modules['lazy_a'] is lazy_a
+        assert lazy_a.x == 42
+        assert sys.lazy_executed == ['lazy_a']
+        assert lazy_a.__name__ == 'lazy_a'
+        assert lazy_a.__file__.endswith('lazy_a.py')
+        import lazy_a
+        from lazy_a import x
+        assert x == 42
+        assert sys.lazy_executed == ['lazy_a']
+
+    def test_disabled(self):
+        import sys
+        import lazy_a
+        assert sys.lazy_executed == ['lazy_a']
+
+    def test_error_on_first_access(self):
+        import sys, __pypy__
+        __pypy__.set_lazy_imports(True)
+        import lazy_b
+        assert sys.lazy_executed == []
+        exc = raises(ValueError, getattr, lazy_b, 'anything')
+        assert str(exc.value) == 'boom'
+        assert sys.lazy_executed == ['lazy_b']
+        assert 'lazy_b' not in sys.modules
+
+    def test_package(self):
+        import sys, __pypy__
+        __pypy__.set_lazy_imports(True)
+        import lazy_pkg.sub
+        assert sys.lazy_executed == ['lazy_pkg']
+        assert lazy_pkg.sub is sys.modules['lazy_pkg.sub']
+        assert lazy_pkg.sub.y == 43
+        assert sys.lazy_executed == ['lazy_pkg', 'lazy_pkg.sub']
+
+    def test_denylist(self):
+        import sys, __pypy__
+        __pypy__.set_lazy_imports(True, denylist=['lazy_a', 'lazy_pkg'])
+        import lazy_a, lazy_pkg.sub
+        assert sys.lazy_executed == ['lazy_a', 'lazy_pkg', 'lazy_pkg.sub']
+
+    def test_allowlist(self):
+        import sys, __pypy__
+        __pypy__.set_lazy_imports(True, allowlist=['lazy_pkg'])
+        import lazy_a, lazy_pkg.sub
+        assert sys.lazy_executed == ['lazy_a', 'lazy_pkg']
+        lazy_pkg.sub.__dict__
+        assert sys.lazy_executed == ['lazy_a', 'lazy_pkg', 'lazy_pkg.sub']
+
+
 class AppTestMultithreadedImp(object):
     spaceconfig = dict(usemodules=['thread', 'time'])
 
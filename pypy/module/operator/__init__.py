@@ -20,7 +20,7 @@ class Module(MixedModule):
                  'countOf', 'delslice', 'getslice', 'indexOf',
                  'isNumberType',
                  'repeat', 'setslice',
-                 'attrgetter', 'itemgetter', 'methodcaller',
+                 'attrgetter', 'methodcaller',
     ]
 
     for name in app_names:
@@ -41,6 +41,7 @@ class Module(MixedModule):
 
     interpleveldefs = {
         '_compare_digest': 'tscmp.compare_digest',
+        'itemgetter': 'interp_operator.W_ItemGetter',
     }
 
     for name in interp_names:
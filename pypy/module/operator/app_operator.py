@@ -1,4 +1,4 @@
-'''NOT_RPYTHON: because of attrgetter and itemgetter
+'''NOT_RPYTHON: because of attrgetter
 Operator interface.
 
 This module exports a set of operators as functions. E.g. operator.add(x,y) is
@@ -114,21 +114,6 @@ class attrgetter(object):
         ])
 
 
-class itemgetter(object):
-    def __init__(self, item, *items):
-        self._single = not bool(items)
-        if self._single:
-            self._idx = item
-        else:
-            self._idx = [item] + list(items)
-
-    def __call__(self, obj):
-        if self._single:
-            return obj[self._idx]
-        else:
-            return tuple([obj[i] for i in self._idx])
-
-
 class methodcaller(object):
     def __init__(*args, **kwargs):
         if len(args) < 2:
@@ -1,5 +1,7 @@
+from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.error import OperationError, oefmt
-from pypy.interpreter.gateway import unwrap_spec
+from pypy.interpreter.gateway import interp2app, unwrap_spec
+from pypy.interpreter.typedef import TypeDef
 from pypy.module.__builtin__.interp_classobj import W_InstanceObject
 
 
@@ -255,3 +257,46 @@ def isMappingType(space, w_obj):
 def isSequenceType(space, w_obj):
     'isSequenceType(a) -- Return True if a has a sequence type, False otherwise.'
     return space.newbool(space.issequence_w(w_obj))
+
+
+class W_ItemGetter(W_Root):
+    """operator.itemgetter, at interp-level so that list.sort() can
+    recognize it (see TupleListStrategy.sort_with_key())."""
+    _immutable_fields_ = ['items_w[*]']
+
+    def __init__(self, items_w):
+        self.items_w = items_w
+
+    def get_single_item(self):
+        """Return the wrapped index if this is itemgetter(index), else None."""
+        if len(self.items_w) == 1:
+            return self.items_w[0]
+        return None
+
+    def descr_call(self, space, w_obj):
+        items_w = self.items_w
+        if len(items_w) == 1:
+            return space.getitem(w_obj, items_w[0])
+        return space.newtuple([space.getitem(w_obj, w_item)
+                               for w_item in items_w])
+
+def descr_itemgetter_new(space, w_subtype, __args__):
+    if __args__.keywords:
+        raise oefmt(space.w_TypeError,
+                    "itemgetter() does not take keyword arguments")
+    items_w = __args__.arguments_w
+    if len(items_w) == 0:
+        raise oefmt(space.w_TypeError,
+                    "itemgetter expected 1 arguments, got 0")
+    return W_ItemGetter(items_w[:])
+
+W_ItemGetter.typedef = TypeDef("operator.itemgetter",
+    __doc__ = """itemgetter(item, ...) --> itemgetter object
+
+Return a callable object that fetches the given item(s) from its operand.
+After f = itemgetter(2), the call f(r) returns r[2].
+After g = itemgetter(2, 5, 3), the call g(r) returns (r[2], r[5], r[3])""",
+    __new__ = interp2app(descr_itemgetter_new),
+    __call__ = interp2app(W_ItemGetter.descr_call),
+)
+W_ItemGetter.typedef.acceptable_as_base_class = False
@@ -40,6 +40,14 @@ class AppTestOperator:
         assert operator.itemgetter(2,10,5)(data) == ('2', '10', '5')
         raises(TypeError, operator.itemgetter(2, 'x', 5), data)
 
+    def test_itemgetter_args(self):
+        import operator
+        raises(TypeError, operator.itemgetter)
+        raises(TypeError, operator.itemgetter, 1, x=2)
+        raises(TypeError, "class A(operator.itemgetter): pass")
+        assert operator.itemgetter(*[1])("abc") == "b"
+        assert operator.itemgetter(1)(operator.itemgetter(0)([[5, 6]])) == 6
+
     def test_dotted_attrgetter(self):
         from operator import attrgetter
         class A:
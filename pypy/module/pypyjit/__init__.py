@@ -17,6 +17,15 @@ class Module(MixedModule):
         'set_trace_too_long_hook': 'interp_resop.set_trace_too_long_hook',
         'get_stats_snapshot': 'interp_resop.get_stats_snapshot',
         'get_stats_asmmemmgr': 'interp_resop.get_stats_asmmemmgr',
+        'get_stats_pauses': 'interp_resop.get_stats_pauses',
+        'get_stats_loop_sizes': 'interp_resop.get_stats_loop_sizes',
+        'enable_warmup_profile': 'interp_warmup.enable_warmup_profile',
+        'load_warmup_profile': 'interp_warmup.load_warmup_profile',
+        'dump_warmup_profile': 'interp_warmup.dump_warmup_profile',
+        'get_warmup_profile': 'interp_warmup.get_warmup_profile',
+        'enable_abort_stats': 'interp_abort.enable_abort_stats',
+        'disable_abort_stats': 'interp_abort.disable_abort_stats',
+        'get_abort_stats': 'interp_abort.get_abort_stats',
         # those things are disabled because they have bugs, but if
         # they're found to be useful, fix test_ztranslation_jit_stats
         # in the backend first. get_stats_snapshot still produces
@@ -41,3 +50,7 @@ class Module(MixedModule):
         w_obj = space.wrap(PARAMETERS)
         space.setattr(self, space.newtext('defaults'), w_obj)
         pypy_hooks.space = space
+
+    def shutdown(self, space):
+        from pypy.module.pypyjit.interp_warmup import shutdown
+        shutdown(space)
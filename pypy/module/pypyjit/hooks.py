@@ -5,10 +5,15 @@ from rpython.rlib.jit import JitHookInterface, Counters
 from pypy.interpreter.error import OperationError
 from pypy.module.pypyjit.interp_resop import (Cache, wrap_greenkey,
     WrappedOp, W_JitLoopInfo, wrap_oplist)
+from pypy.module.pypyjit.interp_warmup import record_compiled
+from pypy.module.pypyjit.interp_abort import (record_abort,
+    record_bridge_abort, record_not_inlined, NOT_INLINED_TOO_LONG,
+    NOT_INLINED_RECURSION)
 
 class PyPyJitIface(JitHookInterface):
     def on_abort(self, reason, jitdriver, greenkey, greenkey_repr, logops, operations):
         space = self.space
+        record_abort(space, reason, jitdriver, greenkey)
         cache = space.fromcache(Cache)
         if cache.in_recursion:
             return
@@ -30,6 +35,7 @@ class PyPyJitIface(JitHookInterface):
 
     def on_trace_too_long(self, jitdriver, greenkey, greenkey_repr):
         space = self.space
+        record_not_inlined(space, jitdriver, greenkey, NOT_INLINED_TOO_LONG)
         cache = space.fromcache(Cache)
         if cache.in_recursion:
             return
@@ -45,6 +51,13 @@ class PyPyJitIface(JitHookInterface):
             finally:
                 cache.in_recursion = False
 
+    def on_bridge_abort(self, reason, jitdriver, fail_descr):
+        record_bridge_abort(self.space, reason, jitdriver, fail_descr)
+
+    def on_recursion_not_inlined(self, jitdriver, greenkey, greenkey_repr):
+        record_not_inlined(self.space, jitdriver, greenkey,
+                           NOT_INLINED_RECURSION)
+
     def after_compile(self, debug_info):
         self._compile_hook(debug_info, is_bridge=False)
 
@@ -59,6 +72,7 @@ class PyPyJitIface(JitHookInterface):
 
     def _compile_hook(self, debug_info, is_bridge):
         space = self.space
+        record_compiled(space, debug_info, is_bridge)
         cache = space.fromcache(Cache)
         if cache.in_recursion:
             return
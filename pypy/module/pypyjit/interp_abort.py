@@ -0,0 +1,140 @@
+"""Statistics about what prevents the JIT from compiling code.
+
+When enabled, the hooks count how many times and why the tracing was
+aborted, for each place where a loop was being traced and for each guard
+from which a bridge was being traced, and they remember the functions that
+the JIT stopped inlining.  When disabled, which is the default, the hooks
+return immediately; they are only called when tracing anyway.
+"""
+
+from rpython.rlib.jit import Counters
+from rpython.rlib.objectmodel import compute_unique_id
+from rpython.rtyper.annlowlevel import cast_base_ptr_to_instance
+from rpython.rtyper.lltypesystem import lltype
+from rpython.rtyper.rclass import OBJECT
+
+from pypy.interpreter.gateway import unwrap_spec
+from pypy.interpreter.pycode import PyCode
+
+NOT_INLINED_TOO_LONG = 'trace too long'
+NOT_INLINED_RECURSION = 'recursion'
+
+
+class AbortCounts(object):
+    def __init__(self):
+        self.reasons = {}       # {reason: count}
+
+    def add(self, reason):
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+
+class AbortStats(object):
+    def __init__(self, space):
+        self.enabled = False
+        self.clear()
+
+    def clear(self):
+        # {(pycode, next_instr): AbortCounts}
+        self.loops = {}
+        # {unique id of the guard's descr: AbortCounts}
+        self.bridges = {}
+        # {pycode: NOT_INLINED_xxx}
+        self.not_inlined = {}
+
+
+def _decode_greenkey(greenkey):
+    next_instr = greenkey[0].getint()
+    ll_code = lltype.cast_opaque_ptr(lltype.Ptr(OBJECT),
+                                     greenkey[2].getref_base())
+    pycode = cast_base_ptr_to_instance(PyCode, ll_code)
+    return pycode, next_instr
+
+def record_abort(space, reason, jitdriver, greenkey):
+    stats = space.fromcache(AbortStats)
+    if not stats.enabled or jitdriver.name != 'pypyjit':
+        return
+    key = _decode_greenkey(greenkey)
+    counts = stats.loops.get(key, None)
+    if counts is None:
+        counts = AbortCounts()
+        stats.loops[key] = counts
+    counts.add(reason)
+
+def record_bridge_abort(space, reason, jitdriver, fail_descr):
+    stats = space.fromcache(AbortStats)
+    if not stats.enabled or jitdriver.name != 'pypyjit':
+        return
+    key = compute_unique_id(fail_descr)
+    counts = stats.bridges.get(key, None)
+    if counts is None:
+        counts = AbortCounts()
+        stats.bridges[key] = counts
+    counts.add(reason)
+
+def record_not_inlined(space, jitdriver, greenkey, why):
+    stats = space.fromcache(AbortStats)
+    if not stats.enabled or jitdriver.name != 'pypyjit':
+        return
+    pycode, _ = _decode_greenkey(greenkey)
+    stats.not_inlined[pycode] = why
+
+
+def wrap_counts(space, counts):
+    w_counts = space.newdict()
+    for reason, count in counts.reasons.iteritems():
+        space.setitem_str(w_counts, Counters.counter_names[reason],
+                          space.newint(count))
+    return w_counts
+
+def enable_abort_stats(space):
+    """enable_abort_stats()
+
+    Start collecting the statistics returned by get_abort_stats().
+    """
+    space.fromcache(AbortStats).enabled = True
+
+def disable_abort_stats(space):
+    """disable_abort_stats()
+
+    Stop collecting the statistics.  The ones collected so far are kept.
+    """
+    space.fromcache(AbortStats).enabled = False
+
+@unwrap_spec(reset=bool)
+def get_abort_stats(space, reset=False):
+    """get_abort_stats(reset=False)
+
+    Return what prevented the JIT from compiling code since
+    enable_abort_stats() was called, as a tuple (loops, bridges,
+    not_inlined):
+
+    - loops is a dict {(code, offset): {reason: count}} of the places
+      where the tracing of a loop was aborted, with the reasons as given
+      to the abort hook, like 'ABORT_TOO_LONG' or 'ABORT_ESCAPE';
+    - bridges is a dict {guard: {reason: count}} of the guards from which
+      the tracing of a bridge was aborted, where guard is the bridge_no
+      that JitLoopInfo gives once the bridge is compiled;
+    - not_inlined is a list of tuples (code, reason) of the functions that
+      the JIT does not inline any more, because their trace was too long
+      or because they are recursive.
+
+    If 'reset' is true, the statistics are cleared afterwards, which also
+    releases the code objects they refer to.
+    """
+    stats = space.fromcache(AbortStats)
+    w_loops = space.newdict()
+    for key, counts in stats.loops.iteritems():
+        pycode, next_instr = key
+        w_key = space.newtuple([pycode, space.newint(next_instr)])
+        space.setitem(w_loops, w_key, wrap_counts(space, counts))
+    w_bridges = space.newdict()
+    for guard_no, counts in stats.bridges.iteritems():
+        space.setitem(w_bridges, space.newint(guard_no),
+                      wrap_counts(space, counts))
+    not_inlined_w = []
+    for pycode, why in stats.not_inlined.items():
+        not_inlined_w.append(space.newtuple([pycode, space.newtext(why)]))
+    w_not_inlined = space.newlist(not_inlined_w)
+    if reset:
+        stats.clear()
+    return space.newtuple([w_loops, w_bridges, w_not_inlined])
@@ -388,6 +388,39 @@ def get_stats_asmmemmgr(space):
     m2 = jit_hooks.stats_asmmemmgr_used(None)
     return space.newtuple([space.newint(m1), space.newint(m2)])
 
+def get_stats_pauses(space):
+    """Returns how long the JIT stopped the program to trace and compile
+    loops and bridges, as a tuple (count, total_seconds, longest_seconds,
+    histogram).  histogram[0] is the number of pauses shorter than one
+    microsecond, histogram[i] the number of pauses between 2**(i-1) and
+    2**i microseconds, and the last item counts all the longer ones."""
+    from rpython.jit.metainterp.jitprof import PAUSE_BUCKETS
+    buckets_w = [space.newint(jit_hooks.stats_get_pause_bucket(None, i))
+                 for i in range(PAUSE_BUCKETS)]
+    return space.newtuple([
+        space.newint(jit_hooks.stats_get_pause_count(None)),
+        space.newfloat(jit_hooks.stats_get_pause_total(None)),
+        space.newfloat(jit_hooks.stats_get_pause_longest(None)),
+        space.newlist(buckets_w)])
+
+def get_stats_loop_sizes(space):
+    """Returns the machine code of the loops that the JIT keeps alive, as
+    a pair (code_size_limit, {loop_number: (code_size, entry_count)}).
+    The sizes are in bytes and include the bridges of the loop; the limit
+    is 0 if there is none.  entry_count is the number of recent entries
+    into the loop from the interpreter, which is halved regularly.  When
+    the limit is reached, the loops with the lowest entry_count per byte
+    are freed first.
+    """
+    ll_sizes = jit_hooks.stats_get_loop_sizes(None)
+    w_sizes = space.newdict()
+    for i in range(len(ll_sizes)):
+        w_value = space.newtuple([space.newint(ll_sizes[i].code_size),
+                                  space.newint(ll_sizes[i].entry_count)])
+        space.setitem(w_sizes, space.newint(ll_sizes[i].number), w_value)
+    limit = jit_hooks.stats_get_code_size_limit(None)
+    return space.newtuple([space.newint(limit), w_sizes])
+
 def enable_debug(space):
     """ Set the jit debugging - completely necessary for some stats to work,
     most notably assembler counters.
@@ -0,0 +1,257 @@
+"""Persistent warmup profiles.
+
+A profile remembers where the JIT compiled loops, entry bridges and bridges
+during a run, identified by the filename, name and first line number of the
+code object plus the bytecode offset.  When a later run loads the profile,
+the counters of these places are pre-seeded as soon as the matching code
+objects are created, so that the JIT traces them on the first iterations
+instead of after the usual thresholds.
+
+The file is a text file with one tab-separated line per place:
+
+    kind  firstlineno  offset  name  filename
+
+where 'kind' is 'loop', 'entry bridge' or 'bridge'.  Bridges are saved to
+show which guards were hot, but they cannot be pre-seeded: their counters
+are keyed by the guard, which only exists once the loop is compiled again.
+"""
+
+import os
+
+from rpython.rlib import jit_hooks
+from rpython.rlib.jit import dont_look_inside
+from rpython.rlib.rarithmetic import r_uint
+from rpython.rlib.rstring import split
+from rpython.rtyper.annlowlevel import (cast_instance_to_gcref,
+    cast_base_ptr_to_instance)
+from rpython.rtyper.lltypesystem import lltype
+from rpython.rtyper.rclass import OBJECT
+
+from pypy.interpreter.error import oefmt, wrap_oserror
+from pypy.interpreter.gateway import unwrap_spec
+from pypy.interpreter.pycode import PyCode
+
+HEADER = '# pypyjit warmup profile: kind, firstlineno, offset, name, filename\n'
+
+DEFAULT_FRACTION = 0.98     # trace on the next iteration
+
+
+class WarmupProfile(object):
+    def __init__(self, space):
+        self.recording = False
+        self.filename = None    # where to write the profile at exit
+        self.fraction = DEFAULT_FRACTION
+        # {(kind, filename, name, firstlineno, offset): None}, in the
+        # order in which they were compiled or loaded
+        self.entries = {}
+        # {(filename, name, firstlineno): [offset]} of the places to seed
+        # when a matching code object is created, or None
+        self.pending = None
+
+    def record(self, kind, pycode, next_instr):
+        filename = pycode.co_filename
+        name = pycode.co_name
+        if '\n' in filename or '\t' in name or '\n' in name:
+            return      # can't be written in the profile
+        key = (kind, filename, name, pycode.co_firstlineno, next_instr)
+        self.entries[key] = None
+
+    def load(self, data):
+        """Add the places of a profile, and seed them when their code
+        object is created.  Malformed lines are ignored."""
+        if self.pending is None:
+            self.pending = {}
+        for line in data.split('\n'):
+            if not line or line.startswith('#'):
+                continue
+            fields = split(line, '\t', 4)
+            if len(fields) != 5:
+                continue
+            kind = fields[0]
+            if kind != 'loop' and kind != 'entry bridge' and kind != 'bridge':
+                continue
+            try:
+                firstlineno = int(fields[1])
+                offset = int(fields[2])
+            except ValueError:
+                continue
+            if offset < 0:
+                continue
+            name = fields[3]
+            filename = fields[4]
+            self.entries[(kind, filename, name, firstlineno, offset)] = None
+            if kind == 'bridge':
+                continue
+            codekey = (filename, name, firstlineno)
+            offsets = self.pending.get(codekey, None)
+            if offsets is None:
+                offsets = []
+                self.pending[codekey] = offsets
+            if offset not in offsets:
+                offsets.append(offset)
+
+    def dump(self):
+        lines = [HEADER]
+        for key in self.entries:
+            kind, filename, name, firstlineno, offset = key
+            lines.append('%s\t%d\t%d\t%s\t%s\n' % (kind, firstlineno, offset,
+                                                   name, filename))
+        return ''.join(lines)
+
+    def code_created(self, pycode):
+        codekey = (pycode.co_filename, pycode.co_name, pycode.co_firstlineno)
+        offsets = self.pending.get(codekey, None)
+        if offsets is not None:
+            for offset in offsets:
+                if offset < len(pycode.co_code):
+                    seed_counter(pycode, offset, self.fraction)
+
+
+def code_created(space, pycode):
+    """Called for every new code object."""
+    profile = space.fromcache(WarmupProfile)
+    if profile.pending is not None:
+        profile.code_created(pycode)
+
+@dont_look_inside
+def seed_counter(pycode, next_instr, fraction):
+    ll_pycode = cast_instance_to_gcref(pycode)
+    jit_hooks.seed_counter('pypyjit', fraction, r_uint(next_instr), 0,
+                           ll_pycode)
+
+def record_compiled(space, debug_info, is_bridge):
+    """Called by the compile hooks.  For bridges, the place recorded is the
+    first debug_merge_point of the bridge, i.e. where the guard failed."""
+    profile = space.fromcache(WarmupProfile)
+    if not profile.recording:
+        return
+    if debug_info.get_jitdriver().name != 'pypyjit':
+        return
+    if is_bridge:
+        from rpython.jit.metainterp.resoperation import rop
+        greenkey = None
+        for op in debug_info.operations:
+            if op.getopnum() == rop.DEBUG_MERGE_POINT:
+                greenkey = op.getarglist()[3:]
+                break
+        if greenkey is None:
+            return
+    else:
+        greenkey = debug_info.greenkey
+    next_instr = greenkey[0].getint()
+    is_being_profiled = greenkey[1].getint()
+    if is_being_profiled:
+        return
+    ll_code = lltype.cast_opaque_ptr(lltype.Ptr(OBJECT),
+                                     greenkey[2].getref_base())
+    pycode = cast_base_ptr_to_instance(PyCode, ll_code)
+    profile.record(debug_info.type, pycode, next_instr)
+
+def write_profile(profile, filename):
+    # write to a temporary file and rename it, so that several processes
+    # can share the same profile
+    tmpname = '%s.%d.tmp' % (filename, os.getpid())
+    data = profile.dump()
+    fd = os.open(tmpname, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0666)
+    try:
+        while data:
+            n = os.write(fd, data)
+            data = data[n:]
+    finally:
+        os.close(fd)
+    os.rename(tmpname, filename)
+
+def read_file(filename):
+    fd = os.open(filename, os.O_RDONLY, 0)
+    try:
+        chunks = []
+        while True:
+            data = os.read(fd, 65536)
+            if not data:
+                break
+            chunks.append(data)
+    finally:
+        os.close(fd)
+    return ''.join(chunks)
+
+def shutdown(space):
+    profile = space.fromcache(WarmupProfile)
+    if profile.filename is not None:
+        try:
+            write_profile(profile, profile.filename)
+        except OSError:
+            pass
+
+def check_fraction(space, fraction):
+    if not (0.0 <= fraction < 1.0):
+        raise oefmt(space.w_ValueError, "fraction must be in [0.0, 1.0)")
+
+
+@unwrap_spec(filename='fsencode', fraction=float)
+def enable_warmup_profile(space, filename, fraction=DEFAULT_FRACTION):
+    """enable_warmup_profile(filename, fraction=0.98)
+
+    Record where the JIT compiles loops and bridges, and write it to
+    'filename' when the interpreter exits.  If 'filename' exists, it is
+    loaded first as with load_warmup_profile(), so that the profile grows
+    over the runs.  This is what setting PYPYJITPROFILE=filename does.
+    """
+    check_fraction(space, fraction)
+    profile = space.fromcache(WarmupProfile)
+    profile.fraction = fraction
+    try:
+        data = read_file(filename)
+    except OSError:
+        pass        # no profile yet
+    else:
+        profile.load(data)
+    profile.recording = True
+    profile.filename = filename
+
+@unwrap_spec(filename='fsencode', fraction=float)
+def load_warmup_profile(space, filename, fraction=DEFAULT_FRACTION):
+    """load_warmup_profile(filename, fraction=0.98)
+
+    Load a profile written by dump_warmup_profile() or at exit.  The code
+    objects created from now on that are listed in the profile get the
+    counters of their loops set to 'fraction' of the threshold; the default
+    makes the JIT trace them at the next iteration.  Code objects that
+    already exist are not affected.
+    """
+    check_fraction(space, fraction)
+    try:
+        data = read_file(filename)
+    except OSError as e:
+        raise wrap_oserror(space, e, filename)
+    profile = space.fromcache(WarmupProfile)
+    profile.fraction = fraction
+    profile.load(data)
+
+@unwrap_spec(filename='fsencode')
+def dump_warmup_profile(space, filename):
+    """dump_warmup_profile(filename)
+
+    Write the places recorded since enable_warmup_profile() and the ones
+    loaded from profiles to 'filename'.
+    """
+    profile = space.fromcache(WarmupProfile)
+    try:
+        write_profile(profile, filename)
+    except OSError as e:
+        raise wrap_oserror(space, e, filename)
+
+def get_warmup_profile(space):
+    """get_warmup_profile()
+
+    Return the recorded and loaded places as a list of tuples
+    (kind, filename, name, firstlineno, offset).
+    """
+    profile = space.fromcache(WarmupProfile)
+    entries_w = []
+    for key in profile.entries:
+        kind, filename, name, firstlineno, offset = key
+        entries_w.append(space.newtuple([
+            space.newtext(kind), space.newtext(filename),
+            space.newtext(name), space.newint(firstlineno),
+            space.newint(offset)]))
+    return space.newlist(entries_w)
@@ -0,0 +1,112 @@
+import py
+from pypy.interpreter.gateway import interp2app
+from rpython.jit.metainterp.history import ConstInt, ConstPtr, BasicFailDescr
+from rpython.jit.metainterp.logger import Logger
+from rpython.rlib.jit import Counters
+from rpython.rlib.objectmodel import compute_unique_id
+from rpython.rtyper.annlowlevel import cast_instance_to_base_ptr
+from rpython.rtyper.lltypesystem import lltype, llmemory
+from pypy.module.pypyjit import interp_abort
+from pypy.module.pypyjit.interp_jit import pypyjitdriver
+from pypy.module.pypyjit.hooks import pypy_hooks
+from pypy.module.pypyjit.test.test_jit_hook import MockSD
+
+
+class AppTestAbortStats(object):
+    spaceconfig = dict(usemodules=('pypyjit',))
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("Can't run this test with -A")
+        space = cls.space
+        w_f = space.appexec([], """():
+        def function():
+            pass
+        return function
+        """)
+        cls.w_f = w_f
+        ll_code = cast_instance_to_base_ptr(w_f.code)
+        code_gcref = lltype.cast_opaque_ptr(llmemory.GCREF, ll_code)
+        greenkey = [ConstInt(12), ConstInt(0), ConstPtr(code_gcref)]
+        fail_descr = BasicFailDescr()
+
+        def interp_on_abort(reason):
+            pypy_hooks.on_abort(reason, pypyjitdriver, greenkey, 'blah',
+                                Logger(MockSD), [])
+
+        def interp_on_bridge_abort(reason):
+            pypy_hooks.on_bridge_abort(reason, pypyjitdriver, fail_descr)
+
+        def interp_on_trace_too_long():
+            pypy_hooks.on_trace_too_long(pypyjitdriver, greenkey, 'blah')
+
+        def interp_on_recursion_not_inlined():
+            pypy_hooks.on_recursion_not_inlined(pypyjitdriver, greenkey,
+                                                'blah')
+
+        cls.w_on_abort = space.wrap(interp2app(interp_on_abort,
+                                               unwrap_spec=[int]))
+        cls.w_on_bridge_abort = space.wrap(
+            interp2app(interp_on_bridge_abort, unwrap_spec=[int]))
+        cls.w_on_trace_too_long = space.wrap(
+            interp2app(interp_on_trace_too_long))
+        cls.w_on_recursion_not_inlined = space.wrap(
+            interp2app(interp_on_recursion_not_inlined))
+        cls.w_guard_no = space.wrap(compute_unique_id(fail_descr))
+        cls.w_ABORT_TOO_LONG = space.wrap(Counters.ABORT_TOO_LONG)
+        cls.w_ABORT_ESCAPE = space.wrap(Counters.ABORT_ESCAPE)
+        cls.orig_fail_descr = fail_descr    # keep the unique id valid
+
+    def setup_method(self, meth):
+        space = self.space
+        space.fromcache(interp_abort.AbortStats).__init__(space)
+
+    def test_disabled(self):
+        import pypyjit
+        self.on_abort(self.ABORT_TOO_LONG)
+        self.on_bridge_abort(self.ABORT_TOO_LONG)
+        self.on_trace_too_long()
+        assert pypyjit.get_abort_stats() == ({}, {}, [])
+
+    def test_loops(self):
+        import pypyjit
+        pypyjit.enable_abort_stats()
+        self.on_abort(self.ABORT_TOO_LONG)
+        self.on_abort(self.ABORT_ESCAPE)
+        self.on_abort(self.ABORT_TOO_LONG)
+        loops, bridges, not_inlined = pypyjit.get_abort_stats()
+        assert loops == {(self.f.__code__, 12): {'ABORT_TOO_LONG': 2,
+                                                 'ABORT_ESCAPE': 1}}
+        assert bridges == {}
+        assert not_inlined == []
+
+    def test_bridges(self):
+        import pypyjit
+        pypyjit.enable_abort_stats()
+        self.on_bridge_abort(self.ABORT_TOO_LONG)
+        self.on_bridge_abort(self.ABORT_TOO_LONG)
+        loops, bridges, not_inlined = pypyjit.get_abort_stats()
+        assert loops == {}
+        assert bridges == {self.guard_no: {'ABORT_TOO_LONG': 2}}
+
+    def test_not_inlined(self):
+        import pypyjit
+        pypyjit.enable_abort_stats()
+        self.on_trace_too_long()
+        loops, bridges, not_inlined = pypyjit.get_abort_stats()
+        assert not_inlined == [(self.f.__code__, 'trace too long')]
+        self.on_recursion_not_inlined()
+        loops, bridges, not_inlined = pypyjit.get_abort_stats()
+        assert not_inlined == [(self.f.__code__, 'recursion')]
+
+    def test_reset_and_disable(self):
+        import pypyjit
+        pypyjit.enable_abort_stats()
+        self.on_abort(self.ABORT_TOO_LONG)
+        assert len(pypyjit.get_abort_stats(reset=True)[0]) == 1
+        assert pypyjit.get_abort_stats() == ({}, {}, [])
+        self.on_abort(self.ABORT_TOO_LONG)
+        pypyjit.disable_abort_stats()
+        self.on_abort(self.ABORT_TOO_LONG)
+        loops, bridges, not_inlined = pypyjit.get_abort_stats()
+        assert loops.values() == [{'ABORT_TOO_LONG': 1}]
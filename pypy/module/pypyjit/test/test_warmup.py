@@ -0,0 +1,144 @@
+import py
+from pypy.interpreter.gateway import interp2app
+from rpython.jit.metainterp.history import JitCellToken, ConstInt, ConstPtr,\
+     BasicFailDescr
+from rpython.jit.metainterp.logger import Logger
+from rpython.rtyper.annlowlevel import cast_instance_to_base_ptr
+from rpython.rtyper.lltypesystem import lltype, llmemory
+from rpython.jit.tool.oparser import parse
+from rpython.rlib.jit import JitDebugInfo
+from rpython.tool.udir import udir
+from pypy.module.pypyjit import interp_warmup
+from pypy.module.pypyjit.hooks import pypy_hooks
+from pypy.module.pypyjit.test.test_jit_hook import MockJitDriverSD, MockSD
+
+
+class AppTestWarmupProfile(object):
+    spaceconfig = dict(usemodules=('pypyjit',))
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("Can't run this test with -A")
+        space = cls.space
+        w_f = space.appexec([], """():
+        def function():
+            pass
+        return function
+        """)
+        cls.w_f = w_f
+        ll_code = cast_instance_to_base_ptr(w_f.code)
+        code_gcref = lltype.cast_opaque_ptr(llmemory.GCREF, ll_code)
+        logger = Logger(MockSD())
+        oplist = parse("""
+        [i1, i2]
+        i3 = int_add(i1, i2)
+        debug_merge_point(0, 0, 0, 4, 0, ConstPtr(ptr0))
+        guard_true(i3) []
+        """, namespace={'ptr0': code_gcref}).operations
+        oplist[-1].setdescr(BasicFailDescr())
+        greenkey = [ConstInt(12), ConstInt(0), ConstPtr(code_gcref)]
+        di_loop = JitDebugInfo(MockJitDriverSD, logger, JitCellToken(),
+                               oplist, 'loop', greenkey)
+        di_bridge = JitDebugInfo(MockJitDriverSD, logger, JitCellToken(),
+                                 oplist, 'bridge',
+                                 fail_descr=BasicFailDescr())
+
+        def interp_on_compile():
+            pypy_hooks.after_compile(di_loop)
+
+        def interp_on_compile_bridge():
+            pypy_hooks.after_compile_bridge(di_bridge)
+
+        seeded = []
+        def seed_counter(pycode, next_instr, fraction):
+            seeded.append((pycode.co_name, next_instr, fraction))
+        cls.orig_seed_counter = interp_warmup.seed_counter
+        interp_warmup.seed_counter = seed_counter
+
+        def interp_get_seeded():
+            result = space.wrap(seeded[:])
+            del seeded[:]
+            return result
+
+        cls.w_on_compile = space.wrap(interp2app(interp_on_compile))
+        cls.w_on_compile_bridge = space.wrap(
+            interp2app(interp_on_compile_bridge))
+        cls.w_get_seeded = space.wrap(interp2app(interp_get_seeded))
+        cls.w_tmpdir = space.wrap(str(udir.ensure('warmup', dir=1)))
+
+    def teardown_class(cls):
+        if not cls.runappdirect:
+            interp_warmup.seed_counter = cls.orig_seed_counter
+
+    def setup_method(self, meth):
+        space = self.space
+        space.fromcache(interp_warmup.WarmupProfile).__init__(space)
+
+    def test_not_recording(self):
+        import pypyjit
+        self.on_compile()
+        assert pypyjit.get_warmup_profile() == []
+
+    def test_record_and_dump(self):
+        import pypyjit, os
+        filename = os.path.join(self.tmpdir, 'record')
+        if os.path.exists(filename):
+            os.unlink(filename)
+        pypyjit.enable_warmup_profile(filename)
+        self.on_compile()
+        self.on_compile_bridge()
+        self.on_compile()
+        code = self.f.__code__
+        key = (code.co_filename, code.co_name, code.co_firstlineno)
+        assert pypyjit.get_warmup_profile() == [
+            ('loop',) + key + (12,), ('bridge',) + key + (4,)]
+        pypyjit.dump_warmup_profile(filename)
+        with open(filename) as f:
+            lines = f.read().splitlines()
+        assert lines[0].startswith('#')
+        assert lines[1:] == [
+            'loop\t%d\t12\tfunction\t%s' % (code.co_firstlineno,
+                                            code.co_filename),
+            'bridge\t%d\t4\tfunction\t%s' % (code.co_firstlineno,
+                                             code.co_filename)]
+
+    def test_load(self):
+        import pypyjit, os
+        filename = os.path.join(self.tmpdir, 'load')
+        with open(filename, 'w') as f:
+            f.write('# comment\n'
+                    'loop\t2\t6\tg\t<warmup>\n'
+                    'entry bridge\t2\t0\tg\t<warmup>\n'
+                    'bridge\t2\t9\tg\t<warmup>\n'
+                    'loop\t1\t0\tg\t<warmup>\n'
+                    'loop\tx\t0\tg\t<warmup>\n'
+                    'loop\t2\t0\n'
+                    'unknown\t2\t0\tg\t<warmup>\n')
+        src = '\ndef g(n):\n    while n:\n        n -= 1\n'
+        exec compile(src, '<warmup>', 'exec')
+        pypyjit.load_warmup_profile(filename, 0.5)
+        assert self.get_seeded() == []
+        exec compile(src, '<warmup>', 'exec')
+        assert sorted(self.get_seeded()) == [('g', 0, 0.5), ('g', 6, 0.5)]
+        exec compile(src, '<other>', 'exec')
+        assert self.get_seeded() == []
+        assert len(pypyjit.get_warmup_profile()) == 4
+
+    def test_enable_merges(self):
+        import pypyjit, os
+        filename = os.path.join(self.tmpdir, 'merge')
+        with open(filename, 'w') as f:
+            f.write('loop\t1\t3\th\t<warmup>\n')
+        pypyjit.enable_warmup_profile(filename)
+        self.on_compile()
+        assert [entry[0] for entry in pypyjit.get_warmup_profile()] == [
+            'loop', 'loop']
+        exec compile('def h(): pass', '<warmup>', 'exec')
+        assert self.get_seeded() == [('h', 3, 0.98)]
+
+    def test_errors(self):
+        import pypyjit, os
+        raises(ValueError, pypyjit.load_warmup_profile, 'x', 1.0)
+        raises(ValueError, pypyjit.enable_warmup_profile, 'x', -0.5)
+        raises(OSError, pypyjit.load_warmup_profile,
+               os.path.join(self.tmpdir, 'does-not-exist'))
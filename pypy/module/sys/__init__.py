@@ -20,6 +20,7 @@ class Module(MixedModule):
         self.defaultencoding = "ascii"
         self.filesystemencoding = None
         self.debug = True
+        self.compiler_optimize = 0
         self.track_resources = False
         self.dlopenflags = rdynload._dlopen_default_mode()
 
@@ -83,6 +84,7 @@ class Module(MixedModule):
         'path_hooks'            : 'space.newlist([])',
         'path_importer_cache'   : 'space.newdict()',
         'dont_write_bytecode'   : 'space.newbool(space.config.translation.sandbox)',
+        'pycache_prefix'        : 'space.w_None',
 
         'getdefaultencoding'    : 'interp_encoding.getdefaultencoding',
         'setdefaultencoding'    : 'interp_encoding.setdefaultencoding',
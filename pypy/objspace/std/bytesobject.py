@@ -19,7 +19,8 @@ from pypy.objspace.std.stringmethods import StringMethods
 from pypy.objspace.std.unicodeobject import (
     decode_object, unicode_from_encoded_object,
     unicode_from_string, getdefaultencoding)
-from pypy.objspace.std.util import IDTAG_SPECIAL, IDTAG_SHIFT
+from pypy.objspace.std.util import (
+    IDTAG_SPECIAL, IDTAG_SHIFT, is_worth_a_slice_view)
 
 
 class W_AbstractBytesObject(W_Root):
@@ -490,6 +491,14 @@ class W_BytesObject(W_AbstractBytesObject):
     def _empty(self):
         return W_BytesObject.EMPTY
 
+    _StringMethods__sliced = _sliced
+    def _sliced(self, space, s, start, stop, orig_obj):
+        if (space.config.objspace.std.withsliceviews and
+                is_worth_a_slice_view(stop - start, len(s))):
+            from pypy.objspace.std.strsliceobject import W_BytesSliceObject
+            return W_BytesSliceObject(s, start, stop)
+        return self._StringMethods__sliced(space, s, start, stop, orig_obj)
+
     def _len(self):
         return len(self._value)
 
@@ -497,9 +506,9 @@ class W_BytesObject(W_AbstractBytesObject):
 
     @staticmethod
     def _use_rstr_ops(space, w_other):
-        from pypy.objspace.std.unicodeobject import W_UnicodeObject
+        from pypy.objspace.std.unicodeobject import W_AbstractUnicodeObject
         return (isinstance(w_other, W_BytesObject) or
-                isinstance(w_other, W_UnicodeObject))
+                isinstance(w_other, W_AbstractUnicodeObject))
 
     @staticmethod
     def _op_val(space, w_other, strict=None):
@@ -610,58 +619,34 @@ class W_BytesObject(W_AbstractBytesObject):
         return mod_format(space, w_values, self, do_unicode=False)
 
     def descr_eq(self, space, w_other):
-        if space.config.objspace.std.withstrbuf:
-            from pypy.objspace.std.strbufobject import W_StringBufferObject
-            if isinstance(w_other, W_StringBufferObject):
-                return space.newbool(self._value == w_other.force())
-        if not isinstance(w_other, W_BytesObject):
+        if not isinstance(w_other, W_AbstractBytesObject):
             return space.w_NotImplemented
-        return space.newbool(self._value == w_other._value)
+        return space.newbool(self._value == space.bytes_w(w_other))
 
     def descr_ne(self, space, w_other):
-        if space.config.objspace.std.withstrbuf:
-            from pypy.objspace.std.strbufobject import W_StringBufferObject
-            if isinstance(w_other, W_StringBufferObject):
-                return space.newbool(self._value != w_other.force())
-        if not isinstance(w_other, W_BytesObject):
+        if not isinstance(w_other, W_AbstractBytesObject):
             return space.w_NotImplemented
-        return space.newbool(self._value != w_other._value)
+        return space.newbool(self._value != space.bytes_w(w_other))
 
     def descr_lt(self, space, w_other):
-        if space.config.objspace.std.withstrbuf:
-            from pypy.objspace.std.strbufobject import W_StringBufferObject
-            if isinstance(w_other, W_StringBufferObject):
-                return space.newbool(self._value < w_other.force())
-        if not isinstance(w_other, W_BytesObject):
+        if not isinstance(w_other, W_AbstractBytesObject):
             return space.w_NotImplemented
-        return space.newbool(self._value < w_other._value)
+        return space.newbool(self._value < space.bytes_w(w_other))
 
     def descr_le(self, space, w_other):
-        if space.config.objspace.std.withstrbuf:
-            from pypy.objspace.std.strbufobject import W_StringBufferObject
-            if isinstance(w_other, W_StringBufferObject):
-                return space.newbool(self._value <= w_other.force())
-        if not isinstance(w_other, W_BytesObject):
+        if not isinstance(w_other, W_AbstractBytesObject):
             return space.w_NotImplemented
-        return space.newbool(self._value <= w_other._value)
+        return space.newbool(self._value <= space.bytes_w(w_other))
 
     def descr_gt(self, space, w_other):
-        if space.config.objspace.std.withstrbuf:
-            from pypy.objspace.std.strbufobject import W_StringBufferObject
-            if isinstance(w_other, W_StringBufferObject):
-                return space.newbool(self._value > w_other.force())
-        if not isinstance(w_other, W_BytesObject):
+        if not isinstance(w_other, W_AbstractBytesObject):
             return space.w_NotImplemented
-        return space.newbool(self._value > w_other._value)
+        return space.newbool(self._value > space.bytes_w(w_other))
 
     def descr_ge(self, space, w_other):
-        if space.config.objspace.std.withstrbuf:
-            from pypy.objspace.std.strbufobject import W_StringBufferObject
-            if isinstance(w_other, W_StringBufferObject):
-                return space.newbool(self._value >= w_other.force())
-        if not isinstance(w_other, W_BytesObject):
+        if not isinstance(w_other, W_AbstractBytesObject):
             return space.w_NotImplemented
-        return space.newbool(self._value >= w_other._value)
+        return space.newbool(self._value >= space.bytes_w(w_other))
 
     # auto-conversion fun
 
@@ -713,12 +698,10 @@ class W_BytesObject(W_AbstractBytesObject):
     _StringMethods_descr_contains = descr_contains
     def descr_contains(self, space, w_sub):
         if space.isinstance_w(w_sub, space.w_unicode):
-            from pypy.objspace.std.unicodeobject import W_UnicodeObject
-            assert isinstance(w_sub, W_UnicodeObject)
             self_as_unicode = unicode_from_encoded_object(space, self, None,
                                                           None)
             return space.newbool(
-                self_as_unicode._value.find(w_sub._value) >= 0)
+                self_as_unicode._value.find(space.unicode_w(w_sub)) >= 0)
         return self._StringMethods_descr_contains(space, w_sub)
 
     _StringMethods_descr_replace = descr_replace
@@ -176,3 +176,99 @@ class ModuleDictStrategy(DictStrategy):
 
 
 create_iterator_classes(ModuleDictStrategy)
+
+
+# ____________________________________________________________
+# LOAD_GLOBAL caching
+
+class GlobalCacheEntry(object):
+    globals_version = None
+    builtins_version = None   # None if the name was found in the globals
+    cell = None
+
+INVALID_GLOBAL_CACHE_ENTRY = GlobalCacheEntry()
+
+class GlobalCacheCounter(object):
+    def __init__(self, space):
+        self.hits = {}
+        self.misses = {}
+
+def init_global_cache(pycode):
+    num_entries = len(pycode.co_names_w)
+    pycode._global_caches = [INVALID_GLOBAL_CACHE_ENTRY] * num_entries
+
+def _get_module_strategy(w_dict):
+    from pypy.objspace.std.dictmultiobject import W_ModuleDictObject
+    if isinstance(w_dict, W_ModuleDictObject):
+        strategy = w_dict.get_strategy()
+        if isinstance(strategy, ModuleDictStrategy):
+            return strategy
+    return None
+
+def LOAD_GLOBAL_caching(pycode, w_globals, builtin, nameindex):
+    # this is to make the interpreter faster; it's not used if
+    # we_are_jitted(), where the lookups in the module dicts are already
+    # constant-folded thanks to the version tags.  'builtin' is the
+    # __builtin__ module.  Returns None if the name is found neither in
+    # the globals nor in the builtins.
+    entry = pycode._global_caches[nameindex]
+    strategy = _get_module_strategy(w_globals)
+    if strategy is not None and entry.globals_version is strategy.version:
+        builtins_version = entry.builtins_version
+        if builtins_version is None:
+            return _global_cache_hit(pycode, nameindex, entry)
+        b_strategy = _get_module_strategy(builtin.w_dict)
+        if b_strategy is not None and b_strategy.version is builtins_version:
+            return _global_cache_hit(pycode, nameindex, entry)
+    return LOAD_GLOBAL_slowpath(pycode, w_globals, builtin, nameindex,
+                                strategy)
+LOAD_GLOBAL_caching._always_inline_ = True
+
+def _global_cache_hit(pycode, nameindex, entry):
+    space = pycode.space
+    if space.config.objspace.std.withmethodcachecounter:
+        name = space.text_w(pycode.co_names_w[nameindex])
+        cache = space.fromcache(GlobalCacheCounter)
+        cache.hits[name] = cache.hits.get(name, 0) + 1
+    return unwrap_cell(space, entry.cell)
+
+def LOAD_GLOBAL_slowpath(pycode, w_globals, builtin, nameindex, strategy):
+    space = pycode.space
+    name = space.text_w(pycode.co_names_w[nameindex])
+    if space.config.objspace.std.withmethodcachecounter:
+        cache = space.fromcache(GlobalCacheCounter)
+        cache.misses[name] = cache.misses.get(name, 0) + 1
+    if strategy is None:
+        w_value = space.finditem_str(w_globals, name)
+        if w_value is None:
+            w_value = builtin.getdictvalue(space, name)
+        return w_value
+    from pypy.objspace.std.dictmultiobject import W_ModuleDictObject
+    assert isinstance(w_globals, W_ModuleDictObject)
+    cell = strategy.getdictvalue_no_unwrapping(w_globals, name)
+    if cell is not None:
+        _fill_global_cache(pycode, nameindex, strategy.version, None, cell)
+        return unwrap_cell(space, cell)
+    # this may load the builtin lazily, i.e. store it in builtin.w_dict
+    w_value = builtin.getdictvalue(space, name)
+    if w_value is not None:
+        w_builtins = builtin.w_dict
+        b_strategy = _get_module_strategy(w_builtins)
+        if b_strategy is not None:
+            assert isinstance(w_builtins, W_ModuleDictObject)
+            cell = b_strategy.getdictvalue_no_unwrapping(w_builtins, name)
+            if cell is not None:
+                _fill_global_cache(pycode, nameindex, strategy.version,
+                                   b_strategy.version, cell)
+    return w_value
+LOAD_GLOBAL_slowpath._dont_inline_ = True
+
+def _fill_global_cache(pycode, nameindex, globals_version, builtins_version,
+                       cell):
+    entry = pycode._global_caches[nameindex]
+    if entry is INVALID_GLOBAL_CACHE_ENTRY:
+        entry = GlobalCacheEntry()
+        pycode._global_caches[nameindex] = entry
+    entry.globals_version = globals_version
+    entry.builtins_version = builtins_version
+    entry.cell = cell
@@ -646,7 +646,16 @@ class EmptyDictStrategy(DictStrategy):
     def get_empty_storage(self):
         return self.erase(None)
 
-    def switch_to_correct_strategy(self, w_dict, w_key):
+    def switch_to_correct_strategy(self, w_dict, w_key, w_value=None):
+        if (w_value is not None and
+                self.space.config.objspace.std.withunboxedvaluedict):
+            from pypy.objspace.std.unboxeddict import (
+                find_unboxed_value_strategy)
+            strategy = find_unboxed_value_strategy(self.space, w_key, w_value)
+            if strategy is not None:
+                w_dict.set_strategy(strategy)
+                w_dict.dstorage = strategy.get_empty_storage()
+                return
         if type(w_key) is self.space.StringObjectCls:
             self.switch_to_bytes_strategy(w_dict)
             return
@@ -656,6 +665,9 @@ class EmptyDictStrategy(DictStrategy):
         w_type = self.space.type(w_key)
         if self.space.is_w(w_type, self.space.w_int):
             self.switch_to_int_strategy(w_dict)
+        elif (self.space.config.objspace.std.withtuplekeystrategies and
+                self.space.is_w(w_type, self.space.w_tuple)):
+            self.switch_to_tuple_key_strategy(w_dict, w_key)
         elif w_type.compares_by_identity():
             self.switch_to_identity_strategy(w_dict)
         else:
@@ -679,6 +691,15 @@ class EmptyDictStrategy(DictStrategy):
         w_dict.set_strategy(strategy)
         w_dict.dstorage = storage
 
+    def switch_to_tuple_key_strategy(self, w_dict, w_key):
+        from pypy.objspace.std.tuplekeydict import find_tuple_key_strategy
+        strategy = find_tuple_key_strategy(self.space, w_key)
+        if strategy is None:
+            strategy = self.space.fromcache(ObjectDictStrategy)
+        storage = strategy.get_empty_storage()
+        w_dict.set_strategy(strategy)
+        w_dict.dstorage = storage
+
     def switch_to_identity_strategy(self, w_dict):
         from pypy.objspace.std.identitydict import IdentityDictStrategy
         strategy = self.space.fromcache(IdentityDictStrategy)
@@ -705,12 +726,12 @@ class EmptyDictStrategy(DictStrategy):
 
     def setdefault(self, w_dict, w_key, w_default):
         # here the dict is always empty
-        self.switch_to_correct_strategy(w_dict, w_key)
+        self.switch_to_correct_strategy(w_dict, w_key, w_default)
         w_dict.setitem(w_key, w_default)
         return w_default
 
     def setitem(self, w_dict, w_key, w_value):
-        self.switch_to_correct_strategy(w_dict, w_key)
+        self.switch_to_correct_strategy(w_dict, w_key, w_value)
         w_dict.setitem(w_key, w_value)
 
     def setitem_str(self, w_dict, key, w_value):
@@ -32,7 +32,8 @@ from pypy.objspace.std.sliceobject import (
     W_SliceObject, normalize_simple_slice, unwrap_start_stop)
 from pypy.objspace.std.tupleobject import W_AbstractTupleObject
 from pypy.objspace.std.unicodeobject import W_UnicodeObject
-from pypy.objspace.std.util import get_positive_index, negate
+from pypy.objspace.std.util import (
+    get_positive_index, is_worth_a_slice_view, negate)
 
 __all__ = ['W_ListObject', 'make_range_list', 'make_empty_list_with_size']
 
@@ -76,6 +77,19 @@ def get_strategy_from_list_objects(space, list_w, sizehint):
     w_firstobj = list_w[0]
     check_int_or_float = False
 
+    if (space.config.objspace.std.withtuplelists and
+            isinstance(w_firstobj, W_AbstractTupleObject)):
+        from pypy.objspace.std.tuplelistobject import find_tuple_list_strategy
+        strategy = find_tuple_list_strategy(space, w_firstobj)
+        if strategy is not None:
+            # check for all-tuples of the same kind
+            for i in range(1, len(list_w)):
+                if not strategy.is_correct_type(list_w[i]):
+                    break
+            else:
+                return strategy
+        return space.fromcache(ObjectListStrategy)
+
     if type(w_firstobj) is W_IntObject:
         # check for all-ints
         for i in range(1, len(list_w)):
@@ -319,6 +333,10 @@ class W_ListObject(W_Root):
         """Returns a slice of the list defined by the arguments. Arguments must
         be normalized (i.e. using normalize_simple_slice or W_Slice.indices4).
         May raise IndexError."""
+        if self.space.config.objspace.std.withsliceviews:
+            w_view = make_slice_view(self, start, step, length)
+            if w_view is not None:
+                return w_view
         return self.strategy.getslice(self, start, stop, step, length)
 
     def getitems(self):
@@ -702,6 +720,10 @@ class W_ListObject(W_Root):
         has_cmp = not space.is_none(w_cmp)
         has_key = not space.is_none(w_key)
 
+        if (has_key and not has_cmp and
+                self.strategy.sort_with_key(self, w_key, reverse)):
+            return
+
         # create and setup a TimSort instance
         if has_cmp:
             if has_key:
@@ -736,17 +758,23 @@ class W_ListObject(W_Root):
                     w_keyitem = space.call_function(w_key, w_item)
                     sorter.list[i] = KeyContainer(w_keyitem, w_item)
 
-            # Reverse sort stability achieved by initially reversing the list,
-            # applying a stable forward sort, then reversing the final result.
-            if reverse:
-                sorter.list.reverse()
+            # if all the keys are ints, floats or strings, sort them unwrapped
+            if (has_key and not has_cmp and
+                    sort_by_unwrapped_keys(space, sorter.list, reverse)):
+                pass
+            else:
+                # Reverse sort stability achieved by initially reversing the
+                # list, applying a stable forward sort, then reversing the
+                # final result.
+                if reverse:
+                    sorter.list.reverse()
 
-            # perform the sort
-            sorter.sort()
+                # perform the sort
+                sorter.sort()
 
-            # reverse again
-            if reverse:
-                sorter.list.reverse()
+                # reverse again
+                if reverse:
+                    sorter.list.reverse()
 
         finally:
             # unwrap each item if needed
@@ -889,9 +917,20 @@ class ListStrategy(object):
     def sort(self, w_list, reverse):
         raise NotImplementedError
 
+    def sort_with_key(self, w_list, w_key, reverse):
+        """Sort w_list in place by the key function w_key, without calling
+        it on every item, if the strategy knows how to.  Return False if it
+        doesn't."""
+        return False
+
     def is_empty_strategy(self):
         return False
 
+    def supports_slice_views(self):
+        """Whether the storage of a list with this strategy can be shared
+        with the views of its slices (see SliceListStrategy)."""
+        return False
+
 
 class EmptyListStrategy(ListStrategy):
     """EmptyListStrategy is used when a W_List withouth elements is created.
@@ -962,6 +1001,13 @@ class EmptyListStrategy(ListStrategy):
             strategy = self.space.fromcache(UnicodeListStrategy)
         elif type(w_item) is W_FloatObject:
             strategy = self.space.fromcache(FloatListStrategy)
+        elif (self.space.config.objspace.std.withtuplelists and
+                isinstance(w_item, W_AbstractTupleObject)):
+            from pypy.objspace.std.tuplelistobject import (
+                find_tuple_list_strategy)
+            strategy = find_tuple_list_strategy(self.space, w_item)
+            if strategy is None:
+                strategy = self.space.fromcache(ObjectListStrategy)
         else:
             strategy = self.space.fromcache(ObjectListStrategy)
 
@@ -1319,6 +1365,183 @@ class RangeListStrategy(BaseRangeListStrategy):
             return w_list.pop(index)
 
 
+class ListSlice(object):
+    """The storage of SliceListStrategy: the items of 'w_base' from 'start'
+    on, 'length' items with the given 'step'.  'w_base' is never modified.
+    """
+    _immutable_fields_ = ['w_base', 'start', 'step', 'length']
+
+    def __init__(self, w_base, start, step, length):
+        self.w_base = w_base
+        self.start = start
+        self.step = step
+        self.length = length
+
+
+def make_slice_view(w_list, start, step, length):
+    """Return a new list which is a view of the given slice of w_list, or
+    None if the items should rather be copied.  If needed, the storage of
+    w_list is moved to a base list shared with the view, which each of
+    them copies only when it is modified."""
+    space = w_list.space
+    strategy = w_list.strategy
+    slice_strategy = space.fromcache(SliceListStrategy)
+    if strategy is slice_strategy:
+        view = slice_strategy.unerase(w_list.lstorage)
+        w_base = view.w_base
+        if not is_worth_a_slice_view(length, w_base.length()):
+            return None
+        start = view.start + start * view.step
+        step = view.step * step
+    else:
+        if not strategy.supports_slice_views():
+            return None
+        if not is_worth_a_slice_view(length, w_list.length()):
+            return None
+        w_base = W_ListObject.from_storage_and_strategy(
+            space, w_list.lstorage, strategy)
+        w_list.strategy = slice_strategy
+        w_list.lstorage = slice_strategy.erase(
+            ListSlice(w_base, 0, 1, w_base.length()))
+    storage = slice_strategy.erase(ListSlice(w_base, start, step, length))
+    return W_ListObject.from_storage_and_strategy(space, storage,
+                                                  slice_strategy)
+
+
+class SliceListStrategy(ListStrategy):
+    """SliceListStrategy is used with 'withsliceviews' for slices of lists,
+    and for the lists that were sliced.  The items are read from a base
+    list that is never modified; the first modification of a list copies
+    the items it needs into a regular strategy."""
+
+    erase, unerase = rerased.new_erasing_pair("slice")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def _base_getslice(self, w_list, start, step, length):
+        # copy the items [start::step] of w_list from the base list
+        view = self.unerase(w_list.lstorage)
+        w_base = view.w_base
+        start = view.start + start * view.step
+        step = view.step * step
+        return w_base.strategy.getslice(w_base, start, start + length, step,
+                                        length)
+
+    def materialize(self, w_list):
+        w_copy = self._base_getslice(w_list, 0, 1, self.length(w_list))
+        w_list.strategy = w_copy.strategy
+        w_list.lstorage = w_copy.lstorage
+
+    def clone(self, w_list):
+        return W_ListObject.from_storage_and_strategy(
+                self.space, w_list.lstorage, self)
+
+    def copy_into(self, w_list, w_other):
+        w_other.strategy = self
+        w_other.lstorage = w_list.lstorage
+
+    def _resize_hint(self, w_list, hint):
+        self.materialize(w_list)
+        w_list._resize_hint(hint)
+
+    def length(self, w_list):
+        return self.unerase(w_list.lstorage).length
+
+    def getitem(self, w_list, index):
+        view = self.unerase(w_list.lstorage)
+        if index < 0:
+            index += view.length
+        if not 0 <= index < view.length:
+            raise IndexError
+        return view.w_base.getitem(view.start + index * view.step)
+
+    def getslice(self, w_list, start, stop, step, length):
+        return self._base_getslice(w_list, start, step, length)
+
+    def getitems_copy(self, w_list):
+        view = self.unerase(w_list.lstorage)
+        w_base = view.w_base
+        return [w_base.getitem(view.start + i * view.step)
+                for i in range(view.length)]
+
+    getitems_fixedsize = func_with_new_name(getitems_copy,
+                                            "getitems_fixedsize")
+    getitems_unroll = getitems_fixedsize
+
+    def getitems_bytes(self, w_list):
+        return self.getslice(w_list, 0, 0, 1,
+                             self.length(w_list)).getitems_bytes()
+
+    def getitems_unicode(self, w_list):
+        return self.getslice(w_list, 0, 0, 1,
+                             self.length(w_list)).getitems_unicode()
+
+    def getitems_int(self, w_list):
+        return self.getslice(w_list, 0, 0, 1,
+                             self.length(w_list)).getitems_int()
+
+    def getitems_float(self, w_list):
+        return self.getslice(w_list, 0, 0, 1,
+                             self.length(w_list)).getitems_float()
+
+    def getstorage_copy(self, w_list):
+        # a ListSlice is never modified, so it can be shared
+        return w_list.lstorage
+
+    def mul(self, w_list, times):
+        w_newlist = self.getslice(w_list, 0, 0, 1, self.length(w_list))
+        w_newlist.inplace_mul(times)
+        return w_newlist
+
+    def append(self, w_list, w_item):
+        self.materialize(w_list)
+        w_list.append(w_item)
+
+    def inplace_mul(self, w_list, times):
+        self.materialize(w_list)
+        w_list.inplace_mul(times)
+
+    def deleteslice(self, w_list, start, step, slicelength):
+        self.materialize(w_list)
+        w_list.deleteslice(start, step, slicelength)
+
+    def pop(self, w_list, index):
+        self.materialize(w_list)
+        return w_list.pop(index)
+
+    def pop_end(self, w_list):
+        self.materialize(w_list)
+        return w_list.pop_end()
+
+    def setitem(self, w_list, index, w_item):
+        self.materialize(w_list)
+        w_list.setitem(index, w_item)
+
+    def setslice(self, w_list, start, step, slicelength, sequence_w):
+        self.materialize(w_list)
+        w_list.setslice(start, step, slicelength, sequence_w)
+
+    def insert(self, w_list, index, w_item):
+        self.materialize(w_list)
+        w_list.insert(index, w_item)
+
+    def extend(self, w_list, w_any):
+        self.materialize(w_list)
+        w_list.extend(w_any)
+
+    def reverse(self, w_list):
+        self.materialize(w_list)
+        w_list.reverse()
+
+    def sort(self, w_list, reverse):
+        self.materialize(w_list)
+        w_list.sort(reverse)
+
+    def sort_with_key(self, w_list, w_key, reverse):
+        self.materialize(w_list)
+        return w_list.strategy.sort_with_key(w_list, w_key, reverse)
+
+
 class AbstractUnwrappedStrategy(object):
 
     def wrap(self, unwrapped):
@@ -1347,6 +1570,9 @@ class AbstractUnwrappedStrategy(object):
         l = [self.unwrap(w_item) for w_item in list_w]
         w_list.lstorage = self.erase(l)
 
+    def supports_slice_views(self):
+        return True
+
     def get_empty_storage(self, sizehint):
         if sizehint == -1:
             return self.erase([])
@@ -2062,6 +2288,9 @@ FloatBaseTimSort = make_timsort_class()
 IntOrFloatBaseTimSort = make_timsort_class()
 StringBaseTimSort = make_timsort_class()
 UnicodeBaseTimSort = make_timsort_class()
+IntKeyBaseTimSort = make_timsort_class()
+FloatKeyBaseTimSort = make_timsort_class()
+StringKeyBaseTimSort = make_timsort_class()
 
 
 class KeyContainer(W_Root):
@@ -2107,6 +2336,24 @@ class UnicodeSort(UnicodeBaseTimSort):
         return a < b
 
 
+# The following classes sort a permutation of range(n), given the unwrapped
+# keys of the n items of a list in 'self.keys'.
+
+class IntKeySort(IntKeyBaseTimSort):
+    def lt(self, a, b):
+        return self.keys[a] < self.keys[b]
+
+
+class FloatKeySort(FloatKeyBaseTimSort):
+    def lt(self, a, b):
+        return self.keys[a] < self.keys[b]
+
+
+class StringKeySort(StringKeyBaseTimSort):
+    def lt(self, a, b):
+        return self.keys[a] < self.keys[b]
+
+
 class CustomCompareSort(SimpleSort):
     def lt(self, a, b):
         space = self.space
@@ -2137,6 +2384,68 @@ class CustomKeyCompareSort(CustomCompareSort):
         return CustomCompareSort.lt(self, a.w_key, b.w_key)
 
 
+def sort_by_unwrapped_keys(space, list_w, reverse):
+    """Sort a list of KeyContainers in place if all the keys are ints, or
+    all floats, or all strings.  The unwrapped keys are compared directly
+    instead of with space.lt().  Return False if the keys are of other
+    types."""
+    length = len(list_w)
+    if length < 2:
+        return False
+    w_first = list_w[0]
+    assert isinstance(w_first, KeyContainer)
+    if type(w_first.w_key) is W_IntObject:
+        keys_i = [0] * length
+        for i in range(length):
+            w_key = list_w[i]
+            assert isinstance(w_key, KeyContainer)
+            w_key = w_key.w_key
+            if type(w_key) is not W_IntObject:
+                return False
+            keys_i[i] = space.int_w(w_key)
+        _sort_by_keys(list_w, keys_i, IntKeySort, reverse)
+        return True
+    if type(w_first.w_key) is W_FloatObject:
+        keys_f = [0.0] * length
+        for i in range(length):
+            w_key = list_w[i]
+            assert isinstance(w_key, KeyContainer)
+            w_key = w_key.w_key
+            if type(w_key) is not W_FloatObject:
+                return False
+            keys_f[i] = space.float_w(w_key)
+        _sort_by_keys(list_w, keys_f, FloatKeySort, reverse)
+        return True
+    if type(w_first.w_key) is W_BytesObject:
+        keys_s = [""] * length
+        for i in range(length):
+            w_key = list_w[i]
+            assert isinstance(w_key, KeyContainer)
+            w_key = w_key.w_key
+            if type(w_key) is not W_BytesObject:
+                return False
+            keys_s[i] = space.bytes_w(w_key)
+        _sort_by_keys(list_w, keys_s, StringKeySort, reverse)
+        return True
+    return False
+
+@specialize.arg(2)
+def _sort_by_keys(list_w, keys, sorterclass, reverse):
+    length = len(list_w)
+    permutation = range(length)
+    # see W_ListObject.descr_sort() for why the list is reversed twice
+    if reverse:
+        permutation.reverse()
+    sorter = sorterclass(permutation, length)
+    sorter.keys = keys
+    sorter.sort()
+    if reverse:
+        permutation.reverse()
+    sorted_w = [list_w[i] for i in permutation]
+    for i in range(length):
+        list_w[i] = sorted_w[i]
+
+
 W_ListObject.typedef = TypeDef("list",
     __doc__ = """list() -> new empty list
 list(iterable) -> new list initialized from iterable's items""",
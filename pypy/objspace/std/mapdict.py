@@ -1,7 +1,9 @@
 import weakref, sys
 
 from rpython.rlib import jit, objectmodel, debug, rerased
+from rpython.rlib.longlong2float import float2longlong, longlong2float
 from rpython.rlib.rarithmetic import intmask, r_uint
+from rpython.rtyper.lltypesystem import rffi
 
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.objspace.std.dictmultiobject import (
@@ -9,6 +11,8 @@ from pypy.objspace.std.dictmultiobject import (
     BaseValueIterator, BaseItemIterator, _never_equal_to_string,
     W_DictObject,
 )
+from pypy.objspace.std.floatobject import W_FloatObject
+from pypy.objspace.std.intobject import W_IntObject
 from pypy.objspace.std.typeobject import MutableCell
 
 
@@ -25,6 +29,19 @@ NUM_DIGITS_POW2 = 1 << NUM_DIGITS
 # note: we use "x * NUM_DIGITS_POW2" instead of "x << NUM_DIGITS" because
 # we want to propagate knowledge that the result cannot be negative
 
+# how the value of an attribute is stored (see UnboxedPlainAttribute)
+BOXED = 0
+UNBOXED_INT = 1
+UNBOXED_FLOAT = 2
+
+def _get_unbox_type(space, w_value):
+    if space.config.objspace.std.withunboxedattributes:
+        if type(w_value) is W_IntObject:
+            return UNBOXED_INT
+        if type(w_value) is W_FloatObject:
+            return UNBOXED_FLOAT
+    return BOXED
+
 
 class AbstractAttribute(object):
     _immutable_fields_ = ['terminator']
@@ -40,6 +57,9 @@ class AbstractAttribute(object):
         attr = self.find_map_attr(name, index)
         if attr is None:
             return self.terminator._read_terminator(obj, name, index)
+        if (self.space.config.objspace.std.withunboxedattributes and
+                isinstance(attr, UnboxedPlainAttribute)):
+            return attr._direct_read(obj)
         if (
             jit.isconstant(attr.storageindex) and
             jit.isconstant(obj) and
@@ -59,7 +79,7 @@ class AbstractAttribute(object):
             return self.terminator._write_terminator(obj, name, index, w_value)
         if not attr.ever_mutated:
             attr.ever_mutated = True
-        obj._mapdict_write_storage(attr.storageindex, w_value)
+        attr._direct_write(obj, w_value)
         return True
 
     def delete(self, obj, name, index):
@@ -129,28 +149,34 @@ class AbstractAttribute(object):
         return None
 
     @jit.elidable
-    def _get_new_attr(self, name, index):
+    def _get_new_attr(self, name, index, unbox_type=BOXED):
         cache = self.cache_attrs
         if cache is None:
             cache = self.cache_attrs = {}
         attr = cache.get((name, index), None)
         if attr is None:
-            attr = PlainAttribute(name, index, self)
+            if unbox_type == BOXED:
+                attr = PlainAttribute(name, index, self)
+            else:
+                attr = UnboxedPlainAttribute(name, index, self, unbox_type)
             cache[name, index] = attr
         return attr
 
     def add_attr(self, obj, name, index, w_value):
         self._reorder_and_add(obj, name, index, w_value)
         if not jit.we_are_jitted():
-            oldattr = self
-            attr = obj._get_mapdict_map()
-            size_est = (oldattr._size_estimate + attr.size_estimate()
-                                               - oldattr.size_estimate())
-            assert size_est >= (oldattr.length() * NUM_DIGITS_POW2)
-            oldattr._size_estimate = size_est
+            self._update_size_estimate(obj._get_mapdict_map())
+
+    def _update_size_estimate(self, attr):
+        oldattr = self
+        size_est = (oldattr._size_estimate + attr.size_estimate()
+                                           - oldattr.size_estimate())
+        assert size_est >= (oldattr.length() * NUM_DIGITS_POW2)
+        oldattr._size_estimate = size_est
 
     def _add_attr_without_reordering(self, obj, name, index, w_value):
-        attr = self._get_new_attr(name, index)
+        unbox_type = _get_unbox_type(self.space, w_value)
+        attr = self._get_new_attr(name, index, unbox_type)
         attr._switch_map_and_write_storage(obj, w_value)
 
     @jit.unroll_safe
@@ -165,11 +191,11 @@ class AbstractAttribute(object):
         # the order is important here: first change the map, then the storage,
         # for the benefit of the special subclasses
         obj._set_mapdict_map(self)
-        obj._mapdict_write_storage(self.storageindex, w_value)
+        self._write_new_value(obj, w_value)
 
 
     @jit.elidable
-    def _find_branch_to_move_into(self, name, index):
+    def _find_branch_to_move_into(self, name, index, unbox_type):
         # walk up the map chain to find an ancestor with lower order that
         # already has the current name as a child inserted
         current_order = sys.maxint
@@ -184,7 +210,7 @@ class AbstractAttribute(object):
                 # we reached the top, so we didn't find it anywhere,
                 # just add it to the top attribute
                 if not isinstance(current, PlainAttribute):
-                    return 0, self._get_new_attr(name, index)
+                    return 0, self._get_new_attr(name, index, unbox_type)
 
             else:
                 return number_to_readd, attr
@@ -221,7 +247,9 @@ class AbstractAttribute(object):
         stack_index = 0
         while True:
             current = self
-            number_to_readd, attr = self._find_branch_to_move_into(name, index)
+            unbox_type = _get_unbox_type(self.space, w_value)
+            number_to_readd, attr = self._find_branch_to_move_into(
+                name, index, unbox_type)
             # we found the attributes further up, need to save the
             # previous values of the attributes we passed
             if number_to_readd:
@@ -230,8 +258,7 @@ class AbstractAttribute(object):
                 current = self
                 for i in range(number_to_readd):
                     assert isinstance(current, PlainAttribute)
-                    w_self_value = obj._mapdict_read_storage(
-                            current.storageindex)
+                    w_self_value = current._direct_read(obj)
                     stack[stack_index] = erase_map(current)
                     stack[stack_index + 1] = erase_item(w_self_value)
                     stack_index += 2
@@ -365,6 +392,16 @@ class PlainAttribute(AbstractAttribute):
         self.ever_mutated = False
         self.order = len(back.cache_attrs) if back.cache_attrs else 0
 
+    def _direct_read(self, obj):
+        return obj._mapdict_read_storage(self.storageindex)
+
+    def _direct_write(self, obj, w_value):
+        obj._mapdict_write_storage(self.storageindex, w_value)
+
+    def _write_new_value(self, obj, w_value):
+        # called when 'obj' just got this attribute
+        obj._mapdict_write_storage(self.storageindex, w_value)
+
     def _copy_attr(self, obj, new_obj):
         w_value = self.read(obj, self.name, self.index)
         new_obj._get_mapdict_map().add_attr(new_obj, self.name, self.index, w_value)
@@ -402,7 +439,7 @@ class PlainAttribute(AbstractAttribute):
         new_obj = self.back.materialize_r_dict(space, obj, dict_w)
         if self.index == DICT:
             w_attr = space.newtext(self.name)
-            dict_w[w_attr] = obj._mapdict_read_storage(self.storageindex)
+            dict_w[w_attr] = self._direct_read(obj)
         else:
             self._copy_attr(obj, new_obj)
         return new_obj
@@ -416,6 +453,144 @@ class PlainAttribute(AbstractAttribute):
     def __repr__(self):
         return "<PlainAttribute %s %s %s %r>" % (self.name, self.index, self.storageindex, self.back)
 
+
+class UnboxedStorage(W_Root):
+    """The values of the unboxed attributes of an object, in a single slot
+    of its storage.  Ints are stored as the bits of a float."""
+
+    def __init__(self, size):
+        self.values = debug.make_sure_not_resized([0.0] * size)
+
+
+class UnboxedPlainAttribute(PlainAttribute):
+    """An attribute whose value is an int or a float, stored unboxed (with
+    'withunboxedattributes').  All the unboxed attributes of an object share
+    the UnboxedStorage in the storage slot of the first one; 'listindex' is
+    the index of the value in it.  If a value of another type is stored,
+    the attribute is replaced by a PlainAttribute in the transitions of its
+    'back' map, and the object is rebuilt with boxed storage for it."""
+
+    _immutable_fields_ = ['unbox_type', 'listindex', 'firstunwrapped',
+                          'first']
+
+    def __init__(self, name, index, back, unbox_type):
+        self.unbox_type = unbox_type
+        prev = back
+        while isinstance(prev, PlainAttribute):
+            if isinstance(prev, UnboxedPlainAttribute):
+                break
+            prev = prev.back
+        if isinstance(prev, UnboxedPlainAttribute):
+            self.firstunwrapped = False
+            self.first = prev.first
+            self.listindex = prev.listindex + 1
+            if self.listindex >= self.first.capacity:
+                self.first.capacity = self.listindex + 1
+        else:
+            self.firstunwrapped = True
+            self.first = self
+            self.listindex = 0
+            self.capacity = 1
+        PlainAttribute.__init__(self, name, index, back)
+        if not self.firstunwrapped:
+            self.storageindex = self.first.storageindex
+
+    def length(self):
+        if self.firstunwrapped:
+            return self.storageindex + 1
+        return self.back.length()
+
+    def _is_correct_type(self, w_value):
+        if self.unbox_type == UNBOXED_INT:
+            return type(w_value) is W_IntObject
+        return type(w_value) is W_FloatObject
+
+    def _unbox(self, w_value):
+        if self.unbox_type == UNBOXED_INT:
+            assert isinstance(w_value, W_IntObject)
+            return longlong2float(rffi.cast(rffi.LONGLONG, w_value.intval))
+        assert isinstance(w_value, W_FloatObject)
+        return w_value.floatval
+
+    def _box(self, value):
+        if self.unbox_type == UNBOXED_INT:
+            return self.space.newint(intmask(float2longlong(value)))
+        return self.space.newfloat(value)
+
+    def _get_unboxed_storage(self, obj):
+        storage = obj._mapdict_read_storage(self.storageindex)
+        assert isinstance(storage, UnboxedStorage)
+        return storage
+
+    def _direct_read(self, obj):
+        storage = self._get_unboxed_storage(obj)
+        return self._box(storage.values[self.listindex])
+
+    def _direct_write(self, obj, w_value):
+        if not self._is_correct_type(w_value):
+            self._convert_to_boxed(obj, w_value)
+            return
+        storage = self._get_unboxed_storage(obj)
+        storage.values[self.listindex] = self._unbox(w_value)
+
+    def _switch_map_and_write_storage(self, obj, w_value):
+        if not self._is_correct_type(w_value):
+            attr = self._unboxing_failed()
+            attr._switch_map_and_write_storage(obj, w_value)
+            return
+        PlainAttribute._switch_map_and_write_storage(self, obj, w_value)
+
+    def _write_new_value(self, obj, w_value):
+        if self.firstunwrapped:
+            storage = UnboxedStorage(self.capacity)
+            obj._mapdict_write_storage(self.storageindex, storage)
+        else:
+            storage = self._get_unboxed_storage(obj)
+            if self.listindex >= len(storage.values):
+                values = [0.0] * self.first.capacity
+                for i in range(len(storage.values)):
+                    values[i] = storage.values[i]
+                storage.values = values
+        storage.values[self.listindex] = self._unbox(w_value)
+
+    @jit.dont_look_inside
+    def _unboxing_failed(self):
+        # objects that get this attribute from now on store it boxed
+        key = (self.name, self.index)
+        cache = self.back.cache_attrs
+        assert cache is not None
+        attr = cache[key]
+        if attr is self:
+            attr = PlainAttribute(self.name, self.index, self.back)
+            attr.order = self.order
+            cache[key] = attr
+        return attr
+
+    @jit.dont_look_inside
+    def _convert_to_boxed(self, obj, w_value):
+        self._unboxing_failed()
+        attrs = []
+        values_w = []
+        curr = obj._get_mapdict_map()
+        while isinstance(curr, PlainAttribute):
+            attrs.append(curr)
+            if curr is self:
+                values_w.append(w_value)
+            else:
+                values_w.append(curr._direct_read(obj))
+            curr = curr.back
+        assert isinstance(curr, Terminator)
+        obj._mapdict_init_empty(curr)
+        for i in range(len(attrs) - 1, -1, -1):
+            attr = attrs[i]
+            obj._get_mapdict_map().add_attr(obj, attr.name, attr.index,
+                                            values_w[i])
+
+    def __repr__(self):
+        return "<UnboxedPlainAttribute %s %s %s:%s %r>" % (
+            self.name, self.index, self.storageindex, self.listindex,
+            self.back)
+
 class MapAttrCache(object):
     def __init__(self, space):
         SIZE = 1 << space.config.objspace.std.methodcachesizeexp
@@ -856,6 +1031,26 @@ class IteratorMixin(object):
             curr_map = curr_map.back
         self.attrs = attrs
 
+    def _map_unchanged(self):
+        map = self.w_obj._get_mapdict_map()
+        if self.orig_map is not map:
+            # storing a value of another type in an unboxed attribute
+            # changes the map, but not the attributes
+            if not _same_attributes(self.orig_map, map):
+                return False
+            self.orig_map = map
+        return True
+
+
+def _same_attributes(map1, map2):
+    while (isinstance(map1, PlainAttribute) and
+           isinstance(map2, PlainAttribute)):
+        if map1.name != map2.name or map1.index != map2.index:
+            return False
+        map1 = map1.back
+        map2 = map2.back
+    return map1 is map2
+
 
 class MapDictIteratorKeys(BaseKeyIterator):
     objectmodel.import_from_mixin(IteratorMixin)
@@ -866,7 +1061,7 @@ class MapDictIteratorKeys(BaseKeyIterator):
 
     def next_key_entry(self):
         assert isinstance(self.w_dict.get_strategy(), MapDictStrategy)
-        if self.orig_map is not self.w_obj._get_mapdict_map():
+        if not self._map_unchanged():
             return None
         attrs = self.attrs
         if len(attrs) > 0:
@@ -885,7 +1080,7 @@ class MapDictIteratorValues(BaseValueIterator):
 
     def next_value_entry(self):
         assert isinstance(self.w_dict.get_strategy(), MapDictStrategy)
-        if self.orig_map is not self.w_obj._get_mapdict_map():
+        if not self._map_unchanged():
             return None
         attrs = self.attrs
         if len(attrs) > 0:
@@ -903,7 +1098,7 @@ class MapDictIteratorItems(BaseItemIterator):
 
     def next_item_entry(self):
         assert isinstance(self.w_dict.get_strategy(), MapDictStrategy)
-        if self.orig_map is not self.w_obj._get_mapdict_map():
+        if not self._map_unchanged():
             return None, None
         attrs = self.attrs
         if len(attrs) > 0:
@@ -920,6 +1115,7 @@ class CacheEntry(object):
     version_tag = None
     storageindex = 0
     w_method = None # for callmethod
+    new_map = None  # for STORE_ATTR adding the attribute
     success_counter = 0
     failure_counter = 0
 
@@ -949,6 +1145,7 @@ INVALID_CACHE_ENTRY.map_wref = weakref.ref(_invalid_cache_entry_map)
 def init_mapdict_cache(pycode):
     num_entries = len(pycode.co_names_w)
     pycode._mapdict_caches = [INVALID_CACHE_ENTRY] * num_entries
+    pycode._mapdict_store_caches = [INVALID_CACHE_ENTRY] * num_entries
 
 @jit.dont_look_inside
 def _fill_cache(pycode, nameindex, map, version_tag, storageindex, w_method=None):
@@ -1016,6 +1213,10 @@ def LOAD_ATTR_slowpath(pycode, w_obj, nameindex, map):
                     # Note that if map.terminator is a DevolvedDictTerminator
                     # or the class provides its own dict, not using mapdict, then:
                     # map.find_map_attr will always return None if index==DICT.
+                    if (space.config.objspace.std.withunboxedattributes and
+                            isinstance(attr, UnboxedPlainAttribute)):
+                        # not supported by the fast path of LOAD_ATTR_caching
+                        return attr._direct_read(w_obj)
                     _fill_cache(pycode, nameindex, map, version_tag, attr.storageindex)
                     return w_obj._mapdict_read_storage(attr.storageindex)
     if space.config.objspace.std.withmethodcachecounter:
@@ -1052,6 +1253,93 @@ def LOOKUP_METHOD_mapdict_fill_cache_method(space, pycode, name, nameindex,
         return
     _fill_cache(pycode, nameindex, map, version_tag, -1, w_method)
 
+class StoreAttrCacheCounter(object):
+    def __init__(self, space):
+        self.hits = {}
+        self.misses = {}
+
+def STORE_ATTR_caching(pycode, w_obj, nameindex, w_value):
+    # the same idea as LOAD_ATTR_caching, for writing an attribute that is
+    # either already there or added by following a map transition
+    entry = pycode._mapdict_store_caches[nameindex]
+    map = w_obj._get_mapdict_map()
+    if entry.is_valid_for_map(map):
+        space = pycode.space
+        if space.config.objspace.std.withmethodcachecounter:
+            name = space.text_w(pycode.co_names_w[nameindex])
+            cache = space.fromcache(StoreAttrCacheCounter)
+            cache.hits[name] = cache.hits.get(name, 0) + 1
+        new_map = entry.new_map
+        if new_map is None:
+            w_obj._mapdict_write_storage(entry.storageindex, w_value)
+        else:
+            new_map._switch_map_and_write_storage(w_obj, w_value)
+            map._update_size_estimate(new_map)
+        return
+    STORE_ATTR_slowpath(pycode, w_obj, nameindex, w_value, map)
+STORE_ATTR_caching._always_inline_ = True
+
+def STORE_ATTR_slowpath(pycode, w_obj, nameindex, w_value, map):
+    from pypy.objspace.descroperation import object_setattr
+    space = pycode.space
+    w_name = pycode.co_names_w[nameindex]
+    if space.config.objspace.std.withmethodcachecounter:
+        cache = space.fromcache(StoreAttrCacheCounter)
+        name = space.text_w(w_name)
+        cache.misses[name] = cache.misses.get(name, 0) + 1
+    space.setattr(w_obj, w_name, w_value)
+    if map is None or isinstance(map.terminator, DevolvedDictTerminator):
+        return
+    w_type = map.terminator.w_cls
+    if w_type.layout.typedef.hasdict:
+        return     # see LOOKUP_METHOD_mapdict_fill_cache_method
+    version_tag = w_type.version_tag()
+    if version_tag is None:
+        return
+    if w_type.lookup('__setattr__') is not object_setattr(space):
+        return
+    name = space.text_w(w_name)
+    _, w_descr = w_type._pure_lookup_where_with_method_cache(
+        name, version_tag)
+    if w_descr is not None and (isinstance(w_descr, MutableCell) or
+                                space.is_data_descr(w_descr)):
+        return
+    # unboxed attributes are not supported by the fast path
+    unboxed = space.config.objspace.std.withunboxedattributes
+    new_map = w_obj._get_mapdict_map()
+    if new_map is map:
+        # the attribute was already there
+        attr = map.find_map_attr(name, DICT)
+        if attr is None or (unboxed and
+                            isinstance(attr, UnboxedPlainAttribute)):
+            return
+        _fill_store_cache(pycode, nameindex, map, version_tag,
+                          attr.storageindex, None)
+    elif isinstance(new_map, PlainAttribute):
+        if unboxed and isinstance(new_map, UnboxedPlainAttribute):
+            return
+        if (new_map.back is not map or new_map.name != name or
+                new_map.index != DICT):
+            return
+        # the attribute was added without reordering the map
+        _fill_store_cache(pycode, nameindex, map, version_tag,
+                          new_map.storageindex, new_map)
+STORE_ATTR_slowpath._dont_inline_ = True
+
+@jit.dont_look_inside
+def _fill_store_cache(pycode, nameindex, map, version_tag, storageindex,
+                      new_map):
+    entry = pycode._mapdict_store_caches[nameindex]
+    if entry is INVALID_CACHE_ENTRY:
+        entry = CacheEntry()
+        pycode._mapdict_store_caches[nameindex] = entry
+    entry.map_wref = weakref.ref(map)
+    entry.version_tag = version_tag
+    entry.storageindex = storageindex
+    entry.new_map = new_map
+    if pycode.space.config.objspace.std.withmethodcachecounter:
+        entry.failure_counter += 1
+
 # XXX fix me: if a function contains a loop with both LOAD_ATTR and
 # XXX LOOKUP_METHOD on the same attribute name, it keeps trashing and
 # XXX rebuilding the cache
@@ -4,7 +4,11 @@ from pypy.interpreter.error import OperationError, oefmt
 from pypy.interpreter.signature import Signature
 from pypy.interpreter.typedef import TypeDef
 from pypy.objspace.std.bytesobject import W_BytesObject
+from pypy.objspace.std.floatobject import W_FloatObject
 from pypy.objspace.std.intobject import W_IntObject
+from pypy.objspace.std.tuplekeydict import (
+    is_bytes_int_pair, is_int_pair, unwrap_bytes_int_pair, unwrap_int_pair,
+    wrap_bytes_int_pair, wrap_int_pair)
 from pypy.objspace.std.unicodeobject import W_UnicodeObject
 from pypy.objspace.std.util import IDTAG_SPECIAL, IDTAG_SHIFT
 
@@ -12,6 +16,7 @@ from rpython.rlib.objectmodel import r_dict
 from rpython.rlib.objectmodel import iterkeys_with_hash, contains_with_hash
 from rpython.rlib.objectmodel import setitem_with_hash, delitem_with_hash
 from rpython.rlib.rarithmetic import intmask, r_uint
+from rpython.rlib.rfloat import isnan
 from rpython.rlib import rerased, jit
 
 
@@ -94,6 +99,10 @@ class W_BaseSetObject(W_Root):
         """ If this is an int set return its contents as a list of uwnrapped ints. Otherwise return None. """
         return self.strategy.listview_int(self)
 
+    def listview_float(self):
+        """ If this is a float set return its contents as a list of uwnrapped floats. Otherwise return None. """
+        return self.strategy.listview_float(self)
+
     def get_storage_copy(self):
         """ Returns a copy of the storage. Needed when we want to clone all elements from one set and
         put them into another. """
@@ -139,6 +148,18 @@ class W_BaseSetObject(W_Root):
         """ Appends all elements from the given set to this set. W_other must be a set."""
         self.strategy.update(self, w_other)
 
+    def update_from_view(self, w_iterable):
+        """ Appends all elements from the given iterable to this set without wrapping them, if the iterable is a list, set or dict whose elements are stored unwrapped like in this set. Returns False (and does nothing) otherwise."""
+        return self.strategy.update_from_view(self, w_iterable)
+
+    def difference_update_from_view(self, w_iterable):
+        """ Removes all elements found in the given iterable from this set, without wrapping them. Returns False (and does nothing) if this is not possible, see update_from_view."""
+        return self.strategy.difference_update_from_view(self, w_iterable)
+
+    def intersect_update_from_view(self, w_iterable):
+        """ Keeps only those elements also found in the given iterable, without wrapping them. Returns False (and does nothing) if this is not possible, see update_from_view."""
+        return self.strategy.intersect_update_from_view(self, w_iterable)
+
     def has_key(self, w_key):
         """ Checks wether this set contains the given wrapped key."""
         return self.strategy.has_key(self, w_key)
@@ -341,7 +362,7 @@ class W_BaseSetObject(W_Root):
             w_other = others_w[i]
             if isinstance(w_other, W_BaseSetObject):
                 result.intersect_update(w_other)
-            else:
+            elif not result.intersect_update_from_view(w_other):
                 w_other_as_set = self._newobj(space, w_other)
                 result.intersect_update(w_other_as_set)
         return result
@@ -394,7 +415,7 @@ class W_BaseSetObject(W_Root):
         for w_other in others_w:
             if isinstance(w_other, W_BaseSetObject):
                 result.update(w_other)
-            else:
+            elif not result.update_from_view(w_other):
                 for w_key in space.listview(w_other):
                     result.add(w_key)
         return result
@@ -431,7 +452,7 @@ class W_BaseSetObject(W_Root):
         for w_other in others_w:
             if isinstance(w_other, W_BaseSetObject):
                 self.difference_update(w_other)
-            else:
+            elif not self.difference_update_from_view(w_other):
                 w_other_as_set = self._newobj(space, w_other)
                 self.difference_update(w_other_as_set)
 
@@ -494,7 +515,7 @@ class W_BaseSetObject(W_Root):
         for w_other in others_w:
             if isinstance(w_other, W_BaseSetObject):
                 self.update(w_other)
-            else:
+            elif not self.update_from_view(w_other):
                 for w_key in space.listview(w_other):
                     self.add(w_key)
 
@@ -700,6 +721,18 @@ class SetStrategy(object):
     def listview_int(self, w_set):
         return None
 
+    def listview_float(self, w_set):
+        return None
+
+    def update_from_view(self, w_set, w_iterable):
+        return False
+
+    def difference_update_from_view(self, w_set, w_iterable):
+        return False
+
+    def intersect_update_from_view(self, w_set, w_iterable):
+        return False
+
     #def erase(self, storage):
     #    raise NotImplementedError
 
@@ -801,6 +834,14 @@ class EmptySetStrategy(SetStrategy):
             strategy = self.space.fromcache(BytesSetStrategy)
         elif type(w_key) is W_UnicodeObject:
             strategy = self.space.fromcache(UnicodeSetStrategy)
+        elif self.space.fromcache(FloatSetStrategy).is_correct_type(w_key):
+            strategy = self.space.fromcache(FloatSetStrategy)
+        elif (self.space.config.objspace.std.withtuplekeystrategies and
+                is_int_pair(self.space, w_key)):
+            strategy = self.space.fromcache(IntPairSetStrategy)
+        elif (self.space.config.objspace.std.withtuplekeystrategies and
+                is_bytes_int_pair(self.space, w_key)):
+            strategy = self.space.fromcache(BytesIntPairSetStrategy)
         elif self.space.type(w_key).compares_by_identity():
             strategy = self.space.fromcache(IdentitySetStrategy)
         else:
@@ -880,6 +921,12 @@ class AbstractUnwrappedSetStrategy(object):
         """ Returns a wrapped version of the given unwrapped item. """
         raise NotImplementedError
 
+    def unwrapped_view(self, w_iterable):
+        """ Returns the items of w_iterable as a list of unwrapped items of
+        the type used by this strategy, if they can be read without wrapping
+        them (see space.listview_int() & co.).  Otherwise returns None. """
+        return None
+
     @jit.look_inside_iff(lambda self, list_w:
             jit.loop_unrolling_heuristic(list_w, len(list_w), UNROLL_CUTOFF))
     def get_storage_from_list(self, list_w):
@@ -1212,6 +1259,39 @@ class AbstractUnwrappedSetStrategy(object):
         w_set.switch_to_object_strategy(self.space)
         w_set.update(w_other)
 
+    def update_from_view(self, w_set, w_iterable):
+        items = self.unwrapped_view(w_iterable)
+        if items is None:
+            return False
+        d = self.unerase(w_set.sstorage)
+        for item in items:
+            d[item] = None
+        return True
+
+    def difference_update_from_view(self, w_set, w_iterable):
+        items = self.unwrapped_view(w_iterable)
+        if items is None:
+            return False
+        d = self.unerase(w_set.sstorage)
+        for item in items:
+            try:
+                del d[item]
+            except KeyError:
+                pass
+        return True
+
+    def intersect_update_from_view(self, w_set, w_iterable):
+        items = self.unwrapped_view(w_iterable)
+        if items is None:
+            return False
+        d = self.unerase(w_set.sstorage)
+        result = self.get_empty_dict()
+        for item in items:
+            if item in d:
+                result[item] = None
+        w_set.sstorage = self.erase(result)
+        return True
+
     def popitem(self, w_set):
         storage = self.unerase(w_set.sstorage)
         try:
@@ -1240,12 +1320,17 @@ class BytesSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     def listview_bytes(self, w_set):
         return self.unerase(w_set.sstorage).keys()
 
+    def unwrapped_view(self, w_iterable):
+        return self.space.listview_bytes(w_iterable)
+
     def is_correct_type(self, w_key):
         return type(w_key) is W_BytesObject
 
     def may_contain_equal_elements(self, strategy):
         if strategy is self.space.fromcache(IntegerSetStrategy):
             return False
+        elif strategy is self.space.fromcache(FloatSetStrategy):
+            return False
         elif strategy is self.space.fromcache(EmptySetStrategy):
             return False
         elif strategy is self.space.fromcache(IdentitySetStrategy):
@@ -1279,12 +1364,17 @@ class UnicodeSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     def listview_unicode(self, w_set):
         return self.unerase(w_set.sstorage).keys()
 
+    def unwrapped_view(self, w_iterable):
+        return self.space.listview_unicode(w_iterable)
+
     def is_correct_type(self, w_key):
         return type(w_key) is W_UnicodeObject
 
     def may_contain_equal_elements(self, strategy):
         if strategy is self.space.fromcache(IntegerSetStrategy):
             return False
+        elif strategy is self.space.fromcache(FloatSetStrategy):
+            return False
         elif strategy is self.space.fromcache(EmptySetStrategy):
             return False
         elif strategy is self.space.fromcache(IdentitySetStrategy):
@@ -1318,6 +1408,9 @@ class IntegerSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     def listview_int(self, w_set):
         return self.unerase(w_set.sstorage).keys()
 
+    def unwrapped_view(self, w_iterable):
+        return self.space.listview_int(w_iterable)
+
     def is_correct_type(self, w_key):
         return type(w_key) is W_IntObject
 
@@ -1342,6 +1435,56 @@ class IntegerSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
         return IntegerIteratorImplementation(self.space, self, w_set)
 
 
+class FloatSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
+    erase, unerase = rerased.new_erasing_pair("float")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    intersect_jmp = jit.JitDriver(greens = [], reds = 'auto',
+                                  name='set(float).intersect')
+
+    def get_empty_storage(self):
+        return self.erase({})
+
+    def get_empty_dict(self):
+        return {}
+
+    def listview_float(self, w_set):
+        return self.unerase(w_set.sstorage).keys()
+
+    def unwrapped_view(self, w_iterable):
+        floatlist = self.space.listview_float(w_iterable)
+        if floatlist is None or _contains_nan(floatlist):
+            return None
+        return floatlist
+
+    def is_correct_type(self, w_key):
+        # NaNs are not equal to themselves, so they cannot be used as keys
+        # of RPython dicts: they need the identity check done by space.eq_w()
+        return (type(w_key) is W_FloatObject and
+                not isnan(self.space.float_w(w_key)))
+
+    def may_contain_equal_elements(self, strategy):
+        if strategy is self.space.fromcache(BytesSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(UnicodeSetStrategy):
+            return False
+        elif strategy is self.space.fromcache(EmptySetStrategy):
+            return False
+        elif strategy is self.space.fromcache(IdentitySetStrategy):
+            return False
+        return True
+
+    def unwrap(self, w_item):
+        return self.space.float_w(w_item)
+
+    def wrap(self, item):
+        return self.space.newfloat(item)
+
+    def iter(self, w_set):
+        return FloatIteratorImplementation(self.space, self, w_set)
+
+
 class ObjectSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     erase, unerase = rerased.new_erasing_pair("object")
     erase = staticmethod(erase)
@@ -1417,6 +1560,8 @@ class IdentitySetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
             return False
         if strategy is self.space.fromcache(UnicodeSetStrategy):
             return False
+        if strategy is self.space.fromcache(FloatSetStrategy):
+            return False
         return True
 
     def unwrap(self, w_item):
@@ -1428,6 +1573,87 @@ class IdentitySetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
     def iter(self, w_set):
         return IdentityIteratorImplementation(self.space, self, w_set)
 
+class IntPairSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
+    erase, unerase = rerased.new_erasing_pair("intpair")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    intersect_jmp = jit.JitDriver(greens = [], reds = 'auto',
+                                  name='set(intpair).intersect')
+
+    def get_empty_storage(self):
+        return self.erase({})
+
+    def get_empty_dict(self):
+        return {}
+
+    def is_correct_type(self, w_key):
+        return is_int_pair(self.space, w_key)
+
+    def may_contain_equal_elements(self, strategy):
+        return _tuple_strategy_may_contain_equal_elements(self.space,
+                                                          strategy)
+
+    def unwrap(self, w_item):
+        return unwrap_int_pair(self.space, w_item)
+
+    def wrap(self, item):
+        return wrap_int_pair(self.space, item)
+
+    def iter(self, w_set):
+        return IntPairIteratorImplementation(self.space, self, w_set)
+
+
+class BytesIntPairSetStrategy(AbstractUnwrappedSetStrategy, SetStrategy):
+    erase, unerase = rerased.new_erasing_pair("bytesintpair")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    intersect_jmp = jit.JitDriver(greens = [], reds = 'auto',
+                                  name='set(bytesintpair).intersect')
+
+    def get_empty_storage(self):
+        return self.erase({})
+
+    def get_empty_dict(self):
+        return {}
+
+    def is_correct_type(self, w_key):
+        return is_bytes_int_pair(self.space, w_key)
+
+    def may_contain_equal_elements(self, strategy):
+        return _tuple_strategy_may_contain_equal_elements(self.space,
+                                                          strategy)
+
+    def unwrap(self, w_item):
+        return unwrap_bytes_int_pair(self.space, w_item)
+
+    def wrap(self, item):
+        return wrap_bytes_int_pair(self.space, item)
+
+    def iter(self, w_set):
+        return BytesIntPairIteratorImplementation(self.space, self, w_set)
+
+
+def _tuple_strategy_may_contain_equal_elements(space, strategy):
+    if strategy is space.fromcache(EmptySetStrategy):
+        return False
+    if strategy is space.fromcache(IntegerSetStrategy):
+        return False
+    if strategy is space.fromcache(BytesSetStrategy):
+        return False
+    if strategy is space.fromcache(UnicodeSetStrategy):
+        return False
+    if strategy is space.fromcache(FloatSetStrategy):
+        return False
+    if strategy is space.fromcache(IdentitySetStrategy):
+        return False
+    if strategy is space.fromcache(IntPairSetStrategy):
+        return False    # the other one is BytesIntPairSetStrategy
+    if strategy is space.fromcache(BytesIntPairSetStrategy):
+        return False    # the other one is IntPairSetStrategy
+    return True
+
 class IteratorImplementation(object):
     def __init__(self, space, strategy, implementation):
         self.space = space
@@ -1518,6 +1744,18 @@ class IntegerIteratorImplementation(IteratorImplementation):
         else:
             return None
 
+class FloatIteratorImplementation(IteratorImplementation):
+    def __init__(self, space, strategy, w_set):
+        IteratorImplementation.__init__(self, space, strategy, w_set)
+        d = strategy.unerase(w_set.sstorage)
+        self.iterator = d.iterkeys()
+
+    def next_entry(self):
+        for key in self.iterator:
+            return self.space.newfloat(key)
+        else:
+            return None
+
 class IdentityIteratorImplementation(IteratorImplementation):
     def __init__(self, space, strategy, w_set):
         IteratorImplementation.__init__(self, space, strategy, w_set)
@@ -1530,6 +1768,30 @@ class IdentityIteratorImplementation(IteratorImplementation):
         else:
             return None
 
+class IntPairIteratorImplementation(IteratorImplementation):
+    def __init__(self, space, strategy, w_set):
+        IteratorImplementation.__init__(self, space, strategy, w_set)
+        d = strategy.unerase(w_set.sstorage)
+        self.iterator = d.iterkeys()
+
+    def next_entry(self):
+        for key in self.iterator:
+            return wrap_int_pair(self.space, key)
+        else:
+            return None
+
+class BytesIntPairIteratorImplementation(IteratorImplementation):
+    def __init__(self, space, strategy, w_set):
+        IteratorImplementation.__init__(self, space, strategy, w_set)
+        d = strategy.unerase(w_set.sstorage)
+        self.iterator = d.iterkeys()
+
+    def next_entry(self):
+        for key in self.iterator:
+            return wrap_bytes_int_pair(self.space, key)
+        else:
+            return None
+
 class RDictIteratorImplementation(IteratorImplementation):
     def __init__(self, space, strategy, w_set):
         IteratorImplementation.__init__(self, space, strategy, w_set)
@@ -1609,6 +1871,13 @@ def set_strategy_and_setdata(space, w_set, w_iterable):
         w_set.sstorage = strategy.get_storage_from_unwrapped_list(intlist)
         return
 
+    floatlist = space.listview_float(w_iterable)
+    if floatlist is not None and not _contains_nan(floatlist):
+        strategy = space.fromcache(FloatSetStrategy)
+        w_set.strategy = strategy
+        w_set.sstorage = strategy.get_storage_from_unwrapped_list(floatlist)
+        return
+
     length_hint = space.length_hint(w_iterable, 0)
 
     if jit.isconstant(length_hint):
@@ -1648,6 +1917,16 @@ def _pick_correct_strategy_unroll(space, w_set, w_iterable):
         w_set.sstorage = w_set.strategy.get_storage_from_list(iterable_w)
         return
 
+    # check for floats
+    strategy = space.fromcache(FloatSetStrategy)
+    for w_item in iterable_w:
+        if not strategy.is_correct_type(w_item):
+            break
+    else:
+        w_set.strategy = strategy
+        w_set.sstorage = strategy.get_storage_from_list(iterable_w)
+        return
+
     # check for compares by identity
     for w_item in iterable_w:
         if not space.type(w_item).compares_by_identity():
@@ -1661,6 +1940,13 @@ def _pick_correct_strategy_unroll(space, w_set, w_iterable):
     w_set.sstorage = w_set.strategy.get_storage_from_list(iterable_w)
 
 
+def _contains_nan(floatlist):
+    for f in floatlist:
+        if isnan(f):
+            return True
+    return False
+
+
 create_set_driver = jit.JitDriver(name='create_set',
                                   greens=['tp', 'strategy'],
                                   reds='auto')
@@ -4,9 +4,11 @@ import py
 
 from pypy.objspace.std.bytesobject import (W_AbstractBytesObject,
     W_BytesObject, StringBuffer)
+from pypy.objspace.std.unicodeobject import (W_AbstractUnicodeObject,
+    W_UnicodeObject)
 from pypy.interpreter.gateway import interp2app, unwrap_spec
 from pypy.interpreter.error import OperationError
-from rpython.rlib.rstring import StringBuilder
+from rpython.rlib.rstring import StringBuilder, UnicodeBuilder
 
 
 class W_StringBufferObject(W_AbstractBytesObject):
@@ -37,6 +39,8 @@ class W_StringBufferObject(W_AbstractBytesObject):
     def str_w(self, space):
         return self.force()
 
+    charbuf_w = str_w
+
     def buffer_w(self, space, flags):
         return StringBuffer(self.force())
 
@@ -67,33 +71,109 @@ class W_StringBufferObject(W_AbstractBytesObject):
         return self
 
 
-delegation_dict = {}
-for key, value in W_BytesObject.typedef.rawdict.iteritems():
-    if not isinstance(value, interp2app):
-        continue
-    if key in ('__len__', '__add__', '__str__'):
-        continue
-
-    func = value._code._bltin
-    args = inspect.getargs(func.func_code)
-    if args.varargs or args.keywords:
-        raise TypeError("Varargs and keywords not supported in unwrap_spec")
-    argspec = ', '.join([arg for arg in args.args[1:]])
-    func_code = py.code.Source("""
-    def f(self, %(args)s):
+
+class W_UnicodeBufferObject(W_AbstractUnicodeObject):
+    w_str = None
+
+    def __init__(self, builder):
+        self.builder = builder             # UnicodeBuilder
+        self.length = builder.getlength()
+
+    def force(self):
+        if self.w_str is None:
+            s = self.builder.build()
+            if self.length < len(s):
+                s = s[:self.length]
+            self.w_str = W_UnicodeObject(s)
+            return s
+        else:
+            return self.w_str._value
+
+    def __repr__(self):
+        """ representation for debugging purposes """
+        return "%s(%r[:%d])" % (
+            self.__class__.__name__, self.builder, self.length)
+
+    def unwrap(self, space):
+        return self.force()
+
+    def unicode_w(self, space):
+        return self.force()
+
+    def str_w(self, space):
+        self.force()
+        return self.w_str.str_w(space)
+
+    charbuf_w = str_w
+
+    def readbuf_w(self, space):
+        self.force()
+        return self.w_str.readbuf_w(space)
+
+    def writebuf_w(self, space):
         self.force()
-        return self.w_str.%(func_name)s(%(args)s)
-    """ % {'args': argspec, 'func_name': func.func_name})
-    d = {}
-    exec func_code.compile() in d
-    f = d['f']
-    f.func_defaults = func.func_defaults
-    f.__module__ = func.__module__
-    # necessary for unique identifiers for pickling
-    f.func_name = func.func_name
-    unwrap_spec_ = getattr(func, 'unwrap_spec', None)
-    if unwrap_spec_ is not None:
-        f = unwrap_spec(**unwrap_spec_)(f)
-    setattr(W_StringBufferObject, func.func_name, f)
-
-W_StringBufferObject.typedef = W_BytesObject.typedef
+        return self.w_str.writebuf_w(space)
+
+    def listview_unicode(self):
+        self.force()
+        return self.w_str.listview_unicode()
+
+    def ord(self, space):
+        self.force()
+        return self.w_str.ord(space)
+
+    def descr_len(self, space):
+        return space.newint(self.length)
+
+    def descr_add(self, space, w_other):
+        try:
+            other = W_UnicodeObject._op_val(space, w_other)
+        except OperationError as e:
+            if e.match(space, space.w_TypeError):
+                return space.w_NotImplemented
+            raise
+        if self.builder.getlength() != self.length:
+            builder = UnicodeBuilder()
+            builder.append(self.force())
+        else:
+            builder = self.builder
+        builder.append(other)
+        return W_UnicodeBufferObject(builder)
+
+
+def delegate_methods(cls, W_PlainObject):
+    """Add to 'cls' all the methods of the typedef of W_PlainObject that
+    are not already defined; they force the buffer and call the method of
+    the resulting plain object."""
+    for key, value in W_PlainObject.typedef.rawdict.iteritems():
+        if not isinstance(value, interp2app):
+            continue
+        func = value._code._bltin
+        if func.func_name in cls.__dict__:
+            continue
+
+        args = inspect.getargs(func.func_code)
+        if args.varargs or args.keywords:
+            raise TypeError("Varargs and keywords not supported in "
+                            "unwrap_spec")
+        argspec = ', '.join([arg for arg in args.args[1:]])
+        func_code = py.code.Source("""
+        def f(self, %(args)s):
+            self.force()
+            return self.w_str.%(func_name)s(%(args)s)
+        """ % {'args': argspec, 'func_name': func.func_name})
+        d = {}
+        exec func_code.compile() in d
+        f = d['f']
+        f.func_defaults = func.func_defaults
+        f.__module__ = func.__module__
+        # necessary for unique identifiers for pickling
+        f.func_name = func.func_name
+        unwrap_spec_ = getattr(func, 'unwrap_spec', None)
+        if unwrap_spec_ is not None:
+            f = unwrap_spec(**unwrap_spec_)(f)
+        setattr(cls, func.func_name, f)
+    cls.typedef = W_PlainObject.typedef
+
+delegate_methods(W_StringBufferObject, W_BytesObject)
+delegate_methods(W_UnicodeBufferObject, W_UnicodeObject)
@@ -0,0 +1,171 @@
+"""Slices of str and unicode objects that share the characters of the sliced
+string instead of copying them (see 'withsliceviews')."""
+
+from rpython.rlib.buffer import StringBuffer, SubBuffer
+from rpython.rlib.objectmodel import import_from_mixin
+
+from pypy.interpreter.error import oefmt
+from pypy.objspace.std.bytesobject import W_AbstractBytesObject, W_BytesObject
+from pypy.objspace.std.sliceobject import (W_SliceObject,
+    normalize_simple_slice)
+from pypy.objspace.std.strbufobject import delegate_methods
+from pypy.objspace.std.unicodeobject import (W_AbstractUnicodeObject,
+    W_UnicodeObject)
+from pypy.objspace.std.util import is_worth_a_slice_view
+
+
+class SliceMethods(object):
+    """Common methods of the slice views.  As strings are immutable, a view
+    never needs to be copied on write: it is only turned into a plain string
+    ('forced') when an operation that is not implemented here is used, which
+    also releases the sliced string."""
+
+    w_str = None
+
+    def __init__(self, value, start, stop):
+        assert 0 <= start <= stop <= len(value)
+        self.value = value
+        self.start = start
+        self.stop = stop
+
+    def force(self):
+        if self.w_str is None:
+            start = self.start
+            stop = self.stop
+            assert start >= 0 and stop >= 0
+            s = self.value[start:stop]
+            self.w_str = self._new_plain(s)
+            self.value = self._empty_value()   # don't keep it alive
+            return s
+        else:
+            return self.w_str._value
+
+    def __repr__(self):
+        """ representation for debugging purposes """
+        return "%s(%r[%d:%d])" % (
+            self.__class__.__name__, self.value, self.start, self.stop)
+
+    def unwrap(self, space):
+        return self.force()
+
+    def _sliced(self, start, stop):
+        # 'start' and 'stop' are relative to the view
+        assert 0 <= start <= stop
+        start += self.start
+        stop += self.start
+        if is_worth_a_slice_view(stop - start, len(self.value)):
+            return self._new_view(self.value, start, stop)
+        return self._new_plain(self.value[start:stop])
+
+    def descr_len(self, space):
+        if self.w_str is not None:
+            return self.w_str.descr_len(space)
+        return space.newint(self.stop - self.start)
+
+    def descr_getitem(self, space, w_index):
+        if self.w_str is not None:
+            return self.w_str.descr_getitem(space, w_index)
+        length = self.stop - self.start
+        if isinstance(w_index, W_SliceObject):
+            start, stop, step, sl = w_index.indices4(space, length)
+            if step == 1 and sl > 0:
+                return self._sliced(start, stop)
+            self.force()
+            return self.w_str.descr_getitem(space, w_index)
+        index = space.getindex_w(w_index, space.w_IndexError, "string index")
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise oefmt(space.w_IndexError, "string index out of range")
+        return self._new_plain(self.value[self.start + index])
+
+    def descr_getslice(self, space, w_start, w_stop):
+        if self.w_str is not None:
+            return self.w_str.descr_getslice(space, w_start, w_stop)
+        start, stop = normalize_simple_slice(space, self.stop - self.start,
+                                             w_start, w_stop)
+        return self._sliced(start, stop)
+
+
+class W_BytesSliceObject(W_AbstractBytesObject):
+    import_from_mixin(SliceMethods)
+
+    def _new_plain(self, value):
+        return W_BytesObject(value)
+
+    def _new_view(self, value, start, stop):
+        return W_BytesSliceObject(value, start, stop)
+
+    def _empty_value(self):
+        return ''
+
+    def str_w(self, space):
+        return self.force()
+
+    charbuf_w = str_w
+
+    def buffer_w(self, space, flags):
+        space.check_buf_flags(flags, True)
+        return self.readbuf_w(space)
+
+    def readbuf_w(self, space):
+        if self.w_str is not None:
+            return StringBuffer(self.w_str._value)
+        return SubBuffer(StringBuffer(self.value), self.start,
+                         self.stop - self.start)
+
+    def listview_bytes(self):
+        self.force()
+        return self.w_str.listview_bytes()
+
+    def ord(self, space):
+        self.force()
+        return self.w_str.ord(space)
+
+    def descr_str(self, space):
+        # you cannot get subclasses of W_BytesSliceObject here
+        assert type(self) is W_BytesSliceObject
+        self.force()
+        return self.w_str
+
+
+class W_UnicodeSliceObject(W_AbstractUnicodeObject):
+    import_from_mixin(SliceMethods)
+
+    def _new_plain(self, value):
+        return W_UnicodeObject(value)
+
+    def _new_view(self, value, start, stop):
+        return W_UnicodeSliceObject(value, start, stop)
+
+    def _empty_value(self):
+        return u''
+
+    def unicode_w(self, space):
+        return self.force()
+
+    def str_w(self, space):
+        self.force()
+        return self.w_str.str_w(space)
+
+    charbuf_w = str_w
+
+    def readbuf_w(self, space):
+        self.force()
+        return self.w_str.readbuf_w(space)
+
+    def writebuf_w(self, space):
+        self.force()
+        return self.w_str.writebuf_w(space)
+
+    def listview_unicode(self):
+        self.force()
+        return self.w_str.listview_unicode()
+
+    def ord(self, space):
+        self.force()
+        return self.w_str.ord(space)
+
+
+delegate_methods(W_BytesSliceObject, W_BytesObject)
+delegate_methods(W_UnicodeSliceObject, W_UnicodeObject)
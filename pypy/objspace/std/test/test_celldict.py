@@ -144,3 +144,79 @@ class AppTestCellDict(object):
         del d["a"]
         d[object()] = 5
         assert d.values() == [5]
+
+
+class AppTestGlobalCache(object):
+    spaceconfig = {"objspace.std.withcelldict": True,
+                   "objspace.std.withmethodcachecounter": True}
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("__pypy__.global_cache_counter() needs the option")
+
+    def test_cache_hits(self):
+        import __pypy__, __builtin__
+        m = type(__builtins__)("abc")
+        exec """if 1:
+            a_global = 5
+            def f():
+                return a_global, divmod
+        """ in m.__dict__
+        __pypy__.reset_method_cache_counter()
+        for i in range(10):
+            assert m.f() == (5, __builtin__.divmod)
+        assert __pypy__.global_cache_counter("a_global") == (9, 1)
+        assert __pypy__.global_cache_counter("divmod") == (9, 1)
+
+    def test_invalidation(self):
+        import __builtin__
+        m = type(__builtins__)("abc")
+        exec """if 1:
+            a_global = 5
+            def f():
+                return a_global, len
+            def g():
+                return a_builtin
+        """ in m.__dict__
+        f = m.f
+        assert f() == (5, len)
+        for i in range(10):
+            m.a_global = i
+            assert f() == (i, len)
+        m.len = 42
+        assert f() == (9, 42)
+        del m.len
+        assert f() == (9, len)
+        del m.a_global
+        raises(NameError, f)
+        #
+        raises(NameError, m.g)
+        __builtin__.a_builtin = 1
+        try:
+            assert m.g() == 1
+            __builtin__.a_builtin = 2
+            assert m.g() == 2
+            m.a_builtin = 3
+            assert m.g() == 3
+            del m.a_builtin
+            assert m.g() == 2
+        finally:
+            del __builtin__.a_builtin
+        raises(NameError, m.g)
+
+    def test_non_module_globals(self):
+        d = {'a_global': 5}
+        exec "def f(): return a_global" in d
+        assert d['f']() == 5
+        d['a_global'] = 6
+        assert d['f']() == 6
+        m = type(__builtins__)("abc")
+        m.a_global = 7
+        f = type(d['f'])(d['f'].func_code, m.__dict__)
+        m2 = type(__builtins__)("abc")
+        m2.a_global = 8
+        f2 = type(d['f'])(d['f'].func_code, m2.__dict__)
+        for i in range(3):
+            assert f() == 7
+            assert f2() == 8
+            assert d['f']() == 6
@@ -1264,6 +1264,9 @@ class Config:
             withcelldict = False
             methodcachesizeexp = 11
             withmethodcachecounter = False
+            withunboxedvaluedict = False
+            withtuplekeystrategies = False
+            withunboxedattributes = False
 
 FakeSpace.config = Config()
 
@@ -686,6 +686,22 @@ class AppTestListObject(object):
         l.sort(reverse = True, key = lower)
         assert l == ['C', 'b', 'a']
 
+    def test_sort_key_primitive(self):
+        l = [(i % 7, -i) for i in range(100)]
+        for key in [lambda t: t[0], lambda t: float(t[0]),
+                    lambda t: str(t[0]), lambda t: t[0] * 2 ** 70,
+                    lambda t: [1, 1.5, "x"][t[0] % 3]]:
+            for reverse in [False, True]:
+                expected = sorted(l, cmp=lambda a, b: cmp(key(a), key(b)),
+                                  reverse=reverse)
+                assert sorted(l, key=key, reverse=reverse) == expected
+        l = [3, 1, 2, 4]
+        l.sort(key=lambda x: x if x < 4 else 2.5)
+        assert l == [1, 2, 4, 3]
+        l = [float('nan'), 1.0, 0.0]
+        l.sort(key=lambda x: x)
+        assert l[0] != l[0]
+
     def test_sort_simple_string(self):
         l = ["a", "d", "c", "b"]
         l.sort()
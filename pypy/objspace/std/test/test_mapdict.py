@@ -7,6 +7,9 @@ class Config:
             withcelldict = False
             methodcachesizeexp = 11
             withmethodcachecounter = False
+            withunboxedvaluedict = False
+            withtuplekeystrategies = False
+            withunboxedattributes = False
 
 space = FakeSpace()
 space.config = Config
@@ -1324,6 +1327,57 @@ class AppTestGlobalCaching(AppTestWithMapDict):
         else:
             assert 0, "failed: got %r" % ([got[1] for got in seen],)
 
+    def test_store_attr_caching(self):
+        import __pypy__
+        class A(object):
+            pass
+        def add(a):
+            a.someattr = 1     # adds the attribute
+        def write(a):
+            a.someattr = 2     # writes the existing attribute
+        def f(a):
+            add(a)
+            write(a)
+        __pypy__.reset_method_cache_counter()
+        l = []
+        for i in range(10):
+            a = A()
+            f(a)
+            assert a.someattr == 2
+            assert a.__dict__ == {'someattr': 2}
+            l.append(a)
+        assert __pypy__.store_attr_cache_counter("someattr") == (18, 2)
+        # the version tag of the class changes
+        A.someattr = property(lambda self: self.__dict__['x'],
+                              lambda self, value: setattr(self, 'x', value))
+        a = A()
+        f(a)
+        assert a.__dict__ == {'x': 2}
+        del A.someattr
+        class B(A):
+            def __setattr__(self, name, value):
+                object.__setattr__(self, name, value * 10)
+        b = B()
+        f(b)
+        assert b.someattr == 20
+        a = A()
+        f(a)
+        assert a.someattr == 2
+
+    def test_store_attr_caching_storage_growth(self):
+        class A(object):
+            pass
+        def f(a, i):
+            a.a0 = a.a1 = a.a2 = a.a3 = a.a4 = a.a5 = a.a6 = a.a7 = i
+        l = []
+        for i in range(10):
+            a = A()
+            f(a, i)
+            l.append(a)
+        for i, a in enumerate(l):
+            assert a.__dict__ == dict.fromkeys(
+                ['a0', 'a1', 'a2', 'a3', 'a4', 'a5', 'a6', 'a7'], i)
+
 class TestDictSubclassShortcutBug(object):
     spaceconfig = {"objspace.std.withmethodcachecounter": True}
 
@@ -1348,3 +1402,109 @@ class TestMapDictImplementationUsingnewdict(BaseTestRDictImplementation):
     def test_setdefault_fast(self):
         # mapdict can't pass this, which is fine
         pass
+
+
+class TestUnboxedAttributes(object):
+    spaceconfig = {"objspace.std.withunboxedattributes": True}
+
+    def make_instance(self):
+        return self.space.appexec([], """():
+            class A(object):
+                pass
+            a = A()
+            a.x = 1
+            a.y = 2.5
+            a.z = "z"
+            a.w = -3
+            return a
+        """)
+
+    def test_storage(self):
+        space = self.space
+        w_a = self.make_instance()
+        map = w_a._get_mapdict_map()
+        attr_x = map.find_map_attr("x", DICT)
+        attr_y = map.find_map_attr("y", DICT)
+        attr_z = map.find_map_attr("z", DICT)
+        attr_w = map.find_map_attr("w", DICT)
+        assert isinstance(attr_x, UnboxedPlainAttribute)
+        assert attr_x.unbox_type == UNBOXED_INT
+        assert attr_y.unbox_type == UNBOXED_FLOAT
+        assert not isinstance(attr_z, UnboxedPlainAttribute)
+        assert attr_w.unbox_type == UNBOXED_INT
+        # all the unboxed values are in the same storage slot
+        assert attr_x.storageindex == attr_y.storageindex == 0
+        assert attr_w.storageindex == 0
+        assert attr_z.storageindex == 1
+        assert map.length() == 2
+        storage = w_a._mapdict_read_storage(0)
+        assert isinstance(storage, UnboxedStorage)
+        assert storage.values[1] == 2.5
+        assert space.int_w(space.getattr(w_a, space.wrap("x"))) == 1
+        assert space.float_w(space.getattr(w_a, space.wrap("y"))) == 2.5
+        assert space.int_w(space.getattr(w_a, space.wrap("w"))) == -3
+
+    def test_change_type(self):
+        space = self.space
+        w_a = self.make_instance()
+        w_A = space.type(w_a)
+        space.setattr(w_a, space.wrap("y"), space.wrap(7))
+        map = w_a._get_mapdict_map()
+        attr_y = map.find_map_attr("y", DICT)
+        assert not isinstance(attr_y, UnboxedPlainAttribute)
+        assert isinstance(map.find_map_attr("x", DICT), UnboxedPlainAttribute)
+        assert isinstance(map.find_map_attr("w", DICT), UnboxedPlainAttribute)
+        assert space.unwrap(space.getattr(w_a, space.wrap("__dict__"))) == {
+            "x": 1, "y": 7, "z": "z", "w": -3}
+        # new instances get the boxed attribute directly
+        w_b = space.call_function(w_A)
+        space.setattr(w_b, space.wrap("x"), space.wrap(5))
+        space.setattr(w_b, space.wrap("y"), space.wrap(6.5))
+        assert (w_b._get_mapdict_map().find_map_attr("y", DICT) is
+                attr_y)
+        assert space.float_w(space.getattr(w_b, space.wrap("y"))) == 6.5
+
+
+class AppTestWithUnboxedAttributes(AppTestWithMapDict):
+    spaceconfig = {"objspace.std.withunboxedattributes": True}
+
+    def test_unboxed_values(self):
+        import sys
+        class A(object):
+            pass
+        values = [0, 1, -1, sys.maxint, -sys.maxint - 1, 0.0, -0.0, 1.5,
+                  1e300, float("inf"), True, 2 ** 100]
+        for value in values:
+            a = A()
+            a.x = value
+            a.y = value
+            assert a.x == value
+            assert type(a.x) is type(value)
+            assert str(a.y) == str(value)
+        a.x = float("nan")
+        assert a.x != a.x
+
+    def test_change_type(self):
+        class A(object):
+            pass
+        for i in range(3):
+            a = A()
+            a.x = 1
+            a.y = 2.5
+            a.z = 3
+            a.y = "y"
+            assert (a.x, a.y, a.z) == (1, "y", 3)
+            a.x = 4.5
+            a.z = 6
+            assert a.__dict__ == {"x": 4.5, "y": "y", "z": 6}
+
+    def test_change_type_while_iterating(self):
+        class A(object):
+            pass
+        a = A()
+        a.x = 1
+        a.y = 2
+        a.z = 3
+        for key in a.__dict__:
+            setattr(a, key, str(getattr(a, key)))
+        assert a.__dict__ == {"x": "1", "y": "2", "z": "3"}
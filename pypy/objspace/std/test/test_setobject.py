@@ -80,7 +80,7 @@ class TestW_SetObject:
 
     def test_create_set_from_list(self):
         from pypy.interpreter.baseobjspace import W_Root
-        from pypy.objspace.std.setobject import BytesSetStrategy, ObjectSetStrategy, UnicodeSetStrategy
+        from pypy.objspace.std.setobject import BytesSetStrategy, FloatSetStrategy, ObjectSetStrategy, UnicodeSetStrategy
         from pypy.objspace.std.floatobject import W_FloatObject
 
         w = self.space.wrap
@@ -118,6 +118,12 @@ class TestW_SetObject:
         w_list = W_ListObject(self.space, [w(1.0), w(2.0), w(3.0)])
         w_set = W_SetObject(self.space)
         _initialize_set(self.space, w_set, w_list)
+        assert w_set.strategy is self.space.fromcache(FloatSetStrategy)
+        assert w_set.strategy.unerase(w_set.sstorage) == {1.0:None, 2.0:None, 3.0:None}
+
+        w_list = W_ListObject(self.space, [w(1.0), w(2.0), w(float('nan'))])
+        w_set = W_SetObject(self.space)
+        _initialize_set(self.space, w_set, w_list)
         assert w_set.strategy is self.space.fromcache(ObjectSetStrategy)
         for item in w_set.strategy.unerase(w_set.sstorage):
             assert isinstance(item, W_FloatObject)
@@ -1032,6 +1038,54 @@ class AppTestAppSetTest:
         s.intersection_update(set())
         assert strategy(s) == "EmptySetStrategy"
 
+    def test_float_set(self):
+        from __pypy__ import strategy
+        s = set([1.5, 2.5, 0.0])
+        assert strategy(s) == "FloatSetStrategy"
+        assert -0.0 in s
+        assert 1.5 in s
+        assert 3.5 not in s
+        assert strategy(s) == "FloatSetStrategy"
+        assert 1 not in set([1.5])
+        assert 1 in set([1.0])
+        assert set([1.0, 2.5]) == set([1, 2.5])
+        assert set([1.5]) != set(["1.5"])
+        nan = float('nan')
+        s = set([1.5])
+        s.add(nan)
+        assert nan in s
+        assert strategy(s) == "ObjectSetStrategy"
+
+    def test_bulk_operations_with_lists(self):
+        from __pypy__ import strategy
+        s = set([1, 2, 3])
+        assert s.union([3, 4]) == set([1, 2, 3, 4])
+        assert s.union([3, 4.5]) == set([1, 2, 3, 4.5])
+        assert s.difference([2, 5]) == set([1, 3])
+        assert s.intersection([2, 3, 5]) == set([2, 3])
+        assert strategy(s.intersection([2, 3, 5])) == "IntegerSetStrategy"
+        assert s.intersection([2.0, "a"]) == set([2])
+        assert s.issubset([1, 2, 3, 4])
+        assert not s.issubset([1, 2])
+        s = set([1, 2, 3])
+        s.update(range(5))
+        assert s == set([0, 1, 2, 3, 4])
+        s.difference_update([0, 4, 7])
+        assert s == set([1, 2, 3])
+        assert strategy(s) == "IntegerSetStrategy"
+        #
+        s = set([1.5, 2.5])
+        assert s.union([0.5]) == set([0.5, 1.5, 2.5])
+        assert strategy(s.union([0.5])) == "FloatSetStrategy"
+        assert s.difference([2.5, float('nan')]) == set([1.5])
+        assert s.intersection([2.5, 3.5]) == set([2.5])
+        assert s.issubset([1.5, 2.5, 3.5])
+        #
+        s = set(["a", "b"])
+        assert s.union(["c"]) == set(["a", "b", "c"])
+        assert s.intersection(["b", "c"]) == set(["b"])
+        assert s.difference(["b"]) == set(["a"])
+
     def test_weird_exception_from_iterable(self):
         def f():
            raise ValueError
@@ -1,6 +1,7 @@
 from pypy.objspace.std.setobject import W_SetObject
 from pypy.objspace.std.setobject import (
     BytesIteratorImplementation, BytesSetStrategy, EmptySetStrategy,
+    FloatIteratorImplementation, FloatSetStrategy,
     IntegerIteratorImplementation, IntegerSetStrategy, ObjectSetStrategy,
     UnicodeIteratorImplementation, UnicodeSetStrategy)
 from pypy.objspace.std.listobject import W_ListObject
@@ -29,6 +30,12 @@ class TestW_SetStrategies:
         s = W_SetObject(self.space, self.wrapped([u"a", u"b"]))
         assert s.strategy is self.space.fromcache(UnicodeSetStrategy)
 
+        s = W_SetObject(self.space, self.wrapped([1.5, 2.5]))
+        assert s.strategy is self.space.fromcache(FloatSetStrategy)
+
+        s = W_SetObject(self.space, self.wrapped([1.5, float('nan')]))
+        assert s.strategy is self.space.fromcache(ObjectSetStrategy)
+
     def test_switch_to_object(self):
         s = W_SetObject(self.space, self.wrapped([1,2,3,4,5]))
         s.add(self.space.wrap("six"))
@@ -39,6 +46,42 @@ class TestW_SetStrategies:
         s1.update(s2)
         assert s1.strategy is self.space.fromcache(ObjectSetStrategy)
 
+    def test_switch_float_to_object(self):
+        space = self.space
+        s = W_SetObject(space, self.wrapped([]))
+        s.add(space.wrap(1.5))
+        assert s.strategy is space.fromcache(FloatSetStrategy)
+        s.add(space.wrap(float('nan')))
+        assert s.strategy is space.fromcache(ObjectSetStrategy)
+
+    def test_bulk_operations_with_lists(self, monkeypatch):
+        space = self.space
+        def fail(*args):
+            raise AssertionError("should not wrap the items")
+        w_list = self.wrapped([4, 5, 6, 7, 8, 9])
+        s1 = W_SetObject(space, self.wrapped([1, 2, 3, 4, 5]))
+        w_floatlist = self.wrapped([4.5, 5.5])
+        s3 = W_SetObject(space, self.wrapped([1.5, 4.5]))
+        # no wrapping, and no temporary set made out of the list
+        monkeypatch.setattr(space, "listview", fail)
+        for cls in [IntegerSetStrategy, FloatSetStrategy]:
+            monkeypatch.setattr(cls, "get_storage_from_unwrapped_list", fail)
+        s2 = s1.descr_union(space, [w_list])
+        assert s2.strategy is space.fromcache(IntegerSetStrategy)
+        assert sorted(space.listview_int(s2)) == [1, 2, 3, 4, 5, 6, 7, 8, 9]
+        s2 = s1.descr_difference(space, [w_list])
+        assert s2.strategy is space.fromcache(IntegerSetStrategy)
+        assert sorted(space.listview_int(s2)) == [1, 2, 3]
+        s1.descr_intersection_update(space, [w_list])
+        assert s1.strategy is space.fromcache(IntegerSetStrategy)
+        assert sorted(space.listview_int(s1)) == [4, 5]
+        #
+        s3.descr_update(space, [w_floatlist])
+        assert s3.strategy is space.fromcache(FloatSetStrategy)
+        assert sorted(space.listview_float(s3)) == [1.5, 4.5, 5.5]
+        s3.descr_difference_update(space, [w_floatlist])
+        assert space.listview_float(s3) == [1.5]
+
     def test_switch_to_unicode(self):
         s = W_SetObject(self.space, self.wrapped([]))
         s.add(self.space.wrap(u"six"))
@@ -133,6 +176,11 @@ class TestW_SetStrategies:
         assert isinstance(it, UnicodeIteratorImplementation)
         assert space.unwrap(it.next()) == u"a"
         assert space.unwrap(it.next()) == u"b"
+        #
+        s = W_SetObject(space, self.wrapped([1.5]))
+        it = s.iter()
+        assert isinstance(it, FloatIteratorImplementation)
+        assert space.unwrap(it.next()) == 1.5
 
     def test_listview(self):
         space = self.space
@@ -0,0 +1,207 @@
+import py
+
+from pypy.objspace.std.listobject import (
+    IntegerListStrategy, ObjectListStrategy, SliceListStrategy, W_ListObject)
+from pypy.objspace.std.strsliceobject import (
+    W_BytesSliceObject, W_UnicodeSliceObject)
+from pypy.objspace.std.test import (
+    test_bytesobject, test_listobject, test_unicodeobject)
+from pypy.objspace.std.util import is_worth_a_slice_view
+
+
+def test_is_worth_a_slice_view():
+    assert is_worth_a_slice_view(64, 64)
+    assert is_worth_a_slice_view(100, 1600)
+    assert not is_worth_a_slice_view(63, 64)
+    assert not is_worth_a_slice_view(100, 1700)
+
+
+class TestListSliceViews(object):
+    spaceconfig = {"objspace.std.withsliceviews": True}
+
+    def newlist(self, items):
+        space = self.space
+        return W_ListObject(space, [space.wrap(x) for x in items])
+
+    def test_slice_is_a_view(self):
+        space = self.space
+        w_l = self.newlist(range(100))
+        w_s = w_l.getslice(10, 90, 1, 80)
+        slice_strategy = space.fromcache(SliceListStrategy)
+        assert w_s.strategy is slice_strategy
+        assert w_l.strategy is slice_strategy
+        assert w_l.length() == 100
+        assert w_s.length() == 80
+        assert space.int_w(w_s.getitem(0)) == 10
+        assert space.int_w(w_s.getitem(-1)) == 89
+        py.test.raises(IndexError, w_s.getitem, 80)
+        assert w_s.getitems_int() == range(10, 90)
+        # the parent and the view share the same base list
+        base = slice_strategy.unerase(w_l.lstorage).w_base
+        assert slice_strategy.unerase(w_s.lstorage).w_base is base
+        assert base.strategy is space.fromcache(IntegerListStrategy)
+
+    def test_small_slices_are_copied(self):
+        space = self.space
+        w_l = self.newlist(range(100))
+        w_s = w_l.getslice(0, 10, 1, 10)
+        assert w_s.strategy is space.fromcache(IntegerListStrategy)
+        assert w_l.strategy is space.fromcache(IntegerListStrategy)
+        w_l = self.newlist(range(2000))
+        w_s = w_l.getslice(0, 100, 1, 100)
+        assert w_s.strategy is space.fromcache(IntegerListStrategy)
+        assert w_l.strategy is space.fromcache(IntegerListStrategy)
+
+    def test_view_of_view(self):
+        space = self.space
+        w_l = self.newlist(range(200))
+        w_s = w_l.getslice(199, -1, -1, 200)
+        w_t = w_s.getslice(0, 200, 2, 100)
+        slice_strategy = space.fromcache(SliceListStrategy)
+        assert w_t.strategy is slice_strategy
+        assert (slice_strategy.unerase(w_t.lstorage).w_base is
+                slice_strategy.unerase(w_l.lstorage).w_base)
+        assert space.unwrap(w_t) == range(199, -1, -2)
+
+    def test_copy_on_write(self):
+        space = self.space
+        w_l = self.newlist(range(100))
+        w_s = w_l.getslice(0, 100, 1, 100)
+        w_s.setitem(0, space.wrap("x"))
+        assert w_s.strategy is space.fromcache(ObjectListStrategy)
+        assert w_l.strategy is space.fromcache(SliceListStrategy)
+        assert space.unwrap(w_l) == range(100)
+        w_l.append(space.wrap(100))
+        assert w_l.strategy is space.fromcache(IntegerListStrategy)
+        assert space.unwrap(w_l) == range(101)
+        assert space.unwrap(w_s) == ["x"] + range(1, 100)
+
+
+class TestStringSliceViews(object):
+    spaceconfig = {"objspace.std.withsliceviews": True}
+
+    def test_bytes(self):
+        space = self.space
+        w_s = space.newbytes("a" * 50 + "b" * 100)
+        w_t = space.getslice(w_s, space.wrap(50), space.wrap(150))
+        assert isinstance(w_t, W_BytesSliceObject)
+        assert space.bytes_w(w_t) == "b" * 100
+        assert w_t.w_str is not None
+        assert w_t.value == ""
+        w_t = space.getslice(w_s, space.wrap(140), space.wrap(150))
+        assert not isinstance(w_t, W_BytesSliceObject)
+
+    def test_unicode(self):
+        space = self.space
+        w_s = space.newunicode(u"a" * 50 + u"b" * 100)
+        w_t = space.getslice(w_s, space.wrap(50), space.wrap(150))
+        assert isinstance(w_t, W_UnicodeSliceObject)
+        assert space.unicode_w(w_t) == u"b" * 100
+
+
+class AppTestSliceViews(object):
+    spaceconfig = {"objspace.std.withsliceviews": True}
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("__pypy__.strategy() is not reliable on appdirect")
+
+    def test_list(self):
+        from __pypy__ import strategy
+        l = range(200)
+        s = l[10:-10]
+        assert strategy(s) == "SliceListStrategy"
+        assert strategy(l) == "SliceListStrategy"
+        assert s == range(10, 190)
+        assert s[::-3] == range(189, 9, -3)
+        assert s * 2 == range(10, 190) * 2
+        assert 100 in s and 5 not in s
+        assert s.index(100) == 90
+        s.sort(reverse=True)
+        assert s == range(189, 9, -1)
+        assert strategy(s) == "IntegerListStrategy"
+        assert l == range(200)
+        del l[:100]
+        assert l == range(100, 200)
+        assert strategy(l) == "IntegerListStrategy"
+
+    def test_list_mutations(self):
+        from __pypy__ import strategy
+        for op in ["l.append(1)", "l.insert(0, 1)", "l.pop()", "l[0] = 'x'",
+                   "l[1:3] = []", "del l[0]", "l.extend([1, 2])",
+                   "l.reverse()", "l *= 2", "l.sort()", "l += l"]:
+            l = [str(i) for i in range(100)]
+            orig = l[:]
+            s = l[::-1]
+            assert strategy(s) == "SliceListStrategy"
+            expected = l[:]
+            exec op in {'l': expected}
+            exec op in {'l': l}
+            assert l == expected
+            assert s == orig[::-1]
+
+    def test_bytes(self):
+        from __pypy__ import internal_repr
+        s = "x" * 1000
+        t = s[100:]
+        assert "W_BytesSliceObject" in internal_repr(t)
+        assert len(t) == 900
+        assert t[-1] == "x"
+        assert t[::2] == "x" * 450
+        assert "W_BytesSliceObject" in internal_repr(t[100:])
+        assert "W_BytesSliceObject" not in internal_repr(t[:10])
+        assert buffer(t)[:3] == "xxx"
+        assert t == "x" * 900
+        assert hash(t) == hash("x" * 900)
+        assert t.upper() == "X" * 900
+        assert {t: 1}["x" * 900] == 1
+        assert type(t) is str
+        assert ("abc" * 100).strip("a").startswith("bc")
+
+    def test_bytes_compare_views(self):
+        from __pypy__ import internal_repr
+        s = "abcdefghij" * 20
+        t = s[10:120]
+        t2 = s[10:120]
+        assert "W_BytesSliceObject" in internal_repr(t2)
+        assert t == t2 and not t != t2
+        assert not t < t2 and t <= t2 and not t > t2 and t >= t2
+        u = s[11:121]
+        assert "W_BytesSliceObject" in internal_repr(u)
+        assert t < u and t != u and not t == u
+        assert u > t and u >= t
+        assert t == str(t2)
+        assert "W_BytesSliceObject" not in internal_repr(str(s[10:120]))
+        assert {t: 1}[s[10:120]] == 1
+        assert {s[10:120]: 1}[t[:]] == 1
+        assert {t: 1}.get(u) is None
+
+    def test_unicode(self):
+        from __pypy__ import internal_repr
+        s = u"abc" * 100
+        t = s[3:]
+        assert "W_UnicodeSliceObject" in internal_repr(t)
+        assert len(t) == 297
+        assert t[1] == u"b"
+        assert t + u"" == s[3:]
+        assert t == s[3:]
+        assert u"X" + t[:3] == u"Xabc"
+        assert unicode(t) == t
+        assert t.encode("ascii") == "abc" * 99
+        assert type(t) is unicode
+        a, b, c = (u"x" * 100 + u"-" + u"y" * 100).partition(u"-")
+        assert (a, b, c) == (u"x" * 100, u"-", u"y" * 100)
+
+
+class AppTestListObjectWithSliceViews(test_listobject.AppTestListObject):
+    spaceconfig = {"objspace.std.withsliceviews": True}
+
+
+class AppTestBytesObjectWithSliceViews(test_bytesobject.AppTestBytesObject):
+    spaceconfig = {"objspace.std.withsliceviews": True}
+
+
+class AppTestUnicodeStringWithSliceViews(
+        test_unicodeobject.AppTestUnicodeString):
+    spaceconfig = dict(usemodules=('unicodedata',),
+                       **{"objspace.std.withsliceviews": True})
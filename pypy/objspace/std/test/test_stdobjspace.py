@@ -64,6 +64,13 @@ class TestW_StdObjSpace:
         cls = space._get_interplevel_cls(space.w_bytes)
         assert cls is W_AbstractBytesObject
 
+    def test_withstrbuf_fastpath_isinstance_unicode(self):
+        from pypy.objspace.std.unicodeobject import W_AbstractUnicodeObject
+
+        space = gettestobjspace(withstrbuf=True)
+        cls = space._get_interplevel_cls(space.w_unicode)
+        assert cls is W_AbstractUnicodeObject
+
     def test_wrap_various_unsigned_types(self):
         import sys
         from rpython.rlib.rarithmetic import r_uint
@@ -1,6 +1,6 @@
 import py
 
-from pypy.objspace.std.test import test_bytesobject
+from pypy.objspace.std.test import test_bytesobject, test_unicodeobject
 
 class AppTestStringObject(test_bytesobject.AppTestBytesObject):
     spaceconfig = {"objspace.std.withstrbuf": True}
@@ -83,3 +83,87 @@ class AppTestStringObject(test_bytesobject.AppTestBytesObject):
         a = 'a'
         a += 'b'
         raises(TypeError, "a += 5")
+
+    def test_decode(self):
+        s = '[2, '.__add__('3]')
+        assert s.decode('ascii') == u'[2, 3]'
+        assert unicode(s) == u'[2, 3]'
+        assert unicode([2, 3]) == u'[2, 3]'
+
+
+class AppTestUnicodeBuffer(test_unicodeobject.AppTestUnicodeString):
+    spaceconfig = {"objspace.std.withstrbuf": True,
+                   "usemodules": ('unicodedata',)}
+
+    def test_basic(self):
+        import __pypy__
+        s = u"Hello, ".__add__(u"World!")
+        assert type(s) is unicode
+        assert 'W_UnicodeBufferObject' in __pypy__.internal_repr(s)
+        s = "Hello, ".__add__(u"World!")
+        assert type(s) is unicode
+        assert 'W_UnicodeBufferObject' in __pypy__.internal_repr(s)
+
+    def test_add(self):
+        import __pypy__
+        all = u""
+        for i in range(20):
+            all += unicode(i)
+        assert 'W_UnicodeBufferObject' in __pypy__.internal_repr(all)
+        assert len(all) == 30
+        assert all == u"012345678910111213141516171819"
+        assert all[10:12] == u"10"
+        assert all[-1] == u"9"
+        assert u"1213" in all
+        assert all.startswith(u"0123")
+
+    def test_add_twice(self):
+        x = u"a".__add__(u"b")
+        y = x + u"c"
+        c = x + u"d"
+        assert y == u"abc"
+        assert c == u"abd"
+        assert x == u"ab"
+
+    def test_add_str(self):
+        x = u"a".__add__(u"\u1234")
+        x += "c"
+        assert x == u"a\u1234c"
+        raises(UnicodeDecodeError, "x + '\\xff'")
+        raises(TypeError, "x + 5")
+        y = "c" + u"d".__add__(u"e")
+        assert y == u"cde"
+
+    def test_hash_and_compare(self):
+        import __pypy__
+        def join(s): return s[:len(s) // 2] + s[len(s) // 2:]
+        t = u'a\u1234' * 51
+        s = join(t)
+        assert 'W_UnicodeBufferObject' in __pypy__.internal_repr(s)
+        assert hash(s) == hash(t)
+        assert s == t
+        assert t == s
+        assert not s < t
+        assert s >= t
+        assert s == t.encode('utf-8').decode('utf-8')
+        assert {t: 1}[s] == 1
+
+    def test_conversions(self):
+        x = u"1".__add__(u"2")
+        assert int(x) == 12
+        assert float(x) == 12.0
+        assert long(x) == 12
+        assert str(x) == "12"
+        assert unicode(x) == u"12"
+        assert type(unicode(x)) is unicode
+        class U(unicode):
+            pass
+        assert U(x) == u"12"
+        assert x.encode("ascii") == "12"
+        assert x in "012"
+        assert ord(u"a".__add__(u"")) == 97
+
+    def test_marshal(self):
+        import marshal
+        x = u"a".__add__(u"\u1234")
+        assert marshal.loads(marshal.dumps(x)) == u"a\u1234"
@@ -0,0 +1,126 @@
+import py
+
+from pypy.objspace.std.dictmultiobject import ObjectDictStrategy
+from pypy.objspace.std.setobject import (
+    BytesIntPairSetStrategy, IntPairSetStrategy, ObjectSetStrategy)
+from pypy.objspace.std.tuplekeydict import (
+    BytesIntPairDictStrategy, IntPairDictStrategy)
+
+
+class TestTupleKeyStrategies(object):
+    spaceconfig = {"objspace.std.withtuplekeystrategies": True}
+
+    def newtuple(self, *items):
+        return self.space.newtuple([self.space.wrap(x) for x in items])
+
+    def test_dict_select_strategy(self):
+        space = self.space
+        for key, cls in [((1, 2), IntPairDictStrategy),
+                         (("a", 2), BytesIntPairDictStrategy),
+                         ((1, "a"), ObjectDictStrategy),
+                         ((1, 2, 3), ObjectDictStrategy),
+                         ((1.5, 2), ObjectDictStrategy),
+                         ((True, 2), ObjectDictStrategy)]:
+            w_d = space.newdict()
+            space.setitem(w_d, self.newtuple(*key), space.w_None)
+            assert type(w_d.get_strategy()) is cls
+
+    def test_dict_keys_are_unboxed(self):
+        space = self.space
+        w_d = space.newdict()
+        space.setitem(w_d, self.newtuple(1, 2), space.wrap(3))
+        space.setitem(w_d, self.newtuple(4, 5), space.wrap(6))
+        strategy = w_d.get_strategy()
+        assert sorted(strategy.unerase(w_d.dstorage).keys()) == [
+            (1, 2), (4, 5)]
+
+    def test_set_select_strategy(self):
+        space = self.space
+        for key, cls in [((1, 2), IntPairSetStrategy),
+                         (("a", 2), BytesIntPairSetStrategy),
+                         ((1, "a"), ObjectSetStrategy)]:
+            w_s = space.newset([])
+            w_s.add(self.newtuple(*key))
+            assert w_s.strategy is space.fromcache(cls)
+
+
+class AppTestTupleKeyStrategies(object):
+    spaceconfig = {"objspace.std.withtuplekeystrategies": True}
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("__pypy__.strategy() is not reliable on appdirect")
+
+    def test_dict(self):
+        from __pypy__ import strategy
+        d = {}
+        for i in range(5):
+            for j in range(5):
+                d[i, j] = i * j
+        assert strategy(d) == "IntPairDictStrategy"
+        assert d[3, 4] == 12
+        assert d.get((5, 5)) is None
+        assert (1, 1) in d
+        assert 1 not in d
+        assert None not in d
+        assert strategy(d) == "IntPairDictStrategy"
+        assert sorted(d)[:2] == [(0, 0), (0, 1)]
+        assert type(d.keys()[0]) is tuple
+        del d[0, 0]
+        assert len(d) == 24
+        assert d.pop((4, 4)) == 16
+        assert (1, 1, 1) not in d
+        d[1.5, 2] = "x"
+        assert strategy(d) == "ObjectDictStrategy"
+        assert d[1.5, 2] == "x"
+        assert d[2, 3] == 6
+
+    def test_dict_bytes_int(self):
+        from __pypy__ import strategy
+        d = {("a", 1): 5}
+        d["b", 2] = 6
+        assert strategy(d) == "BytesIntPairDictStrategy"
+        assert d == {("a", 1): 5, ("b", 2): 6}
+        assert d.get((u"a", 1)) == 5
+        assert strategy(d) == "ObjectDictStrategy"
+
+    def test_dict_equal_keys_of_other_types(self):
+        d = {(1, 2): "a"}
+        assert d[1L, 2] == "a"
+        assert d[1.0, 2.0] == "a"
+        class T(tuple):
+            pass
+        assert d[T((1, 2))] == "a"
+
+    def test_set(self):
+        from __pypy__ import strategy
+        s = set()
+        s.add((1, 2))
+        s.add((3, 4))
+        assert strategy(s) == "IntPairSetStrategy"
+        assert (1, 2) in s
+        assert (2, 1) not in s
+        t = set([(3, 4), (5, 6)])
+        assert s & t == set([(3, 4)])
+        assert s | t == set([(1, 2), (3, 4), (5, 6)])
+        assert s - t == set([(1, 2)])
+        assert sorted(s) == [(1, 2), (3, 4)]
+        s.add(("a", 1))
+        assert strategy(s) == "ObjectSetStrategy"
+        assert s == set([(1, 2), (3, 4), ("a", 1)])
+
+    def test_set_bytes_int(self):
+        from __pypy__ import strategy
+        s = set()
+        s.add(("a", 1))
+        assert strategy(s) == "BytesIntPairSetStrategy"
+        s2 = set()
+        s2.add((1, 1))
+        assert s.isdisjoint(s2)
+        assert s != s2
+        assert s.pop() == ("a", 1)
+
+
+class AppTestTupleKeyStrategiesSpecialised(AppTestTupleKeyStrategies):
+    spaceconfig = {"objspace.std.withtuplekeystrategies": True,
+                   "objspace.std.withspecialisedtuple": True}
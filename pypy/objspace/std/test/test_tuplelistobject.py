@@ -0,0 +1,146 @@
+import py
+
+from pypy.objspace.std.listobject import ObjectListStrategy, W_ListObject
+from pypy.objspace.std.tuplelistobject import (
+    FloatFloatFloatListStrategy, FloatFloatListStrategy, IntFloatListStrategy,
+    IntIntListStrategy)
+
+
+class TestTupleListStrategies(object):
+    spaceconfig = {"objspace.std.withtuplelists": True}
+
+    def newtuple(self, *items):
+        return self.space.newtuple([self.space.wrap(x) for x in items])
+
+    def test_select_strategy(self):
+        space = self.space
+        for item, cls in [((1, 2), IntIntListStrategy),
+                          ((1.5, 2.5), FloatFloatListStrategy),
+                          ((1, 2.5), IntFloatListStrategy),
+                          ((1., 2., 3.), FloatFloatFloatListStrategy),
+                          ((1, "a"), ObjectListStrategy),
+                          ((1, 2, 3, 4), ObjectListStrategy),
+                          ((True, 2), ObjectListStrategy)]:
+            w_l = W_ListObject(space, [])
+            w_l.append(self.newtuple(*item))
+            assert w_l.strategy is space.fromcache(cls)
+            w_l = W_ListObject(space, [self.newtuple(*item),
+                                       self.newtuple(*item)])
+            assert w_l.strategy is space.fromcache(cls)
+
+    def test_items_are_stored_columnwise(self):
+        space = self.space
+        w_l = W_ListObject(space, [self.newtuple(1, 2.5),
+                                   self.newtuple(3, 4.5)])
+        columns = w_l.strategy.unerase(w_l.lstorage)
+        assert columns.col0 == [1, 3]
+        assert columns.col1 == [2.5, 4.5]
+
+    def test_switch_to_object(self):
+        space = self.space
+        w_l = W_ListObject(space, [self.newtuple(1, 2)])
+        w_l.append(self.newtuple(1, 2.5))
+        assert w_l.strategy is space.fromcache(ObjectListStrategy)
+        assert space.unwrap(w_l) == [(1, 2), (1, 2.5)]
+
+        w_l = W_ListObject(space, [self.newtuple(1, 2), self.newtuple(3, 4)])
+        w_l.setitem(1, space.wrap(5))
+        assert w_l.strategy is space.fromcache(ObjectListStrategy)
+        assert space.unwrap(w_l) == [(1, 2), 5]
+
+    def test_mixed_list(self):
+        space = self.space
+        w_l = W_ListObject(space, [self.newtuple(1, 2), self.newtuple(1.5, 2)])
+        assert w_l.strategy is space.fromcache(ObjectListStrategy)
+
+
+class AppTestTupleLists(object):
+    spaceconfig = {"objspace.std.withtuplelists": True}
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("__pypy__.strategy() is not reliable on appdirect")
+
+    def test_basic(self):
+        from __pypy__ import strategy
+        l = [(i, i * 2) for i in range(5)]
+        assert strategy(l) == "TupleListStrategy_ii"
+        assert len(l) == 5
+        assert l[1] == (1, 2)
+        assert l[-1] == (4, 8)
+        raises(IndexError, "l[5]")
+        raises(IndexError, "l[-6]")
+        assert (3, 6) in l
+        assert (3.0, 6.0) in l
+        assert (3, 7) not in l
+        assert 3 not in l
+        assert l.index((2, 4)) == 2
+        assert l.count((2, 4)) == 1
+        assert list(l) == [(0, 0), (1, 2), (2, 4), (3, 6), (4, 8)]
+        assert strategy(l) == "TupleListStrategy_ii"
+
+    def test_mutations(self):
+        from __pypy__ import strategy
+        l = [(1.5, 2.5), (3.5, 4.5)]
+        assert strategy(l) == "TupleListStrategy_ff"
+        l.append((5.5, 6.5))
+        l.insert(0, (0.5, 0.5))
+        l[1] = (7.5, 8.5)
+        assert l.pop() == (5.5, 6.5)
+        assert l.pop(0) == (0.5, 0.5)
+        assert l == [(7.5, 8.5), (3.5, 4.5)]
+        l.extend([(9.5, 9.5)])
+        l += l[:1]
+        assert l == [(7.5, 8.5), (3.5, 4.5), (9.5, 9.5), (7.5, 8.5)]
+        del l[1:3]
+        assert l == [(7.5, 8.5), (7.5, 8.5)]
+        l[1:] = [(1.5, 1.5), (2.5, 2.5)]
+        assert l == [(7.5, 8.5), (1.5, 1.5), (2.5, 2.5)]
+        l.reverse()
+        assert l == [(2.5, 2.5), (1.5, 1.5), (7.5, 8.5)]
+        assert l * 2 == l + l
+        assert l[::2] == [(2.5, 2.5), (7.5, 8.5)]
+        assert strategy(l) == "TupleListStrategy_ff"
+        l[0] = "x"
+        assert strategy(l) == "ObjectListStrategy"
+        assert l == ["x", (1.5, 1.5), (7.5, 8.5)]
+
+    def test_triples(self):
+        from __pypy__ import strategy
+        l = []
+        for i in range(3):
+            l.append((i, i + 1, i + 2))
+        assert strategy(l) == "TupleListStrategy_iii"
+        assert l[2] == (2, 3, 4)
+        l.append((1, 2))
+        assert strategy(l) == "ObjectListStrategy"
+
+    def test_sort(self):
+        from __pypy__ import strategy
+        l = [(3, 1), (1, 2), (3, 0), (2, 5), (1, 1)]
+        l.sort()
+        assert l == [(1, 1), (1, 2), (2, 5), (3, 0), (3, 1)]
+        l.sort(reverse=True)
+        assert l == [(3, 1), (3, 0), (2, 5), (1, 2), (1, 1)]
+        assert strategy(l) == "TupleListStrategy_ii"
+        nan = float('nan')
+        l = [(1.0, nan), (nan, 1.0), (0.5, 2.0)]
+        l.sort()
+        expected = [(1.0, nan), (nan, 1.0), (0.5, 2.0)]
+        expected.sort()
+        assert l == expected
+
+    def test_sort_itemgetter(self):
+        from __pypy__ import strategy
+        from operator import itemgetter
+        l = [(3, 1.5), (1, 2.5), (3, 0.5), (2, 5.5), (1, 1.5)]
+        l.sort(key=itemgetter(0))
+        assert l == [(1, 2.5), (1, 1.5), (2, 5.5), (3, 1.5), (3, 0.5)]
+        l.sort(key=itemgetter(-1))
+        assert l == [(3, 0.5), (1, 1.5), (3, 1.5), (1, 2.5), (2, 5.5)]
+        l.sort(key=itemgetter(0), reverse=True)
+        assert l == [(3, 0.5), (3, 1.5), (2, 5.5), (1, 1.5), (1, 2.5)]
+        assert strategy(l) == "TupleListStrategy_if"
+        raises(IndexError, l.sort, key=itemgetter(2))
+        l.sort(key=itemgetter(1, 0))
+        assert l == [(3, 0.5), (1, 1.5), (3, 1.5), (1, 2.5), (2, 5.5)]
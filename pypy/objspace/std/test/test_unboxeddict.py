@@ -0,0 +1,158 @@
+import py
+
+from pypy.objspace.std.dictmultiobject import (
+    BytesDictStrategy, IntDictStrategy, ObjectDictStrategy, W_DictObject)
+from pypy.objspace.std.unboxeddict import (
+    BytesFloatDictStrategy, BytesIntDictStrategy, IntFloatDictStrategy,
+    IntIntDictStrategy)
+
+
+class TestUnboxedValueDict(object):
+    spaceconfig = {"objspace.std.withunboxedvaluedict": True}
+
+    def newdict(self, pairs):
+        space = self.space
+        w_d = space.newdict()
+        for key, value in pairs:
+            space.setitem(w_d, space.wrap(key), space.wrap(value))
+        return w_d
+
+    def test_select_strategy(self):
+        for pairs, cls in [([(1, 2)], IntIntDictStrategy),
+                           ([(1, 2.5)], IntFloatDictStrategy),
+                           ([("a", 2)], BytesIntDictStrategy),
+                           ([("a", 2.5)], BytesFloatDictStrategy),
+                           ([(1, "a")], IntDictStrategy),
+                           ([("a", None)], BytesDictStrategy)]:
+            w_d = self.newdict(pairs)
+            assert type(w_d.get_strategy()) is cls
+
+    def test_values_are_unboxed(self):
+        w_d = self.newdict([(1, 2.5), (2, 3.5)])
+        strategy = w_d.get_strategy()
+        assert strategy.unerase(w_d.dstorage) == {1: 2.5, 2: 3.5}
+
+    def test_switch_to_boxed_on_other_value(self):
+        space = self.space
+        w_d = self.newdict([("a", 1), ("b", 2)])
+        space.setitem(w_d, space.wrap("c"), space.wrap(3.5))
+        assert type(w_d.get_strategy()) is BytesDictStrategy
+        assert space.unwrap(w_d) == {"a": 1, "b": 2, "c": 3.5}
+
+    def test_switch_to_object_on_other_key(self):
+        space = self.space
+        w_d = self.newdict([(1, 1.5)])
+        space.setitem(w_d, space.wrap("x"), space.wrap(2.5))
+        assert type(w_d.get_strategy()) is ObjectDictStrategy
+        assert space.unwrap(w_d) == {1: 1.5, "x": 2.5}
+
+    def test_setitem_str(self):
+        space = self.space
+        w_d = self.newdict([("a", 1)])
+        w_d.setitem_str("b", space.wrap(2))
+        assert type(w_d.get_strategy()) is BytesIntDictStrategy
+        w_d.setitem_str("c", space.w_None)
+        assert type(w_d.get_strategy()) is BytesDictStrategy
+        assert space.unwrap(w_d) == {"a": 1, "b": 2, "c": None}
+
+
+class AppTestUnboxedValueDict(object):
+    spaceconfig = {"objspace.std.withunboxedvaluedict": True}
+
+    def setup_class(cls):
+        if cls.runappdirect:
+            py.test.skip("__pypy__.strategy() is not reliable on appdirect")
+
+    def test_counter(self):
+        from __pypy__ import strategy
+        d = {}
+        for word in "a b a c b a".split():
+            d[word] = d.get(word, 0) + 1
+        assert strategy(d) == "BytesIntDictStrategy"
+        assert d == {"a": 3, "b": 2, "c": 1}
+        assert sorted(d.items()) == [("a", 3), ("b", 2), ("c", 1)]
+        assert sorted(d.values()) == [1, 2, 3]
+        assert sorted(d.itervalues()) == [1, 2, 3]
+        assert sorted(d.iteritems()) == [("a", 3), ("b", 2), ("c", 1)]
+
+    def test_int_float(self):
+        from __pypy__ import strategy
+        d = {1: 0.5}
+        d[2] = 1.5
+        assert strategy(d) == "IntFloatDictStrategy"
+        assert d[1] == 0.5
+        assert d.get(3) is None
+        assert d.get("x", 42) == 42
+        assert strategy(d) == "IntFloatDictStrategy"
+        assert 2 in d
+        assert d.pop(1) == 0.5
+        assert d.pop(1, "default") == "default"
+        raises(KeyError, d.pop, 1)
+        assert d.setdefault(2, 7.5) == 1.5
+        assert d.setdefault(5, 7.5) == 7.5
+        assert d.popitem() in [(2, 1.5), (5, 7.5)]
+        assert strategy(d) == "IntFloatDictStrategy"
+
+    def test_identity(self):
+        x = 12345.5
+        d = {1: x}
+        assert d[1] is x
+        n = 10 ** 10
+        d = {"a": n}
+        assert d["a"] is n
+
+    def test_fall_back(self):
+        from __pypy__ import strategy
+        d = {1: 1}
+        d[2] = True
+        assert strategy(d) == "IntDictStrategy"
+        assert d[2] is True
+        assert d[1] == 1
+        d = {1: 1.5}
+        d[2] = 2
+        assert strategy(d) == "IntDictStrategy"
+        assert d == {1: 1.5, 2: 2}
+        assert type(d[2]) is int
+        d = {1: 1}
+        d[2] = 2 ** 100
+        assert d == {1: 1, 2: 2 ** 100}
+        d = {"a": 1}
+        d[1] = 5
+        assert strategy(d) == "ObjectDictStrategy"
+        assert d == {"a": 1, 1: 5}
+
+    def test_setdefault_fall_back(self):
+        from __pypy__ import strategy
+        d = {1: 2}
+        l = d.setdefault(3, [])
+        assert strategy(d) == "IntDictStrategy"
+        assert d[3] is l
+
+    def test_copy_and_update(self):
+        from __pypy__ import strategy
+        d = {1: 2.5, 3: 4.5}
+        d2 = d.copy()
+        assert strategy(d2) == "IntFloatDictStrategy"
+        assert d2 == d
+        d3 = {5: 6.5}
+        d3.update(d)
+        assert strategy(d3) == "IntFloatDictStrategy"
+        assert d3 == {1: 2.5, 3: 4.5, 5: 6.5}
+        d4 = {"x": 5}
+        d4.update(d)
+        assert strategy(d4) == "ObjectDictStrategy"
+        assert d4 == {"x": 5, 1: 2.5, 3: 4.5}
+
+    def test_kwargs(self):
+        def f(**kwargs):
+            return kwargs
+        d = {"a": 1, "b": 2}
+        assert f(**d) == d
+
+    def test_subclasses_are_boxed(self):
+        from __pypy__ import strategy
+        class myint(int):
+            pass
+        d = {1: myint(5)}
+        assert strategy(d) == "IntDictStrategy"
+        assert type(d[1]) is myint
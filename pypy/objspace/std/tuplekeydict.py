@@ -0,0 +1,137 @@
+## ----------------------------------------------------------------------------
+## dict strategies for keys that are pairs of primitives (see dictmultiobject.py)
+##
+## Tuples like (int, int) or (str, int) are commonly used as composite keys.
+## The strategies below store them as RPython tuples, so hashing and
+## comparing keys never goes through space.hash() or space.eq(), and no
+## W_TupleObject needs to be kept alive for every key.  The helpers are also
+## used by the corresponding set strategies in setobject.py.
+
+from rpython.rlib import rerased
+from rpython.rlib.debug import mark_dict_non_null
+from rpython.rlib.objectmodel import specialize
+
+from pypy.objspace.std.bytesobject import W_BytesObject
+from pypy.objspace.std.dictmultiobject import (
+    AbstractTypedStrategy, DictStrategy, create_iterator_classes)
+from pypy.objspace.std.intobject import W_IntObject
+from pypy.objspace.std.specialisedtupleobject import Cls_ii
+from pypy.objspace.std.tupleobject import W_AbstractTupleObject
+
+
+@specialize.arg(2, 3)
+def _is_exact_pair(space, w_obj, cls0, cls1):
+    if not space.is_w(space.type(w_obj), space.w_tuple):
+        return False
+    assert isinstance(w_obj, W_AbstractTupleObject)
+    if (space.config.objspace.std.withspecialisedtuple and
+            type(w_obj) is Cls_ii):
+        # no need to box the items to check their type
+        return cls0 is W_IntObject and cls1 is W_IntObject
+    if w_obj.length() != 2:
+        return False
+    return (type(w_obj.getitem(space, 0)) is cls0 and
+            type(w_obj.getitem(space, 1)) is cls1)
+
+def never_equal_to_tuple(space, w_lookup_type):
+    """Like _never_equal_to_string(), for lookups in dicts or sets of tuples.
+    """
+    return (space.is_w(w_lookup_type, space.w_NoneType) or
+            space.is_w(w_lookup_type, space.w_int) or
+            space.is_w(w_lookup_type, space.w_bool) or
+            space.is_w(w_lookup_type, space.w_float) or
+            space.is_w(w_lookup_type, space.w_bytes) or
+            space.is_w(w_lookup_type, space.w_unicode))
+
+
+def is_int_pair(space, w_obj):
+    return _is_exact_pair(space, w_obj, W_IntObject, W_IntObject)
+
+def unwrap_int_pair(space, w_obj):
+    if (space.config.objspace.std.withspecialisedtuple and
+            type(w_obj) is Cls_ii):
+        return (w_obj.value0, w_obj.value1)
+    assert isinstance(w_obj, W_AbstractTupleObject)
+    return (space.int_w(w_obj.getitem(space, 0)),
+            space.int_w(w_obj.getitem(space, 1)))
+
+def wrap_int_pair(space, key):
+    return space.newtuple([space.newint(key[0]), space.newint(key[1])])
+
+
+def is_bytes_int_pair(space, w_obj):
+    return _is_exact_pair(space, w_obj, W_BytesObject, W_IntObject)
+
+def unwrap_bytes_int_pair(space, w_obj):
+    assert isinstance(w_obj, W_AbstractTupleObject)
+    return (space.bytes_w(w_obj.getitem(space, 0)),
+            space.int_w(w_obj.getitem(space, 1)))
+
+def wrap_bytes_int_pair(space, key):
+    return space.newtuple([space.newbytes(key[0]), space.newint(key[1])])
+
+
+def find_tuple_key_strategy(space, w_key):
+    """Return the strategy to use for an empty dict that gets the tuple w_key
+    stored in it, or None if there is no specialized strategy for it."""
+    if is_int_pair(space, w_key):
+        return space.fromcache(IntPairDictStrategy)
+    if is_bytes_int_pair(space, w_key):
+        return space.fromcache(BytesIntPairDictStrategy)
+    return None
+
+
+class IntPairDictStrategy(AbstractTypedStrategy, DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("intpair")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def wrap(self, unwrapped):
+        return wrap_int_pair(self.space, unwrapped)
+
+    def unwrap(self, wrapped):
+        return unwrap_int_pair(self.space, wrapped)
+
+    def is_correct_type(self, w_obj):
+        return is_int_pair(self.space, w_obj)
+
+    def get_empty_storage(self):
+        res = {}
+        mark_dict_non_null(res)
+        return self.erase(res)
+
+    def _never_equal_to(self, w_lookup_type):
+        return never_equal_to_tuple(self.space, w_lookup_type)
+
+    def wrapkey(space, key):
+        return wrap_int_pair(space, key)
+
+create_iterator_classes(IntPairDictStrategy)
+
+
+class BytesIntPairDictStrategy(AbstractTypedStrategy, DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("bytesintpair")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+    def wrap(self, unwrapped):
+        return wrap_bytes_int_pair(self.space, unwrapped)
+
+    def unwrap(self, wrapped):
+        return unwrap_bytes_int_pair(self.space, wrapped)
+
+    def is_correct_type(self, w_obj):
+        return is_bytes_int_pair(self.space, w_obj)
+
+    def get_empty_storage(self):
+        res = {}
+        mark_dict_non_null(res)
+        return self.erase(res)
+
+    def _never_equal_to(self, w_lookup_type):
+        return never_equal_to_tuple(self.space, w_lookup_type)
+
+    def wrapkey(space, key):
+        return wrap_bytes_int_pair(space, key)
+
+create_iterator_classes(BytesIntPairDictStrategy)
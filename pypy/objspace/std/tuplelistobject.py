@@ -0,0 +1,432 @@
+## ----------------------------------------------------------------------------
+## list strategies for lists of small tuples (see listobject.py)
+##
+## Lists like [(x, y), ...] or [(key, count), ...], where all items are
+## tuples of the same length holding ints or floats at the same positions,
+## are stored column-wise: there is one RPython list per position in the
+## tuples, instead of one W_TupleObject (plus its boxed items) per item.
+## The tuples are only created when the items are read.  Storing any other
+## kind of item switches the list to ObjectListStrategy.
+
+from rpython.rlib import jit, rerased
+from rpython.rlib.listsort import make_timsort_class
+from rpython.rlib.longlong2float import float2longlong
+from rpython.rlib.objectmodel import newlist_hint, resizelist_hint
+from rpython.rlib.unroll import unrolling_iterable
+
+from pypy.objspace.std.floatobject import W_FloatObject
+from pypy.objspace.std.intobject import W_IntObject
+from pypy.objspace.std.listobject import (
+    UNROLL_CUTOFF, ListStrategy, W_ListObject)
+from pypy.objspace.std.tupleobject import W_AbstractTupleObject
+
+
+def _is_plain_tuple(space, w_obj):
+    return (isinstance(w_obj, W_AbstractTupleObject) and
+            space.is_w(space.type(w_obj), space.w_tuple))
+
+def _float_eq(a, b):
+    # like space.eq_w() on the boxed floats: NaNs are equal to themselves
+    return a == b or float2longlong(a) == float2longlong(b)
+
+
+def make_tuple_list_strategy(kinds):
+    """Make a list strategy for tuples whose items have the given kinds:
+    'i' for ints and 'f' for floats, e.g. 'if' for (int, float) tuples."""
+    ncols = len(kinds)
+    iter_cols = unrolling_iterable([(i, kinds[i], 'col%d' % i)
+                                    for i in range(ncols)])
+
+    class Columns(object):
+        """The storage: one list per position in the tuples, named col0,
+        col1, ...  All the lists have the same length."""
+
+    Columns.__name__ = 'Columns_' + kinds
+
+    def new_columns(sizehint):
+        columns = Columns()
+        for i, kind, name in iter_cols:
+            setattr(columns, name, newlist_hint(sizehint))
+        return columns
+
+    def copy_columns(columns, start, stop):
+        assert start >= 0
+        assert stop >= 0
+        res = Columns()
+        for i, kind, name in iter_cols:
+            setattr(res, name, getattr(columns, name)[start:stop])
+        return res
+
+    ColumnBaseTimSort = make_timsort_class()
+
+    class ColumnSort(ColumnBaseTimSort):
+        """Sorts a permutation of the indices of the items, comparing the
+        items as tuples, or only on the column 'keycolumn' if it is >= 0."""
+
+        def lt(self, a, b):
+            columns = self.columns
+            keycolumn = self.keycolumn
+            for i, kind, name in iter_cols:
+                col = getattr(columns, name)
+                if keycolumn == i:
+                    return col[a] < col[b]
+                elif keycolumn < 0:
+                    # like tuple comparison: the first items that are not
+                    # equal decide
+                    if kind == 'f':
+                        equal = _float_eq(col[a], col[b])
+                    else:
+                        equal = col[a] == col[b]
+                    if not equal:
+                        return col[a] < col[b]
+            return False
+
+    class TupleListStrategy(ListStrategy):
+        erase, unerase = rerased.new_erasing_pair("tuplelist_" + kinds)
+        erase = staticmethod(erase)
+        unerase = staticmethod(unerase)
+
+        def is_correct_type(self, w_obj):
+            space = self.space
+            if not _is_plain_tuple(space, w_obj):
+                return False
+            assert isinstance(w_obj, W_AbstractTupleObject)
+            if w_obj.length() != ncols:
+                return False
+            for i, kind, name in iter_cols:
+                w_item = w_obj.getitem(space, i)
+                if kind == 'i':
+                    if type(w_item) is not W_IntObject:
+                        return False
+                else:
+                    if type(w_item) is not W_FloatObject:
+                        return False
+            return True
+
+        def _append_unwrapped(self, columns, w_tuple):
+            # w_tuple must be of the correct type
+            space = self.space
+            assert isinstance(w_tuple, W_AbstractTupleObject)
+            for i, kind, name in iter_cols:
+                w_item = w_tuple.getitem(space, i)
+                if kind == 'i':
+                    getattr(columns, name).append(space.int_w(w_item))
+                else:
+                    getattr(columns, name).append(space.float_w(w_item))
+
+        def _set_unwrapped(self, columns, index, w_tuple):
+            # w_tuple must be of the correct type, index must be valid
+            space = self.space
+            assert isinstance(w_tuple, W_AbstractTupleObject)
+            for i, kind, name in iter_cols:
+                w_item = w_tuple.getitem(space, i)
+                if kind == 'i':
+                    getattr(columns, name)[index] = space.int_w(w_item)
+                else:
+                    getattr(columns, name)[index] = space.float_w(w_item)
+
+        def _wrap_item(self, columns, index):
+            # index must be valid
+            space = self.space
+            items_w = [None] * ncols
+            for i, kind, name in iter_cols:
+                value = getattr(columns, name)[index]
+                if kind == 'i':
+                    items_w[i] = space.newint(value)
+                else:
+                    items_w[i] = space.newfloat(value)
+            return space.newtuple(items_w)
+
+        def _items_equal(self, columns1, index1, columns2, index2):
+            for i, kind, name in iter_cols:
+                a = getattr(columns1, name)[index1]
+                b = getattr(columns2, name)[index2]
+                if kind == 'f':
+                    if not _float_eq(a, b):
+                        return False
+                elif a != b:
+                    return False
+            return True
+
+        def get_empty_storage(self, sizehint):
+            if sizehint == -1:
+                sizehint = 0
+            return self.erase(new_columns(sizehint))
+
+        @jit.look_inside_iff(lambda self, w_list, list_w:
+                jit.loop_unrolling_heuristic(list_w, len(list_w),
+                                             UNROLL_CUTOFF))
+        def init_from_list_w(self, w_list, list_w):
+            columns = new_columns(len(list_w))
+            for w_item in list_w:
+                self._append_unwrapped(columns, w_item)
+            w_list.lstorage = self.erase(columns)
+
+        def clone(self, w_list):
+            storage = self.getstorage_copy(w_list)
+            return W_ListObject.from_storage_and_strategy(
+                    self.space, storage, self)
+
+        def copy_into(self, w_list, w_other):
+            w_other.strategy = self
+            w_other.lstorage = self.getstorage_copy(w_list)
+
+        def getstorage_copy(self, w_list):
+            columns = self.unerase(w_list.lstorage)
+            return self.erase(copy_columns(columns, 0, len(columns.col0)))
+
+        def _resize_hint(self, w_list, hint):
+            columns = self.unerase(w_list.lstorage)
+            for i, kind, name in iter_cols:
+                resizelist_hint(getattr(columns, name), hint)
+
+        def find(self, w_list, w_obj, start, stop):
+            if not self.is_correct_type(w_obj):
+                return ListStrategy.find(self, w_list, w_obj, start, stop)
+            columns = self.unerase(w_list.lstorage)
+            search = new_columns(1)
+            self._append_unwrapped(search, w_obj)
+            for index in range(start, min(stop, len(columns.col0))):
+                if self._items_equal(columns, index, search, 0):
+                    return index
+            raise ValueError
+
+        def length(self, w_list):
+            return len(self.unerase(w_list.lstorage).col0)
+
+        def getitem(self, w_list, index):
+            columns = self.unerase(w_list.lstorage)
+            length = len(columns.col0)
+            if index < 0:
+                index += length
+            if not 0 <= index < length:
+                raise IndexError
+            return self._wrap_item(columns, index)
+
+        def getslice(self, w_list, start, stop, step, length):
+            columns = self.unerase(w_list.lstorage)
+            if step == 1 and 0 <= start <= stop:
+                res = copy_columns(columns, start, stop)
+            else:
+                res = new_columns(length)
+                for i, kind, name in iter_cols:
+                    col = getattr(columns, name)
+                    newcol = getattr(res, name)
+                    index = start
+                    for j in range(length):
+                        newcol.append(col[index])
+                        index += step
+            return W_ListObject.from_storage_and_strategy(
+                    self.space, self.erase(res), self)
+
+        @jit.look_inside_iff(lambda self, w_list:
+                jit.loop_unrolling_heuristic(w_list, w_list.length(),
+                                             UNROLL_CUTOFF))
+        def getitems_copy(self, w_list):
+            columns = self.unerase(w_list.lstorage)
+            return [self._wrap_item(columns, index)
+                    for index in range(len(columns.col0))]
+
+        @jit.unroll_safe
+        def getitems_unroll(self, w_list):
+            columns = self.unerase(w_list.lstorage)
+            return [self._wrap_item(columns, index)
+                    for index in range(len(columns.col0))]
+
+        @jit.look_inside_iff(lambda self, w_list:
+                jit.loop_unrolling_heuristic(w_list, w_list.length(),
+                                             UNROLL_CUTOFF))
+        def getitems_fixedsize(self, w_list):
+            return self.getitems_unroll(w_list)
+
+        def append(self, w_list, w_item):
+            if self.is_correct_type(w_item):
+                self._append_unwrapped(self.unerase(w_list.lstorage), w_item)
+                return
+            w_list.switch_to_object_strategy()
+            w_list.append(w_item)
+
+        def insert(self, w_list, index, w_item):
+            if self.is_correct_type(w_item):
+                columns = self.unerase(w_list.lstorage)
+                space = self.space
+                assert isinstance(w_item, W_AbstractTupleObject)
+                for i, kind, name in iter_cols:
+                    w_value = w_item.getitem(space, i)
+                    if kind == 'i':
+                        getattr(columns, name).insert(index,
+                                                      space.int_w(w_value))
+                    else:
+                        getattr(columns, name).insert(index,
+                                                      space.float_w(w_value))
+                return
+            w_list.switch_to_object_strategy()
+            w_list.insert(index, w_item)
+
+        def setitem(self, w_list, index, w_item):
+            columns = self.unerase(w_list.lstorage)
+            length = len(columns.col0)
+            if index < 0:
+                index += length
+            if not 0 <= index < length:
+                raise IndexError
+            if self.is_correct_type(w_item):
+                self._set_unwrapped(columns, index, w_item)
+                return
+            w_list.switch_to_object_strategy()
+            w_list.setitem(index, w_item)
+
+        def _extend_from_list(self, w_list, w_other):
+            columns = self.unerase(w_list.lstorage)
+            if w_other.strategy is self:
+                other = self.unerase(w_other.lstorage)
+                for i, kind, name in iter_cols:
+                    col = getattr(columns, name)
+                    col += getattr(other, name)
+                return
+            elif w_other.strategy.is_empty_strategy():
+                return
+            items_w = w_other.getitems()
+            for w_item in items_w:
+                if not self.is_correct_type(w_item):
+                    break
+            else:
+                for w_item in items_w:
+                    self._append_unwrapped(columns, w_item)
+                return
+            w_other = w_other._temporarily_as_objects()
+            w_list.switch_to_object_strategy()
+            w_list.extend(w_other)
+
+        def setslice(self, w_list, start, step, slicelength, w_other):
+            if step == 1 and start >= 0:
+                if w_other.length() == 0:
+                    self.deleteslice(w_list, start, 1, slicelength)
+                    return
+                if w_other.strategy is self:
+                    columns = self.unerase(w_list.lstorage)
+                    other = self.unerase(w_other.lstorage)
+                    assert start >= 0
+                    stop = start + slicelength
+                    assert stop >= 0
+                    for i, kind, name in iter_cols:
+                        col = getattr(columns, name)
+                        setattr(columns, name, col[:start] +
+                                getattr(other, name) + col[stop:])
+                    return
+            w_list.switch_to_object_strategy()
+            w_list.setslice(start, step, slicelength, w_other)
+
+        def deleteslice(self, w_list, start, step, slicelength):
+            if slicelength == 0:
+                return
+            if step < 0:
+                start = start + step * (slicelength - 1)
+                step = -step
+            if step == 1:
+                assert start >= 0
+                stop = start + slicelength
+                assert stop >= 0
+                columns = self.unerase(w_list.lstorage)
+                for i, kind, name in iter_cols:
+                    del getattr(columns, name)[start:stop]
+                return
+            w_list.switch_to_object_strategy()
+            w_list.deleteslice(start, step, slicelength)
+
+        def pop(self, w_list, index):
+            columns = self.unerase(w_list.lstorage)
+            if not 0 <= index < len(columns.col0):
+                raise IndexError
+            w_item = self._wrap_item(columns, index)
+            for i, kind, name in iter_cols:
+                getattr(columns, name).pop(index)
+            return w_item
+
+        def pop_end(self, w_list):
+            return self.pop(w_list, self.length(w_list) - 1)
+
+        def mul(self, w_list, times):
+            columns = self.unerase(w_list.lstorage)
+            res = Columns()
+            for i, kind, name in iter_cols:
+                setattr(res, name, getattr(columns, name) * times)
+            return W_ListObject.from_storage_and_strategy(
+                    self.space, self.erase(res), self)
+
+        def inplace_mul(self, w_list, times):
+            columns = self.unerase(w_list.lstorage)
+            for i, kind, name in iter_cols:
+                col = getattr(columns, name)
+                col *= times
+
+        def reverse(self, w_list):
+            columns = self.unerase(w_list.lstorage)
+            for i, kind, name in iter_cols:
+                getattr(columns, name).reverse()
+
+        def sort(self, w_list, reverse):
+            self._sort_by_column(w_list, -1, reverse)
+
+        def sort_with_key(self, w_list, w_key, reverse):
+            # sort(key=itemgetter(n)) only compares the unboxed column n
+            from pypy.module.operator.interp_operator import W_ItemGetter
+            if not isinstance(w_key, W_ItemGetter):
+                return False
+            w_index = w_key.get_single_item()
+            if w_index is None or type(w_index) is not W_IntObject:
+                return False
+            index = self.space.int_w(w_index)
+            if index < 0:
+                index += ncols
+            if not 0 <= index < ncols:
+                return False
+            self._sort_by_column(w_list, index, reverse)
+            return True
+
+        def _sort_by_column(self, w_list, keycolumn, reverse):
+            columns = self.unerase(w_list.lstorage)
+            length = len(columns.col0)
+            permutation = [0] * length
+            for i in range(length):
+                permutation[i] = i
+            sorter = ColumnSort(permutation, length)
+            sorter.columns = columns
+            sorter.keycolumn = keycolumn
+            # Reverse sort stability achieved by initially reversing the list,
+            # applying a stable forward sort, then reversing the final result.
+            if reverse:
+                permutation.reverse()
+            sorter.sort()
+            if reverse:
+                permutation.reverse()
+            for i, kind, name in iter_cols:
+                col = getattr(columns, name)
+                setattr(columns, name, [col[j] for j in permutation])
+
+    TupleListStrategy.__name__ = 'TupleListStrategy_' + kinds
+    return TupleListStrategy
+
+
+IntIntListStrategy = make_tuple_list_strategy('ii')
+FloatFloatListStrategy = make_tuple_list_strategy('ff')
+IntFloatListStrategy = make_tuple_list_strategy('if')
+FloatIntListStrategy = make_tuple_list_strategy('fi')
+IntIntIntListStrategy = make_tuple_list_strategy('iii')
+FloatFloatFloatListStrategy = make_tuple_list_strategy('fff')
+
+all_strategies = unrolling_iterable([
+    IntIntListStrategy, FloatFloatListStrategy, IntFloatListStrategy,
+    FloatIntListStrategy, IntIntIntListStrategy, FloatFloatFloatListStrategy])
+
+
+def find_tuple_list_strategy(space, w_item):
+    """Return the strategy to use for an empty list that gets w_item stored
+    in it, or None if w_item is not a tuple with a specialized strategy."""
+    if not _is_plain_tuple(space, w_item):
+        return None
+    for cls in all_strategies:
+        strategy = space.fromcache(cls)
+        if strategy.is_correct_type(w_item):
+            return strategy
+    return None
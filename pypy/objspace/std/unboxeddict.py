@@ -0,0 +1,320 @@
+## ----------------------------------------------------------------------------
+## dict strategies with unboxed values (see dictmultiobject.py)
+##
+## These strategies are used for dicts like {int: float} or {str: int}, as
+## typically built by counters and accumulators.  The values are stored
+## directly in the RPython dict instead of as separate W_IntObject or
+## W_FloatObject instances.  As soon as a value of another type is stored,
+## the dict switches to the corresponding strategy with boxed values
+## (e.g. IntDictStrategy); as soon as a key of another type is used, it
+## switches to ObjectDictStrategy, like the other typed strategies.
+
+from rpython.rlib import jit, rerased
+
+from pypy.objspace.std.dictmultiobject import (
+    AbstractTypedStrategy, BytesDictStrategy, DictStrategy, IntDictStrategy,
+    ObjectDictStrategy, _never_equal_to_string, create_iterator_classes,
+    w_dict_unrolling_heuristic)
+from pypy.objspace.std.floatobject import W_FloatObject
+from pypy.objspace.std.intobject import W_IntObject
+
+
+def find_unboxed_value_strategy(space, w_key, w_value):
+    """Return the strategy to use for an empty dict that gets the item
+    (w_key, w_value) stored in it, or None if there is no strategy with
+    unboxed values for this combination of types."""
+    if type(w_key) is space.StringObjectCls:
+        if type(w_value) is W_IntObject:
+            return space.fromcache(BytesIntDictStrategy)
+        elif type(w_value) is W_FloatObject:
+            return space.fromcache(BytesFloatDictStrategy)
+    elif type(w_key) is W_IntObject:
+        if type(w_value) is W_IntObject:
+            return space.fromcache(IntIntDictStrategy)
+        elif type(w_value) is W_FloatObject:
+            return space.fromcache(IntFloatDictStrategy)
+    return None
+
+
+class AbstractUnboxedValueStrategy(AbstractTypedStrategy):
+    """Common logic for the strategies storing unboxed values.  Subclasses
+    provide the key handling (see IntKeyMixin and BytesKeyMixin) and the
+    value handling (see IntValueMixin and FloatValueMixin)."""
+    _mixin_ = True
+
+    def get_boxed_strategy(self):
+        # the strategy with the same key type and boxed values
+        raise NotImplementedError("abstract base class")
+
+    def is_correct_value(self, w_value):
+        raise NotImplementedError("abstract base class")
+
+    def wrap_value(self, value):
+        raise NotImplementedError("abstract base class")
+
+    def unwrap_value(self, w_value):
+        raise NotImplementedError("abstract base class")
+
+    def get_empty_storage(self):
+        return self.erase({})
+
+    def setitem(self, w_dict, w_key, w_value):
+        if self.is_correct_type(w_key):
+            if self.is_correct_value(w_value):
+                d = self.unerase(w_dict.dstorage)
+                d[self.unwrap(w_key)] = self.unwrap_value(w_value)
+                return
+            self.switch_to_boxed_strategy(w_dict)
+        else:
+            self.switch_to_object_strategy(w_dict)
+        w_dict.setitem(w_key, w_value)
+
+    def setdefault(self, w_dict, w_key, w_default):
+        if self.is_correct_type(w_key):
+            key = self.unwrap(w_key)
+            d = self.unerase(w_dict.dstorage)
+            if key in d:
+                return self.wrap_value(d[key])
+            if self.is_correct_value(w_default):
+                d[key] = self.unwrap_value(w_default)
+                return w_default
+            self.switch_to_boxed_strategy(w_dict)
+        else:
+            self.switch_to_object_strategy(w_dict)
+        return w_dict.setdefault(w_key, w_default)
+
+    def getitem_typed(self, w_dict, w_key):
+        space = self.space
+        if self.is_correct_type(w_key):
+            d = self.unerase(w_dict.dstorage)
+            try:
+                value = d[self.unwrap(w_key)]
+            except KeyError:
+                return None
+            return self.wrap_value(value)
+        elif self._never_equal_to(space.type(w_key)):
+            return None
+        else:
+            self.switch_to_object_strategy(w_dict)
+            return w_dict.getitem(w_key)
+
+    getitem = getitem_typed
+
+    def values(self, w_dict):
+        return [self.wrap_value(value)
+                for value in self.unerase(w_dict.dstorage).itervalues()]
+
+    def items(self, w_dict):
+        space = self.space
+        d = self.unerase(w_dict.dstorage)
+        return [space.newtuple([self.wrap(key), self.wrap_value(value)])
+                for (key, value) in d.iteritems()]
+
+    def popitem(self, w_dict):
+        key, value = self.unerase(w_dict.dstorage).popitem()
+        return (self.wrap(key), self.wrap_value(value))
+
+    def pop(self, w_dict, w_key, w_default):
+        space = self.space
+        if self.is_correct_type(w_key):
+            key = self.unwrap(w_key)
+            d = self.unerase(w_dict.dstorage)
+            if w_default is None:
+                return self.wrap_value(d.pop(key))
+            try:
+                value = d.pop(key)
+            except KeyError:
+                return w_default
+            return self.wrap_value(value)
+        elif self._never_equal_to(space.type(w_key)):
+            if w_default is not None:
+                return w_default
+            raise KeyError
+        else:
+            self.switch_to_object_strategy(w_dict)
+            return w_dict.get_strategy().pop(w_dict, w_key, w_default)
+
+    def switch_to_boxed_strategy(self, w_dict):
+        d = self.unerase(w_dict.dstorage)
+        strategy = self.get_boxed_strategy()
+        d_new = strategy.unerase(strategy.get_empty_storage())
+        for key, value in d.iteritems():
+            d_new[key] = self.wrap_value(value)
+        w_dict.set_strategy(strategy)
+        w_dict.dstorage = strategy.erase(d_new)
+
+    def switch_to_object_strategy(self, w_dict):
+        d = self.unerase(w_dict.dstorage)
+        strategy = self.space.fromcache(ObjectDictStrategy)
+        d_new = strategy.unerase(strategy.get_empty_storage())
+        for key, value in d.iteritems():
+            d_new[self.wrap(key)] = self.wrap_value(value)
+        w_dict.set_strategy(strategy)
+        w_dict.dstorage = strategy.erase(d_new)
+
+
+class IntKeyMixin(object):
+    _mixin_ = True
+
+    def get_boxed_strategy(self):
+        return self.space.fromcache(IntDictStrategy)
+
+    def wrap(self, unwrapped):
+        return self.space.newint(unwrapped)
+
+    def unwrap(self, wrapped):
+        return self.space.int_w(wrapped)
+
+    def is_correct_type(self, w_obj):
+        space = self.space
+        return space.is_w(space.type(w_obj), space.w_int)
+
+    def _never_equal_to(self, w_lookup_type):
+        space = self.space
+        return (space.is_w(w_lookup_type, space.w_NoneType) or
+                space.is_w(w_lookup_type, space.w_bytes) or
+                space.is_w(w_lookup_type, space.w_unicode)
+                )
+
+    def listview_int(self, w_dict):
+        return self.unerase(w_dict.dstorage).keys()
+
+    def wrapkey(space, key):
+        return space.newint(key)
+
+    def w_keys(self, w_dict):
+        return self.space.newlist_int(self.listview_int(w_dict))
+
+
+class BytesKeyMixin(object):
+    _mixin_ = True
+
+    def get_boxed_strategy(self):
+        return self.space.fromcache(BytesDictStrategy)
+
+    def wrap(self, unwrapped):
+        return self.space.newbytes(unwrapped)
+
+    def unwrap(self, wrapped):
+        return self.space.bytes_w(wrapped)
+
+    def is_correct_type(self, w_obj):
+        space = self.space
+        return space.is_w(space.type(w_obj), space.w_bytes)
+
+    def _never_equal_to(self, w_lookup_type):
+        return _never_equal_to_string(self.space, w_lookup_type)
+
+    def setitem_str(self, w_dict, key, w_value):
+        assert key is not None
+        if self.is_correct_value(w_value):
+            self.unerase(w_dict.dstorage)[key] = self.unwrap_value(w_value)
+        else:
+            self.switch_to_boxed_strategy(w_dict)
+            w_dict.setitem_str(key, w_value)
+
+    def getitem(self, w_dict, w_key):
+        space = self.space
+        # -- This is called extremely often.  Hack for performance --
+        if type(w_key) is space.StringObjectCls:
+            return self.getitem_str(w_dict, w_key.unwrap(space))
+        # -- End of performance hack --
+        return self.getitem_typed(w_dict, w_key)
+
+    def getitem_str(self, w_dict, key):
+        assert key is not None
+        try:
+            value = self.unerase(w_dict.dstorage)[key]
+        except KeyError:
+            return None
+        return self.wrap_value(value)
+
+    def listview_bytes(self, w_dict):
+        return self.unerase(w_dict.dstorage).keys()
+
+    def wrapkey(space, key):
+        return space.newbytes(key)
+
+    def w_keys(self, w_dict):
+        return self.space.newlist_bytes(self.listview_bytes(w_dict))
+
+    @jit.look_inside_iff(lambda self, w_dict:
+                         w_dict_unrolling_heuristic(w_dict))
+    def view_as_kwargs(self, w_dict):
+        d = self.unerase(w_dict.dstorage)
+        l = len(d)
+        keys, values = [None] * l, [None] * l
+        i = 0
+        for key, value in d.iteritems():
+            keys[i] = key
+            values[i] = self.wrap_value(value)
+            i += 1
+        return keys, values
+
+
+class IntValueMixin(object):
+    _mixin_ = True
+
+    def is_correct_value(self, w_value):
+        return type(w_value) is W_IntObject
+
+    def wrap_value(self, value):
+        return self.space.newint(value)
+
+    def unwrap_value(self, w_value):
+        return self.space.int_w(w_value)
+
+    def wrapvalue(space, value):
+        return space.newint(value)
+
+
+class FloatValueMixin(object):
+    _mixin_ = True
+
+    def is_correct_value(self, w_value):
+        return type(w_value) is W_FloatObject
+
+    def wrap_value(self, value):
+        return self.space.newfloat(value)
+
+    def unwrap_value(self, w_value):
+        return self.space.float_w(w_value)
+
+    def wrapvalue(space, value):
+        return space.newfloat(value)
+
+
+class IntIntDictStrategy(IntKeyMixin, IntValueMixin,
+                         AbstractUnboxedValueStrategy, DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("int_int")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+create_iterator_classes(IntIntDictStrategy)
+
+
+class IntFloatDictStrategy(IntKeyMixin, FloatValueMixin,
+                           AbstractUnboxedValueStrategy, DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("int_float")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+create_iterator_classes(IntFloatDictStrategy)
+
+
+class BytesIntDictStrategy(BytesKeyMixin, IntValueMixin,
+                           AbstractUnboxedValueStrategy, DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("bytes_int")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+create_iterator_classes(BytesIntDictStrategy)
+
+
+class BytesFloatDictStrategy(BytesKeyMixin, FloatValueMixin,
+                             AbstractUnboxedValueStrategy, DictStrategy):
+    erase, unerase = rerased.new_erasing_pair("bytes_float")
+    erase = staticmethod(erase)
+    unerase = staticmethod(unerase)
+
+create_iterator_classes(BytesFloatDictStrategy)
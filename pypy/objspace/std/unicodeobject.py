@@ -1,5 +1,9 @@
 """The builtin unicode implementation"""
 
+import inspect
+
+import py
+
 from rpython.rlib.objectmodel import (
     compute_hash, compute_unique_id, import_from_mixin,
     enforceargs)
@@ -12,44 +16,28 @@ from rpython.rlib.runicode import (
 from pypy.interpreter import unicodehelper
 from pypy.interpreter.baseobjspace import W_Root
 from pypy.interpreter.error import OperationError, oefmt
-from pypy.interpreter.gateway import WrappedDefault, interp2app, unwrap_spec
+from pypy.interpreter.gateway import (
+    WrappedDefault, interp2app, interpindirect2app, unwrap_spec)
 from pypy.interpreter.typedef import TypeDef
 from pypy.module.unicodedata import unicodedb
 from pypy.objspace.std import newformat
 from pypy.objspace.std.basestringtype import basestring_typedef
 from pypy.objspace.std.formatting import mod_format
 from pypy.objspace.std.stringmethods import StringMethods
-from pypy.objspace.std.util import IDTAG_SPECIAL, IDTAG_SHIFT
+from pypy.objspace.std.util import (
+    IDTAG_SPECIAL, IDTAG_SHIFT, is_worth_a_slice_view)
 
-__all__ = ['W_UnicodeObject', 'wrapunicode', 'plain_str2unicode',
-           'encode_object', 'decode_object', 'unicode_from_object',
-           'unicode_from_string', 'unicode_to_decimal_w']
+__all__ = ['W_AbstractUnicodeObject', 'W_UnicodeObject', 'wrapunicode',
+           'plain_str2unicode', 'encode_object', 'decode_object',
+           'unicode_from_object', 'unicode_from_string',
+           'unicode_to_decimal_w']
 
 
-class W_UnicodeObject(W_Root):
-    import_from_mixin(StringMethods)
-    _immutable_fields_ = ['_value']
-
-    @enforceargs(uni=unicode)
-    def __init__(self, unistr):
-        assert isinstance(unistr, unicode)
-        self._value = unistr
-
-    def __repr__(self):
-        """representation for debugging purposes"""
-        return "%s(%r)" % (self.__class__.__name__, self._value)
-
-    def unwrap(self, space):
-        # for testing
-        return self._value
-
-    def create_if_subclassed(self):
-        if type(self) is W_UnicodeObject:
-            return self
-        return W_UnicodeObject(self._value)
+class W_AbstractUnicodeObject(W_Root):
+    __slots__ = ()
 
     def is_w(self, space, w_other):
-        if not isinstance(w_other, W_UnicodeObject):
+        if not isinstance(w_other, W_AbstractUnicodeObject):
             return False
         if self is w_other:
             return True
@@ -76,6 +64,29 @@ class W_UnicodeObject(W_Root):
             uid = (base << IDTAG_SHIFT) | IDTAG_SPECIAL
         return space.newint(uid)
 
+
+class W_UnicodeObject(W_AbstractUnicodeObject):
+    import_from_mixin(StringMethods)
+    _immutable_fields_ = ['_value']
+
+    @enforceargs(uni=unicode)
+    def __init__(self, unistr):
+        assert isinstance(unistr, unicode)
+        self._value = unistr
+
+    def __repr__(self):
+        """representation for debugging purposes"""
+        return "%s(%r)" % (self.__class__.__name__, self._value)
+
+    def unwrap(self, space):
+        # for testing
+        return self._value
+
+    def create_if_subclassed(self):
+        if type(self) is W_UnicodeObject:
+            return self
+        return W_UnicodeObject(self._value)
+
     def str_w(self, space):
         return space.text_w(space.str(self))
 
@@ -114,6 +125,14 @@ class W_UnicodeObject(W_Root):
     def _empty(self):
         return W_UnicodeObject.EMPTY
 
+    _StringMethods__sliced = _sliced
+    def _sliced(self, space, s, start, stop, orig_obj):
+        if (space.config.objspace.std.withsliceviews and
+                is_worth_a_slice_view(stop - start, len(s))):
+            from pypy.objspace.std.strsliceobject import W_UnicodeSliceObject
+            return W_UnicodeSliceObject(s, start, stop)
+        return self._StringMethods__sliced(space, s, start, stop, orig_obj)
+
     def _len(self):
         return len(self._value)
 
@@ -129,6 +148,9 @@ class W_UnicodeObject(W_Root):
     def _op_val(space, w_other, strict=None):
         if isinstance(w_other, W_UnicodeObject):
             return w_other._value
+        if isinstance(w_other, W_AbstractUnicodeObject):
+            # a W_UnicodeBufferObject or a W_UnicodeSliceObject
+            return space.unicode_w(w_other)
         if space.isinstance_w(w_other, space.w_bytes):
             return unicode_from_string(space, w_other)._value
         if strict:
@@ -220,9 +242,8 @@ class W_UnicodeObject(W_Root):
             if space.is_w(w_unicodetype, space.w_unicode):
                 return w_value
 
-        assert isinstance(w_value, W_UnicodeObject)
         w_newobj = space.allocate_instance(W_UnicodeObject, w_unicodetype)
-        W_UnicodeObject.__init__(w_newobj, w_value._value)
+        W_UnicodeObject.__init__(w_newobj, space.unicode_w(w_value))
         return w_newobj
 
     def descr_repr(self, space):
@@ -306,6 +327,22 @@ class W_UnicodeObject(W_Root):
             raise
         return space.newbool(res)
 
+    _StringMethods_descr_add = descr_add
+    def descr_add(self, space, w_other):
+        if space.config.objspace.std.withstrbuf:
+            from pypy.objspace.std.strbufobject import W_UnicodeBufferObject
+            try:
+                other = self._op_val(space, w_other)
+            except OperationError as e:
+                if e.match(space, space.w_TypeError):
+                    return space.w_NotImplemented
+                raise
+            builder = UnicodeBuilder()
+            builder.append(self._value)
+            builder.append(other)
+            return W_UnicodeBufferObject(builder)
+        return self._StringMethods_descr_add(space, w_other)
+
     def descr_format(self, space, __args__):
         return newformat.format_method(space, self, __args__, is_unicode=True)
 
@@ -529,8 +566,17 @@ def unicode_from_encoded_object(space, w_obj, encoding, errors):
         raise oefmt(space.w_TypeError,
                     "decoder did not return an unicode object (type '%T')",
                     w_retval)
-    assert isinstance(w_retval, W_UnicodeObject)
-    return w_retval
+    return _force_unicode(space, w_retval)
+
+
+def _force_unicode(space, w_obj):
+    # with 'withstrbuf' or 'withsliceviews', the result may also be a
+    # W_UnicodeBufferObject or a W_UnicodeSliceObject: turn it into a
+    # regular W_UnicodeObject
+    if not isinstance(w_obj, W_UnicodeObject):
+        assert isinstance(w_obj, W_AbstractUnicodeObject)
+        return W_UnicodeObject(space.unicode_w(w_obj))
+    return w_obj
 
 
 def unicode_from_object(space, w_obj):
@@ -968,140 +1014,165 @@ class UnicodeDocstrings:
         """
 
 
+def _unicode_method(name, doc=None):
+    """Return the gateway for the method 'name' of unicode objects.  Like
+    the methods of str, it dispatches on the class of 'self', so that it
+    also works on W_UnicodeBufferObject (see strbufobject.py).
+    """
+    func = getattr(W_UnicodeObject, name).im_func
+    args = inspect.getargs(func.func_code)
+    argspec = ', '.join([arg for arg in args.args[1:]])
+    func_code = py.code.Source("""
+    def %(name)s(self, %(args)s):
+        pass
+    """ % {'args': argspec, 'name': name})
+    d = {}
+    exec func_code.compile() in d
+    f = d[name]
+    f.func_defaults = func.func_defaults
+    f.func_doc = doc
+    f.__module__ = func.__module__
+    unwrap_spec_ = getattr(func, 'unwrap_spec', None)
+    if unwrap_spec_ is not None:
+        f = unwrap_spec(**unwrap_spec_)(f)
+    setattr(W_AbstractUnicodeObject, name, f)
+    return interpindirect2app(getattr(W_AbstractUnicodeObject, name))
+
+
 W_UnicodeObject.typedef = TypeDef(
     "unicode", basestring_typedef,
     __new__ = interp2app(W_UnicodeObject.descr_new),
     __doc__ = UnicodeDocstrings.__doc__,
 
-    __repr__ = interp2app(W_UnicodeObject.descr_repr,
-                          doc=UnicodeDocstrings.__repr__.__doc__),
-    __str__ = interp2app(W_UnicodeObject.descr_str,
-                         doc=UnicodeDocstrings.__str__.__doc__),
-    __hash__ = interp2app(W_UnicodeObject.descr_hash,
-                          doc=UnicodeDocstrings.__hash__.__doc__),
-
-    __eq__ = interp2app(W_UnicodeObject.descr_eq,
-                        doc=UnicodeDocstrings.__eq__.__doc__),
-    __ne__ = interp2app(W_UnicodeObject.descr_ne,
-                        doc=UnicodeDocstrings.__ne__.__doc__),
-    __lt__ = interp2app(W_UnicodeObject.descr_lt,
-                        doc=UnicodeDocstrings.__lt__.__doc__),
-    __le__ = interp2app(W_UnicodeObject.descr_le,
-                        doc=UnicodeDocstrings.__le__.__doc__),
-    __gt__ = interp2app(W_UnicodeObject.descr_gt,
-                        doc=UnicodeDocstrings.__gt__.__doc__),
-    __ge__ = interp2app(W_UnicodeObject.descr_ge,
-                        doc=UnicodeDocstrings.__ge__.__doc__),
-
-    __len__ = interp2app(W_UnicodeObject.descr_len,
-                         doc=UnicodeDocstrings.__len__.__doc__),
-    __contains__ = interp2app(W_UnicodeObject.descr_contains,
-                              doc=UnicodeDocstrings.__contains__.__doc__),
-
-    __add__ = interp2app(W_UnicodeObject.descr_add,
-                         doc=UnicodeDocstrings.__add__.__doc__),
-    __mul__ = interp2app(W_UnicodeObject.descr_mul,
-                         doc=UnicodeDocstrings.__mul__.__doc__),
-    __rmul__ = interp2app(W_UnicodeObject.descr_mul,
-                          doc=UnicodeDocstrings.__rmul__.__doc__),
-
-    __getitem__ = interp2app(W_UnicodeObject.descr_getitem,
-                             doc=UnicodeDocstrings.__getitem__.__doc__),
-    __getslice__ = interp2app(W_UnicodeObject.descr_getslice,
-                              doc=UnicodeDocstrings.__getslice__.__doc__),
-
-    capitalize = interp2app(W_UnicodeObject.descr_capitalize,
-                            doc=UnicodeDocstrings.capitalize.__doc__),
-    center = interp2app(W_UnicodeObject.descr_center,
-                        doc=UnicodeDocstrings.center.__doc__),
-    count = interp2app(W_UnicodeObject.descr_count,
-                       doc=UnicodeDocstrings.count.__doc__),
-    decode = interp2app(W_UnicodeObject.descr_decode,
-                        doc=UnicodeDocstrings.decode.__doc__),
-    encode = interp2app(W_UnicodeObject.descr_encode,
-                        doc=UnicodeDocstrings.encode.__doc__),
-    expandtabs = interp2app(W_UnicodeObject.descr_expandtabs,
-                            doc=UnicodeDocstrings.expandtabs.__doc__),
-    find = interp2app(W_UnicodeObject.descr_find,
-                      doc=UnicodeDocstrings.find.__doc__),
-    rfind = interp2app(W_UnicodeObject.descr_rfind,
-                       doc=UnicodeDocstrings.rfind.__doc__),
-    index = interp2app(W_UnicodeObject.descr_index,
-                       doc=UnicodeDocstrings.index.__doc__),
-    rindex = interp2app(W_UnicodeObject.descr_rindex,
-                        doc=UnicodeDocstrings.rindex.__doc__),
-    isalnum = interp2app(W_UnicodeObject.descr_isalnum,
-                         doc=UnicodeDocstrings.isalnum.__doc__),
-    isalpha = interp2app(W_UnicodeObject.descr_isalpha,
-                         doc=UnicodeDocstrings.isalpha.__doc__),
-    isdecimal = interp2app(W_UnicodeObject.descr_isdecimal,
-                           doc=UnicodeDocstrings.isdecimal.__doc__),
-    isdigit = interp2app(W_UnicodeObject.descr_isdigit,
-                         doc=UnicodeDocstrings.isdigit.__doc__),
-    islower = interp2app(W_UnicodeObject.descr_islower,
-                         doc=UnicodeDocstrings.islower.__doc__),
-    isnumeric = interp2app(W_UnicodeObject.descr_isnumeric,
-                           doc=UnicodeDocstrings.isnumeric.__doc__),
-    isspace = interp2app(W_UnicodeObject.descr_isspace,
-                         doc=UnicodeDocstrings.isspace.__doc__),
-    istitle = interp2app(W_UnicodeObject.descr_istitle,
-                         doc=UnicodeDocstrings.istitle.__doc__),
-    isupper = interp2app(W_UnicodeObject.descr_isupper,
-                         doc=UnicodeDocstrings.isupper.__doc__),
-    join = interp2app(W_UnicodeObject.descr_join,
-                      doc=UnicodeDocstrings.join.__doc__),
-    ljust = interp2app(W_UnicodeObject.descr_ljust,
-                       doc=UnicodeDocstrings.ljust.__doc__),
-    rjust = interp2app(W_UnicodeObject.descr_rjust,
-                       doc=UnicodeDocstrings.rjust.__doc__),
-    lower = interp2app(W_UnicodeObject.descr_lower,
-                       doc=UnicodeDocstrings.lower.__doc__),
-    partition = interp2app(W_UnicodeObject.descr_partition,
-                           doc=UnicodeDocstrings.partition.__doc__),
-    rpartition = interp2app(W_UnicodeObject.descr_rpartition,
-                            doc=UnicodeDocstrings.rpartition.__doc__),
-    replace = interp2app(W_UnicodeObject.descr_replace,
-                         doc=UnicodeDocstrings.replace.__doc__),
-    split = interp2app(W_UnicodeObject.descr_split,
-                       doc=UnicodeDocstrings.split.__doc__),
-    rsplit = interp2app(W_UnicodeObject.descr_rsplit,
-                        doc=UnicodeDocstrings.rsplit.__doc__),
-    splitlines = interp2app(W_UnicodeObject.descr_splitlines,
-                            doc=UnicodeDocstrings.splitlines.__doc__),
-    startswith = interp2app(W_UnicodeObject.descr_startswith,
-                            doc=UnicodeDocstrings.startswith.__doc__),
-    endswith = interp2app(W_UnicodeObject.descr_endswith,
-                          doc=UnicodeDocstrings.endswith.__doc__),
-    strip = interp2app(W_UnicodeObject.descr_strip,
-                       doc=UnicodeDocstrings.strip.__doc__),
-    lstrip = interp2app(W_UnicodeObject.descr_lstrip,
-                        doc=UnicodeDocstrings.lstrip.__doc__),
-    rstrip = interp2app(W_UnicodeObject.descr_rstrip,
-                        doc=UnicodeDocstrings.rstrip.__doc__),
-    swapcase = interp2app(W_UnicodeObject.descr_swapcase,
-                          doc=UnicodeDocstrings.swapcase.__doc__),
-    title = interp2app(W_UnicodeObject.descr_title,
-                       doc=UnicodeDocstrings.title.__doc__),
-    translate = interp2app(W_UnicodeObject.descr_translate,
-                           doc=UnicodeDocstrings.translate.__doc__),
-    upper = interp2app(W_UnicodeObject.descr_upper,
-                       doc=UnicodeDocstrings.upper.__doc__),
-    zfill = interp2app(W_UnicodeObject.descr_zfill,
-                       doc=UnicodeDocstrings.zfill.__doc__),
-
-    format = interp2app(W_UnicodeObject.descr_format,
-                        doc=UnicodeDocstrings.format.__doc__),
-    __format__ = interp2app(W_UnicodeObject.descr__format__,
-                            doc=UnicodeDocstrings.__format__.__doc__),
-    __mod__ = interp2app(W_UnicodeObject.descr_mod,
-                         doc=UnicodeDocstrings.__mod__.__doc__),
-    __rmod__ = interp2app(W_UnicodeObject.descr_rmod,
-                         doc=UnicodeDocstrings.__rmod__.__doc__),
-    __getnewargs__ = interp2app(W_UnicodeObject.descr_getnewargs,
-                                doc=UnicodeDocstrings.__getnewargs__.__doc__),
-    _formatter_parser = interp2app(W_UnicodeObject.descr_formatter_parser),
+    __repr__ = _unicode_method('descr_repr',
+                               doc=UnicodeDocstrings.__repr__.__doc__),
+    __str__ = _unicode_method('descr_str',
+                              doc=UnicodeDocstrings.__str__.__doc__),
+    __hash__ = _unicode_method('descr_hash',
+                               doc=UnicodeDocstrings.__hash__.__doc__),
+
+    __eq__ = _unicode_method('descr_eq',
+                             doc=UnicodeDocstrings.__eq__.__doc__),
+    __ne__ = _unicode_method('descr_ne',
+                             doc=UnicodeDocstrings.__ne__.__doc__),
+    __lt__ = _unicode_method('descr_lt',
+                             doc=UnicodeDocstrings.__lt__.__doc__),
+    __le__ = _unicode_method('descr_le',
+                             doc=UnicodeDocstrings.__le__.__doc__),
+    __gt__ = _unicode_method('descr_gt',
+                             doc=UnicodeDocstrings.__gt__.__doc__),
+    __ge__ = _unicode_method('descr_ge',
+                             doc=UnicodeDocstrings.__ge__.__doc__),
+
+    __len__ = _unicode_method('descr_len',
+                              doc=UnicodeDocstrings.__len__.__doc__),
+    __contains__ = _unicode_method('descr_contains',
+                                   doc=UnicodeDocstrings.__contains__.__doc__),
+
+    __add__ = _unicode_method('descr_add',
+                              doc=UnicodeDocstrings.__add__.__doc__),
+    __mul__ = _unicode_method('descr_mul',
+                              doc=UnicodeDocstrings.__mul__.__doc__),
+    __rmul__ = _unicode_method('descr_rmul',
+                               doc=UnicodeDocstrings.__rmul__.__doc__),
+
+    __getitem__ = _unicode_method('descr_getitem',
+                                  doc=UnicodeDocstrings.__getitem__.__doc__),
+    __getslice__ = _unicode_method('descr_getslice',
+                                   doc=UnicodeDocstrings.__getslice__.__doc__),
+
+    capitalize = _unicode_method('descr_capitalize',
+                                 doc=UnicodeDocstrings.capitalize.__doc__),
+    center = _unicode_method('descr_center',
+                             doc=UnicodeDocstrings.center.__doc__),
+    count = _unicode_method('descr_count',
+                            doc=UnicodeDocstrings.count.__doc__),
+    decode = _unicode_method('descr_decode',
+                             doc=UnicodeDocstrings.decode.__doc__),
+    encode = _unicode_method('descr_encode',
+                             doc=UnicodeDocstrings.encode.__doc__),
+    expandtabs = _unicode_method('descr_expandtabs',
+                                 doc=UnicodeDocstrings.expandtabs.__doc__),
+    find = _unicode_method('descr_find',
+                           doc=UnicodeDocstrings.find.__doc__),
+    rfind = _unicode_method('descr_rfind',
+                            doc=UnicodeDocstrings.rfind.__doc__),
+    index = _unicode_method('descr_index',
+                            doc=UnicodeDocstrings.index.__doc__),
+    rindex = _unicode_method('descr_rindex',
+                             doc=UnicodeDocstrings.rindex.__doc__),
+    isalnum = _unicode_method('descr_isalnum',
+                              doc=UnicodeDocstrings.isalnum.__doc__),
+    isalpha = _unicode_method('descr_isalpha',
+                              doc=UnicodeDocstrings.isalpha.__doc__),
+    isdecimal = _unicode_method('descr_isdecimal',
+                                doc=UnicodeDocstrings.isdecimal.__doc__),
+    isdigit = _unicode_method('descr_isdigit',
+                              doc=UnicodeDocstrings.isdigit.__doc__),
+    islower = _unicode_method('descr_islower',
+                              doc=UnicodeDocstrings.islower.__doc__),
+    isnumeric = _unicode_method('descr_isnumeric',
+                                doc=UnicodeDocstrings.isnumeric.__doc__),
+    isspace = _unicode_method('descr_isspace',
+                              doc=UnicodeDocstrings.isspace.__doc__),
+    istitle = _unicode_method('descr_istitle',
+                              doc=UnicodeDocstrings.istitle.__doc__),
+    isupper = _unicode_method('descr_isupper',
+                              doc=UnicodeDocstrings.isupper.__doc__),
+    join = _unicode_method('descr_join',
+                           doc=UnicodeDocstrings.join.__doc__),
+    ljust = _unicode_method('descr_ljust',
+                            doc=UnicodeDocstrings.ljust.__doc__),
+    rjust = _unicode_method('descr_rjust',
+                            doc=UnicodeDocstrings.rjust.__doc__),
+    lower = _unicode_method('descr_lower',
+                            doc=UnicodeDocstrings.lower.__doc__),
+    partition = _unicode_method('descr_partition',
+                                doc=UnicodeDocstrings.partition.__doc__),
+    rpartition = _unicode_method('descr_rpartition',
+                                 doc=UnicodeDocstrings.rpartition.__doc__),
+    replace = _unicode_method('descr_replace',
+                              doc=UnicodeDocstrings.replace.__doc__),
+    split = _unicode_method('descr_split',
+                            doc=UnicodeDocstrings.split.__doc__),
+    rsplit = _unicode_method('descr_rsplit',
+                             doc=UnicodeDocstrings.rsplit.__doc__),
+    splitlines = _unicode_method('descr_splitlines',
+                                 doc=UnicodeDocstrings.splitlines.__doc__),
+    startswith = _unicode_method('descr_startswith',
+                                 doc=UnicodeDocstrings.startswith.__doc__),
+    endswith = _unicode_method('descr_endswith',
+                               doc=UnicodeDocstrings.endswith.__doc__),
+    strip = _unicode_method('descr_strip',
+                            doc=UnicodeDocstrings.strip.__doc__),
+    lstrip = _unicode_method('descr_lstrip',
+                             doc=UnicodeDocstrings.lstrip.__doc__),
+    rstrip = _unicode_method('descr_rstrip',
+                             doc=UnicodeDocstrings.rstrip.__doc__),
+    swapcase = _unicode_method('descr_swapcase',
+                               doc=UnicodeDocstrings.swapcase.__doc__),
+    title = _unicode_method('descr_title',
+                            doc=UnicodeDocstrings.title.__doc__),
+    translate = _unicode_method('descr_translate',
+                                doc=UnicodeDocstrings.translate.__doc__),
+    upper = _unicode_method('descr_upper',
+                            doc=UnicodeDocstrings.upper.__doc__),
+    zfill = _unicode_method('descr_zfill',
+                            doc=UnicodeDocstrings.zfill.__doc__),
+
+    format = _unicode_method('descr_format',
+                             doc=UnicodeDocstrings.format.__doc__),
+    __format__ = _unicode_method('descr__format__',
+                                 doc=UnicodeDocstrings.__format__.__doc__),
+    __mod__ = _unicode_method('descr_mod',
+                              doc=UnicodeDocstrings.__mod__.__doc__),
+    __rmod__ = _unicode_method('descr_rmod',
+                               doc=UnicodeDocstrings.__rmod__.__doc__),
+    __getnewargs__ = _unicode_method(
+        'descr_getnewargs', doc=UnicodeDocstrings.__getnewargs__.__doc__),
+    _formatter_parser = _unicode_method('descr_formatter_parser'),
     _formatter_field_name_split =
-        interp2app(W_UnicodeObject.descr_formatter_field_name_split),
+        _unicode_method('descr_formatter_field_name_split'),
 )
 W_UnicodeObject.typedef.flag_sequence_bug_compat = True
 
@@ -1117,9 +1188,9 @@ W_UnicodeObject.EMPTY = W_UnicodeObject(u'')
 
 # Helper for converting int/long
 def unicode_to_decimal_w(space, w_unistr):
-    if not isinstance(w_unistr, W_UnicodeObject):
+    if not isinstance(w_unistr, W_AbstractUnicodeObject):
         raise oefmt(space.w_TypeError, "expected unicode, got '%T'", w_unistr)
-    unistr = w_unistr._value
+    unistr = space.unicode_w(w_unistr)
     result = ['\0'] * len(unistr)
     digits = ['0', '1', '2', '3', '4',
               '5', '6', '7', '8', '9']
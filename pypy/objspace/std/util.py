@@ -16,6 +16,12 @@ IDTAG_SPECIAL = 11    # -1 - (-maxunicode-1): unichar
                       # 258: empty tuple
                       # 259: empty frozenset
 
+# With 'withsliceviews', slices shorter than SLICE_VIEW_MIN_LENGTH are
+# always copied, and a view never keeps alive an object more than
+# SLICE_VIEW_MAX_RATIO times larger than itself.
+SLICE_VIEW_MIN_LENGTH = 64
+SLICE_VIEW_MAX_RATIO = 16
+
 CMP_OPS = dict(lt='<', le='<=', eq='==', ne='!=', gt='>', ge='>=')
 BINARY_BITWISE_OPS = {'and': '&', 'lshift': '<<', 'or': '|', 'rshift': '>>',
                       'xor': '^'}
@@ -39,6 +45,12 @@ def negate(f):
     _negator.func_name = 'negate-%s' % f.func_name
     return _negator
 
+def is_worth_a_slice_view(length, total_length):
+    """Whether a slice of 'length' items out of 'total_length' should be a
+    view rather than a copy (see 'withsliceviews')."""
+    return (length >= SLICE_VIEW_MIN_LENGTH and
+            length >= total_length // SLICE_VIEW_MAX_RATIO)
+
 def get_positive_index(where, length):
     if where < 0:
         where += length
@@ -0,0 +1,86 @@
+#! /usr/bin/env python
+"""
+Micro-benchmark of the overhead of Python-level calls.
+
+Usage: pypy bench_calls.py [-n RUNS] [LOOPS]
+
+Each benchmark makes a few million calls that create a new frame every
+time: plain calls with positional, default and keyword arguments, a method
+call, a closure and recursion.  The best time of all the runs is reported.
+Compare a pypy translated with and without --objspace-framefreelist, also
+with --jit off to see the cost in the interpreter.
+"""
+
+import sys
+import time
+
+def f0():
+    return 1
+
+def f2(a, b):
+    return a
+
+def fdefaults(a, b=2, c=3):
+    return c
+
+class A(object):
+    def method(self, x):
+        return x
+
+def make_closure(n):
+    def inner(x):
+        return x + n
+    return inner
+
+def fib(n):
+    if n < 2:
+        return n
+    return fib(n - 1) + fib(n - 2)
+
+def bench_f0(loops):
+    for i in xrange(loops):
+        f0(); f0(); f0(); f0(); f0()
+
+def bench_f2(loops):
+    for i in xrange(loops):
+        f2(i, 1); f2(i, 2); f2(i, 3); f2(i, 4); f2(i, 5)
+
+def bench_defaults(loops):
+    for i in xrange(loops):
+        fdefaults(i); fdefaults(i, 1); fdefaults(i, c=1)
+        fdefaults(i); fdefaults(i, 1)
+
+def bench_method(loops):
+    a = A()
+    for i in xrange(loops):
+        a.method(i); a.method(i); a.method(i); a.method(i); a.method(i)
+
+def bench_closure(loops):
+    inner = make_closure(5)
+    for i in xrange(loops):
+        inner(i); inner(i); inner(i); inner(i); inner(i)
+
+def bench_recursion(loops):
+    # fib(18) makes 8361 calls: about five calls per loop, like the others
+    for i in xrange(loops // 1672):
+        fib(18)
+
+BENCHMARKS = [bench_f0, bench_f2, bench_defaults, bench_method,
+              bench_closure, bench_recursion]
+
+def main(argv):
+    runs = 5
+    if argv[:1] == ['-n']:
+        runs = int(argv[1])
+        argv = argv[2:]
+    loops = int(argv[0]) if argv else 400000
+    for bench in BENCHMARKS:
+        best = float('inf')
+        for i in range(runs):
+            t0 = time.time()
+            bench(loops)
+            best = min(best, time.time() - t0)
+        print '%-20s %8.3f s' % (bench.__name__[len('bench_'):], best)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
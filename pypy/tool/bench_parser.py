@@ -0,0 +1,88 @@
+#! /usr/bin/env python
+"""
+Benchmark the interpreter-level tokenizer and parser on a tree of Python
+sources, by default the whole of lib-python/2.7.
+
+Usage: bench_parser.py [-n RUNS] [directory...]
+
+For every run, each file is tokenized and then parsed by PythonParser, and
+the best time of all the runs is reported for both steps.  Run it with a
+translated pypy as the host interpreter to get numbers close to the ones of
+import and compile().
+"""
+
+import os
+import sys
+import time
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from pypy.interpreter.pyparser import pyparse, pytokenizer, error
+
+def find_sources(dirnames):
+    result = []
+    for dirname in dirnames:
+        for dirpath, dirnames, filenames in os.walk(dirname):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if filename.endswith('.py'):
+                    result.append(os.path.join(dirpath, filename))
+    return result
+
+def load_sources(filenames):
+    """Read the files and keep the ones the parser accepts, so that the
+    timings are not polluted by error paths (lib-python contains a few files
+    with deliberate syntax errors or exotic encodings)."""
+    sources = []
+    parser = pyparse.PythonParser(None)
+    for filename in filenames:
+        with open(filename, 'rb') as f:
+            source = f.read()
+        if source.startswith('\xEF\xBB\xBF'):
+            # parse_source() strips it, the tokenizer doesn't
+            source = source[3:]
+        info = pyparse.CompileInfo(filename, 'exec')
+        try:
+            parser.parse_source(source, info)
+        except (error.SyntaxError, error.TokenError, AttributeError):
+            # AttributeError: the space is needed to recode the source
+            continue
+        sources.append(source)
+    return sources
+
+def bench(sources, runs):
+    parser = pyparse.PythonParser(None)
+    best_tokenize = best_parse = float('inf')
+    for i in range(runs):
+        t0 = time.time()
+        for source in sources:
+            pytokenizer.generate_tokens(source, 0)
+        t1 = time.time()
+        for source in sources:
+            parser.parse_source(source, pyparse.CompileInfo('<bench>', 'exec'))
+        t2 = time.time()
+        best_tokenize = min(best_tokenize, t1 - t0)
+        best_parse = min(best_parse, t2 - t1)
+    return best_tokenize, best_parse
+
+def main(argv):
+    runs = 3
+    if argv[:1] == ['-n']:
+        runs = int(argv[1])
+        argv = argv[2:]
+    if not argv:
+        from pypy import pypydir
+        argv = [os.path.join(os.path.dirname(pypydir), 'lib-python', '2.7')]
+    sources = load_sources(find_sources(argv))
+    size = sum([len(source) for source in sources])
+    print 'parsing %d files, %d bytes, best of %d runs' % (len(sources), size,
+                                                          runs)
+    tokenize, parse = bench(sources, runs)
+    print 'tokenize:               %8.3f s  %8.2f MB/s' % (
+        tokenize, size / tokenize / 1e6)
+    print 'tokenize + parse:       %8.3f s  %8.2f MB/s' % (
+        parse, size / parse / 1e6)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,107 @@
+#! /usr/bin/env python
+"""
+Micro-benchmark of the superinstructions on code that is not jitted.
+
+Usage: pypy --jit off bench_superinstructions.py [-n RUNS] [LOOPS]
+
+Each benchmark runs a loop whose body is made of the instruction pairs
+that the compiler fuses, LOAD_FAST+LOAD_ATTR and
+COMPARE_OP+POP_JUMP_IF_FALSE.  It is timed twice in the same process:
+once as compiled, and once with the superinstructions turned back into
+the plain first instruction of their pair, which gives the bytecode that
+the compiler produced before.  The best time of all the runs is reported
+for both.
+"""
+
+import sys
+import time
+import opcode
+
+FUSED = {'LOAD_FAST_LOAD_ATTR': 'LOAD_FAST',
+         'COMPARE_OP_POP_JUMP_IF_FALSE': 'COMPARE_OP'}
+
+class Point(object):
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+def bench_load_attr(loops):
+    p = Point(1, 2)
+    t = 0
+    for i in xrange(loops):
+        t = p.x + p.y + p.x + p.y + p.x
+    return t
+
+def bench_compare_jump(loops):
+    t = 0
+    for i in xrange(loops):
+        if i < 0:
+            t += 1
+        if i == -1:
+            t += 1
+        if i > loops:
+            t += 1
+    return t
+
+def bench_mixed(loops):
+    # a typical method body, from the interpreter's point of view
+    p = Point(3, 4)
+    t = 0
+    for i in xrange(loops):
+        x = p.x
+        y = p.y
+        if x < y:
+            t = t + abs(x - y)
+        if t > loops:
+            t = len(p.__dict__)
+    return t
+
+BENCHMARKS = [bench_load_attr, bench_compare_jump, bench_mixed]
+
+def unfuse(func):
+    """Return a copy of 'func' without superinstructions."""
+    co = func.func_code
+    code = list(co.co_code)
+    replace = {}
+    for name, first in FUSED.items():
+        replace[opcode.opmap[name]] = chr(opcode.opmap[first])
+    i = 0
+    while i < len(code):
+        op = ord(code[i])
+        if op in replace:
+            code[i] = replace[op]
+        i += 3 if op >= opcode.HAVE_ARGUMENT else 1
+    co = type(co)(co.co_argcount, co.co_nlocals, co.co_stacksize,
+                  co.co_flags, ''.join(code), co.co_consts, co.co_names,
+                  co.co_varnames, co.co_filename, co.co_name,
+                  co.co_firstlineno, co.co_lnotab, co.co_freevars,
+                  co.co_cellvars)
+    return type(func)(co, func.func_globals, func.func_name)
+
+def best_time(bench, loops, runs):
+    best = float('inf')
+    for i in range(runs):
+        t0 = time.time()
+        bench(loops)
+        best = min(best, time.time() - t0)
+    return best
+
+def main(argv):
+    runs = 5
+    if argv[:1] == ['-n']:
+        runs = int(argv[1])
+        argv = argv[2:]
+    loops = int(argv[0]) if argv else 1000000
+    if 'LOAD_FAST_LOAD_ATTR' not in opcode.opmap:
+        print 'this interpreter has no superinstructions'
+        return
+    print '%-16s %10s %10s %8s' % ('', 'unfused', 'fused', 'speedup')
+    for bench in BENCHMARKS:
+        fused = best_time(bench, loops, runs)
+        unfused = best_time(unfuse(bench), loops, runs)
+        print '%-16s %8.3f s %8.3f s %7.1f%%' % (
+            bench.__name__[len('bench_'):], unfused, fused,
+            (unfused / fused - 1.0) * 100.0)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
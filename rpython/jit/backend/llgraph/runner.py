@@ -25,6 +25,7 @@ from rpython.rlib.objectmodel import Symbolic, compute_hash
 class LLAsmInfo(object):
     def __init__(self, lltrace):
         self.ops_offset = None
+        self.asmlen = 0     # no machine code
         self.lltrace = lltrace
 
 class LLTrace(object):
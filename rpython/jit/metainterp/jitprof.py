@@ -178,5 +178,49 @@ class Profiler(BaseProfiler):
         debug_print(final)
 
 
+PAUSE_BUCKETS = 24
+
+class PauseStats(object):
+    """Histogram of the pauses of the program while the JIT traces,
+    optimizes and assembles a loop or a bridge.  Bucket 0 counts the pauses
+    shorter than 1 microsecond, bucket i the ones between 2**(i-1) and
+    2**i microseconds, and the last bucket all the longer ones.  Unlike the
+    Profiler, it is always enabled: reading the clock twice is nothing
+    compared to tracing."""
+    timer = staticmethod(time.time)
+
+    def __init__(self):
+        self.buckets = [0] * PAUSE_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.longest = 0.0
+        self.depth = 0
+        self.t0 = 0.0
+
+    def start(self):
+        # the blackhole interpreter can start tracing again while we
+        # cancel a trace: only the outermost pause is recorded
+        if self.depth == 0:
+            self.t0 = self.timer()
+        self.depth += 1
+
+    def stop(self):
+        self.depth -= 1
+        if self.depth == 0:
+            self.record(self.timer() - self.t0)
+
+    def record(self, duration):
+        self.count += 1
+        self.total += duration
+        if duration > self.longest:
+            self.longest = duration
+        us = int(duration * 1000000.0)
+        i = 0
+        while us > 0 and i < PAUSE_BUCKETS - 1:
+            us >>= 1
+            i += 1
+        self.buckets[i] += 1
+
+
 class BrokenProfilerData(JitException):
     pass
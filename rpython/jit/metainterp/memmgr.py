@@ -1,6 +1,7 @@
 import math
 from rpython.rlib.rarithmetic import r_int64
 from rpython.rlib.debug import debug_start, debug_print, debug_stop
+from rpython.rlib.listsort import make_timsort_class
 from rpython.rlib.objectmodel import we_are_translated
 
 #
@@ -19,6 +20,24 @@ from rpython.rlib.objectmodel import we_are_translated
 # 'generation' field is much smaller than the current generation, and
 # removed from the set.
 #
+# Optionally, the total size of the machine code of the loops in
+# 'alive_loops' is also limited.  Each LoopToken records the size of
+# its assembler, bridges included, and how many times it was entered
+# from the interpreter (halved at every periodic check, so that it counts
+# the recent entries).  When the limit is exceeded, the loops with the
+# fewest entries per byte of code are removed first, i.e. the big ones
+# that are rarely used.  Like the old loops, they are freed by the GC;
+# if they become hot again, they are traced again.
+#
+
+def _eviction_score(looptoken):
+    return (looptoken.entry_count + 1.0) / (looptoken.code_size + 1.0)
+
+def _lower_score(looptoken1, looptoken2):
+    return _eviction_score(looptoken1) < _eviction_score(looptoken2)
+
+LoopTokenSort = make_timsort_class(lt=_lower_score)
+
 
 class MemoryManager(object):
 
@@ -38,6 +57,8 @@ class MemoryManager(object):
         self.current_generation = r_int64(1)
         self.next_check = r_int64(-1)
         self.alive_loops = {}
+        self.alive_code_size = 0    # total code_size of the alive_loops
+        self.max_code_size = 0      # in bytes, 0 means no limit
 
     def set_max_age(self, max_age, check_frequency=0):
         if max_age <= 0:
@@ -49,6 +70,12 @@ class MemoryManager(object):
             self.check_frequency = check_frequency
             self.next_check = self.current_generation + 1
 
+    def set_max_code_size(self, max_code_size):
+        if max_code_size < 0:
+            max_code_size = 0
+        self.max_code_size = max_code_size
+        self._check_code_size(None)
+
     def next_generation(self):
         self.current_generation += 1
         if self.current_generation == self.next_check:
@@ -58,7 +85,29 @@ class MemoryManager(object):
     def keep_loop_alive(self, looptoken):
         if looptoken.generation != self.current_generation:
             looptoken.generation = self.current_generation
-            self.alive_loops[looptoken] = None
+            if looptoken not in self.alive_loops:
+                self.alive_code_size += looptoken.code_size
+                self.alive_loops[looptoken] = None
+
+    def loop_entered(self, looptoken):
+        looptoken.entry_count += 1
+        self.keep_loop_alive(looptoken)
+
+    def add_code_size(self, looptoken, size):
+        """Record that 'size' bytes of machine code were produced for
+        the loop or one of its bridges."""
+        looptoken.code_size += size
+        if looptoken in self.alive_loops:
+            self.alive_code_size += size
+        self._check_code_size(looptoken)
+
+    def _forget_loop(self, looptoken):
+        del self.alive_loops[looptoken]
+        self.alive_code_size -= looptoken.code_size
+
+    def _check_code_size(self, keep):
+        if 0 < self.max_code_size < self.alive_code_size:
+            self._free_code_now(keep)
 
     def _kill_old_loops_now(self):
         debug_start("jit-mem-collect")
@@ -70,14 +119,43 @@ class MemoryManager(object):
         for looptoken in self.alive_loops.keys():
             if (0 <= looptoken.generation < max_generation or
                 looptoken.invalidated):
-                del self.alive_loops[looptoken]
+                self._forget_loop(looptoken)
+            else:
+                looptoken.entry_count >>= 1
         newtotal = len(self.alive_loops)
         debug_print("Loop tokens freed: ", oldtotal - newtotal)
         debug_print("Loop tokens left:  ", newtotal)
         #print self.alive_loops.keys()
+        self._check_code_size(None)
         if not we_are_translated() and oldtotal != newtotal:
             looptoken = None
-            from rpython.rlib import rgc
-            # a single one is not enough for all tests :-(
-            rgc.collect(); rgc.collect(); rgc.collect()
+            self._collect()
         debug_stop("jit-mem-collect")
+
+    def _free_code_now(self, keep):
+        debug_start("jit-mem-limit")
+        oldtotal = len(self.alive_loops)
+        debug_print("Code size before:  ", self.alive_code_size)
+        # the loops entered or compiled since the last loop or bridge
+        # was compiled are still in use, don't free them
+        looptokens = [looptoken for looptoken in self.alive_loops.keys()
+                      if looptoken.generation != self.current_generation and
+                         looptoken is not keep]
+        LoopTokenSort(looptokens).sort()
+        for looptoken in looptokens:
+            if self.alive_code_size <= self.max_code_size:
+                break
+            self._forget_loop(looptoken)
+        newtotal = len(self.alive_loops)
+        debug_print("Loop tokens freed: ", oldtotal - newtotal)
+        debug_print("Code size left:    ", self.alive_code_size)
+        if not we_are_translated() and oldtotal != newtotal:
+            looptoken = None
+            looptokens = None
+            self._collect()
+        debug_stop("jit-mem-limit")
+
+    def _collect(self):
+        from rpython.rlib import rgc
+        # a single one is not enough for all tests :-(
+        rgc.collect(); rgc.collect(); rgc.collect()
@@ -9,7 +9,7 @@ from rpython.jit.metainterp import history, compile, resume, executor, jitexc
 from rpython.jit.metainterp.heapcache import HeapCache
 from rpython.jit.metainterp.history import (Const, ConstInt, ConstPtr,
     ConstFloat, TargetToken, MissingValue, SwitchToBlackhole)
-from rpython.jit.metainterp.jitprof import EmptyProfiler
+from rpython.jit.metainterp.jitprof import EmptyProfiler, PauseStats
 from rpython.jit.metainterp.logger import Logger
 from rpython.jit.metainterp.optimizeopt.util import args_dict
 from rpython.jit.metainterp.resoperation import rop, OpHelpers, GuardResOp
@@ -1119,6 +1119,9 @@ class MIFrame(object):
                         loc = targetjitdriver_sd.warmstate.get_location_str(greenboxes)
                         debug_print("recursive function (not inlined):", loc)
                     warmrunnerstate.dont_trace_here(greenboxes)
+                    self.metainterp.staticdata.warmrunnerdesc.hooks.on_recursion_not_inlined(
+                        targetjitdriver_sd.jitdriver, greenboxes,
+                        warmrunnerstate.get_location_str(greenboxes))
                 else:
                     return self.metainterp.perform_call(portal_code, allboxes,
                                 greenkey=greenboxes)
@@ -1825,6 +1828,7 @@ class MetaInterpStaticData(object):
 
         self.profiler = ProfilerClass()
         self.profiler.cpu = cpu
+        self.pauses = PauseStats()
         self.warmrunnerdesc = warmrunnerdesc
         if warmrunnerdesc:
             self.config = warmrunnerdesc.translator.config
@@ -2355,6 +2359,8 @@ class MetaInterp(object):
         jd_sd = self.jitdriver_sd
         if not self.current_merge_points:
             greenkey = None # we're in the bridge
+            self.staticdata.warmrunnerdesc.hooks.on_bridge_abort(reason,
+                    jd_sd.jitdriver, self.resumekey)
         else:
             greenkey = self.current_merge_points[0][0][:jd_sd.num_green_args]
             self.staticdata.warmrunnerdesc.hooks.on_abort(reason,
@@ -2423,11 +2429,13 @@ class MetaInterp(object):
         self.staticdata._setup_once()
         self.staticdata.profiler.start_tracing()
         assert jitdriver_sd is self.jitdriver_sd
+        self.staticdata.pauses.start()
         self.staticdata.try_to_free_some_loops()
         try:
             original_boxes = self.initialize_original_boxes(jitdriver_sd, *args)
             return self._compile_and_run_once(original_boxes)
         finally:
+            self.staticdata.pauses.stop()
             self.staticdata.profiler.end_tracing()
             debug_stop('jit-tracing')
 
@@ -2460,6 +2468,7 @@ class MetaInterp(object):
         self.resumekey_original_loop_token = resumedescr.rd_loop_token.loop_token_wref()
         if self.resumekey_original_loop_token is None:
             raise compile.giveup() # should be rare
+        self.staticdata.pauses.start()
         self.staticdata.try_to_free_some_loops()
         try:
             inputargs = self.initialize_state_from_guard_failure(key, deadframe)
@@ -2467,6 +2476,7 @@ class MetaInterp(object):
         except SwitchToBlackhole as stb:
             self.run_blackhole_interp_to_cancel_tracing(stb)
         finally:
+            self.staticdata.pauses.stop()
             self.resumekey_original_loop_token = None
             self.staticdata.profiler.end_tracing()
             debug_stop('jit-tracing')
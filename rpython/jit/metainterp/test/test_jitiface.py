@@ -1,12 +1,13 @@
 
 import py
 from rpython.rlib.jit import JitDriver, JitHookInterface, Counters, dont_look_inside
+from rpython.rlib.jit import set_param
 from rpython.rlib import jit_hooks
 from rpython.jit.metainterp.test.support import LLJitMixin
 from rpython.jit.codewriter.policy import JitPolicy
 from rpython.jit.metainterp.resoperation import rop
 from rpython.rtyper.annlowlevel import hlstr, cast_instance_to_gcref
-from rpython.jit.metainterp.jitprof import Profiler, EmptyProfiler
+from rpython.jit.metainterp.jitprof import Profiler, EmptyProfiler, PAUSE_BUCKETS
 from rpython.jit.codewriter.policy import JitPolicy
 
 
@@ -119,6 +120,78 @@ class JitHookInterfaceTests(object):
         self.meta_interp(loop, [1, 10], policy=JitPolicy(MyJitIface()))
         assert called == ["compile", "before_compile_bridge", "compile_bridge"]
 
+    def test_on_bridge_abort(self):
+        reasons = []
+
+        class MyJitIface(JitHookInterface):
+            def on_abort(self, reason, jitdriver, greenkey, greenkey_repr,
+                         logops, ops):
+                assert False, "not a loop"
+
+            def on_bridge_abort(self, reason, jitdriver, fail_descr):
+                assert jitdriver is driver
+                reasons.append((reason, fail_descr))
+
+        driver = JitDriver(greens = [], reds = ['i', 's'])
+
+        def add(s, j):
+            return s + j
+
+        def loop(i):
+            s = 0
+            while i > 0:
+                driver.jit_merge_point(i=i, s=s)
+                if i < 10:
+                    # the trace length is only checked at calls and returns
+                    j = 0
+                    while j < 50:
+                        s = add(s, j * i)
+                        j += 1
+                i -= 1
+            return s
+
+        self.meta_interp(loop, [20], trace_limit=50,
+                         policy=JitPolicy(MyJitIface()))
+        assert len(reasons) >= 1
+        for reason, fail_descr in reasons:
+            assert reason == Counters.ABORT_TOO_LONG
+            assert fail_descr is reasons[0][1]
+
+    def test_on_recursion_not_inlined(self):
+        called = []
+
+        class MyJitIface(JitHookInterface):
+            def on_recursion_not_inlined(self, jitdriver, greenkey,
+                                         greenkey_repr):
+                assert jitdriver is driver
+                called.append(greenkey[1].getint())
+
+        driver = JitDriver(greens = ["threshold", "loop"], reds=["i"])
+
+        @dont_look_inside
+        def f():
+            set_param(driver, "max_unroll_recursion", 10)
+
+        def portal(threshold, loop, i):
+            f()
+            if i > threshold:
+                return i
+            while True:
+                driver.jit_merge_point(threshold=threshold, loop=loop, i=i)
+                if loop:
+                    portal(threshold, False, 0)
+                else:
+                    portal(threshold, False, i + 1)
+                    return i
+                if i > 10:
+                    return 1
+                i += 1
+                driver.can_enter_jit(threshold=threshold, loop=loop, i=i)
+
+        self.meta_interp(portal, [10, True, 0], inline=True,
+                         policy=JitPolicy(MyJitIface()))
+        assert called and called == [False] * len(called)
+
     def test_get_stats(self):
         driver = JitDriver(greens = [], reds = ['i', 's'])
 
@@ -144,6 +217,48 @@ class JitHookInterfaceTests(object):
 
         self.meta_interp(main, [], ProfilerClass=Profiler)
 
+    def test_get_pause_stats(self):
+        driver = JitDriver(greens = [], reds = ['i'])
+
+        def loop(i):
+            while i > 0:
+                driver.jit_merge_point(i=i)
+                i -= 1
+
+        def main():
+            assert jit_hooks.stats_get_pause_count(None) == 0
+            loop(30)
+            assert jit_hooks.stats_get_pause_count(None) == 1
+            total = jit_hooks.stats_get_pause_total(None)
+            assert total == jit_hooks.stats_get_pause_longest(None)
+            assert total > 0.0
+            n = 0
+            for i in range(PAUSE_BUCKETS):
+                n += jit_hooks.stats_get_pause_bucket(None, i)
+            assert n == 1
+
+        self.meta_interp(main, [])
+
+    def test_get_loop_sizes(self):
+        driver = JitDriver(greens = [], reds = ['i'])
+
+        def loop(i):
+            while i > 0:
+                driver.jit_merge_point(i=i)
+                i -= 1
+
+        def main():
+            assert len(jit_hooks.stats_get_loop_sizes(None)) == 0
+            loop(30)
+            loop(30)
+            ll_sizes = jit_hooks.stats_get_loop_sizes(None)
+            assert len(ll_sizes) == 1
+            assert ll_sizes[0].entry_count == 2
+            assert ll_sizes[0].code_size >= 0
+            assert jit_hooks.stats_get_code_size_limit(None) == 0
+
+        self.meta_interp(main, [])
+
     def test_get_stats_empty(self):
         driver = JitDriver(greens = [], reds = ['i'])
         def loop(i):
@@ -202,6 +317,25 @@ class JitHookInterfaceTests(object):
         self.meta_interp(main, [5])
         self.check_jitcell_token_count(2)
 
+    def test_seed_counter(self):
+        driver = JitDriver(greens = ['s'], reds = ['i'], name='jit')
+
+        def loop(i, s):
+            while i > s:
+                driver.jit_merge_point(i=i, s=s)
+                i -= 1
+
+        def main(s):
+            jit_hooks.seed_counter("jit", 0.0, s)
+            loop(s + 2, s)
+            assert not jit_hooks.get_jitcell_at_key("jit", s)
+            jit_hooks.seed_counter("jit", 0.98, s + 1)
+            loop(s + 3, s + 1)
+            assert jit_hooks.get_jitcell_at_key("jit", s + 1)
+
+        self.meta_interp(main, [5])
+        self.check_jitcell_token_count(1)
+
     def test_dont_trace_here(self):
         driver = JitDriver(greens = ['s'], reds = ['i', 'k'], name='jit')
 
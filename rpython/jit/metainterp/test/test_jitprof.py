@@ -4,7 +4,7 @@ from rpython.jit.metainterp.warmspot import ll_meta_interp
 from rpython.rlib.jit import JitDriver, dont_look_inside, elidable, Counters
 from rpython.jit.metainterp.test.support import LLJitMixin
 from rpython.jit.metainterp import pyjitpl
-from rpython.jit.metainterp.jitprof import Profiler
+from rpython.jit.metainterp.jitprof import Profiler, PauseStats, PAUSE_BUCKETS
 
 class FakeProfiler(Profiler):
     def start(self):
@@ -97,3 +97,41 @@ class TestProfile(ProfilerMixin):
         assert res == f(6, 7, 2)
         profiler = pyjitpl._warmrunnerdesc.metainterp_sd.profiler
         assert profiler.calls == 1
+
+    def test_pauses(self):
+        myjitdriver = JitDriver(greens = [], reds = ['x', 'y', 'res'])
+        def f(x, y):
+            res = 0
+            while y > 0:
+                myjitdriver.jit_merge_point(x=x, y=y, res=res)
+                res += x
+                if y < 5:
+                    res += 1
+                y -= 1
+            return res
+        res = self.meta_interp(f, [6, 20])
+        assert res == f(6, 20)
+        pauses = pyjitpl._warmrunnerdesc.metainterp_sd.pauses
+        assert pauses.count == 2     # the loop and the bridge
+        assert pauses.depth == 0
+        assert sum(pauses.buckets) == 2
+        assert 0.0 < pauses.longest <= pauses.total
+
+
+def test_pause_stats():
+    pauses = PauseStats()
+    times = [0.0, 0.0000005, 10.0, 10.003, 20.0, 21.0, 22.0, 1000.0]
+    pauses.timer = lambda: times.pop(0)
+    for i in range(3):
+        pauses.start()
+        pauses.stop()
+    pauses.start()
+    pauses.start()      # nested, not recorded separately
+    pauses.stop()
+    pauses.stop()
+    assert pauses.count == 4
+    assert pauses.longest == 978.0
+    assert pauses.buckets[0] == 1
+    assert pauses.buckets[12] == 1       # 3000us: between 2**11 and 2**12
+    assert pauses.buckets[20] == 1       # 1s: between 2**19 and 2**20
+    assert pauses.buckets[PAUSE_BUCKETS - 1] == 1
@@ -21,6 +21,8 @@ from rpython.rlib import rgc
 class FakeLoopToken:
     generation = 0
     invalidated = False
+    code_size = 0
+    entry_count = 0
 
 
 class _TestMemoryManager:
@@ -78,6 +80,71 @@ class _TestMemoryManager:
             else:
                 assert tokens[i] in memmgr.alive_loops
 
+    def test_code_size(self):
+        memmgr = MemoryManager()
+        tokens = [FakeLoopToken() for i in range(3)]
+        for token in tokens:
+            memmgr.keep_loop_alive(token)
+            memmgr.add_code_size(token, 100)
+            memmgr.next_generation()
+        memmgr.add_code_size(tokens[0], 50)     # a bridge
+        assert tokens[0].code_size == 150
+        assert memmgr.alive_code_size == 350
+        other = FakeLoopToken()
+        memmgr.add_code_size(other, 1000)       # not alive, not counted
+        assert memmgr.alive_code_size == 350
+        memmgr.keep_loop_alive(other)
+        assert memmgr.alive_code_size == 1350
+
+    def test_code_size_limit(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_code_size(1000)
+        small, big, hot = [FakeLoopToken() for i in range(3)]
+        for token, size in [(small, 100), (big, 500), (hot, 300)]:
+            memmgr.keep_loop_alive(token)
+            memmgr.add_code_size(token, size)
+            memmgr.next_generation()
+        for i in range(10):
+            memmgr.loop_entered(hot)
+        assert hot.entry_count == 10
+        memmgr.next_generation()
+        assert memmgr.alive_code_size == 900
+        # a bridge that makes 'hot' exceed the limit: 'big' is freed first
+        memmgr.add_code_size(hot, 200)
+        assert memmgr.alive_loops == dict.fromkeys([small, hot])
+        assert memmgr.alive_code_size == 600
+        # 'big' is traced and compiled again, and now 'small' has to go too
+        big = FakeLoopToken()
+        memmgr.keep_loop_alive(big)
+        memmgr.add_code_size(big, 500)
+        assert memmgr.alive_loops == dict.fromkeys([hot, big])
+        assert memmgr.alive_code_size == 1000
+
+    def test_code_size_limit_keeps_current(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_code_size(100)
+        tokens = [FakeLoopToken() for i in range(3)]
+        for token in tokens:
+            memmgr.keep_loop_alive(token)
+            memmgr.add_code_size(token, 80)
+        # all entered since the last loop was compiled: none is freed
+        assert memmgr.alive_loops == dict.fromkeys(tokens)
+        memmgr.next_generation()
+        memmgr.set_max_code_size(200)
+        assert len(memmgr.alive_loops) == 2
+        assert memmgr.alive_code_size == 160
+
+    def test_entry_count_decays(self):
+        memmgr = MemoryManager()
+        memmgr.set_max_age(4, 1)
+        token = FakeLoopToken()
+        for i in range(8):
+            memmgr.loop_entered(token)
+        memmgr.next_generation()
+        assert token.entry_count == 4
+        memmgr.next_generation()
+        assert token.entry_count == 2
+
 
 class _TestIntegration(LLJitMixin):
     # See comments in TestMemoryManager.  To get temporarily the normal
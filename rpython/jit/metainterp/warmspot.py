@@ -209,6 +209,7 @@ def reset_jit():
     """Helper for some tests (see micronumpy/test/test_zjit.py)"""
     reset_stats()
     pyjitpl._warmrunnerdesc.memory_manager.alive_loops.clear()
+    pyjitpl._warmrunnerdesc.memory_manager.alive_code_size = 0
     pyjitpl._warmrunnerdesc.jitcounter._clear_all()
 
 def get_translator():
@@ -676,7 +677,8 @@ class WarmRunnerDesc(object):
                 jitdrivers_by_name[name] = jd
         m = _find_jit_markers(self.translator.graphs,
                               ('get_jitcell_at_key', 'trace_next_iteration',
-                               'dont_trace_here', 'trace_next_iteration_hash'))
+                               'dont_trace_here', 'trace_next_iteration_hash',
+                               'seed_counter'))
         accessors = {}
 
         def get_accessor(name, jitdriver_name, function, ARGS, green_arg_spec):
@@ -688,7 +690,12 @@ class WarmRunnerDesc(object):
                  'lltype': lltype}
             arg_spec = ", ".join([("arg%d" % i) for i in range(len(ARGS))])
             arg_converters = []
+            if name == 'seed_counter':
+                first_green = 1     # the fraction comes first
+            else:
+                first_green = 0
             for i, spec in enumerate(green_arg_spec):
+                i += first_green
                 if isinstance(spec, lltype.Ptr):
                     arg_converters.append("arg%d = lltype.cast_opaque_ptr(type%d, arg%d)" % (i, i, i))
                     d['type%d' % i] = spec
@@ -730,6 +737,8 @@ class WarmRunnerDesc(object):
                 func = JitCell.dont_trace_here
             elif op.args[0].value == 'trace_next_iteration_hash':
                 func = JitCell.trace_next_iteration_hash
+            elif op.args[0].value == 'seed_counter':
+                func = JitCell.seed_counter
             else:
                 func = JitCell._trace_next_iteration
             argspec = jitdrivers_by_name[jitdriver_name]._green_args_spec
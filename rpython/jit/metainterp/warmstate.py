@@ -289,6 +289,12 @@ class WarmEnterState(object):
             self.warmrunnerdesc.memory_manager is not None):   # all for tests
             self.warmrunnerdesc.memory_manager.set_max_age(value)
 
+    def set_param_code_size_limit(self, value):
+        # note: it's a global parameter, not a per-jitdriver one
+        if (self.warmrunnerdesc is not None and
+            self.warmrunnerdesc.memory_manager is not None):   # all for tests
+            self.warmrunnerdesc.memory_manager.set_max_code_size(value * 1024)
+
     def set_param_retrace_limit(self, value):
         if self.warmrunnerdesc:
             if self.warmrunnerdesc.memory_manager:
@@ -389,7 +395,7 @@ class WarmEnterState(object):
             #
             # Record in the memmgr that we just ran this loop,
             # so that it will keep it alive for a longer time
-            warmrunnerdesc.memory_manager.keep_loop_alive(loop_token)
+            warmrunnerdesc.memory_manager.loop_entered(loop_token)
             #
             # Handle the failure
             fail_descr = cpu.get_latest_descr(deadframe)
@@ -601,8 +607,14 @@ class WarmEnterState(object):
 
             @staticmethod
             def _trace_next_iteration(*greenargs):
+                JitCell.seed_counter(0.98, *greenargs)
+
+            @staticmethod
+            def seed_counter(fraction, *greenargs):
+                # set the counter of 'greenargs' to the given fraction of
+                # the threshold: 0.98 means "trace the next iteration"
                 hash = JitCell.get_uhash(*greenargs)
-                jitcounter.change_current_fraction(hash, 0.98)
+                jitcounter.change_current_fraction(hash, fraction)
 
             @staticmethod
             def trace_next_iteration_hash(hash):
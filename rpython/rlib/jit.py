@@ -549,6 +549,7 @@ PARAMETER_DOCS = {
     'trace_limit': 'number of recorded operations before we abort tracing with ABORT_TOO_LONG',
     'inlining': 'inline python functions or not (1/0)',
     'loop_longevity': 'a parameter controlling how long loops will be kept before being freed, an estimate',
+    'code_size_limit': 'maximum size in KB of the machine code of the loops kept alive; the least used ones per byte are freed first (0=no limit)',
     'retrace_limit': 'how many times we can try retracing before giving up',
     'max_retrace_guards': 'number of extra guards a retrace can cause',
     'max_unroll_loops': 'number of extra unrollings a loop can cause',
@@ -570,6 +571,7 @@ PARAMETERS = {'threshold': 1039, # just above 1024, prime
               'trace_limit': 6000,
               'inlining': 1,
               'loop_longevity': 1000,
+              'code_size_limit': 0,
               'retrace_limit': 0,
               'max_retrace_guards': 15,
               'max_unroll_loops': 0,
@@ -1105,6 +1107,18 @@ class JitHookInterface(object):
         disabled function
         """
 
+    def on_bridge_abort(self, reason, jitdriver, fail_descr):
+        """ A hook called each time the tracing of a bridge is aborted,
+        with the fail descr of the guard it started from, as in
+        JitDebugInfo.fail_descr, and reason as in on_abort
+        """
+
+    def on_recursion_not_inlined(self, jitdriver, greenkey, greenkey_repr):
+        """ A hook called each time the tracing doesn't inline a call to
+        a recursive function, because it was already inlined
+        max_unroll_recursion times, with the greenkey of that function
+        """
+
     #def before_optimize(self, debug_info):
     #    """ A hook called before optimizer is run, called with instance of
     #    JitDebugInfo. Overwrite for custom behavior
@@ -137,6 +137,41 @@ def stats_asmmemmgr_allocated(warmrunnerdesc):
 def stats_asmmemmgr_used(warmrunnerdesc):
     return warmrunnerdesc.metainterp_sd.cpu.asmmemmgr.get_stats()[1]
 
+@register_helper(annmodel.SomeInteger())
+def stats_get_pause_count(warmrunnerdesc):
+    return warmrunnerdesc.metainterp_sd.pauses.count
+
+@register_helper(annmodel.SomeFloat())
+def stats_get_pause_total(warmrunnerdesc):
+    return warmrunnerdesc.metainterp_sd.pauses.total
+
+@register_helper(annmodel.SomeFloat())
+def stats_get_pause_longest(warmrunnerdesc):
+    return warmrunnerdesc.metainterp_sd.pauses.longest
+
+@register_helper(annmodel.SomeInteger())
+def stats_get_pause_bucket(warmrunnerdesc, i):
+    return warmrunnerdesc.metainterp_sd.pauses.buckets[i]
+
+LOOP_SIZE_CONTAINER = lltype.GcArray(lltype.Struct('elem',
+                                                   ('number', lltype.Signed),
+                                                   ('code_size', lltype.Signed),
+                                                   ('entry_count', lltype.Signed)))
+
+@register_helper(lltype.Ptr(LOOP_SIZE_CONTAINER))
+def stats_get_loop_sizes(warmrunnerdesc):
+    looptokens = warmrunnerdesc.memory_manager.alive_loops.keys()
+    l = lltype.malloc(LOOP_SIZE_CONTAINER, len(looptokens))
+    for i in range(len(looptokens)):
+        l[i].number = looptokens[i].number
+        l[i].code_size = looptokens[i].code_size
+        l[i].entry_count = looptokens[i].entry_count
+    return l
+
+@register_helper(annmodel.SomeInteger())
+def stats_get_code_size_limit(warmrunnerdesc):
+    return warmrunnerdesc.memory_manager.max_code_size
+
 # ---------------------- jitcell interface ----------------------
 
 def _new_hook(name, resulttype):
@@ -166,3 +201,4 @@ get_jitcell_at_key = _new_hook('get_jitcell_at_key', SomePtr(llmemory.GCREF))
 trace_next_iteration = _new_hook('trace_next_iteration', None)
 dont_trace_here = _new_hook('dont_trace_here', None)
 trace_next_iteration_hash = _new_hook('trace_next_iteration_hash', None)
+seed_counter = _new_hook('seed_counter', None)
@@ -713,12 +713,12 @@ class UnicodeBuilderEntry(BaseEntry, ExtRegistryEntry):
 class __extend__(pairtype(SomeStringBuilder, SomeStringBuilder)):
 
     def union((obj1, obj2)):
-        return obj1
+        return SomeStringBuilder()
 
 class __extend__(pairtype(SomeUnicodeBuilder, SomeUnicodeBuilder)):
 
     def union((obj1, obj2)):
-        return obj1
+        return SomeUnicodeBuilder()
 
 class PrebuiltStringBuilderEntry(ExtRegistryEntry):
     _type_ = StringBuilder
@@ -215,6 +215,38 @@ class TestStringBuilder(BaseRtypingTest):
         res = self.interpret(f, [])
         assert res == 3
 
+    def test_prebuilt_builder_in_attribute(self):
+        class A(object):
+            def __init__(self, builder):
+                self.builder = builder
+        prebuilt = A(StringBuilder())
+        prebuilt.builder.append("prebuilt")
+
+        def f(n):
+            length = prebuilt.builder.getlength()
+            a = A(StringBuilder())
+            a.builder.append("x" * n)
+            return a.builder.getlength() * 100 + length
+
+        res = self.interpret(f, [5])
+        assert res == 508
+
+    def test_prebuilt_unicode_builder_in_attribute(self):
+        class A(object):
+            def __init__(self, builder):
+                self.builder = builder
+        prebuilt = A(UnicodeBuilder())
+        prebuilt.builder.append(u"prebuilt")
+
+        def f(n):
+            length = prebuilt.builder.getlength()
+            a = A(UnicodeBuilder())
+            a.builder.append(u"x" * n)
+            return a.builder.getlength() * 100 + length
+
+        res = self.interpret(f, [5])
+        assert res == 508
+
     def test_string_builder_union(self):
         s = StringBuilder()
 